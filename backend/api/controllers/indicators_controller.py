@@ -42,11 +42,12 @@ class IndicatorsController:
     def get_indicator_modules(self):
         """
         Retrieve all indicator modules from the indicators directory.
+        Private helper modules (prefixed with '_') hold shared kernels, not indicators.
         """
         return [
             f
             for f in os.listdir(self.indicators_dir)
-            if f.endswith('.py') and f != '__init__.py'
+            if f.endswith('.py') and not f.startswith('_')
         ]
 
     def fetch_historical_data(self, instrument, granularity="M"):
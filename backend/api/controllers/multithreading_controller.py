@@ -6,6 +6,7 @@ from backend.api.services.trading_services import TradingService
 from backend.api.services.data_population_service import DataPopulationService
 from backend.trading.optimizers.backtester import Backtester
 from backend.trading.optimizers.optimizer import Optimizer
+from backend.trading.optimizers.portfolio import MAJORS, PortfolioBacktester
 from backend.api.services.state_machine import StateMachine
 from backend.logs.log_manager import LogManager
 
@@ -55,6 +56,20 @@ class MultithreadingController:
         future = self.executor.submit(self._run_task, self.backtester.run, strategy_name, instrument, timeframe)
         self.futures.append(future)
 
+    def run_portfolio_backtest(self, buy_signal, sell_signal, indicators=(), instruments=MAJORS, timeframe="D"):
+        """
+        Schedules one backtest of several instruments in a shared account, instead of one thread per instrument.
+        :parameter buy_signal: Signal expression evaluated for every instrument (e.g. "close > sma").
+        :parameter sell_signal: Signal expression evaluated for every instrument.
+        :parameter indicators: Iterable of (indicator_func, parameters dict) pairs.
+        :parameter instruments: Forex instruments of the portfolio.
+        :parameter timeframe: Timeframe to run the backtest on.
+        """
+        portfolio = PortfolioBacktester()
+        future = self.executor.submit(self._run_task, portfolio.run, instruments, timeframe, buy_signal, sell_signal,
+                                      indicators)
+        self.futures.append(future)
+
     def run_optimizer(self, instrument, parameters):
         """
         Schedules an optimization task to run in a separate thread.
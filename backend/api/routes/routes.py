@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, timezone
 import os
 from backend.api.services.data_population_service import DataPopulationService
 from backend.api.services.state_machine import StateMachine
@@ -79,7 +79,7 @@ def system_status():
                 {}, collection_name=mongo_collection
             ):
                 latest_mongo_time = max(record["time"] for record in mongo_latest_record)
-                latest_mongo_dt = datetime.strptime(latest_mongo_time, "%Y-%m-%d %H:%M:%S")
+                latest_mongo_dt = datetime.strptime(latest_mongo_time, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
             else:
                 latest_mongo_dt = None
 
@@ -88,10 +88,14 @@ def system_status():
                 "SELECT MAX(timestamp) FROM historical_data WHERE instrument_id = ? AND granularity = ?",
                 (instrument_id, "D")
             )
-            latest_sqlite_dt = sqlite_latest_time[0][0] if sqlite_latest_time and sqlite_latest_time[0][0] else None
+            # historical_data stores epoch seconds (UTC)
+            latest_sqlite_dt = (
+                datetime.fromtimestamp(sqlite_latest_time[0][0], timezone.utc)
+                if sqlite_latest_time and sqlite_latest_time[0][0] else None
+            )
 
             # Step 3: Determine if data is missing or out-of-sync
-            now = datetime.now()
+            now = datetime.now(timezone.utc)
 
             if not latest_mongo_dt:
                 alerts.append(f"⚠️ No data in MongoDB for {instrument_name} (Daily)")
@@ -100,7 +104,7 @@ def system_status():
 
             if not latest_sqlite_dt:
                 alerts.append(f"⚠️ No data in SQLite for {instrument_name} (Daily)")
-            elif (now - datetime.strptime(latest_sqlite_dt, "%Y-%m-%d %H:%M:%S")).days > 1:
+            elif (now - latest_sqlite_dt).days > 1:
                 alerts.append(f"⚠️ SQLite data outdated for {instrument_name} (Last updated: {latest_sqlite_dt})")
 
             response_data.append({
@@ -108,7 +112,7 @@ def system_status():
                 'instrument_name': instrument_name,
                 'state': states,
                 'mongo_last_update': latest_mongo_dt.strftime("%Y-%m-%d %H:%M:%S") if latest_mongo_dt else "Missing",
-                'sqlite_last_update': latest_sqlite_dt or "Missing",
+                'sqlite_last_update': latest_sqlite_dt.strftime("%Y-%m-%d %H:%M:%S") if latest_sqlite_dt else "Missing",
                 'timestamp': now.isoformat()
             })
 
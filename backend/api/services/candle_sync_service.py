@@ -0,0 +1,95 @@
+import itertools
+from datetime import datetime, timedelta, timezone
+
+from backend.data.repositories._mongo_db import MongoDBHandler
+from backend.data.repositories._sqlite_db import SQLiteDBHandler
+from backend.data.utils.utils import candle_rows, to_epoch_seconds
+from backend.logs.log_manager import LogManager
+from backend.trading.brokers.oanda_client import OandaClient
+
+# Initialize the logger
+logger = LogManager('candle_sync_logs').get_logger()
+
+
+class CandleSyncService:
+    """
+    Keeps the MongoDB and SQLite candle stores up to date with OANDA.
+
+    Each store's high-water mark (the epoch of its newest candle) is read back from the store itself, so a
+    sync downloads only the candles after the older of the two marks and writes each store only what it
+    is missing. Writes are keyed on (instrument, granularity, timestamp), so repeating a sync adds nothing.
+
+    Usage:
+        service = CandleSyncService()
+        service.sync("EUR_USD", "M1")  # {'mongo': 12, 'sqlite': 12}
+    """
+
+    def __init__(self, oanda_client=None, mongo_handler=None, sqlite_db=None):
+        """
+        :param oanda_client: OandaClient to download from.
+        :param mongo_handler: MongoDBHandler for the forex_data database.
+        :param sqlite_db: SQLiteDBHandler holding the instruments and historical_data tables.
+        """
+        self.oanda_client = oanda_client or OandaClient()
+        self.mongo_handler = mongo_handler or MongoDBHandler(db_name="forex_data")
+        self.sqlite_db = sqlite_db or SQLiteDBHandler(db_name="instruments.db")
+
+    def high_water_marks(self, instrument, granularity, instrument_id=None):
+        """
+        :return: Dict of store name to the epoch of its newest candle (None when it has none).
+        """
+        marks = {"mongo": self.mongo_handler.latest_candle_timestamp(instrument, granularity)}
+        if instrument_id is not None:
+            marks["sqlite"] = self.sqlite_db.latest_candle_timestamp(instrument_id, granularity)
+        return marks
+
+    def sync(self, instrument, granularity, default_days=30):
+        """
+        Bring both stores up to date for one instrument and granularity.
+
+        :param instrument: The forex pair (e.g., "EUR_USD").
+        :param granularity: The timeframe (e.g., "M1", "H1").
+        :param default_days: History to download for a store that holds no candles yet.
+        :return: Dict of store name to the number of candles added. SQLite is left out when the
+                 instrument is not registered there.
+        """
+        instrument, granularity = instrument.upper(), granularity.upper()
+        instrument_id = self.sqlite_db.get_instrument_id(instrument)
+        if instrument_id is None:
+            logger.warning(f"⚠️ Instrument {instrument} not found in SQLite; syncing MongoDB only.")
+
+        marks = self.high_water_marks(instrument, granularity, instrument_id)
+        now = datetime.now(timezone.utc)
+        default_start = int((now - timedelta(days=default_days)).timestamp())
+        starts = {store: default_start if mark is None else mark + 1 for store, mark in marks.items()}
+
+        candles = self.oanda_client.fetch_historical_data(
+            instrument, granularity, start_date=datetime.fromtimestamp(min(starts.values()), timezone.utc),
+            end_date=now,
+        )
+        timestamps = [to_epoch_seconds(candle['time']) for candle in candles]
+
+        def newer(store):
+            return [candle for candle, ts in zip(candles, timestamps) if ts >= starts[store]]
+
+        added = {"mongo": self.mongo_handler.upsert_candles(instrument, granularity, newer("mongo"))}
+        if instrument_id is not None:
+            added["sqlite"] = self.sqlite_db.insert_candles(candle_rows(instrument_id, granularity, newer("sqlite")))
+
+        logger.info(f"✅ Synced {instrument} ({granularity}): downloaded {len(candles)} candles, added {added}.")
+        return added
+
+    def sync_all(self, instruments, granularities, default_days=30):
+        """
+        Sync every instrument/granularity pair. A failing pair is logged and does not stop the others.
+
+        :return: Dict of (instrument, granularity) to the counts returned by sync, or None on failure.
+        """
+        results = {}
+        for instrument, granularity in itertools.product(instruments, granularities):
+            try:
+                results[(instrument, granularity)] = self.sync(instrument, granularity, default_days)
+            except Exception as e:
+                logger.error(f"❌ Error syncing {instrument} ({granularity}): {e}")
+                results[(instrument, granularity)] = None
+        return results
@@ -70,7 +70,7 @@ class DataPopulationService:
                 data_inserted = self.mongo_handler.populate_historical_data(instrument, granularity, count)
 
                 if data_inserted:
-                    self.logger.info(f"Inserted {len(data_inserted)} records into {collection_name}.")
+                    self.logger.info(f"Inserted {data_inserted} records into {collection_name}.")
                 else:
                     self.logger.warning(f"No data inserted for {instrument} ({granularity}).")
 
@@ -94,12 +94,13 @@ class DataPopulationService:
             try:
                 self.logger.info(f"Populating {pair} ({granularity})...")
 
-                if data_inserted := self.mongo_handler.populate_historical_data(
+                # Only the candles after the newest stored one are downloaded
+                if data_inserted := self.mongo_handler.ensure_collection_exists_and_populate(
                     pair, granularity
                 ):
-                    self.logger.info(f"Successfully inserted {len(data_inserted)} records for {pair} ({granularity}).")
+                    self.logger.info(f"Successfully inserted {data_inserted} records for {pair} ({granularity}).")
                 else:
-                    self.logger.warning(f"No data was inserted for {pair} ({granularity}).")
+                    self.logger.info(f"No new data for {pair} ({granularity}).")
 
             except Exception as e:
                 self.logger.error(f"Error populating {pair} ({granularity}): {e}")
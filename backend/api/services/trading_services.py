@@ -131,7 +131,8 @@ class TradingService:
         Retrieves the trading performance metrics from the database.
         """
         query = """
-        SELECT instruments.name, optimization_results.sharpe_ratio, optimization_results.total_return, optimization_results.max_drawdown, optimization_results.win_rate, optimization_results.profit_loss, optimization_results.total_trades FROM optimization_results JOIN instruments ON instruments.id = optimization_results.instrument_id; """
+        SELECT instruments.name, optimization_results.sharpe_ratio, optimization_results.total_return, optimization_results.max_drawdown, optimization_results.win_rate, optimization_results.profit_loss, optimization_results.total_trades FROM optimization_results JOIN instruments ON instruments.id = optimization_results.instrument_id
+        WHERE optimization_results.run_id IS NULL; """
         cursor = self.conn.cursor()
         cursor.execute(query)
         performance_data = cursor.fetchall()
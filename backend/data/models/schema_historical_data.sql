@@ -1,18 +1,15 @@
 -- Table for storing historical data
+-- Rows are clustered on (instrument_id, granularity, timestamp), so a range query for one
+-- instrument/granularity reads a contiguous slice of the table already in time order.
 CREATE TABLE IF NOT EXISTS historical_data (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
     instrument_id INTEGER NOT NULL,  -- Foreign key to instruments
-    instrument TEXT NOT NULL, -- Instrument information
     granularity TEXT NOT NULL,
-    timestamp TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,      -- Candle time in seconds since the Unix epoch (UTC)
     open REAL,        -- Open price
     high REAL,        -- High price
     low REAL,         -- Low price
     close REAL,       -- Close price
     volume INTEGER,   -- Volume (optional)
+    PRIMARY KEY (instrument_id, granularity, timestamp),
     FOREIGN KEY (instrument_id) REFERENCES instruments(id)
-);
-
--- Create the index only if it doesn't exist
-CREATE INDEX IF NOT EXISTS idx_historical_instrument_id ON historical_data (instrument_id);
-
+) WITHOUT ROWID;
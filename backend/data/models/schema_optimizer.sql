@@ -13,8 +13,10 @@ CREATE TABLE IF NOT EXISTS optimized_parameters (
 -- Table for storing optimization performance results
 CREATE TABLE IF NOT EXISTS optimization_results (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
-    optimization_id INTEGER NOT NULL,  -- Foreign key to the optimized_parameters table
+    optimization_id INTEGER,           -- Foreign key to the optimized_parameters table (NULL for sweep checkpoints)
     instrument_id INTEGER NOT NULL,    -- Foreign key to the instruments table (for easier lookup)
+    run_id TEXT,                       -- optimization_runs row of the sweep that evaluated the parameters
+    parameters TEXT,                   -- JSON of the evaluated parameters (sweep checkpoints)
     sharpe_ratio REAL,                 -- Sharpe ratio of the optimized strategy
     total_return REAL,                 -- Total return percentage
     max_drawdown REAL,                 -- Maximum drawdown observed
@@ -25,3 +27,37 @@ CREATE TABLE IF NOT EXISTS optimization_results (
     FOREIGN KEY(optimization_id) REFERENCES optimized_parameters(id) ON DELETE CASCADE,
     FOREIGN KEY(instrument_id) REFERENCES instruments(id) ON DELETE CASCADE
 );
+
+-- Table for storing walk-forward optimization windows
+CREATE TABLE IF NOT EXISTS walk_forward_windows (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instrument_id INTEGER NOT NULL,    -- Foreign key to the instruments table
+    indicator_id INTEGER NOT NULL,     -- Foreign key to the indicators table
+    search_key TEXT NOT NULL,          -- Hash of the parameter grid, window sizes and ranking metric
+    train_start TEXT NOT NULL,         -- First bar of the training window
+    train_end TEXT NOT NULL,           -- Last bar of the training window
+    test_start TEXT NOT NULL,          -- First bar of the out-of-sample window
+    test_end TEXT NOT NULL,            -- Last bar of the out-of-sample window
+    parameters TEXT NOT NULL,          -- JSON of the parameters that won the training window
+    optimization_id INTEGER,           -- First optimized_parameters row of the winner
+    result_id INTEGER,                 -- optimization_results row of the out-of-sample performance
+    timestamp TEXT NOT NULL,           -- Timestamp of when the window was evaluated
+    UNIQUE (instrument_id, indicator_id, search_key, train_start, test_end),
+    FOREIGN KEY(optimization_id) REFERENCES optimized_parameters(id) ON DELETE CASCADE,
+    FOREIGN KEY(result_id) REFERENCES optimization_results(id) ON DELETE CASCADE
+);
+
+-- Table for storing checkpointed optimizer sweeps
+CREATE TABLE IF NOT EXISTS optimization_runs (
+    run_id TEXT PRIMARY KEY,           -- Caller-chosen or generated id, reused to resume the sweep
+    instrument_id INTEGER NOT NULL,    -- Foreign key to the instruments table
+    indicator_id INTEGER NOT NULL,     -- Foreign key to the indicators table
+    total_combinations INTEGER NOT NULL,
+    status TEXT NOT NULL,              -- running, cancelled, interrupted or completed
+    started TEXT NOT NULL,             -- Timestamp of when the run was first started
+    updated TEXT NOT NULL              -- Timestamp of the last status change
+);
+
+-- One checkpoint row per parameter set and run, so a resumed sweep never stores a combination twice
+CREATE UNIQUE INDEX IF NOT EXISTS idx_optimization_results_run
+    ON optimization_results (run_id, parameters) WHERE run_id IS NOT NULL;
@@ -0,0 +1,177 @@
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from backend.data.utils.utils import to_epoch_array
+from backend.logs.log_manager import LogManager
+
+# Configure logging
+logger = LogManager('candle_cache_logs').get_logger()
+
+
+class CandleCache:
+    """
+    Local columnar cache of candles, one .npy file per column under
+    databases/cache/<INSTRUMENT>_<GRANULARITY>/<generation>/.
+
+    Columns are opened with np.load(mmap_mode='r'), so loading is O(1) regardless of size and every
+    process that opens the same generation shares the same page-cache pages. A refresh writes a new
+    generation and then switches meta.json to it; readers that still map the previous generation
+    keep a consistent view until they reload.
+    """
+
+    COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+    META_FILE = 'meta.json'
+
+    def __init__(self, cache_dir=None):
+        """
+        :parameter cache_dir: Directory holding the cache. Defaults to databases/cache next to the SQLite files.
+        """
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.cache_dir = cache_dir or os.path.join(base_dir, "databases", "cache")
+
+    def path(self, instrument, granularity):
+        return os.path.join(self.cache_dir, f"{instrument.upper()}_{granularity.upper()}")
+
+    def metadata(self, instrument, granularity):
+        """
+        Return the cache metadata (rows, first/last timestamp, refreshed_at, generation) or None if not cached.
+        """
+        meta_path = os.path.join(self.path(instrument, granularity), self.META_FILE)
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def is_stale(self, instrument, granularity, latest_timestamp=None, max_age=None):
+        """
+        Decide whether the cached candles need a refresh.
+
+        :parameter latest_timestamp: Epoch seconds of the newest candle in the source, if known.
+        :parameter max_age: Seconds after which the cache is stale regardless of the source.
+        :return: True if the cache is missing, behind the source, or older than max_age.
+        """
+        meta = self.metadata(instrument, granularity)
+        if meta is None:
+            return True
+        if latest_timestamp is not None and (meta['last_timestamp'] is None or latest_timestamp > meta['last_timestamp']):
+            return True
+        return max_age is not None and time.time() - meta['refreshed_at'] > max_age
+
+    def load_arrays(self, instrument, granularity):
+        """
+        Memory-map the cached columns without copying.
+
+        :return: Dict of read-only arrays keyed by 'timestamp' (epoch seconds) and the OHLCV columns,
+                 or None if the instrument is not cached.
+        """
+        for attempt in range(2):
+            meta = self.metadata(instrument, granularity)
+            if meta is None:
+                return None
+            generation_dir = os.path.join(self.path(instrument, granularity), meta['generation'])
+            try:
+                return {
+                    column: np.load(os.path.join(generation_dir, f"{column}.npy"), mmap_mode='r')
+                    for column in ('timestamp',) + self.COLUMNS
+                }
+            except FileNotFoundError:
+                # A refresh replaced the generation between reading meta.json and opening the files
+                if attempt:
+                    raise
+
+    def load(self, instrument, granularity):
+        """
+        Load the cached candles as a DataFrame indexed by UTC timestamp. The OHLCV columns are
+        backed by the memory-mapped files (read-only; pandas copies on write).
+
+        :return: DataFrame or None if the instrument is not cached.
+        """
+        arrays = self.load_arrays(instrument, granularity)
+        if arrays is None:
+            return None
+        # Reinterpreting the epoch seconds as datetime64[s] avoids parsing them one by one
+        index = pd.DatetimeIndex(arrays.pop('timestamp').view('datetime64[s]'), dtype='datetime64[s, UTC]',
+                                 name='timestamp')
+        return pd.DataFrame(arrays, index=index, copy=False)
+
+    def write(self, instrument, granularity, df):
+        """
+        Replace the cached candles.
+
+        :parameter df: DataFrame with OHLCV columns, indexed by timestamp (or with a 'timestamp' column).
+        :return: Number of cached rows.
+        """
+        return self._write_generation(instrument, granularity, self._as_columns(df))
+
+    def append(self, instrument, granularity, df):
+        """
+        Add newer candles to the cache. Rows at or before the last cached timestamp replace nothing
+        and are dropped.
+
+        :return: Number of cached rows after the append.
+        """
+        current = self.load_arrays(instrument, granularity)
+        if current is None:
+            return self.write(instrument, granularity, df)
+
+        last = int(current['timestamp'][-1]) if len(current['timestamp']) else None
+        new = self._as_columns(df)
+        keep = new['timestamp'] > last if last is not None else slice(None)
+        columns = {column: np.concatenate((current[column], new[column][keep])) for column in current}
+        return self._write_generation(instrument, granularity, columns)
+
+    def invalidate(self, instrument, granularity):
+        """
+        Drop the cache for one instrument/granularity.
+        """
+        shutil.rmtree(self.path(instrument, granularity), ignore_errors=True)
+
+    @classmethod
+    def _as_columns(cls, df):
+        timestamps = df['timestamp'] if 'timestamp' in df.columns else df.index
+        if pd.api.types.is_integer_dtype(timestamps):
+            timestamps = np.asarray(timestamps, dtype=np.int64)
+        else:
+            timestamps = to_epoch_array(timestamps)
+        columns = {'timestamp': timestamps}
+        for column in cls.COLUMNS:
+            columns[column] = df[column].to_numpy(dtype=float) if column in df.columns else np.zeros(len(df))
+        return columns
+
+    def _write_generation(self, instrument, granularity, columns):
+        key_dir = self.path(instrument, granularity)
+        previous = self.metadata(instrument, granularity)
+        generation = uuid.uuid4().hex
+        generation_dir = os.path.join(key_dir, generation)
+        os.makedirs(generation_dir)
+
+        for column, values in columns.items():
+            np.save(os.path.join(generation_dir, f"{column}.npy"), values)
+
+        timestamps = columns['timestamp']
+        meta = {
+            'rows': int(len(timestamps)),
+            'first_timestamp': int(timestamps[0]) if len(timestamps) else None,
+            'last_timestamp': int(timestamps[-1]) if len(timestamps) else None,
+            'refreshed_at': time.time(),
+            'generation': generation,
+        }
+        # Switch readers to the new generation atomically
+        meta_tmp = os.path.join(key_dir, f"{self.META_FILE}.{generation}")
+        with open(meta_tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_tmp, os.path.join(key_dir, self.META_FILE))
+
+        # Processes that still map the old files keep them alive until they close them
+        if previous is not None:
+            shutil.rmtree(os.path.join(key_dir, previous['generation']), ignore_errors=True)
+
+        logger.info(f"Cached {meta['rows']} candles for {instrument} {granularity} in {generation_dir}.")
+        return meta['rows']
@@ -4,9 +4,10 @@ from datetime import datetime, timedelta
 
 import yfinance as yf
 from datetime import timezone
-from pymongo import MongoClient, errors
+from pymongo import DeleteOne, MongoClient, UpdateOne, errors
 
 from backend.config.secrets import defs
+from backend.data.utils.utils import candle_rows, to_epoch_seconds
 from backend.logs.log_manager import LogManager
 from backend.trading.brokers.oanda_client import OandaClient
 
@@ -270,46 +271,159 @@ class MongoDBHandler:
 
     def ensure_collection_exists_and_populate(self, instrument, granularity="D", count=500):
         """
-        Ensure the MongoDB collection exists and populate it with historical data.
+        Ensure the MongoDB collection exists and bring it up to date with OANDA.
+
+        Only the candles after the newest stored one are fetched; an empty collection gets the latest `count`.
 
         :param instrument: The forex pair (e.g., "EUR_USD").
         :param granularity: The timeframe (e.g., "M1", "D", "H1").
-        :param count: The number of data points to fetch.
+        :param count: The number of data points to fetch when the collection is empty.
+        :return: Number of candles added.
         """
         try:
-            collection_name = f"{instrument.lower()}_{granularity.lower()}_data"
-
-            # Ensure collection exists and create it if necessary
-            self.create_collection_with_index(collection_name, index_field="time")
-
-            # Check if the latest data exists before fetching new data
-            latest_record = self.db[collection_name].find_one(sort=[("time", -1)])
-            latest_time = latest_record["time"] if latest_record else None
-
-            if latest_time:
-                logger.info(f"📌 Latest stored data for {instrument} ({granularity}): {latest_time}")
-                start_time = datetime.fromisoformat(latest_time[:-1])  # Remove trailing 'Z' if present
+            instrument = instrument.upper()
+            latest = self.latest_candle_timestamp(instrument, granularity)
+
+            if latest is not None:
+                logger.info(f"📌 Latest stored data for {instrument} ({granularity}): {latest}. Fetching newer data...")
+                # Fetch **only newer data** from OANDA
+                new_data = self.oanda_client.fetch_historical_data(
+                    instrument, granularity, start_date=datetime.fromtimestamp(latest + 1, timezone.utc)
+                )
             else:
-                start_time = datetime.utcnow() - timedelta(days=30)  # Default to last 30 days if no data
-
-            logger.info(f"Latest record found in {collection_name} at {latest_time}. Fetching newer data...")
+                new_data = self.oanda_client.fetch_historical_data(instrument, granularity, count=count)
 
-            # Fetch **only newer data** from OANDA
-            new_data = self.oanda_client.fetch_historical_data(instrument, granularity, count, start_time=start_time)
-            # Ensure collection is set before inserting
-            self.switch_collection(collection_name)
-
-            if new_data:
-                self.switch_collection(collection_name)
-                self.short_bulk_insert(new_data)
-                logger.info(f"✅ Inserted {len(new_data)} new records for {instrument} in {granularity}.")
+            added = self.upsert_candles(instrument, granularity, new_data)
+            if added:
+                logger.info(f"✅ Inserted {added} new records for {instrument} in {granularity}.")
             else:
                 logger.info(f"⚠️ No new data available for {instrument} in {granularity}.")
+            return added
 
         except Exception as e:
             logger.error(f"❌ Error ensuring collection and populating data for {instrument}: {e}")
             raise
 
+    @staticmethod
+    def candle_collection_name(instrument, granularity):
+        return f"{instrument.lower()}_{granularity.lower()}_data"
+
+    def ensure_candle_index(self, instrument, granularity):
+        """
+        Create the unique (instrument, granularity, timestamp) index candle upserts are keyed on.
+
+        :return: The candle collection.
+        """
+        collection = self.db[self.candle_collection_name(instrument, granularity)]
+        # Partial, so documents stored before the key fields existed do not collide on nulls
+        collection.create_index([("instrument", 1), ("granularity", 1), ("timestamp", 1)], unique=True,
+                                name="candle_key", partialFilterExpression={"timestamp": {"$exists": True}})
+        return collection
+
+    def latest_candle_timestamp(self, instrument, granularity):
+        """
+        High-water mark of a candle collection. Candles stored before the key fields existed are backfilled
+        first, so they count towards the mark instead of being fetched and stored again.
+
+        :return: Epoch seconds of the newest candle, or None if there are none.
+        """
+        collection = self.ensure_candle_index(instrument, granularity)
+        query = {"instrument": instrument.upper(), "granularity": granularity.upper()}
+        latest = collection.find_one(query, projection={"timestamp": 1}, sort=[("timestamp", -1)])
+        if latest is None and self.backfill_candle_keys(instrument, granularity):
+            latest = collection.find_one(query, projection={"timestamp": 1}, sort=[("timestamp", -1)])
+        return latest["timestamp"] if latest else None
+
+    def backfill_candle_keys(self, instrument, granularity):
+        """
+        Add instrument, granularity and timestamp to candle documents stored with only 'time' and 'mid', so
+        the high-water mark and read_candles_after see them. A legacy document whose candle was already
+        stored again under the key is a duplicate and is deleted.
+
+        :return: Number of documents updated.
+        """
+        instrument, granularity = instrument.upper(), granularity.upper()
+        collection = self.ensure_candle_index(instrument, granularity)
+        legacy = list(collection.find({"timestamp": {"$exists": False}, "time": {"$exists": True}},
+                                      projection={"time": 1}))
+        if not legacy:
+            return 0
+        keyed = set(collection.distinct("timestamp", {"instrument": instrument, "granularity": granularity}))
+
+        operations, seen = [], set()
+        for document in legacy:
+            timestamp = to_epoch_seconds(document["time"])
+            if timestamp in keyed or timestamp in seen:
+                operations.append(DeleteOne({"_id": document["_id"]}))
+                continue
+            seen.add(timestamp)
+            operations.append(UpdateOne({"_id": document["_id"]}, {"$set": {
+                "instrument": instrument, "granularity": granularity, "timestamp": timestamp}}))
+        result = collection.bulk_write(operations, ordered=False)
+        logger.info(f"✅ Backfilled candle keys in {collection.name}: {result.modified_count} updated, "
+                    f"{result.deleted_count} duplicates removed.")
+        return result.modified_count
+
+    def upsert_candles(self, instrument, granularity, candles):
+        """
+        Write OANDA candles ({'time', 'mid', 'volume'}) keyed on (instrument, granularity, timestamp).
+        Candles already stored are updated in place, so writing the same candles twice adds nothing.
+        Incomplete candles are skipped: once stored they would sit below the high-water mark and never be
+        refreshed.
+
+        :return: Number of candles added.
+        """
+        candles = [candle for candle in candles or () if candle.get("complete", True)]
+        if not candles:
+            return 0
+        instrument, granularity = instrument.upper(), granularity.upper()
+        collection = self.ensure_candle_index(instrument, granularity)
+
+        documents = [
+            {"instrument": instrument, "granularity": granularity, "timestamp": to_epoch_seconds(candle["time"]),
+             "time": candle["time"], "mid": candle["mid"], "volume": candle.get("volume", 0)}
+            for candle in candles
+        ]
+        return self.upsert_many(documents, ("instrument", "granularity", "timestamp"), collection.name)
+
+    def upsert_many(self, documents, key_fields, collection_name=None):
+        """
+        Insert documents, or update the stored ones that share their key, in one unordered bulk write.
+
+        :param documents: List of documents.
+        :param key_fields: Fields identifying a document (should be covered by a unique index).
+        :param collection_name: Collection to write to (defaults to the current collection).
+        :return: Number of documents added.
+        """
+        if not documents:
+            return 0
+        collection = self.db[collection_name] if collection_name else self.collection
+        operations = [
+            UpdateOne({field: document[field] for field in key_fields}, {"$set": document}, upsert=True)
+            for document in documents
+        ]
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+        except errors.PyMongoError as err:
+            logger.error(f"❌ Upsert into {collection.name} failed: {err}")
+            raise
+        logger.info(f"✅ Upserted {len(operations)} documents into {collection.name}: {result.upserted_count} new.")
+        return result.upserted_count
+
+    def read_candles_after(self, instrument, granularity, timestamp=None):
+        """
+        Read the candles of an instrument newer than a high-water mark, oldest first.
+
+        :param timestamp: Epoch seconds; None reads every candle in the collection.
+        :return: List of candle documents.
+        """
+        collection_name = self.candle_collection_name(instrument, granularity)
+        if timestamp is None:
+            return self.read({}, collection_name=collection_name)
+        # Legacy documents have no timestamp yet and would not match the range below
+        self.backfill_candle_keys(instrument, granularity)
+        return list(self.db[collection_name].find({"timestamp": {"$gt": timestamp}}).sort("timestamp", 1))
+
     def create_collection_with_index(self, collection_name, index_field="time"):
         """
         Creates a new collection with an index on a specific field if it doesn't already exist.
@@ -334,33 +448,18 @@ class MongoDBHandler:
             # Ensure the instrument symbol is in uppercase, as expected by the OANDA API
             instrument = instrument.upper()
 
-            # Ensure collection exists and set it
-            collection_name = f"{instrument.lower()}_{granularity.lower()}_data"
-            # Ensure collection exists before querying and switch to it
-            self.create_collection_with_index(collection_name, index_field="time")
-            self.switch_collection(collection_name)  # Ensure collection is set
-
-            print(f"Collection set to: {self.collection.name}")  # Debugging
-
             # Fetch historical data from OANDA
-            data = self.oanda_client.fetch_historical_data(instrument, granularity, count)
-            print(f"Fetched data: {data}")  # Debugging
+            data = self.oanda_client.fetch_historical_data(instrument, granularity, count=count)
 
             # Check if data is returned and proceed
             if not data:
-                self.logger.warning(f"No data received for {instrument} with granularity {granularity}.")
-                return
+                logger.warning(f"No data received for {instrument} with granularity {granularity}.")
+                return 0
 
-            # Ensure collection is set before read operation or create new collection
-            if self.collection is None:
-                raise ValueError(f"MongoDB collection for {collection_name} is not set.")
-
-            if new_data := list(data):
-                print(f"New data to insert: {new_data}")  # Debugging
-                self.short_bulk_insert(new_data)
-                logger.info(f"Inserted {len(new_data)} new data points for {instrument} in {granularity} timeframe.")
-            else:
-                logger.info(f"No new data to insert for {instrument} in {granularity} timeframe.")
+            # Candles already stored are matched on their key instead of being inserted again
+            added = self.upsert_candles(instrument, granularity, data)
+            logger.info(f"Inserted {added} new data points for {instrument} in {granularity} timeframe.")
+            return added
 
         except Exception as e:
             # Log any error during the population process
@@ -388,21 +487,10 @@ class MongoDBHandler:
             logger.error(f"❌ Instrument {instrument} not found in SQLite. Skipping...")
             return
 
-        if records := [
-            {
-                "instrument_id": instrument_id,
-                "granularity": granularity,
-                "timestamp": record.get("time"),
-                "open": float(record.get("mid", {}).get("o", 0)),
-                "high": float(record.get("mid", {}).get("h", 0)),
-                "low": float(record.get("mid", {}).get("l", 0)),
-                "close": float(record.get("mid", {}).get("c", 0)),
-                "volume": record.get("volume", 0),
-            }
-            for record in data
-        ]:
-            sqlite_db.bulk_insert("historical_data", records)
-            logger.info(f"✅ Inserted {len(records)} records for {instrument} into SQLite.")
+        # Candles already stored are skipped, so populating twice is harmless
+        if rows := candle_rows(instrument_id, granularity, data):
+            added = sqlite_db.insert_candles(rows)
+            logger.info(f"✅ Inserted {added} of {len(rows)} records for {instrument} into SQLite.")
 
     def switch_collection(self, collection_name):
         """
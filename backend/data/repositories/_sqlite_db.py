@@ -1,35 +1,137 @@
 import os
+import json
 import datetime
 import sqlite3
+import threading
+from contextlib import contextmanager
 from backend.logs.log_manager import LogManager  # Import the LogManager class
+from backend.data.utils.utils import to_python
 
 # Configure logging
 logger = LogManager('sqlite_db_logs').get_logger()
 
 class SQLiteDBHandler:
-    def __init__(self, db_name):
+    # PRAGMAs applied to every connection opened in pooled mode; override per handler with `pragmas`
+    POOLED_PRAGMAS = {
+        'journal_mode': 'WAL',      # readers don't block the writer
+        'synchronous': 'NORMAL',    # safe with WAL, far fewer fsyncs than FULL
+        'cache_size': -64000,       # negative = KiB, i.e. 64 MB page cache
+        'mmap_size': 268435456,     # 256 MB memory-mapped I/O
+        'busy_timeout': 5000,       # ms to wait for a lock before failing
+    }
+
+    def __init__(self, db_name, pooled=False, pragmas=None):
         """
         Initializes the SQLiteDBHandler class with the specified database.
         :parameter db_name: The name of the database (e.g., indicators.db, configuration.db).
+        :parameter pooled: Keep one persistent connection per thread instead of opening and closing
+                           a connection around every call. Pooled connections run in WAL mode.
+        :parameter pragmas: Optional PRAGMA overrides (e.g. {'synchronous': 'OFF', 'cache_size': -200000}).
         """
         base_dir = os.path.dirname(os.path.abspath(__file__))
         self.db_path = os.path.join(base_dir, "databases", db_name)
-        self.conn = None
+        self.pooled = pooled
+        self.pragmas = {**self.POOLED_PRAGMAS, **(pragmas or {})} if pooled else dict(pragmas or {})
+        self._local = threading.local()
+        self._pool = []
+        self._pool_lock = threading.Lock()
+        self._conn = None
         self._connect_db()
         logger.info(f"Database initialized at {self.db_path}")
 
+    @property
+    def conn(self):
+        """
+        The connection for the calling thread (pooled mode) or the handler's single connection.
+        """
+        return getattr(self._local, 'conn', None) if self.pooled else self._conn
+
+    @conn.setter
+    def conn(self, connection):
+        if self.pooled:
+            self._local.conn = connection
+        else:
+            self._conn = connection
+
     def _connect_db(self):
         if self.conn is None:
-            self.conn = sqlite3.connect(self.db_path)
+            # Pooled connections are only used by the thread that opened them, but close_all()
+            # may be called from another thread, so the same-thread check is relaxed for them
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=not self.pooled)
+            for name, value in self.pragmas.items():
+                self.conn.execute(f"PRAGMA {name} = {value}")
+            if self.pooled:
+                with self._pool_lock:
+                    self._pool.append(self.conn)
             logger.info(f"Connected to the database: {self.db_path}")
         return self.conn
 
+    def _transaction_depth(self):
+        return getattr(self._local, 'depth', 0)
+
+    def _commit(self):
+        """
+        Commit the current work unless it is part of an explicit transaction scope.
+        """
+        if self._transaction_depth() == 0:
+            self.conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group several handler calls into one connection and one commit.
+
+        Usage:
+            with db.transaction():
+                db.add_indicator_parameters(...)
+                db.add_indicator_results(...)
+
+        Scopes can be nested; only the outermost one commits (or rolls back on an exception).
+        """
+        self._connect_db()
+        depth = self._transaction_depth()
+        if depth == 0 and not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        self._local.depth = depth + 1
+        try:
+            yield self.conn
+        except Exception:
+            if depth == 0:
+                self.conn.rollback()
+                logger.error("Transaction rolled back.")
+            raise
+        else:
+            if depth == 0:
+                self.conn.commit()
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                self.close_connection()
+
     def close_connection(self):
+        # Pooled connections persist, and nothing is closed in the middle of a transaction scope
+        if self.pooled or self._transaction_depth() > 0:
+            return
         if self.conn:
             self.conn.close()
             self.conn = None
             logger.info("Database connection closed")
 
+    def close_all(self):
+        """
+        Close every connection opened by this handler, including the pooled per-thread ones.
+        """
+        with self._pool_lock:
+            pooled, self._pool = self._pool, []
+        for connection in pooled:
+            connection.close()
+        if self.pooled:
+            self._local = threading.local()
+        elif self._conn:
+            self._conn.close()
+            self._conn = None
+        logger.info("All database connections closed")
+
     def load_schema(self):
         """
         Load the schema dynamically based on the database name.
@@ -69,7 +171,7 @@ class SQLiteDBHandler:
             self._connect_db()
             cursor = self.conn.cursor()
             cursor.executescript(schema_sql)
-            self.conn.commit()
+            self._commit()
             logger.info("SQL schema script executed successfully.")
         except Exception as e:
             logger.error(f"Error executing schema script: {e}")
@@ -187,7 +289,7 @@ class SQLiteDBHandler:
             logger.info(f"Attempting to insert indicator '{name}' of type '{indicator_type}'.")
             
             cursor.execute(query, (name, indicator_type))
-            self.conn.commit()
+            self._commit()
 
             logger.info(f"Indicator '{name}' of type '{indicator_type}' added to the database.")
         except Exception as e:
@@ -212,7 +314,7 @@ class SQLiteDBHandler:
                 logger.info(f"Adding parameter '{parameter_name}' with value {parameter_value} for indicator ID {indicator_id}.")
                 cursor.execute(query, (indicator_id, parameter_name, parameter_value, timestamp))
 
-            self.conn.commit()
+            self._commit()
             logger.info(f"Parameters for indicator ID {indicator_id} updated: {parameters}")
         except Exception as e:
             logger.error(f"Error updating indicator parameters for indicator ID {indicator_id}: {e}")
@@ -221,25 +323,73 @@ class SQLiteDBHandler:
 
     def add_indicator_results(self, indicator_id, timestamp, parameter_name, parameter_value):
         try:
-            self._connect_db()
-            cursor = self.conn.cursor()
-
-            parameter_id = self.get_parameter_id(indicator_id, parameter_name)
-            if parameter_id is None:
-                raise ValueError(f"Parameter {parameter_name} not found for indicator {indicator_id}.")
-
-            query = """
-                INSERT INTO instrument_indicator_results 
-                (instrument_id, indicator_id, parameter_id, parameter_name, parameter_value, timestamp)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """
-            cursor.execute(query, (None, indicator_id, parameter_id, parameter_name, parameter_value, timestamp))  # instrument_id to be added later
-            self.conn.commit()
+            # The parameter lookup shares this call's connection and commit
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+
+                parameter_id = self.get_parameter_id(indicator_id, parameter_name)
+                if parameter_id is None:
+                    raise ValueError(f"Parameter {parameter_name} not found for indicator {indicator_id}.")
+
+                query = """
+                    INSERT INTO instrument_indicator_results 
+                    (instrument_id, indicator_id, parameter_id, parameter_name, parameter_value, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """
+                cursor.execute(query, (None, indicator_id, parameter_id, parameter_name, parameter_value, timestamp))  # instrument_id to be added later
             logger.info(f"Indicator result added for indicator ID {indicator_id} at {timestamp}")
         except Exception as e:
             logger.error(f"Error adding indicator result: {e}")
-        finally:
-            self.close_connection()
+
+    def add_indicator_results_bulk(self, instrument_id, indicator_id, results, timestamp):
+        """
+        Insert whole result columns in one transaction with a single executemany per column.
+
+        :parameter instrument_id: ID of the instrument the results belong to.
+        :parameter indicator_id: ID of the indicator.
+        :parameter results: Mapping of result name -> sequence of values (e.g. {'sma': df['sma']}).
+                            NaN values (warm-up bars) are skipped.
+        :parameter timestamp: Timestamp recorded with the results.
+        :return: Number of rows inserted.
+        """
+        query = """
+            INSERT INTO instrument_indicator_results
+            (instrument_id, indicator_id, parameter_id, parameter_name, parameter_value, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """
+        inserted = 0
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                for parameter_name, values in results.items():
+                    parameter_id = self._resolve_parameter_id(cursor, indicator_id, parameter_name)
+                    rows = [
+                        (instrument_id, indicator_id, parameter_id, parameter_name, value, timestamp)
+                        for value in map(float, values)
+                        if value == value
+                    ]
+                    cursor.executemany(query, rows)
+                    inserted += len(rows)
+            logger.info(f"Inserted {inserted} indicator results for indicator ID {indicator_id}.")
+        except Exception as e:
+            logger.error(f"Error adding indicator results in bulk: {e}")
+            return 0
+        return inserted
+
+    @staticmethod
+    def _resolve_parameter_id(cursor, indicator_id, parameter_name):
+        # Prefer the parameter row named after the result, else the indicator's first parameter
+        cursor.execute("""
+            SELECT id
+            FROM indicator_parameters
+            WHERE indicator_id = ?
+            ORDER BY parameter_name = ? DESC, id
+            LIMIT 1
+        """, (indicator_id, parameter_name))
+        result = cursor.fetchone()
+        if result is None:
+            raise ValueError(f"No parameters registered for indicator {indicator_id}.")
+        return result[0]
 
     def get_parameter_id(self, indicator_id, parameter_name):
         try:
@@ -280,7 +430,7 @@ class SQLiteDBHandler:
         placeholders = ', '.join('?' * len(data))
         query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
         cursor.execute(query, list(data.values()))
-        self.conn.commit()
+        self._commit()
 
         logger.info(f"Record added to {table_name}")
         return cursor.lastrowid
@@ -308,7 +458,7 @@ class SQLiteDBHandler:
             values = [tuple(record.values()) for record in records]
 
             cursor.executemany(query, values)  # Execute bulk insert
-            self.conn.commit()
+            self._commit()
 
             logger.info(f"✅ Inserted {len(records)} records into {table_name}.")
         except Exception as e:
@@ -316,6 +466,55 @@ class SQLiteDBHandler:
         finally:
             self.close_connection()
 
+    def execute_many(self, query, records):
+        """
+        Execute a parameterized statement for every record in one transaction.
+
+        :param query: SQL statement with ? placeholders.
+        :param records: Iterable of parameter tuples.
+        :return: Number of rows affected.
+        """
+        try:
+            with self.transaction() as conn:
+                cursor = conn.executemany(query, records)
+            logger.info(f"✅ Executed statement for {cursor.rowcount} records.")
+            return cursor.rowcount
+        except Exception as e:
+            logger.error(f"❌ Error executing statement in bulk: {e}")
+            return 0
+
+    def latest_candle_timestamp(self, instrument_id, granularity):
+        """
+        High-water mark of the candles stored for an instrument and granularity.
+
+        :param instrument_id: Instrument ID.
+        :param granularity: Granularity (e.g. 'M1').
+        :return: Epoch seconds of the newest stored candle, or None if there are none.
+        """
+        result = self.fetch_records_with_query(
+            "SELECT MAX(timestamp) FROM historical_data WHERE instrument_id = ? AND granularity = ?",
+            (instrument_id, granularity),
+        )
+        return result[0][0] if result else None
+
+    def insert_candles(self, records):
+        """
+        Insert candles into historical_data, skipping the ones whose (instrument_id, granularity, timestamp)
+        key is already stored, so running the same sync twice changes nothing.
+
+        :param records: Iterable of (instrument_id, granularity, timestamp, open, high, low, close, volume) tuples.
+        :return: Number of candles added.
+        """
+        query = """
+            INSERT INTO historical_data (instrument_id, granularity, timestamp, open, high, low, close, volume)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (instrument_id, granularity, timestamp) DO NOTHING
+        """
+        records = list(records)
+        if not records:
+            return 0
+        return self.execute_many(query, records)
+
     def add_optimized_parameters(self, instrument_id, indicator_id, parameters):
         try:
             self._connect_db()
@@ -329,13 +528,195 @@ class SQLiteDBHandler:
                 timestamp = datetime.datetime.now().isoformat()
                 cursor.execute(query, (instrument_id, indicator_id, parameter_name, parameter_value, timestamp))
 
-            self.conn.commit()
+            self._commit()
             logger.info("Optimized parameters added to the database.")
         except Exception as e:
             logger.error(f"Failed to insert optimized parameters: {e}")
         finally:
             self.close_connection()
 
+    def add_walk_forward_window(self, instrument_id, indicator_id, search_key, window, parameters, performance):
+        """
+        Store one evaluated walk-forward window in a single transaction: the winning parameters in
+        optimized_parameters, the out-of-sample performance in optimization_results and the window in
+        walk_forward_windows. A window already stored under the same key is left as it is. profit_loss is
+        left NULL, as in add_optimization_run_results: the metrics are per unit traded, not an account P&L.
+
+        :param instrument_id: Instrument ID.
+        :param indicator_id: Indicator ID.
+        :param search_key: Identity of the search (parameter grid, window sizes, ranking metric).
+        :param window: Dict with the train_start, train_end, test_start and test_end bar labels.
+        :param parameters: Dict of the parameters that won the training window.
+        :param performance: Dict of out-of-sample metrics (total_return, win_rate, sharpe_ratio,
+                            max_drawdown, trades).
+        :return: True if the window was added.
+        """
+        timestamp = datetime.datetime.now().isoformat()
+        try:
+            with self.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT 1 FROM walk_forward_windows
+                    WHERE instrument_id = ? AND indicator_id = ? AND search_key = ? AND train_start = ? AND test_end = ?
+                """, (instrument_id, indicator_id, search_key, window['train_start'], window['test_end']))
+                if cursor.fetchone():
+                    return False
+
+                optimization_id = None
+                for parameter_name, parameter_value in parameters.items():
+                    cursor.execute("""
+                        INSERT INTO optimized_parameters (instrument_id, indicator_id, parameter_name, parameter_value, timestamp)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, (instrument_id, indicator_id, parameter_name, parameter_value, timestamp))
+                    optimization_id = optimization_id or cursor.lastrowid
+
+                cursor.execute("""
+                    INSERT INTO optimization_results
+                    (optimization_id, instrument_id, sharpe_ratio, total_return, max_drawdown, win_rate, total_trades, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, (optimization_id, instrument_id, performance['sharpe_ratio'], performance['total_return'],
+                      performance['max_drawdown'], performance['win_rate'], performance['trades'], timestamp))
+                result_id = cursor.lastrowid
+
+                cursor.execute("""
+                    INSERT INTO walk_forward_windows
+                    (instrument_id, indicator_id, search_key, train_start, train_end, test_start, test_end,
+                     parameters, optimization_id, result_id, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (instrument_id, indicator_id, search_key, window['train_start'], window['train_end'],
+                      window['test_start'], window['test_end'], json.dumps(parameters), optimization_id,
+                      result_id, timestamp))
+            logger.info(f"Walk-forward window {window['test_start']} - {window['test_end']} stored for "
+                        f"instrument {instrument_id}, indicator {indicator_id}.")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to store walk-forward window: {e}")
+            return False
+
+    def get_walk_forward_windows(self, instrument_id, indicator_id, search_key):
+        """
+        Read back the walk-forward windows stored under a search key, oldest first.
+
+        :return: List of dicts with the window labels, the winning parameters and the out-of-sample metrics.
+        """
+        rows = self.fetch_records_with_query("""
+            SELECT w.train_start, w.train_end, w.test_start, w.test_end, w.parameters,
+                   r.total_return, r.win_rate, r.sharpe_ratio, r.max_drawdown, r.total_trades
+            FROM walk_forward_windows w LEFT JOIN optimization_results r ON r.id = w.result_id
+            WHERE w.instrument_id = ? AND w.indicator_id = ? AND w.search_key = ?
+            ORDER BY w.train_start
+        """, (instrument_id, indicator_id, search_key))
+        columns = ('train_start', 'train_end', 'test_start', 'test_end', 'parameters',
+                   'total_return', 'win_rate', 'sharpe_ratio', 'max_drawdown', 'trades')
+        windows = [dict(zip(columns, row)) for row in rows]
+        for window in windows:
+            window['parameters'] = json.loads(window['parameters'])
+        return windows
+
+    @staticmethod
+    def parameters_key(parameters):
+        """
+        Canonical JSON of a parameter dict, as stored in optimization_results.parameters. Equal
+        parameter sets always give the same text, whatever their order or numeric types.
+        """
+        plain = {name: to_python(value) for name, value in parameters.items()}
+        return json.dumps(plain, sort_keys=True)
+
+    def get_optimization_run(self, run_id):
+        """
+        :return: Dict of the optimization_runs row, or None if the run does not exist.
+        """
+        rows = self.fetch_records_with_query("""
+            SELECT run_id, instrument_id, indicator_id, total_combinations, status, started, updated
+            FROM optimization_runs WHERE run_id = ?
+        """, (run_id,))
+        columns = ('run_id', 'instrument_id', 'indicator_id', 'total_combinations', 'status', 'started', 'updated')
+        return dict(zip(columns, rows[0])) if rows else None
+
+    def save_optimization_run(self, run_id, instrument_id, indicator_id, total_combinations, status):
+        """
+        Create an optimization run, or update the status of an existing one. An existing run is only
+        updated if it belongs to the same instrument and indicator.
+
+        :param run_id: Id of the run.
+        :param total_combinations: Number of parameter sets the run evaluates.
+        :param status: 'running', 'cancelled', 'interrupted' or 'completed'.
+        :return: True if the run was saved.
+        """
+        timestamp = datetime.datetime.now().isoformat()
+        try:
+            with self.transaction() as conn:
+                cursor = conn.execute("""
+                    INSERT INTO optimization_runs
+                    (run_id, instrument_id, indicator_id, total_combinations, status, started, updated)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (run_id) DO UPDATE SET
+                        total_combinations = excluded.total_combinations, status = excluded.status,
+                        updated = excluded.updated
+                    WHERE optimization_runs.instrument_id = excluded.instrument_id
+                      AND optimization_runs.indicator_id = excluded.indicator_id
+                """, (run_id, instrument_id, indicator_id, total_combinations, status, timestamp, timestamp))
+                saved = cursor.rowcount > 0
+            if not saved:
+                logger.error(f"Optimization run {run_id} belongs to another instrument or indicator.")
+                return False
+            logger.info(f"Optimization run {run_id} is {status}.")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save optimization run {run_id}: {e}")
+            return False
+
+    def add_optimization_run_results(self, run_id, instrument_id, parameter_sets, results):
+        """
+        Checkpoint a batch of evaluated parameter sets of a run in one transaction. A parameter set
+        that produced no result is stored with empty metrics, so a resumed run skips it as well.
+        Parameter sets already stored for the run are ignored. profit_loss is left NULL: sweep metrics are
+        per unit traded, not an account P&L.
+
+        :param run_id: Id of the run.
+        :param instrument_id: Instrument ID.
+        :param parameter_sets: List of parameter dicts.
+        :param results: Metrics dict (total_return, win_rate, sharpe_ratio, max_drawdown, trades) or None
+                        for each parameter set.
+        :return: Number of rows written.
+        """
+        timestamp = datetime.datetime.now().isoformat()
+        records = []
+        for parameters, result in zip(parameter_sets, results):
+            metrics = [result[metric] if result is not None else None
+                       for metric in ('sharpe_ratio', 'total_return', 'max_drawdown', 'win_rate', 'trades')]
+            records.append((run_id, self.parameters_key(parameters), instrument_id, *metrics, timestamp))
+        if not records:
+            return 0
+        try:
+            with self.transaction() as conn:
+                cursor = conn.executemany("""
+                    INSERT OR IGNORE INTO optimization_results
+                    (run_id, parameters, instrument_id, sharpe_ratio, total_return, max_drawdown, win_rate,
+                     total_trades, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, records)
+                written = cursor.rowcount
+            logger.info(f"Checkpointed {written} of {len(records)} results of optimization run {run_id}.")
+            return written
+        except Exception as e:
+            logger.error(f"Failed to checkpoint results of optimization run {run_id}: {e}")
+            return 0
+
+    def get_optimization_run_results(self, run_id):
+        """
+        Read back the checkpointed results of a run, in the order they were stored.
+
+        :return: List of dicts of the parameters and metrics; metrics are None for parameter sets that
+                 produced no result.
+        """
+        rows = self.fetch_records_with_query("""
+            SELECT parameters, total_return, win_rate, sharpe_ratio, max_drawdown, total_trades
+            FROM optimization_results WHERE run_id = ? ORDER BY id
+        """, (run_id,))
+        columns = ('total_return', 'win_rate', 'sharpe_ratio', 'max_drawdown', 'trades')
+        return [{'parameters': json.loads(row[0]), **dict(zip(columns, row[1:]))} for row in rows]
+
     def fetch_records(self, table_name, where_clause=None):
         try:
             return self.fetch_from_the_database(table_name, where_clause)
@@ -393,7 +774,7 @@ class SQLiteDBHandler:
             query = f"UPDATE {table_name} SET {set_clause} WHERE {where_conditions}"
 
             cursor.execute(query, list(data.values()) + list(where_clause.values()))
-            self.conn.commit()
+            self._commit()
 
             logger.info(f"Record(s) updated in {table_name}")
         except Exception as e:
@@ -415,7 +796,7 @@ class SQLiteDBHandler:
             for parameter_name, parameter_value in parameters.items():
                 cursor.execute(query, (parameter_value, timestamp, indicator_id, parameter_name))
 
-            self.conn.commit()
+            self._commit()
             logger.info(f"Updated indicator parameters for indicator ID {indicator_id}.")
         except Exception as e:
             logger.error(f"Error updating indicator parameters: {e}")
@@ -430,7 +811,7 @@ class SQLiteDBHandler:
             where_conditions = ' AND '.join([f"{key} = ?" for key in where_clause])
             query = f"DELETE FROM {table_name} WHERE {where_conditions}"
             cursor.execute(query, list(where_clause.values()))
-            self.conn.commit()
+            self._commit()
 
             logger.info(f"Record(s) deleted from {table_name}")
         except Exception as e:
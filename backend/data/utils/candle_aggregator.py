@@ -0,0 +1,220 @@
+'''
+Build higher-timeframe OHLCV candles from finer ones (S5/M1 candles or streamed ticks).
+
+Buckets are aligned to UTC: an H1 candle covers [hh:00, hh+1:00), a D candle a UTC calendar day,
+a W candle a week starting Monday 00:00 UTC and an M candle a calendar month. OANDA aligns its own
+D/W/M candles to 17:00 New York by default, so derive those only when UTC alignment is what you want
+(or shift the buckets with `offset`).
+'''
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from backend.data.utils.utils import GRANULARITY_SECONDS, from_epoch_seconds, to_epoch_array
+
+OHLCV = ('open', 'high', 'low', 'close', 'volume')
+_DAY = 86400
+# 1970-01-01 was a Thursday; shifting by 3 days puts week boundaries on Mondays
+_MONDAY_SHIFT = 3 * _DAY
+
+
+def bucket_starts(timestamps, granularity, offset=0):
+    """
+    Start of the candle each timestamp falls into.
+
+    :param timestamps: int64 array of epoch seconds.
+    :param granularity: Target granularity (e.g. 'M5', 'H1', 'D', 'W', 'M').
+    :param offset: Seconds to shift the bucket boundaries by (e.g. -7 * 3600 for 17:00 UTC days).
+    :return: int64 array of bucket start epochs.
+    :raises ValueError: If the granularity is unknown.
+    """
+    granularity = granularity.upper()
+    if granularity not in GRANULARITY_SECONDS:
+        raise ValueError(f"Unknown granularity: {granularity}")
+    shifted = np.asarray(timestamps, dtype=np.int64) - offset
+
+    if granularity == 'M':
+        months = shifted.astype('datetime64[s]').astype('datetime64[M]')
+        return months.astype('datetime64[s]').astype(np.int64) + offset
+    if granularity == 'W':
+        return shifted - (shifted + _MONDAY_SHIFT) % (7 * _DAY) + offset
+
+    seconds = GRANULARITY_SECONDS[granularity]
+    return shifted - shifted % seconds + offset
+
+
+def bucket_end(start, granularity, offset=0):
+    """
+    End (exclusive) of the candle starting at epoch `start`.
+    """
+    granularity = granularity.upper()
+    if granularity == 'M':
+        month = np.datetime64(int(start - offset), 's').astype('datetime64[M]') + 1
+        return int(month.astype('datetime64[s]').astype(np.int64)) + offset
+    return start + GRANULARITY_SECONDS[granularity]
+
+
+def aggregate_arrays(timestamps, open_, high, low, close, volume, granularity, offset=0, data_end=None):
+    """
+    Aggregate time-sorted candles into the target granularity in one vectorized pass.
+
+    :param timestamps: int64 array of epoch seconds, ascending.
+    :param open_, high, low, close, volume: Arrays of the source candles.
+    :param granularity: Target granularity.
+    :param offset: Seconds to shift the bucket boundaries by.
+    :param data_end: Epoch seconds up to which the source data is complete. The last candle is only
+                     marked complete if it ends by then; without it the last candle counts as forming.
+    :return: Dict of arrays: 'timestamp' (bucket starts), OHLCV and 'complete'.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if len(timestamps) == 0:
+        empty = {column: np.empty(0) for column in OHLCV}
+        return {'timestamp': np.empty(0, dtype=np.int64), **empty, 'complete': np.empty(0, dtype=bool)}
+    if np.any(timestamps[1:] < timestamps[:-1]):
+        raise ValueError("Timestamps must be sorted in ascending order.")
+
+    buckets = bucket_starts(timestamps, granularity, offset)
+    # First row of every bucket; reduceat folds each run of rows between consecutive firsts
+    firsts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    lasts = np.r_[firsts[1:] - 1, len(buckets) - 1]
+
+    complete = np.ones(len(firsts), dtype=bool)
+    complete[-1] = data_end is not None and data_end >= bucket_end(int(buckets[-1]), granularity, offset)
+
+    return {
+        'timestamp': buckets[firsts],
+        'open': np.asarray(open_, dtype=float)[firsts],
+        'high': np.maximum.reduceat(np.asarray(high, dtype=float), firsts),
+        'low': np.minimum.reduceat(np.asarray(low, dtype=float), firsts),
+        'close': np.asarray(close, dtype=float)[lasts],
+        'volume': np.add.reduceat(np.asarray(volume, dtype=float), firsts),
+        'complete': complete,
+    }
+
+
+def resample_candles(df, granularity, offset=0, data_end=None):
+    """
+    Aggregate a candle DataFrame into the target granularity.
+
+    :param df: OHLCV DataFrame indexed by timestamp, or with a 'timestamp'/'time' column
+               (datetimes, ISO strings or epoch seconds).
+    :param granularity: Target granularity (e.g. 'H1').
+    :param offset: Seconds to shift the bucket boundaries by.
+    :param data_end: See aggregate_arrays. Accepts anything to_epoch_array accepts.
+    :return: DataFrame indexed by UTC 'timestamp' with OHLCV and 'complete' columns.
+    """
+    time_column = next((column for column in ('timestamp', 'time') if column in df.columns), None)
+    timestamps = df[time_column] if time_column else df.index
+    if pd.api.types.is_integer_dtype(timestamps):
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+    else:
+        timestamps = to_epoch_array(timestamps)
+
+    if data_end is not None and not isinstance(data_end, (int, np.integer)):
+        data_end = int(to_epoch_array([data_end])[0])
+    values = [df[column].to_numpy(dtype=float) if column in df.columns else np.zeros(len(df)) for column in OHLCV]
+    if np.any(timestamps[1:] < timestamps[:-1]):
+        order = np.argsort(timestamps, kind='stable')
+        timestamps = timestamps[order]
+        values = [column[order] for column in values]
+
+    columns = aggregate_arrays(timestamps, *values, granularity, offset, data_end)
+    index = pd.DatetimeIndex(from_epoch_seconds(columns.pop('timestamp')), name='timestamp')
+    return pd.DataFrame(columns, index=index)
+
+
+def frame_from_oanda_candles(candles):
+    """
+    Turn OANDA candle dicts ({'time', 'mid': {'o', 'h', 'l', 'c'}, 'volume'}) into an OHLCV DataFrame
+    indexed by UTC timestamp.
+    """
+    frame = pd.DataFrame({
+        'open': [float(candle['mid']['o']) for candle in candles],
+        'high': [float(candle['mid']['h']) for candle in candles],
+        'low': [float(candle['mid']['l']) for candle in candles],
+        'close': [float(candle['mid']['c']) for candle in candles],
+        'volume': [float(candle.get('volume', 0)) for candle in candles],
+    })
+    frame.index = pd.DatetimeIndex(from_epoch_seconds(to_epoch_array([candle['time'] for candle in candles])),
+                                   name='timestamp')
+    return frame
+
+
+def tick_epoch(time_text):
+    """
+    Epoch seconds of an OANDA RFC3339 time ('2024-01-01T00:00:00.123456789Z'), ignoring the fraction.
+    """
+    return int(datetime.datetime.fromisoformat(time_text[:19]).replace(tzinfo=datetime.timezone.utc).timestamp())
+
+
+class CandleAggregator:
+    """
+    Incremental counterpart of aggregate_arrays for live data: feed candles or ticks in time order and
+    each completed candle is handed to on_candle as soon as the first update of the next bucket arrives.
+
+    Usage:
+        aggregator = CandleAggregator('M1', on_candle=store_candle)
+        bus.subscribe('EUR_USD', aggregator.add_tick)
+    """
+
+    def __init__(self, granularity, offset=0, on_candle=None):
+        """
+        :param granularity: Target granularity.
+        :param offset: Seconds to shift the bucket boundaries by.
+        :param on_candle: Called with each completed candle (dict with 'timestamp' epoch and OHLCV).
+        """
+        self.granularity = granularity.upper()
+        if self.granularity not in GRANULARITY_SECONDS:
+            raise ValueError(f"Unknown granularity: {granularity}")
+        self.offset = offset
+        self.on_candle = on_candle
+        self.current = None
+        self._current_end = None
+        self.completed = 0
+
+    def add_candle(self, timestamp, open_, high, low, close, volume=0.0):
+        """
+        Fold one finer candle (or a tick, with open = high = low = close) into the forming candle.
+
+        :param timestamp: Epoch seconds of the update. Updates older than the forming candle are ignored.
+        :return: The candle completed by this update, or None.
+        """
+        finished = None
+        if self.current is not None and timestamp >= self._current_end:
+            finished = self.flush()
+        if self.current is None:
+            start = int(bucket_starts(np.array([timestamp]), self.granularity, self.offset)[0])
+            self.current = {'timestamp': start, 'open': open_, 'high': high, 'low': low, 'close': close,
+                            'volume': volume}
+            self._current_end = bucket_end(start, self.granularity, self.offset)
+        elif timestamp >= self.current['timestamp']:
+            candle = self.current
+            candle['high'] = max(candle['high'], high)
+            candle['low'] = min(candle['low'], low)
+            candle['close'] = close
+            candle['volume'] += volume
+        return finished
+
+    def add_tick(self, tick):
+        """
+        Fold a Tick (see trading/brokers/price_stream.py) in at its mid price. Volume counts ticks, as
+        OANDA's candle volume does.
+        """
+        mid = (tick.bid + tick.ask) / 2
+        return self.add_candle(tick_epoch(tick.time), mid, mid, mid, mid, 1.0)
+
+    def flush(self):
+        """
+        Complete the forming candle now (e.g. at the end of a backfill).
+
+        :return: The completed candle, or None if there was none.
+        """
+        candle, self.current = self.current, None
+        if candle is None:
+            return None
+        candle['complete'] = True
+        self.completed += 1
+        if self.on_candle is not None:
+            self.on_candle(candle)
+        return candle
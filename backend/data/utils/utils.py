@@ -2,9 +2,94 @@
 This file contains utility functions that are used in the data module.
 Utility functions for the data module.
 '''
+import numpy as np
+import pandas as pd
+
 
 def convert_to_float(value):
     try:
         return float(value)
     except ValueError:
         return None
+
+
+def to_python(value):
+    """
+    Unwrap a NumPy scalar to the equivalent Python value, so it can be bound as an SQLite parameter,
+    serialized to JSON, or used in a stable cache key. Other values are returned as is.
+    """
+    return value.item() if isinstance(value, np.generic) else value
+
+
+# Candle length in seconds per OANDA granularity. 'M' uses the longest month, as an upper bound.
+GRANULARITY_SECONDS = {
+    'S5': 5, 'S10': 10, 'S15': 15, 'S30': 30,
+    'M1': 60, 'M2': 120, 'M4': 240, 'M5': 300, 'M10': 600, 'M15': 900, 'M30': 1800,
+    'H1': 3600, 'H2': 7200, 'H3': 10800, 'H4': 14400, 'H6': 21600, 'H8': 28800, 'H12': 43200,
+    'D': 86400, 'W': 604800, 'M': 2678400,
+}
+
+_EPOCH = pd.Timestamp(0, tz='UTC')
+_SECOND = pd.Timedelta(seconds=1)
+_UNITS_PER_SECOND = {'s': 1, 'ms': 10 ** 3, 'us': 10 ** 6, 'ns': 10 ** 9}
+
+
+def to_epoch_seconds(value):
+    """
+    Convert a timestamp to integer seconds since the Unix epoch (UTC).
+
+    :param value: ISO/OANDA string, datetime, pandas Timestamp, or an epoch number (returned as is).
+                  Naive datetimes are taken as UTC.
+    :return: int
+    """
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize('UTC')
+    return int((timestamp - _EPOCH) // _SECOND)
+
+
+def to_epoch_array(values):
+    """
+    Vectorized to_epoch_seconds for a column of timestamps.
+
+    :param values: Series/list/array of timestamp strings or datetimes.
+    :return: int64 NumPy array of epoch seconds.
+    """
+    if isinstance(values, (pd.DatetimeIndex, pd.Series)) and pd.api.types.is_datetime64_any_dtype(values):
+        # Already datetimes: read the integer representation instead of going through Timedelta arithmetic
+        index = pd.DatetimeIndex(values)
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        return np.floor_divide(index.asi8, _UNITS_PER_SECOND[index.unit])
+    timestamps = pd.to_datetime(pd.Series(values), utc=True, format='ISO8601')
+    return ((timestamps - _EPOCH) // _SECOND).to_numpy(dtype=np.int64)
+
+
+def from_epoch_seconds(values):
+    """
+    Convert epoch seconds back to UTC datetimes (a DatetimeIndex for sequences, a Timestamp for scalars).
+    """
+    return pd.to_datetime(values, unit='s', utc=True)
+
+
+def candle_rows(instrument_id, granularity, candles):
+    """
+    Turn OANDA-style candles ({'time', 'mid': {'o', 'h', 'l', 'c'}, 'volume'}) into historical_data rows.
+
+    :return: List of (instrument_id, granularity, timestamp, open, high, low, close, volume) tuples.
+    """
+    return [
+        (
+            instrument_id,
+            granularity,
+            to_epoch_seconds(candle['time']),
+            float(candle['mid'].get('o', 0)),
+            float(candle['mid'].get('h', 0)),
+            float(candle['mid'].get('l', 0)),
+            float(candle['mid'].get('c', 0)),
+            float(candle.get('volume', 0)),
+        )
+        for candle in candles
+    ]
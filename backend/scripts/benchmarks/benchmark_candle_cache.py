@@ -0,0 +1,99 @@
+# backend/scripts/benchmarks/benchmark_candle_cache.py
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.data.repositories._candle_cache import CandleCache
+from backend.data.utils.utils import from_epoch_seconds, to_epoch_array
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data/models/schema_historical_data.sql')
+
+
+def make_candles(n_bars, seed=42):
+    """
+    Build a synthetic random-walk M1 series with n_bars candles.
+    """
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0002, n_bars))
+    index = pd.date_range("2020-01-01", periods=n_bars, freq="min", tz="UTC", name="timestamp")
+    return pd.DataFrame({
+        'open': close, 'high': close + 0.0003, 'low': close - 0.0003, 'close': close, 'volume': 100.0
+    }, index=index)
+
+
+def load_like_mongo(documents):
+    # What Backtester.load_from_mongo does with the documents it reads
+    df = pd.DataFrame(documents)
+    df['timestamp'] = pd.to_datetime(df['time'])
+    df.set_index('timestamp', inplace=True)
+    df['open'] = df['mid'].apply(lambda x: float(x.get('o', 0)))
+    df['high'] = df['mid'].apply(lambda x: float(x.get('h', 0)))
+    df['low'] = df['mid'].apply(lambda x: float(x.get('l', 0)))
+    df['close'] = df['mid'].apply(lambda x: float(x.get('c', 0)))
+    return df
+
+
+def load_like_sqlite(path):
+    # What Backtester.load_from_sqlite does, against the clustered historical_data table
+    conn = sqlite3.connect(path)
+    rows = conn.execute(
+        "SELECT timestamp, open, high, low, close, volume FROM historical_data "
+        "WHERE instrument_id = 1 AND granularity = 'M1' ORDER BY timestamp ASC"
+    ).fetchall()
+    conn.close()
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = from_epoch_seconds(df['timestamp'])
+    return df.set_index('timestamp')
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(n_bars=1_000_000, mongo_bars=100_000):
+    candles = make_candles(n_bars)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache = CandleCache(cache_dir=os.path.join(tmpdir, 'cache'))
+        _, write_seconds = timed(cache.write, "EUR_USD", "M1", candles)
+        loaded, cache_seconds = timed(cache.load, "EUR_USD", "M1")
+        _, arrays_seconds = timed(cache.load_arrays, "EUR_USD", "M1")
+        assert np.array_equal(loaded['close'].to_numpy(), candles['close'].to_numpy())
+
+        db_path = os.path.join(tmpdir, 'historical_data.db')
+        conn = sqlite3.connect(db_path)
+        conn.executescript(open(SCHEMA_PATH).read())
+        epochs = to_epoch_array(candles.index).tolist()
+        conn.executemany(
+            "INSERT INTO historical_data VALUES (1, 'M1', ?, ?, ?, ?, ?, ?)",
+            zip(epochs, *(candles[column].tolist() for column in CandleCache.COLUMNS)),
+        )
+        conn.commit()
+        conn.close()
+        _, sqlite_seconds = timed(load_like_sqlite, db_path)
+
+    sample = candles.iloc[:mongo_bars]
+    documents = [
+        {'time': ts.isoformat(), 'mid': {'o': str(o), 'h': str(h), 'l': str(l), 'c': str(c)}, 'volume': 100}
+        for ts, o, h, l, c in zip(sample.index, sample['open'], sample['high'], sample['low'], sample['close'])
+    ]
+    _, mongo_seconds = timed(load_like_mongo, documents)
+    mongo_seconds *= n_bars / mongo_bars
+
+    print(f"Bars:                  {n_bars}")
+    print(f"Cache write:           {write_seconds:.3f}s")
+    print(f"Cache load_arrays:     {arrays_seconds * 1000:.2f} ms")
+    print(f"Cache load DataFrame:  {cache_seconds * 1000:.2f} ms")
+    print(f"SQLite load:           {sqlite_seconds:.3f}s")
+    print(f"Mongo DataFrame build: {mongo_seconds:.3f}s  (est. from {mongo_bars} documents, excludes the query)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
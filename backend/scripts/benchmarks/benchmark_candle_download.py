@@ -0,0 +1,72 @@
+# backend/scripts/benchmarks/benchmark_candle_download.py
+import datetime
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytz
+
+from backend.trading.brokers.oanda_client import OandaClient
+
+
+class CandleHandler(BaseHTTPRequestHandler):
+    """
+    Candles endpoint that answers every M1 window after a fixed delay, standing in for the
+    round trip and server time of the real API.
+    """
+    protocol_version = "HTTP/1.1"
+    latency = 0.2
+
+    def do_GET(self):
+        parameters = {key: values[0] for key, values in parse_qs(self.path.partition("?")[2]).items()}
+        start = datetime.datetime.strptime(parameters["from"], "%Y-%m-%dT%H:%M:%SZ")
+        end = datetime.datetime.strptime(parameters["to"], "%Y-%m-%dT%H:%M:%SZ")
+        count = int((end - start).total_seconds() // 60) + 1
+        candles = [
+            {"time": (start + datetime.timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%S.000000000Z"),
+             "mid": {"o": "1.1", "h": "1.1", "l": "1.1", "c": "1.1"}, "volume": 1, "complete": True}
+            for i in range(count)
+        ]
+        time.sleep(self.latency)
+
+        data = json.dumps({"candles": candles}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(days=365, latency=0.2, workers=(1, 4, 8)):
+    CandleHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CandleHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v3"
+
+    end = datetime.datetime(2024, 1, 1, tzinfo=pytz.UTC)
+    start = end - datetime.timedelta(days=days)
+
+    print(f"Range:            {days} days of M1, {latency * 1000:.0f} ms simulated latency per request")
+    try:
+        for max_workers in workers:
+            with OandaClient(base_url=base_url, headers={}, account_id="bench") as client:
+                begin = time.perf_counter()
+                candles = client.fetch_historical_data("EUR_USD", "M1", start_date=start, end_date=end,
+                                                       max_workers=max_workers)
+                seconds = time.perf_counter() - begin
+                requests_made = client.latency_stats()["candles"]["calls"]
+            print(f"{max_workers} worker(s):      {len(candles)} candles in {requests_made} requests, {seconds:.2f}s")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 365)
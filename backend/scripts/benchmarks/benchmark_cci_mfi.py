@@ -0,0 +1,70 @@
+# backend/scripts/benchmarks/benchmark_cci_mfi.py
+import logging
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.trading.indicators.cci import CCI
+from backend.trading.indicators.mfi import MFI
+
+
+def make_candles(n_bars, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0002, n_bars))
+    spread = rng.uniform(0.0001, 0.0010, n_bars)
+    return pd.DataFrame({
+        'high': close + spread, 'low': close - spread, 'close': close,
+        'volume': rng.integers(1, 500, n_bars).astype(float),
+    })
+
+
+def legacy_cci(df, period):
+    # CCI.calculate before the strided kernel: a pandas Series built for every window
+    typical_price = (df['high'] + df['low'] + df['close']) / 3
+    tp_sma = typical_price.rolling(window=period).mean()
+    mean_deviation = typical_price.rolling(window=period).apply(
+        lambda series: np.mean(np.abs(series - series.mean())), raw=False)
+    return (typical_price - tp_sma) / (0.015 * mean_deviation)
+
+
+def legacy_mfi(df, period):
+    # MFI.calculate before np.where: two row-wise apply passes
+    df = df.copy()
+    df['typical_price'] = (df['high'] + df['low'] + df['close']) / 3
+    df['money_flow'] = df['typical_price'] * df['volume']
+    df['previous_typical_price'] = df['typical_price'].shift(1)
+    positive = df.apply(lambda row: row['money_flow'] if row['typical_price'] > row['previous_typical_price'] else 0, axis=1)
+    negative = df.apply(lambda row: row['money_flow'] if row['typical_price'] < row['previous_typical_price'] else 0, axis=1)
+    mfr = positive.rolling(window=period).sum() / negative.rolling(window=period).sum()
+    return 100 - (100 / (1 + mfr))
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def run(n_bars=500_000, period=20, legacy_bars=20_000):
+    candles = make_candles(n_bars)
+    sample = candles.iloc[:legacy_bars]
+
+    logging.disable(logging.INFO)
+    try:
+        for name, indicator, column, legacy in (("CCI", CCI, 'cci', legacy_cci), ("MFI", MFI, 'mfi', legacy_mfi)):
+            result, seconds = timed(lambda: indicator.calculate(candles.copy(), period=period))
+            expected, legacy_seconds = timed(lambda: legacy(sample, period))
+            legacy_seconds *= n_bars / legacy_bars
+
+            assert np.allclose(result[column].iloc[:legacy_bars], expected, rtol=1e-8, equal_nan=True), \
+                f"{name} differs from the previous implementation."
+            print(f"{name}: {n_bars} bars, period {period} | previous {legacy_seconds:.1f}s "
+                  f"(est. from {legacy_bars} bars) | vectorized {seconds * 1000:.1f} ms")
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,103 @@
+# backend/scripts/benchmarks/benchmark_historical_data.py
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.scripts.maintenance.migrate_historical_data import migrate
+
+# Layout before the migration: rowid table, TEXT timestamps, index on instrument_id only
+OLD_SCHEMA = """
+CREATE TABLE historical_data (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instrument_id INTEGER NOT NULL,
+    instrument TEXT,
+    granularity TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    open REAL, high REAL, low REAL, close REAL,
+    volume INTEGER
+);
+CREATE INDEX idx_historical_instrument_id ON historical_data (instrument_id);
+"""
+
+FULL_LOAD = """
+    SELECT timestamp, open, high, low, close, volume FROM historical_data
+    WHERE instrument_id = ? AND granularity = ?
+    ORDER BY timestamp ASC
+"""
+RANGE_LOAD = """
+    SELECT timestamp, open, high, low, close, volume FROM historical_data
+    WHERE instrument_id = ? AND granularity = ? AND timestamp >= ?
+    ORDER BY timestamp ASC
+"""
+
+
+def build_old_database(path, n_instruments, granularities, n_bars):
+    """
+    Fill an old-layout database with interleaved batches, the way separate sync jobs write it.
+    """
+    rng = np.random.default_rng(42)
+    times = pd.date_range("2020-01-01", periods=n_bars, freq="min").strftime("%Y-%m-%d %H:%M:%S").tolist()
+    conn = sqlite3.connect(path)
+    conn.executescript(OLD_SCHEMA)
+    for start in range(0, n_bars, 5_000):
+        for instrument_id in range(1, n_instruments + 1):
+            for granularity in granularities:
+                prices = rng.normal(1.1, 0.01, min(5_000, n_bars - start)).tolist()
+                conn.executemany(
+                    "INSERT INTO historical_data (instrument_id, granularity, timestamp, open, high, low, close, volume)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(instrument_id, granularity, times[start + i], p, p, p, p, 100) for i, p in enumerate(prices)],
+                )
+    conn.commit()
+    conn.close()
+    return times
+
+
+def time_query(path, query, parameters, repeat=5):
+    conn = sqlite3.connect(path)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(query, parameters).fetchall()
+        best = min(best, time.perf_counter() - start)
+    conn.close()
+    return best, len(rows)
+
+
+def run(n_bars=100_000, n_instruments=4, granularities=("M1", "M5", "H1")):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        old_path = os.path.join(tmpdir, "old.db")
+        times = build_old_database(old_path, n_instruments, granularities, n_bars)
+        new_path = os.path.join(tmpdir, "new.db")
+        shutil.copy(old_path, new_path)
+
+        start = time.perf_counter()
+        migrated, dropped = migrate(new_path)
+        migrate_seconds = time.perf_counter() - start
+
+        range_start_text = times[-5_000]
+        range_start_epoch = int(pd.Timestamp(range_start_text, tz="UTC").timestamp())
+
+        old_full, old_rows = time_query(old_path, FULL_LOAD, (2, "M5"))
+        new_full, new_rows = time_query(new_path, FULL_LOAD, (2, "M5"))
+        old_range, old_range_rows = time_query(old_path, RANGE_LOAD, (2, "M5", range_start_text))
+        new_range, new_range_rows = time_query(new_path, RANGE_LOAD, (2, "M5", range_start_epoch))
+
+    assert old_rows == new_rows and old_range_rows == new_range_rows, "Migrated table returns different rows."
+
+    print(f"Rows in table:     {n_bars * n_instruments * len(granularities)}  ({migrated} migrated, {dropped} dropped)")
+    print(f"Migration:         {migrate_seconds:.2f}s")
+    print(f"Full load ({old_rows} rows):  before {old_full * 1000:.1f} ms, after {new_full * 1000:.1f} ms, "
+          f"{old_full / new_full:.1f}x")
+    print(f"Range load ({old_range_rows} rows): before {old_range * 1000:.1f} ms, after {new_range * 1000:.1f} ms, "
+          f"{old_range / new_range:.1f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
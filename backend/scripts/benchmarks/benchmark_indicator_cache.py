@@ -0,0 +1,43 @@
+# backend/scripts/benchmarks/benchmark_indicator_cache.py
+import logging
+import sys
+import tempfile
+import time
+
+from backend.scripts.benchmarks.benchmark_indicator_outputs import REQUESTS, make_candles
+from backend.trading.indicators.result_cache import IndicatorCache, data_version
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def run(n_bars=200_000):
+    candles = make_candles(n_bars)
+
+    logging.disable(logging.INFO)
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = IndicatorCache(cache_dir=cache_dir)
+            cold_seconds = timed(cache.compute_indicators, candles, REQUESTS, 'EUR_USD', 'M1')
+            warm_seconds = timed(cache.compute_indicators, candles, REQUESTS, 'EUR_USD', 'M1')
+            version_seconds = timed(data_version, candles)
+
+            # A new process: nothing in memory, every result read back from disk
+            restarted = IndicatorCache(cache_dir=cache_dir)
+            disk_seconds = timed(restarted.compute_indicators, candles, REQUESTS, 'EUR_USD', 'M1')
+    finally:
+        logging.disable(logging.NOTSET)
+
+    print(f"Bars: {n_bars}, indicator requests: {len(REQUESTS)}")
+    print(f"cold (compute + store):   {cold_seconds:.2f}s")
+    print(f"warm (memory hits):       {warm_seconds:.2f}s, of which data_version {version_seconds:.3f}s")
+    print(f"restart (disk hits):      {disk_seconds:.2f}s")
+    print(f"memory tier: {cache.stats()}")
+    print(f"restarted:   {restarted.stats()}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,62 @@
+# backend/scripts/benchmarks/benchmark_indicator_outputs.py
+import logging
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.trading.indicators.outputs import INDICATORS, compute_indicators
+
+# A wide indicator set: several parameter sets per indicator, as an optimizer run would use
+REQUESTS = [(name, {'period': period}) for name in ('sma', 'ema', 'rsi', 'atr', 'cci', 'stoch', 'williams_r', 'mfi')
+            for period in (10, 20, 50)] + [('macd', {}), ('bollinger', {'period': 20}), ('adx', {}), ('aroon', {}),
+                                            ('obv', {}), ('vwap', {})]
+
+
+def make_candles(n_bars, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0002, n_bars))
+    spread = rng.uniform(0.0001, 0.0010, n_bars)
+    return pd.DataFrame({
+        'high': close + spread, 'low': close - spread, 'close': close,
+        'volume': rng.integers(1, 500, n_bars).astype(float),
+    })
+
+
+def frame_megabytes(df):
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def run(n_bars=200_000):
+    candles = make_candles(n_bars)
+
+    logging.disable(logging.INFO)
+    try:
+        # The calculate methods write into the frame they are given, helper columns included; later
+        # parameter sets of the same indicator overwrite the earlier ones
+        start = time.perf_counter()
+        mutated = candles.copy()
+        for name, parameters in REQUESTS:
+            mutated = INDICATORS[name].calculate(mutated, **parameters)
+        mutating_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        outputs = compute_indicators(candles, REQUESTS)
+        outputs_seconds = time.perf_counter() - start
+    finally:
+        logging.disable(logging.NOTSET)
+
+    outputs_written = {column.format(**parameters) for name, parameters in REQUESTS for column in INDICATORS[name].outputs}
+    helpers = [column for column in mutated.columns if column not in candles.columns and column not in outputs_written]
+
+    print(f"Bars: {n_bars}, indicator requests: {len(REQUESTS)}")
+    print(f"Helper columns left behind by calculate: {helpers}")
+    print(f"calculate into one frame:  {mutated.shape[1]} columns, {frame_megabytes(mutated):.0f} MB, "
+          f"{mutating_seconds:.2f}s (only the last parameter set of each indicator survives)")
+    print(f"compute_indicators:        {outputs.shape[1]} columns, {frame_megabytes(outputs):.0f} MB, "
+          f"{outputs_seconds:.2f}s (every parameter set kept)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,81 @@
+# backend/scripts/benchmarks/benchmark_indicator_persistence.py
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from backend.data.repositories._sqlite_db import SQLiteDBHandler
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators.sma import SMA
+
+SCHEMA = """
+CREATE TABLE indicators (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, type TEXT NOT NULL);
+CREATE TABLE indicator_parameters (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    indicator_id INTEGER NOT NULL,
+    parameter_name TEXT NOT NULL,
+    parameter_value REAL,
+    last_update TIMESTAMP NOT NULL,
+    UNIQUE(indicator_id, parameter_name)
+);
+CREATE TABLE instrument_indicator_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instrument_id INTEGER,  -- nullable here because the row-by-row path never filled it
+    indicator_id INTEGER NOT NULL,
+    parameter_id INTEGER NOT NULL,
+    parameter_name TEXT,
+    parameter_value REAL NOT NULL,
+    timestamp TEXT NOT NULL
+);
+"""
+
+
+def make_database(path):
+    db = SQLiteDBHandler(path)
+    db.initialize_db(SCHEMA)
+    db.add_indicator("SMA", "trend")
+    # Register the result name so the row-by-row path can resolve its parameter id
+    db.add_indicator_parameters(db.get_indicator_id("SMA"), {'sma': 0, 'period': 20})
+    return db
+
+
+def run(n_rows=100_000, row_sample=2_000):
+    rng = np.random.default_rng(42)
+    prices = pd.DataFrame({'close': 1.10 + np.cumsum(rng.normal(0, 0.0002, n_rows + 19))})
+    result = SMA.calculate(prices, period=20).dropna()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        logging.disable(logging.INFO)
+        try:
+            # Previous insert_results_to_db path: one connection and commit per row, timed on a sample
+            db = make_database(os.path.join(tmpdir, 'rows.db'))
+            indicator_id = db.get_indicator_id("SMA")
+            timestamp = datetime.now().isoformat()
+            start = time.perf_counter()
+            for value in result['sma'].iloc[:row_sample]:
+                db.add_indicator_results(indicator_id, timestamp, 'sma', value)
+                db.add_indicator_parameters(indicator_id, {'period': 20})
+            row_seconds = (time.perf_counter() - start) * n_rows / row_sample
+
+            db = make_database(os.path.join(tmpdir, 'bulk.db'))
+            start = time.perf_counter()
+            rows = write_indicator_results(db, "SMA", 1, result, ['sma'], {'period': 20})
+            bulk_seconds = time.perf_counter() - start
+        finally:
+            logging.disable(logging.NOTSET)
+
+    assert rows == n_rows, f"Bulk writer stored {rows} of {n_rows} rows."
+
+    print(f"Rows:              {n_rows}")
+    print(f"Row by row (est.): {row_seconds:.2f}s  (timed on {row_sample} rows)")
+    print(f"Bulk:              {bulk_seconds:.3f}s")
+    print(f"Speedup:           {row_seconds / bulk_seconds:.0f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
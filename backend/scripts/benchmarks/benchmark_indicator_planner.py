@@ -0,0 +1,37 @@
+# backend/scripts/benchmarks/benchmark_indicator_planner.py
+import logging
+import sys
+import time
+
+from backend.scripts.benchmarks.benchmark_indicator_outputs import REQUESTS, make_candles
+from backend.trading.indicators.outputs import compute_indicators
+from backend.trading.indicators.planner import IndicatorPlan
+
+
+def run(n_bars=200_000):
+    candles = make_candles(n_bars)
+    plan = IndicatorPlan(REQUESTS)
+
+    logging.disable(logging.INFO)
+    try:
+        start = time.perf_counter()
+        separate = compute_indicators(candles, REQUESTS)
+        separate_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        planned = plan.evaluate(candles)
+        planned_seconds = time.perf_counter() - start
+    finally:
+        logging.disable(logging.NOTSET)
+
+    uses = plan.uses()
+    print(plan.explain())
+    print(f"\nBars: {n_bars}, indicator requests: {len(REQUESTS)}, plan nodes: {len(plan.nodes)} "
+          f"({sum(count > 1 for count in uses.values())} shared)")
+    print(f"one calculate per request: {separate_seconds:.2f}s")
+    print(f"planned (shared nodes):    {planned_seconds:.2f}s")
+    print(f"identical outputs: {separate.equals(planned[separate.columns])}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
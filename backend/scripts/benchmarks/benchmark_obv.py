@@ -0,0 +1,59 @@
+# backend/scripts/benchmarks/benchmark_obv.py
+import logging
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.trading.indicators.obv import OBV
+
+
+def reference_obv(close, volume):
+    # The bar-by-bar loop OBV.calculate used to run (without the chained assignment)
+    obv = [0.0]
+    for i in range(1, len(close)):
+        if close[i] > close[i - 1]:
+            obv.append(obv[-1] + volume[i])
+        elif close[i] < close[i - 1]:
+            obv.append(obv[-1] - volume[i])
+        else:
+            obv.append(obv[-1])
+    return obv
+
+
+def run(n_bars=1_000_000, loop_bars=100_000, append_bars=60):
+    rng = np.random.default_rng(42)
+    candles = pd.DataFrame({
+        'close': np.round(1.10 + np.cumsum(rng.normal(0, 0.0002, n_bars)), 5),
+        'volume': rng.integers(1, 500, n_bars).astype(float),
+    })
+
+    logging.disable(logging.INFO)
+    try:
+        start = time.perf_counter()
+        result = OBV.calculate(candles.copy())
+        vectorized_seconds = time.perf_counter() - start
+
+        sample = candles.iloc[:loop_bars]
+        start = time.perf_counter()
+        expected = reference_obv(sample['close'].tolist(), sample['volume'].tolist())
+        loop_seconds = (time.perf_counter() - start) * n_bars / loop_bars
+        assert np.allclose(result['obv'].to_numpy()[:loop_bars], expected), "Vectorized OBV differs from the loop."
+
+        grown = pd.concat([result.iloc[:-append_bars], candles.iloc[-append_bars:]])
+        start = time.perf_counter()
+        extended = OBV.extend(grown)
+        extend_seconds = time.perf_counter() - start
+        assert np.allclose(extended['obv'], result['obv']), "Extended OBV differs from a full calculation."
+    finally:
+        logging.disable(logging.NOTSET)
+
+    print(f"Bars:                 {n_bars}")
+    print(f"Vectorized calculate: {vectorized_seconds * 1000:.1f} ms")
+    print(f"Python loop:          {loop_seconds:.2f}s  (est. from {loop_bars} bars)")
+    print(f"Extend by {append_bars} bars:    {extend_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,53 @@
+# backend/scripts/benchmarks/benchmark_parallel_sweep.py
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.trading.indicators.sma import SMA
+from backend.trading.optimizers.parallel_sweep import evaluate_combination, run_parallel_sweep
+
+
+def make_candles(n_bars, seed=42):
+    """
+    Build a synthetic random-walk M1 series with n_bars candles.
+    """
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0002, n_bars))
+    index = pd.date_range("2024-01-01", periods=n_bars, freq="min")
+    return pd.DataFrame({"close": close}, index=index)
+
+
+def run(n_bars=200_000, n_combinations=256):
+    data = make_candles(n_bars)
+    combinations = [{'period': period} for period in range(5, 5 + n_combinations)]
+    columns = {'close': data['close'].to_numpy()}
+
+    logging.disable(logging.INFO)
+    try:
+        start = time.perf_counter()
+        serial = [evaluate_combination(columns, SMA.calculate, 'sma', parameters) for parameters in combinations]
+        serial_seconds = time.perf_counter() - start
+
+        print(f"Bars:          {n_bars}")
+        print(f"Combinations:  {n_combinations}")
+        print(f"In-process:    {serial_seconds:.2f}s  ({n_combinations / serial_seconds:.0f} combinations/s)")
+
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            start = time.perf_counter()
+            results = run_parallel_sweep(data, SMA.calculate, 'sma', combinations, max_workers=workers)
+            seconds = time.perf_counter() - start
+            assert len(results) == len(serial), "Parallel sweep lost combinations."
+            print(f"{workers:>3} workers:   {seconds:.2f}s  ({n_combinations / seconds:.0f} combinations/s, "
+                  f"{serial_seconds / seconds:.1f}x)")
+            workers *= 2
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,75 @@
+# backend/scripts/benchmarks/benchmark_portfolio.py
+import logging
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.trading.indicators.sma import SMA
+from backend.trading.optimizers.backtester import Backtester
+from backend.trading.optimizers.portfolio import MAJORS, PortfolioBacktester
+
+
+def make_frames(n_bars, seed=42):
+    """
+    Build synthetic random-walk H1 candles for the 7 majors, each missing a few random bars.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2020-01-01", periods=n_bars, freq="h", tz="UTC")
+    frames = {}
+    for instrument in MAJORS:
+        start = 110.0 if instrument.endswith("JPY") else 1.2
+        close = start * np.exp(np.cumsum(rng.normal(0, 0.001, n_bars)))
+        keep = rng.random(n_bars) > 0.001
+        frames[instrument] = pd.DataFrame({"close": close[keep]}, index=index[keep])
+    return frames
+
+
+def single_pair_run(data, period):
+    backtester = Backtester()
+    backtester.data = data.copy()
+    backtester.apply_indicator(SMA.calculate, period=period)
+    backtester.simulate_trades_vectorized("close > sma", "close < sma")
+    return backtester.calculate_performance()
+
+
+def portfolio_run(frames, period):
+    portfolio = PortfolioBacktester(loader=object())
+    portfolio.set_data(frames, "H1")
+    portfolio.apply_indicator(SMA.calculate, period=period)
+    portfolio.simulate_trades_vectorized("close > sma", "close < sma")
+    return portfolio, portfolio.calculate_performance()
+
+
+def best_time(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def run(n_bars=100_000, period=50, repeat=5):
+    frames = make_frames(n_bars)
+    logging.disable(logging.INFO)
+    try:
+        single_seconds = best_time(lambda: single_pair_run(frames["EUR_USD"], period), repeat)
+        separate_seconds = best_time(lambda: [single_pair_run(frame, period) for frame in frames.values()], repeat)
+        portfolio_seconds = best_time(lambda: portfolio_run(frames, period), repeat)
+        portfolio, performance = portfolio_run(frames, period)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    print(f"Bars per pair:          {n_bars}")
+    print(f"Single pair (EUR_USD):  {single_seconds:.3f}s")
+    print(f"7 pairs one by one:     {separate_seconds:.3f}s")
+    print(f"7 pairs as a portfolio: {portfolio_seconds:.3f}s ({len(portfolio.data['close'])} aligned bars, "
+          f"{performance['trades']} trades, peak margin {performance['max_margin_used']:.0f})")
+    print(f"Portfolio / single:     {portfolio_seconds / single_seconds:.1f}x")
+    print(f"Portfolio / one by one: {portfolio_seconds / separate_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
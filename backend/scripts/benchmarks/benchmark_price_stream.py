@@ -0,0 +1,97 @@
+# backend/scripts/benchmarks/benchmark_price_stream.py
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from backend.trading.brokers.oanda_client import OandaClient
+from backend.trading.brokers.price_stream import ALL_INSTRUMENTS, TickBus, parse_price_line, replay_stream
+
+INSTRUMENTS = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD", "USD_CAD", "USD_CHF", "NZD_USD"]
+
+
+def write_replay_file(path, n_ticks, heartbeat_every=50, seed=42):
+    """
+    Write a pricing stream recording: n_ticks PRICE lines over INSTRUMENTS with a HEARTBEAT line
+    every heartbeat_every prices.
+    """
+    rng = np.random.default_rng(seed)
+    mids = 1.10 + np.cumsum(rng.normal(0, 0.00005, n_ticks))
+    with open(path, 'w') as f:
+        for i, mid in enumerate(mids):
+            if i % heartbeat_every == 0:
+                f.write(f'{{"type":"HEARTBEAT","time":"2024-01-01T00:00:{i % 60:02d}.000000000Z"}}\n')
+            f.write(
+                f'{{"type":"PRICE","time":"2024-01-01T00:00:{i % 60:02d}.{i:09d}Z",'
+                f'"bids":[{{"price":"{mid - 0.00005:.5f}","liquidity":1000000}}],'
+                f'"asks":[{{"price":"{mid + 0.00005:.5f}","liquidity":1000000}}],'
+                f'"closeoutBid":"{mid - 0.0001:.5f}","closeoutAsk":"{mid + 0.0001:.5f}",'
+                f'"status":"tradeable","tradeable":true,"instrument":"{INSTRUMENTS[i % len(INSTRUMENTS)]}"}}\n'
+            )
+
+
+def make_handler(body):
+    class ReplayHandler(BaseHTTPRequestHandler):
+        # Serves the recording as one streamed response, then closes the connection
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+    return ReplayHandler
+
+
+def run(n_ticks=500_000):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "pricing_stream.jsonl")
+        write_replay_file(path, n_ticks)
+        with open(path, 'rb') as f:
+            body = f.read()
+        lines = body.splitlines()
+
+        start = time.perf_counter()
+        parsed = sum(1 for line in lines if parse_price_line(line) is not None)
+        parse_seconds = time.perf_counter() - start
+
+        bus = TickBus()
+        mids = {}
+        for instrument in INSTRUMENTS:
+            bus.subscribe(instrument, lambda tick: mids.__setitem__(tick.instrument, tick.mid))
+        bus.subscribe(ALL_INSTRUMENTS, lambda tick: None)
+        start = time.perf_counter()
+        replayed = replay_stream(path, bus)
+        replay_seconds = time.perf_counter() - start
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(body))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        with OandaClient(base_url=f"http://127.0.0.1:{server.server_address[1]}/v3", headers={},
+                         account_id="bench") as client:
+            start = time.perf_counter()
+            streamed = client.stream_prices(INSTRUMENTS, max_reconnects=0)
+            stream_seconds = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert parsed == replayed == streamed == n_ticks, "Not every price line became a tick."
+
+    print(f"Ticks:                    {n_ticks} ({len(lines) - n_ticks} heartbeats, {len(body) / 1e6:.0f} MB)")
+    print(f"parse_price_line:         {n_ticks / parse_seconds:,.0f} ticks/s")
+    print(f"replay file -> TickBus:   {n_ticks / replay_seconds:,.0f} ticks/s")
+    print(f"HTTP stream -> TickBus:   {n_ticks / stream_seconds:,.0f} ticks/s")
+    print(f"(TickBus runs {len(INSTRUMENTS)} per-instrument subscribers and one wildcard subscriber)")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,67 @@
+# backend/scripts/benchmarks/benchmark_rolling_extrema.py
+import logging
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.trading.indicators._kernels import HighLowExtrema
+from backend.trading.indicators.aroon import Aroon
+from backend.trading.indicators.stoch import StochasticOscillator
+from backend.trading.indicators.williams_r import WilliamsR
+
+
+def make_candles(n_bars, seed=42):
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0002, n_bars))
+    spread = rng.uniform(0.0001, 0.0010, n_bars)
+    return pd.DataFrame({'high': close + spread, 'low': close - spread, 'close': close})
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def run(n_bars=500_000, period=25, apply_bars=50_000):
+    candles = make_candles(n_bars)
+
+    logging.disable(logging.INFO)
+    try:
+        # The previous Aroon: one Python call per window
+        sample = candles.iloc[:apply_bars]
+        expected, apply_seconds = timed(lambda: sample['high'].rolling(period).apply(
+            lambda x: (x.argmax() + 1) / period * 100, raw=True))
+        apply_seconds *= n_bars / apply_bars
+
+        aroon, aroon_seconds = timed(lambda: Aroon.calculate(candles.copy(), period=period))
+        assert np.allclose(aroon['aroon_up'].iloc[:apply_bars], expected, equal_nan=True), "Aroon differs."
+
+        def separately():
+            frame = Aroon.calculate(candles.copy(), period=period)
+            frame = StochasticOscillator.calculate(frame, period=period)
+            return WilliamsR.calculate(frame, period=period)
+
+        def shared():
+            extrema = HighLowExtrema(candles['high'], candles['low'])
+            frame = Aroon.calculate(candles.copy(), period=period, extrema=extrema)
+            frame = StochasticOscillator.calculate(frame, period=period, extrema=extrema)
+            return WilliamsR.calculate(frame, period=period, extrema=extrema)
+
+        separate_frame, separate_seconds = timed(separately)
+        shared_frame, shared_seconds = timed(shared)
+        assert np.allclose(separate_frame['williams_r'], shared_frame['williams_r'], equal_nan=True)
+    finally:
+        logging.disable(logging.NOTSET)
+
+    print(f"Bars: {n_bars}, period {period}")
+    print(f"Aroon rolling.apply:          {apply_seconds:.2f}s  (est. from {apply_bars} bars)")
+    print(f"Aroon extremum kernel:        {aroon_seconds * 1000:.1f} ms")
+    print(f"Aroon + Stoch + %R separate:  {separate_seconds * 1000:.1f} ms")
+    print(f"Aroon + Stoch + %R shared:    {shared_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 500_000)
@@ -0,0 +1,57 @@
+# backend/scripts/benchmarks/benchmark_search_strategies.py
+import logging
+import sys
+import time
+
+import numpy as np
+
+from backend.scripts.benchmarks.benchmark_parallel_sweep import make_candles
+from backend.trading.indicators._kernels import rolling_mean_many
+from backend.trading.optimizers.search import (
+    EvaluationBudget, GridSearch, RandomSearch, SuccessiveHalving, TPESearch,
+)
+from backend.trading.optimizers.signal_engine import generate_trades, trade_statistics
+
+# A two-parameter moving-average crossover: long while fast SMA > slow SMA, flat while below
+SPACE = {'fast': range(2, 60), 'slow': range(20, 400, 5)}
+
+
+def crossover_objective(close):
+    def objective(parameters, fraction=1.0):
+        window = close[len(close) - int(round(len(close) * fraction)):]
+        fast, slow = rolling_mean_many(window, [parameters['fast'], parameters['slow']]).T
+        _, _, profits = generate_trades(window, fast > slow, fast < slow)
+        return {**trade_statistics(profits), 'trades': len(profits)}
+
+    return objective
+
+
+def run(n_bars=50_000, max_evaluations=100, seeds=5):
+    objective = crossover_objective(make_candles(n_bars)['close'].to_numpy())
+
+    logging.disable(logging.INFO)
+    try:
+        start = time.perf_counter()
+        grid = GridSearch(SPACE).search(EvaluationBudget(objective, max_evaluations=float('inf')))
+        grid_seconds = time.perf_counter() - start
+        returns = grid.results()['total_return'].to_numpy()
+
+        print(f"Bars: {n_bars}, combinations: {grid.runs}")
+        print(f"grid:     best {returns[0]:.5f} in {grid.runs} runs, {grid_seconds:.2f}s")
+        for name, strategy in (('random', RandomSearch), ('halving', SuccessiveHalving), ('tpe', TPESearch)):
+            best, seconds = [], 0.0
+            for seed in range(seeds):
+                start = time.perf_counter()
+                budget = strategy(SPACE, seed=seed).search(EvaluationBudget(objective, max_evaluations))
+                seconds += time.perf_counter() - start
+                best.append(budget.results().at[0, 'total_return'])
+            percentile = np.mean([(returns > value).mean() for value in best]) * 100
+            print(f"{name + ':':<9} best {np.mean(best):.5f} on average (top {percentile:.2f}% of the grid) "
+                  f"for {max_evaluations} backtests ({grid.runs / max_evaluations:.0f}x fewer), "
+                  f"{seconds / seeds:.2f}s per search")
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,56 @@
+# backend/scripts/benchmarks/benchmark_walk_forward.py
+import logging
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+from backend.data.repositories._sqlite_db import SQLiteDBHandler
+from backend.scripts.benchmarks.benchmark_parallel_sweep import make_candles
+from backend.trading.indicators.sma import SMA
+from backend.trading.optimizers.backtester import Backtester
+from backend.trading.optimizers.optimizer import Optimizer
+
+
+def run(n_bars=200_000, n_windows=20, n_combinations=64):
+    data = make_candles(n_bars)
+    test_size = n_bars // (n_windows + 3)
+    train_size = 3 * test_size
+    combinations = [{'period': period} for period in range(5, 5 + n_combinations)]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = SQLiteDBHandler(os.path.join(tmpdir, 'optimizer.db'))
+        db.initialize_db()
+        # The benchmark database has no instruments/indicators tables
+        db.get_instrument_id = MagicMock(return_value=1)
+        db.get_indicator_id = MagicMock(return_value=1)
+
+        backtester = Backtester()
+        optimizer = Optimizer(backtester)
+        optimizer.db_handler = db
+
+        def walk_forward(bars):
+            backtester.data = data.iloc[:bars]
+            start = time.perf_counter()
+            table = optimizer.optimize_walk_forward("EUR_USD", SMA.calculate, combinations, train_size, test_size)
+            return table, time.perf_counter() - start
+
+        logging.disable(logging.INFO)
+        try:
+            # All windows but the last, then the last one once its test bars have arrived
+            full, full_seconds = walk_forward(n_bars - test_size)
+            grown, incremental_seconds = walk_forward(n_bars)
+        finally:
+            logging.disable(logging.NOTSET)
+        db.close_connection()
+
+    print(f"Bars: {n_bars}, train/test: {train_size}/{test_size}, combinations: {n_combinations}, "
+          f"workers: {os.cpu_count()}")
+    print(f"first run:         {len(full)} windows in {full_seconds:.2f}s")
+    print(f"after new window:  {len(grown)} windows in {incremental_seconds:.2f}s (only the new one evaluated)")
+    print(grown[['test_start', 'test_end', 'period', 'total_return', 'trades']].tail().to_string(index=False))
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
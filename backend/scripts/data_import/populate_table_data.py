@@ -1,8 +1,8 @@
-import itertools
 from datetime import datetime, timedelta
-import pandas as pd
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
 from backend.data.repositories._mongo_db import MongoDBHandler
+from backend.data.utils.candle_aggregator import frame_from_oanda_candles, resample_candles
+from backend.data.utils.utils import GRANULARITY_SECONDS, candle_rows, from_epoch_seconds, to_epoch_seconds
 from backend.trading.brokers.oanda_client import OandaClient
 from backend.logs.log_manager import LogManager
 
@@ -62,7 +62,7 @@ class PopulateTableData:
         result = self.instruments_db.fetch_records_with_query(query, (instrument_id, granularity))
 
         if result and result[0][0]:
-            return datetime.strptime(result[0][0], "%Y-%m-%d %H:%M:%S")  # Convert string to datetime
+            return datetime.fromtimestamp(result[0][0], timezone.utc)  # Stored as epoch seconds
         else:
             # If no data exists, return one year ago
             return datetime.now(timezone.utc) - timedelta(days=365)
@@ -128,7 +128,7 @@ class PopulateTableData:
         logger.info(f"🔄 Fetching last {days} days of historical data from OANDA and storing in MongoDB...")
 
         forex_pairs = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD", "USD_CAD", "USD_CHF", "NZD_USD"]
-        granularities = ["M", "W", "D", "H1", "M5", "M1", "S5", "S1"]
+        granularities = ["M", "W", "D", "H1", "M5", "M1", "S5"]
         """
         EUR/USD = "the fiber": This is considered the most traded currency pair globally, often referred to as "the fiber". 
         GBP/USD = "cable": Also known as "cable," it is highly correlated to the EUR/USD and is a volatile, liquid pair due to high trading volumes. 
@@ -142,72 +142,86 @@ class PopulateTableData:
         end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days)
 
-        for pair, granularity in itertools.product(forex_pairs, granularities):
-            logger.info(f"📥 Fetching {pair} data ({granularity}, {days} days)...")
-
-            # Fetch data from OANDA
-            oanda_data = self.oanda_client.fetch_historical_data(
-                instrument=pair,
-                granularity=granularity,
-                start_date=start_date,
-                end_date=end_date
-            )
-
-            if not oanda_data:
-                logger.warning(f"⚠️ No data found for {pair} - {granularity}. Skipping...")
-                continue
-
-            # Convert to Pandas DataFrame
-            df = pd.DataFrame(oanda_data)
-            if "time" not in df.columns:
-                # Extract 'time' from index if missing
-                df["time"] = df.index.strftime("%Y-%m-%d %H:%M:%S")
-            else:
-                df["time"] = pd.to_datetime(df["time"]).dt.strftime("%Y-%m-%d %H:%M:%S")  # Ensure correct format
-
-            df.reset_index(inplace=True)  # Convert index to columns
-
-            # Extract OHLC and volume
-            df['open'] = df['mid'].apply(lambda x: float(x.get('o', 0)))
-            df['high'] = df['mid'].apply(lambda x: float(x.get('h', 0)))
-            df['low'] = df['mid'].apply(lambda x: float(x.get('l', 0)))
-            df['close'] = df['mid'].apply(lambda x: float(x.get('c', 0)))
-            df['volume'] = df.get('volume', 0).astype(float)
-
-            # Drop unnecessary columns
-            df.drop(columns=['mid', '_id'], errors='ignore', inplace=True)
-
-            # # Store in MongoDB
-            collection_name = f"{pair.lower()}_{granularity}_data"
-            self.mongo_handler.switch_collection(collection_name)  # Ensure we're working with the right collection
-            
-            # 🔍 Debug: Check if the collection is set
-            if self.mongo_handler.collection is None:
-                logger.error(f"❌ MongoDB collection '{collection_name}' was not set properly.")
-                raise ValueError(f"MongoDB collection '{collection_name}' is None")
-            
-            logger.info(f"📂 Using MongoDB collection: {self.mongo_handler.collection.name}")
-            
-            # Debug: Print first few rows of DataFrame
-            print("DataFrame Columns Before Inserting:", df.columns)  # Debugging
-            print(df.head())
-
-            # Ensure 'time' exists in DataFrame
-            if "time" not in df.columns:
-                logger.error("❌ The 'time' column is missing from the dataframe before inserting into MongoDB.")
-                raise KeyError("Missing 'time' field in historical data")
-
-            # Insert into MongoDB
-            self.mongo_handler.switch_collection(collection_name)
-            self.mongo_handler.long_bulk_insert(df.to_dict(orient="records"))
-
-            # Insert into MongoDB
-            self.mongo_handler.long_bulk_insert(df.to_dict(orient="records"))
-
-            logger.info(f"✅ Inserted {len(df)} records for {pair} - {granularity} in MongoDB.")
+        # Intraday granularities are aggregated from the M1 download instead of being requested separately.
+        # D/W/M are still downloaded because OANDA aligns them to 17:00 New York rather than UTC.
+        derived_granularities = {"M5": "M1", "H1": "M1"}
+        downloaded_granularities = [g for g in granularities if g not in derived_granularities]
+
+        for pair in forex_pairs:
+            # Each collection resumes after its newest candle; a source is downloaded from the earliest point
+            # any collection built from it needs, and the overlap is upserted without creating duplicates
+            resume = {g: self.resume_point(pair, g, start_date) for g in downloaded_granularities}
+            for granularity, source in derived_granularities.items():
+                # Derived buckets are UTC-aligned, so the next one starts a full bucket after the newest
+                resume[granularity] = self.resume_point(pair, granularity, start_date, GRANULARITY_SECONDS[granularity])
+                resume[source] = min(resume[source], resume[granularity])
+
+            frames = {}
+            for granularity in downloaded_granularities:
+                logger.info(f"📥 Fetching {pair} data ({granularity}) from {resume[granularity]}...")
+
+                # Fetch data from OANDA (the range is downloaded in concurrent 5000-candle chunks)
+                oanda_data = self.oanda_client.fetch_historical_data(
+                    instrument=pair,
+                    granularity=granularity,
+                    start_date=resume[granularity],
+                    end_date=end_date
+                )
+
+                if not oanda_data:
+                    logger.warning(f"⚠️ No new data found for {pair} - {granularity}. Skipping...")
+                    continue
+
+                frames[granularity] = frame_from_oanda_candles(oanda_data)
+                self.insert_candles_to_mongo(pair, granularity, frames[granularity])
+
+            for granularity, source in derived_granularities.items():
+                if source not in frames:
+                    logger.warning(f"⚠️ No {source} data to build {pair} - {granularity} from. Skipping...")
+                    continue
+                # The bucket still forming at end_date is left out, like OANDA's incomplete candles, and so
+                # are buckets before the resume point, which the source download may only partly cover
+                candles = resample_candles(frames[source], granularity, data_end=end_date)
+                candles = candles[candles['complete'] & (candles.index >= resume[granularity])]
+                self.insert_candles_to_mongo(pair, granularity, candles.drop(columns='complete'))
 
         logger.info("🎯 Historical data population to MongoDB complete!")
 
+    def resume_point(self, pair, granularity, start_date, step=1):
+        """
+        Point to resume the {pair}_{granularity}_data collection from: `step` seconds after its newest candle.
+
+        :param start_date: Returned when the collection is empty or its newest candle is older.
+        :param step: Seconds after the newest candle. The default of 1 lets OANDA find the next candle itself,
+                     which D/W/M need because their boundaries move with New York daylight saving time.
+        :return: UTC datetime.
+        """
+        latest = self.mongo_handler.db[f"{pair.lower()}_{granularity}_data"].find_one(
+            {}, projection={"time": 1}, sort=[("time", -1)]
+        )
+        if not latest:
+            return start_date
+        return max(start_date, from_epoch_seconds(to_epoch_seconds(latest["time"]) + step).to_pydatetime())
+
+    def insert_candles_to_mongo(self, pair, granularity, candles):
+        """
+        Store OHLCV candles in the {pair}_{granularity}_data collection, keyed on their time, so candles
+        that are already stored are updated instead of duplicated.
+
+        :param candles: OHLCV DataFrame indexed by UTC timestamp.
+        :return: Number of candles added.
+        """
+        df = candles[['open', 'high', 'low', 'close', 'volume']].reset_index(drop=True)
+        df.insert(0, "time", candles.index.strftime("%Y-%m-%d %H:%M:%S"))
+
+        collection_name = f"{pair.lower()}_{granularity}_data"
+        self.mongo_handler.create_collection_with_index(collection_name, index_field="time")
+
+        added = self.mongo_handler.upsert_many(df.to_dict(orient="records"), ("time",), collection_name)
+
+        logger.info(f"✅ Stored {len(df)} records for {pair} - {granularity} in MongoDB ({added} new).")
+        return added
+
     def populate_historical_data_to_sqlite(self, years=1):
         """
         Populates SQLite with M1 & M5 data for active positions.
@@ -256,42 +270,12 @@ class PopulateTableData:
                     logger.warning(f"⚠️ No data found in MongoDB for {pair} - {granularity}.")
                     continue
 
-                df = pd.DataFrame(mongo_data)
-                df["timestamp"] = pd.to_datetime(df["time"]).dt.strftime("%Y-%m-%d %H:%M:%S")
-
-                df["open"] = df["mid"].apply(lambda x: float(x.get("o", 0)))
-                df["high"] = df["mid"].apply(lambda x: float(x.get("h", 0)))
-                df["low"] = df["mid"].apply(lambda x: float(x.get("l", 0)))
-                df["close"] = df["mid"].apply(lambda x: float(x.get("c", 0)))
-                df["volume"] = df.get("volume", 0).astype(float)
-
-                df.drop(columns=["mid", "_id", "time"], errors="ignore", inplace=True)
-
                 # ✅ Step 4: Transform data for SQLite insertion
-                records = [
-                    {
-                        "instrument_id": instrument_id,
-                        "timestamp": row["timestamp"],
-                        "open": row["open"],
-                        "high": row["high"],
-                        "low": row["low"],
-                        "close": row["close"],
-                        "volume": row["volume"],
-                        "granularity": granularity,
-                    }
-                    for _, row in df.iterrows()
-                ]
-
-                if any(record["instrument_id"] is None for record in records):
-                    logger.error(f"❌ Some records have missing instrument_id for {pair} - {granularity}. Skipping insert!")
-                    continue
+                rows = candle_rows(instrument_id, granularity, mongo_data)
 
-                # ✅ Step 5: Insert into SQLite
-                try:
-                    self.historical_data_db.bulk_insert("historical_data", records)
-                    logger.info(f"✅ Inserted {len(records)} records for {pair} - {granularity} in SQLite.")
-                except Exception as e:
-                    logger.error(f"❌ Error inserting records for {pair} - {granularity}: {e}")
+                # ✅ Step 5: Insert into SQLite; candles already stored are skipped, so re-runs are harmless
+                added = self.historical_data_db.insert_candles(rows)
+                logger.info(f"✅ Inserted {added} of {len(rows)} records for {pair} - {granularity} in SQLite.")
 
 
     def run(self):
@@ -0,0 +1,52 @@
+# backend/scripts/maintenance/backfill_mongo_candle_keys.py
+"""
+Backfill the instrument, granularity and timestamp key fields on Mongo candle documents stored before
+incremental syncing, so the high-water mark counts them and they are not downloaded and stored again.
+
+Usage:
+    python -m backend.scripts.maintenance.backfill_mongo_candle_keys [collection ...] [--db forex_data]
+
+Without collection names every '<instrument>_<granularity>_data' collection is backfilled. Documents that
+already have the key fields are left untouched, so the script can be run again safely.
+"""
+import argparse
+
+from backend.data.repositories._mongo_db import MongoDBHandler
+from backend.logs.log_manager import LogManager
+
+logger = LogManager('migration_logs').get_logger()
+
+COLLECTION_SUFFIX = '_data'
+
+
+def parse_collection_name(name):
+    """
+    Split a candle collection name ('eur_usd_m1_data') into (instrument, granularity), or None if the name
+    does not follow MongoDBHandler.candle_collection_name.
+    """
+    if not name.endswith(COLLECTION_SUFFIX):
+        return None
+    instrument, _, granularity = name[:-len(COLLECTION_SUFFIX)].rpartition('_')
+    if not instrument or not granularity:
+        return None
+    return instrument.upper(), granularity.upper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the key fields of legacy Mongo candle documents.")
+    parser.add_argument('collections', nargs='*', help="Candle collections to backfill (default: all).")
+    parser.add_argument('--db', default='forex_data', help="Mongo database holding the candle collections.")
+    args = parser.parse_args()
+
+    mongo_handler = MongoDBHandler(db_name=args.db)
+    for name in args.collections or sorted(mongo_handler.db.list_collection_names()):
+        key = parse_collection_name(name)
+        if key is None:
+            logger.warning(f"Not a candle collection, skipping: {name}")
+            continue
+        updated = mongo_handler.backfill_candle_keys(*key)
+        print(f"{name}: {updated} documents backfilled")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# backend/scripts/maintenance/migrate_historical_data.py
+"""
+Migrate historical_data to the clustered schema in data/models/schema_historical_data.sql:
+a WITHOUT ROWID table keyed on (instrument_id, granularity, timestamp) with integer epoch timestamps.
+
+Usage:
+    python -m backend.scripts.maintenance.migrate_historical_data [db_name ...] [--vacuum]
+
+db_name defaults to historical_data.db and instruments.db (the Backtester keeps its candles there).
+Databases that are already migrated, or have no historical_data table, are left untouched.
+"""
+import argparse
+import os
+import sqlite3
+
+from backend.logs.log_manager import LogManager
+
+logger = LogManager('migration_logs').get_logger()
+
+DATABASES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data/repositories/databases')
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data/models/schema_historical_data.sql')
+
+# TEXT timestamps ('2024-01-01 00:00:00', OANDA's '2024-01-01T00:00:00.000000000Z') become epoch seconds;
+# values that are already numeric are kept
+EPOCH_EXPRESSION = """
+    CASE WHEN typeof(timestamp) IN ('integer', 'real') THEN CAST(timestamp AS INTEGER)
+         ELSE CAST(strftime('%s', timestamp) AS INTEGER) END
+"""
+
+
+def needs_migration(conn):
+    """
+    True if the database has a historical_data table in the old rowid/TEXT timestamp layout.
+    """
+    columns = {row[1]: row[2].upper() for row in conn.execute("PRAGMA table_info(historical_data)")}
+    if not columns:
+        return False
+    without_rowid = conn.execute(
+        "SELECT sql LIKE '%WITHOUT ROWID%' FROM sqlite_master WHERE type = 'table' AND name = 'historical_data'"
+    ).fetchone()[0]
+    return not (without_rowid and columns.get('timestamp') == 'INTEGER')
+
+
+def migrate(db_path, vacuum=False):
+    """
+    Rebuild historical_data in the new layout, converting timestamps to epoch seconds.
+    Rows whose timestamp cannot be parsed are dropped; duplicate candles keep the most recently inserted row.
+
+    :param db_path: Path to the SQLite database file.
+    :param vacuum: Reclaim the space of the old table afterwards.
+    :return: Tuple (rows migrated, rows dropped), or None if nothing had to be done.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        if not needs_migration(conn):
+            logger.info(f"historical_data in {db_path} needs no migration.")
+            return None
+
+        with open(SCHEMA_PATH, 'r') as f:
+            schema_sql = f.read()
+
+        # One transaction: either the whole table is converted or nothing changes
+        conn.isolation_level = None
+        conn.execute("BEGIN")
+        try:
+            conn.execute("ALTER TABLE historical_data RENAME TO historical_data_old")
+            conn.execute("DROP INDEX IF EXISTS idx_historical_instrument_id")
+            for statement in schema_sql.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+
+            total = conn.execute("SELECT COUNT(*) FROM historical_data_old").fetchone()[0]
+            # Later inserts win on duplicates, so feed the old rows in insertion order
+            has_rowid = not conn.execute(
+                "SELECT sql LIKE '%WITHOUT ROWID%' FROM sqlite_master WHERE name = 'historical_data_old'"
+            ).fetchone()[0]
+            order = "ORDER BY rowid" if has_rowid else ""
+            conn.execute(f"""
+                INSERT OR REPLACE INTO historical_data
+                    (instrument_id, granularity, timestamp, open, high, low, close, volume)
+                SELECT instrument_id, granularity, epoch, open, high, low, close, volume
+                FROM (SELECT *, {EPOCH_EXPRESSION} AS epoch FROM historical_data_old {order})
+                WHERE epoch IS NOT NULL AND instrument_id IS NOT NULL AND granularity IS NOT NULL
+            """)
+            migrated = conn.execute("SELECT COUNT(*) FROM historical_data").fetchone()[0]
+
+            conn.execute("DROP TABLE historical_data_old")
+            conn.execute("ANALYZE historical_data")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if vacuum:
+            conn.execute("VACUUM")
+
+        logger.info(f"Migrated historical_data in {db_path}: {migrated} rows kept, {total - migrated} dropped.")
+        return migrated, total - migrated
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate historical_data to the clustered epoch-timestamp schema.")
+    parser.add_argument('databases', nargs='*', default=['historical_data.db', 'instruments.db'],
+                        help="Database names in data/repositories/databases, or paths.")
+    parser.add_argument('--vacuum', action='store_true', help="Reclaim the space of the old table.")
+    args = parser.parse_args()
+
+    for db_name in args.databases:
+        db_path = os.path.join(DATABASES_DIR, db_name)
+        if not os.path.isfile(db_path):
+            logger.warning(f"Database not found, skipping: {db_path}")
+            continue
+        result = migrate(db_path, vacuum=args.vacuum)
+        if result:
+            print(f"{db_name}: {result[0]} rows migrated, {result[1]} dropped")
+        else:
+            print(f"{db_name}: nothing to migrate")
+
+
+if __name__ == "__main__":
+    main()
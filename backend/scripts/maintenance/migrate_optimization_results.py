@@ -0,0 +1,99 @@
+# backend/scripts/maintenance/migrate_optimization_results.py
+"""
+Migrate optimization_results to the checkpointing schema in data/models/schema_optimizer.sql:
+nullable optimization_id plus the run_id and parameters columns written by checkpointed sweeps,
+and the optimization_runs table.
+
+Usage:
+    python -m backend.scripts.maintenance.migrate_optimization_results [db_name ...]
+
+db_name defaults to optimizer.db. Databases that are already migrated, or have no optimization_results
+table, are left untouched.
+"""
+import argparse
+import os
+import sqlite3
+
+from backend.logs.log_manager import LogManager
+
+logger = LogManager('migration_logs').get_logger()
+
+DATABASES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data/repositories/databases')
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data/models/schema_optimizer.sql')
+
+COLUMNS = ('id', 'optimization_id', 'instrument_id', 'sharpe_ratio', 'total_return', 'max_drawdown', 'win_rate',
+           'profit_loss', 'total_trades', 'timestamp')
+
+
+def needs_migration(conn):
+    """
+    True if the database has an optimization_results table without the run_id column.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(optimization_results)")}
+    return bool(columns) and 'run_id' not in columns
+
+
+def migrate(db_path):
+    """
+    Rebuild optimization_results in the new layout, keeping every row and its id (walk_forward_windows
+    refers to them).
+
+    :param db_path: Path to the SQLite database file.
+    :return: Number of rows migrated, or None if nothing had to be done.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        if not needs_migration(conn):
+            logger.info(f"optimization_results in {db_path} needs no migration.")
+            return None
+
+        with open(SCHEMA_PATH, 'r') as f:
+            schema_sql = f.read()
+
+        # One transaction: either the whole table is converted or nothing changes
+        conn.isolation_level = None
+        # Keep the foreign keys of other tables pointing at optimization_results, not at the renamed table
+        conn.execute("PRAGMA legacy_alter_table = ON")
+        conn.execute("BEGIN")
+        try:
+            conn.execute("ALTER TABLE optimization_results RENAME TO optimization_results_old")
+            for statement in schema_sql.split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+
+            columns = ', '.join(COLUMNS)
+            conn.execute(f"INSERT INTO optimization_results ({columns}) SELECT {columns} FROM optimization_results_old")
+            migrated = conn.execute("SELECT COUNT(*) FROM optimization_results").fetchone()[0]
+
+            conn.execute("DROP TABLE optimization_results_old")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        logger.info(f"Migrated optimization_results in {db_path}: {migrated} rows.")
+        return migrated
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate optimization_results to the checkpointing schema.")
+    parser.add_argument('databases', nargs='*', default=['optimizer.db'],
+                        help="Database names in data/repositories/databases, or paths.")
+    args = parser.parse_args()
+
+    for db_name in args.databases:
+        db_path = os.path.join(DATABASES_DIR, db_name)
+        if not os.path.isfile(db_path):
+            logger.warning(f"Database not found, skipping: {db_path}")
+            continue
+        migrated = migrate(db_path)
+        if migrated is None:
+            print(f"{db_name}: nothing to migrate")
+        else:
+            print(f"{db_name}: {migrated} rows migrated")
+
+
+if __name__ == "__main__":
+    main()
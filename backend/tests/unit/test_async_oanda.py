@@ -0,0 +1,193 @@
+import asyncio
+import datetime
+import time
+import unittest
+import aiohttp
+from aiohttp import web
+from backend.trading.brokers.async_oanda_client import AsyncOandaClient
+
+
+class TestAsyncOandaClient(unittest.IsolatedAsyncioTestCase):
+    """
+    Runs AsyncOandaClient against a local aiohttp stub server.
+    """
+
+    async def asyncSetUp(self):
+        self.requests = []
+        self.responses = {}
+        self.delay = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        self.client = AsyncOandaClient(base_url=f"http://127.0.0.1:{port}/v3", headers={"Authorization": "Bearer test"},
+                                       account_id="101-TEST", max_concurrency=50, backoff_factor=0)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.runner.cleanup()
+
+    async def handle(self, request):
+        """
+        Serve the queued responses of a path (the last one repeats), or the candles of the requested instrument.
+        """
+        self.requests.append({"method": request.method, "path": request.path, "query": dict(request.query),
+                              "peer": request.transport.get_extra_info("peername"),
+                              "body": await request.json() if request.can_read_body else None})
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+
+        queue = self.responses.get(request.path)
+        if queue:
+            status, headers, payload = queue.pop(0) if len(queue) > 1 else queue[0]
+            return web.json_response(payload, status=status, headers=headers)
+        if request.path.endswith("/candles"):
+            instrument = request.path.split("/")[-2]
+            candle = {"time": "2024-01-01T00:00:00.000000000Z", "mid": {"o": "1", "h": "1", "l": "1", "c": "1"},
+                      "volume": 1, "complete": True, "instrument": instrument}
+            return web.json_response({"instrument": instrument, "candles": [candle]})
+        return web.json_response({}, status=404)
+
+    async def test_fetch_many_runs_concurrently(self):
+        """
+        A cycle over 30 pairs should take about as long as one request, not 30 of them.
+        """
+        self.delay = 0.2
+        pairs = [f"PAIR_{i}" for i in range(30)]
+
+        start = time.perf_counter()
+        candles = await self.client.fetch_many(pairs, "H1", count=1)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(list(candles), pairs)
+        self.assertTrue(all(len(candles[pair]) == 1 for pair in pairs))
+        self.assertLess(elapsed, 0.2 * 30 / 4, "Requests should overlap")
+        self.assertEqual(self.client.latency_stats()["candles"]["calls"], 30)
+
+    async def test_end_date_alone_is_one_request(self):
+        """
+        Without a start date the candles up to end_date come from a single request.
+        """
+        end = datetime.datetime(2024, 1, 1, 1, tzinfo=datetime.timezone.utc)
+
+        candles = await self.client.fetch_historical_data("EUR_USD", "H1", end_date=end, count=10)
+
+        self.assertEqual(len(candles), 1)
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.requests[0]["query"], {"granularity": "H1", "to": "2024-01-01T01:00:00Z", "count": "10"})
+
+    async def test_failed_page_cancels_the_other_pages(self):
+        """
+        When one page of a date range fails, the page requests still running are cancelled, not orphaned.
+        """
+        started, cancelled = [], []
+
+        async def request(method, endpoint, url, params=None):
+            started.append(params["from"])
+            if len(started) == 1:
+                raise aiohttp.ClientError("page failed")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(params["from"])
+                raise
+
+        self.client._request = request
+        start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+        began = time.perf_counter()
+        candles = await self.client.fetch_historical_data("EUR_USD", "M1", start_date=start,
+                                                          end_date=start + datetime.timedelta(days=14))
+
+        self.assertEqual(candles, [])
+        self.assertLess(time.perf_counter() - began, 5)
+        self.assertGreater(len(started), 2)
+        self.assertEqual(sorted(cancelled), sorted(started[1:]))
+
+    async def test_concurrency_is_limited(self):
+        """
+        No more than max_concurrency requests should be in flight.
+        """
+        await self.client.close()
+        self.client.max_concurrency = 5
+        self.delay = 0.05
+
+        results = await asyncio.gather(*(self.client.get_pricing(["EUR_USD"]) for _ in range(20)))
+
+        self.assertEqual(len(results), 20)
+        self.assertEqual(len(self.requests), 20)
+        self.assertEqual(self.peak_in_flight, 5)
+
+    async def test_connections_are_reused(self):
+        """
+        Sequential calls should share one keep-alive connection.
+        """
+        self.responses["/v3/accounts/101-TEST/orders"] = [(200, {}, {"orders": []})]
+
+        for _ in range(5):
+            self.assertEqual(await self.client.get_orders(), {"orders": []})
+
+        self.assertEqual(len({request["peer"] for request in self.requests}), 1)
+
+    async def test_retries_with_retry_after(self):
+        """
+        429 and 5xx responses should be retried until the request succeeds.
+        """
+        self.responses["/v3/accounts/101-TEST/positions"] = [
+            (429, {"Retry-After": "0"}, {}), (503, {}, {}), (200, {}, {"positions": [{"instrument": "EUR_USD"}]}),
+        ]
+
+        positions = await self.client.get_open_positions()
+
+        self.assertEqual(positions["positions"], [{"instrument": "EUR_USD"}])
+        self.assertEqual(self.client.latency_stats()["positions"]["retries"], 2)
+
+    async def test_orders_are_not_retried_on_server_errors(self):
+        """
+        A POSTed order must not be sent twice after a server error.
+        """
+        self.responses["/v3/accounts/101-TEST/orders"] = [(500, {}, {}), (201, {}, {"orderFillTransaction": {}})]
+
+        self.assertIsNone(await self.client.place_market_order("EUR_USD", 100, stop_loss=1.09))
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.requests[0]["body"]["order"]["stopLossOnFill"], {"price": "1.09"})
+
+    async def test_invalid_account_raises(self):
+        """
+        get_account should raise like OandaClient.get_account.
+        """
+        self.responses["/v3/accounts/101-TEST"] = [(400, {}, {"errorMessage": "Invalid value specified for 'accountID'"})]
+
+        with self.assertRaises(Exception) as context:
+            await self.client.get_account()
+        self.assertIn("Invalid account", str(context.exception))
+
+    async def test_pricing_and_transactions(self):
+        """
+        Query parameters should be passed the way OANDA expects them.
+        """
+        self.responses["/v3/accounts/101-TEST/pricing"] = [(200, {}, {"prices": [{"instrument": "EUR_USD"}]})]
+        self.responses["/v3/accounts/101-TEST/transactions"] = [(200, {}, {"transactions": []})]
+
+        prices = await self.client.get_pricing(["EUR_USD", "USD_JPY"])
+        transactions = await self.client.get_account_transactions(last_trans_id=42)
+
+        self.assertEqual(prices["prices"], [{"instrument": "EUR_USD"}])
+        self.assertEqual(transactions, {"transactions": []})
+        self.assertEqual(self.requests[0]["query"], {"instruments": "EUR_USD,USD_JPY"})
+        self.assertEqual(self.requests[1]["query"], {"sinceTransactionID": "42"})
+
+
+if __name__ == '__main__':
+    unittest.main()
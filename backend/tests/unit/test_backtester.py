@@ -1,11 +1,19 @@
 # tests/unit/test_backtester.py
 
+import os
+import tempfile
 import unittest
+from unittest.mock import MagicMock
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from backend.trading.indicators.result_cache import IndicatorCache
 from backend.trading.indicators.sma import SMA
 from backend.trading.optimizers.backtester import Backtester
+from backend.data.repositories._candle_cache import CandleCache
+from backend.data.repositories._sqlite_db import SQLiteDBHandler
+
+SCHEMA_HISTORICAL_DATA = os.path.join(os.path.dirname(__file__), '../../data/models/schema_historical_data.sql')
 
 class TestBacktester(unittest.TestCase):
     def setUp(self):
@@ -144,6 +152,128 @@ class TestBacktester(unittest.TestCase):
         # Assert that total return is negative and win rate is 0 (all trades lost)
         self.assertLess(performance['total_return'], 0, "Total return should be negative.")
         self.assertEqual(performance['win_rate'], 0, "Win rate should be 0 when all trades result in loss.")
-        
+
+    def assert_matches_loop(self, buy, sell):
+        # Run the row-by-row loop and the vectorized engine on the same signals and compare the results
+        loop = Backtester()
+        loop.data = self.backtester.data.copy()
+        loop.simulate_trades(lambda row: buy[loop.data.index.get_loc(row.name)],
+                             lambda row: sell[loop.data.index.get_loc(row.name)])
+
+        vectorized = Backtester()
+        vectorized.data = self.backtester.data.copy()
+        vectorized.simulate_trades_vectorized(buy, sell)
+
+        self.assertEqual(vectorized.positions, loop.positions, "Positions differ from the row loop.")
+        np.testing.assert_allclose(vectorized.trades, loop.trades)
+        self.assertAlmostEqual(vectorized.balance, loop.balance, places=9)
+
+    def test_vectorized_matches_loop_on_sma_signals(self):
+        self.backtester.apply_indicator(SMA.calculate, period=15)
+        close = self.backtester.data['close']
+        sma = self.backtester.data['sma']
+
+        self.assert_matches_loop((close > sma).to_numpy(), (close < sma).to_numpy())
+
+    def test_vectorized_matches_loop_on_overlapping_signals(self):
+        # Random signals, including bars where buy and sell fire together
+        rng = np.random.default_rng(7)
+        buy = rng.random(len(self.sample_data)) < 0.3
+        sell = rng.random(len(self.sample_data)) < 0.3
+
+        self.assertTrue((buy & sell).any(), "Test data should contain overlapping signals.")
+        self.assert_matches_loop(buy, sell)
+
+    def test_vectorized_accepts_expressions(self):
+        self.backtester.apply_indicator(SMA.calculate, period=15)
+        self.backtester.simulate_trades_vectorized("close < sma", "close > sma")
+
+        self.assertGreater(len(self.backtester.trades), 0, "There should be trades executed.")
+        performance = self.backtester.calculate_performance()
+        self.assertEqual(performance['win_rate'], 1, "Win rate should be 1 when all trades are profitable.")
+
+    def test_add_indicators_joins_namespaced_outputs(self):
+        self.backtester.add_indicators([('sma', {'period': 15}), ('sma', {'period': 30})])
+
+        self.assertEqual(list(self.backtester.data.columns), ['close', 'sma_15', 'sma_30'])
+        self.backtester.simulate_trades_vectorized("close < sma_15", "close > sma_15")
+        self.assertGreater(len(self.backtester.trades), 0, "There should be trades executed.")
+
+    def test_replaced_candles_are_not_served_stale_indicators(self):
+        """
+        The cheap version of loaded candles must not outlive them: a corrected frame of the same length
+        and end has to get freshly computed indicators.
+        """
+        self.backtester.indicator_cache = IndicatorCache()
+        self.backtester.load_from_cache = MagicMock(return_value=self.sample_data.copy())
+        self.backtester.load_data("EUR_USD", granularity="D", source="cache")
+        self.backtester.add_indicators([('sma', {'period': 15})])
+        loaded_version = self.backtester.data_version()
+        self.assertEqual(loaded_version, f"100:{self.sample_data.index[-1]}")
+
+        corrected = self.sample_data.copy()
+        corrected.iloc[-1, 0] += 10
+        self.backtester.data = corrected
+        self.assertNotEqual(self.backtester.data_version(), loaded_version)
+        self.backtester.add_indicators([('sma', {'period': 15})])
+
+        expected = SMA.calculate(corrected.copy(), period=15)['sma']
+        np.testing.assert_allclose(self.backtester.data['sma_15'], expected)
+
+    def test_vectorized_rejects_misaligned_signal(self):
+        with self.assertRaises(ValueError):
+            self.backtester.simulate_trades_vectorized(np.ones(3, dtype=bool), np.zeros(3, dtype=bool))
+
+    def test_load_from_cache_refreshes_only_when_sqlite_is_newer(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = SQLiteDBHandler(os.path.join(tmpdir, 'instruments.db'))
+            db.initialize_db(
+                "CREATE TABLE instruments (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);"
+                "INSERT INTO instruments (id, name) VALUES (1, 'EUR_USD');"
+                + open(SCHEMA_HISTORICAL_DATA).read()
+            )
+            insert = "INSERT INTO historical_data VALUES (1, 'M1', ?, ?, ?, ?, ?, 100)"
+            db.execute_many(insert, [(1704067200 + 60 * i, p, p, p, p) for i, p in enumerate(self.sample_data['close'][:80])])
+
+            self.backtester.db_handler = db
+            self.backtester.candle_cache = CandleCache(cache_dir=os.path.join(tmpdir, 'cache'))
+
+            self.backtester.load_data("EUR_USD", granularity="M1", source="cache")
+            generation = self.backtester.candle_cache.metadata("EUR_USD", "M1")['generation']
+            self.backtester.load_data("EUR_USD", granularity="M1", source="cache")
+            self.assertEqual(self.backtester.candle_cache.metadata("EUR_USD", "M1")['generation'], generation,
+                             "An up-to-date cache should not be rewritten.")
+
+            db.execute_many(insert, [(1704067200 + 60 * i, p, p, p, p) for i, p in enumerate(self.sample_data['close']) if i >= 80])
+            self.backtester.load_data("EUR_USD", granularity="M1", source="cache")
+            data = self.backtester.data
+
+            self.assertEqual(len(data), 100)
+            np.testing.assert_allclose(data['close'], self.sample_data['close'])
+            self.assertEqual(data.index[0], pd.Timestamp("2024-01-01", tz="UTC"))
+
+    def test_transfer_mongo_to_sqlite_copies_only_newer_candles(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db = SQLiteDBHandler(os.path.join(tmpdir, 'instruments.db'))
+            db.initialize_db(
+                "CREATE TABLE instruments (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);"
+                "INSERT INTO instruments (id, name) VALUES (1, 'EUR_USD');"
+                + open(SCHEMA_HISTORICAL_DATA).read()
+            )
+            db.execute_many("INSERT INTO historical_data VALUES (1, 'M1', ?, 1, 1, 1, 1, 100)",
+                            [(1704067200 + 60 * i,) for i in range(3)])
+            self.backtester.db_handler = db
+            self.backtester.mongo_handler = MagicMock()
+            self.backtester.mongo_handler.read_candles_after.return_value = [
+                {'time': '2024-01-01T00:02:00Z', 'mid': {'o': '2', 'h': '2', 'l': '2', 'c': '2'}, 'volume': 5},
+                {'time': '2024-01-01T00:03:00Z', 'mid': {'o': '3', 'h': '3', 'l': '3', 'c': '3'}, 'volume': 5},
+            ]
+
+            added = self.backtester.transfer_mongo_to_sqlite("EUR_USD", "M1")
+
+            self.backtester.mongo_handler.read_candles_after.assert_called_once_with("EUR_USD", "M1", 1704067320)
+            self.assertEqual(added, 1, "The candle already in SQLite should be skipped.")
+            self.assertEqual(db.latest_candle_timestamp(1, 'M1'), 1704067380)
+
 if __name__ == '__main__':
     unittest.main()
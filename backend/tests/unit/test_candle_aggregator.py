@@ -0,0 +1,129 @@
+import unittest
+import numpy as np
+import pandas as pd
+from backend.data.utils.candle_aggregator import CandleAggregator, aggregate_arrays, frame_from_oanda_candles, resample_candles
+from backend.trading.brokers.price_stream import Tick
+
+
+def make_m1(n_bars, start="2024-01-29", seed=7):
+    """
+    Random-walk M1 candles with a few gaps, indexed by UTC timestamp.
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n_bars, freq="min", tz="UTC", name="timestamp")
+    index = index[rng.random(n_bars) > 0.05]
+    close = 1.1 + np.cumsum(rng.normal(0, 0.0002, len(index)))
+    spread = rng.random(len(index)) * 0.0005
+    return pd.DataFrame({
+        'open': close - spread / 2, 'high': close + spread, 'low': close - spread, 'close': close,
+        'volume': rng.integers(1, 100, len(index)).astype(float),
+    }, index=index)
+
+
+def pandas_reference(df, rule):
+    aggregated = df.resample(rule, label='left', closed='left').agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+    )
+    return aggregated.dropna(subset=['open'])
+
+
+class TestResampleCandles(unittest.TestCase):
+
+    def setUp(self):
+        # Starts on a Wednesday so the first week and month are partial
+        self.m1 = make_m1(60 * 24 * 70, start="2024-01-24 13:17")
+
+    def test_matches_pandas_resample(self):
+        """
+        Every granularity should match pandas' resample over UTC-aligned buckets.
+        """
+        for granularity, rule in {"M5": "5min", "H1": "1h", "H4": "4h", "D": "1D", "W": "W-MON", "M": "MS"}.items():
+            with self.subTest(granularity=granularity):
+                expected = pandas_reference(self.m1, rule)
+
+                result = resample_candles(self.m1, granularity)
+
+                np.testing.assert_array_equal(result.index.as_unit('s'), expected.index.as_unit('s'))
+                for column in ('open', 'high', 'low', 'close', 'volume'):
+                    np.testing.assert_allclose(result[column].to_numpy(), expected[column].to_numpy())
+
+    def test_last_bucket_completeness(self):
+        """
+        The last candle is forming unless the data is known to cover its whole bucket.
+        """
+        m1 = self.m1.loc[:"2024-01-29 10:29"]
+
+        self.assertFalse(resample_candles(m1, "H1")['complete'].iloc[-1])
+        self.assertTrue(resample_candles(m1, "H1")['complete'].iloc[:-1].all())
+        self.assertFalse(resample_candles(m1, "H1", data_end="2024-01-29 10:30")['complete'].iloc[-1])
+        self.assertTrue(resample_candles(m1, "H1", data_end="2024-01-29 11:00")['complete'].iloc[-1])
+
+    def test_offset_and_epoch_column(self):
+        """
+        Buckets can be shifted, and epoch 'timestamp' columns are accepted.
+        """
+        frame = self.m1.reset_index()
+        frame['timestamp'] = (frame['timestamp'] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+
+        result = resample_candles(frame, "D", offset=-7 * 3600)
+
+        self.assertTrue((result.index.hour == 17).all())
+        self.assertEqual(result['volume'].sum(), self.m1['volume'].sum())
+
+    def test_unsorted_input(self):
+        with self.assertRaises(ValueError):
+            aggregate_arrays([120, 60], [1, 1], [1, 1], [1, 1], [1, 1], [1, 1], "M5")
+        shuffled = self.m1.sample(frac=1, random_state=1)
+        pd.testing.assert_frame_equal(resample_candles(shuffled, "H1"), resample_candles(self.m1, "H1"))
+
+    def test_frame_from_oanda_candles(self):
+        candles = [{"time": "2024-01-01T00:01:00.000000000Z", "mid": {"o": "1.1", "h": "1.3", "l": "1.0", "c": "1.2"},
+                    "volume": 7}]
+
+        frame = frame_from_oanda_candles(candles)
+
+        self.assertEqual(frame.index[0], pd.Timestamp("2024-01-01 00:01", tz="UTC"))
+        self.assertEqual(frame.iloc[0].tolist(), [1.1, 1.3, 1.0, 1.2, 7.0])
+
+
+class TestCandleAggregator(unittest.TestCase):
+
+    def test_incremental_matches_vectorized(self):
+        """
+        Feeding M1 candles one by one should produce the same H1 candles as resample_candles.
+        """
+        m1 = make_m1(60 * 24 * 3)
+        completed = []
+        aggregator = CandleAggregator("H1", on_candle=completed.append)
+        timestamps = (m1.index - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+
+        for timestamp, row in zip(timestamps, m1.itertuples(index=False)):
+            aggregator.add_candle(int(timestamp), row.open, row.high, row.low, row.close, row.volume)
+
+        expected = resample_candles(m1, "H1")
+        self.assertEqual(len(completed), len(expected) - 1)
+        aggregator.flush()
+        incremental = pd.DataFrame(completed)
+        np.testing.assert_array_equal(incremental['timestamp'].to_numpy(),
+                                      (expected.index - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1))
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            np.testing.assert_allclose(incremental[column].to_numpy(), expected[column].to_numpy())
+
+    def test_ticks(self):
+        """
+        Ticks are aggregated at their mid price, with volume counting ticks.
+        """
+        aggregator = CandleAggregator("M1")
+        ticks = [Tick("EUR_USD", "2024-01-01T00:00:01.5Z", 1.0, 1.2), Tick("EUR_USD", "2024-01-01T00:00:30.0Z", 1.3, 1.5),
+                 Tick("EUR_USD", "2024-01-01T00:00:59.9Z", 0.9, 1.1), Tick("EUR_USD", "2024-01-01T00:01:00.0Z", 1.0, 1.0)]
+
+        results = [aggregator.add_tick(tick) for tick in ticks]
+
+        self.assertEqual(results[:3], [None, None, None])
+        self.assertEqual(results[3], {'timestamp': 1704067200, 'open': 1.1, 'high': 1.4, 'low': 1.0, 'close': 1.0,
+                                      'volume': 3.0, 'complete': True})
+        self.assertEqual(aggregator.current['timestamp'], 1704067260)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import mmap
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from backend.data.repositories._candle_cache import CandleCache
+
+
+def is_memory_mapped(array):
+    # Follow the chain of views down to the buffer that owns the memory
+    while array is not None:
+        if isinstance(array, mmap.mmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+class TestCandleCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = CandleCache(cache_dir=self.tmpdir.name)
+        index = pd.date_range("2024-01-01", periods=50, freq="min", tz="UTC", name="timestamp")
+        close = np.linspace(1.0, 1.5, 50)
+        self.candles = pd.DataFrame({
+            'open': close - 0.01, 'high': close + 0.02, 'low': close - 0.02, 'close': close, 'volume': 100.0
+        }, index=index)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip_is_memory_mapped(self):
+        self.cache.write("EUR_USD", "M1", self.candles)
+        loaded = self.cache.load("EUR_USD", "M1")
+
+        pd.testing.assert_frame_equal(loaded, self.candles, check_freq=False, check_index_type=False)
+        arrays = self.cache.load_arrays("EUR_USD", "M1")
+        self.assertIsInstance(arrays['close'], np.memmap)
+        self.assertTrue(is_memory_mapped(loaded['close'].to_numpy()), "DataFrame columns should not be copies.")
+        self.assertFalse(arrays['close'].flags.writeable, "Cached columns should be read-only mappings.")
+
+    def test_staleness(self):
+        self.assertTrue(self.cache.is_stale("EUR_USD", "M1"))
+        self.cache.write("EUR_USD", "M1", self.candles)
+        last = self.cache.metadata("EUR_USD", "M1")['last_timestamp']
+
+        self.assertFalse(self.cache.is_stale("EUR_USD", "M1", latest_timestamp=last))
+        self.assertTrue(self.cache.is_stale("EUR_USD", "M1", latest_timestamp=last + 60))
+        self.assertTrue(self.cache.is_stale("EUR_USD", "M1", max_age=-1))
+
+    def test_append_adds_only_newer_candles(self):
+        self.cache.write("EUR_USD", "M1", self.candles.iloc[:30])
+        old_generation = self.cache.metadata("EUR_USD", "M1")['generation']
+        mapped_before = self.cache.load("EUR_USD", "M1")
+
+        # Overlapping batch: rows 20-29 are already cached
+        rows = self.cache.append("EUR_USD", "M1", self.candles.iloc[20:])
+
+        self.assertEqual(rows, 50)
+        pd.testing.assert_frame_equal(self.cache.load("EUR_USD", "M1"), self.candles,
+                                      check_freq=False, check_index_type=False)
+        self.assertFalse(os.path.exists(os.path.join(self.cache.path("EUR_USD", "M1"), old_generation)))
+        # A reader holding the previous generation still sees its own consistent data
+        self.assertEqual(len(mapped_before), 30)
+        self.assertAlmostEqual(mapped_before['close'].iloc[-1], self.candles['close'].iloc[29])
+
+
+if __name__ == '__main__':
+    unittest.main()
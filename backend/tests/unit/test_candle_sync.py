@@ -0,0 +1,184 @@
+# tests/unit/test_candle_sync.py
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from pymongo import DeleteOne, UpdateOne
+
+from backend.api.services.candle_sync_service import CandleSyncService
+from backend.data.repositories._mongo_db import MongoDBHandler
+from backend.data.repositories._sqlite_db import SQLiteDBHandler
+from backend.data.utils.utils import to_epoch_seconds
+
+SCHEMA_HISTORICAL_DATA = os.path.join(os.path.dirname(__file__), '../../data/models/schema_historical_data.sql')
+START = 1704067200  # 2024-01-01 00:00 UTC
+
+
+def make_candles(n, start=START, step=60):
+    return [
+        {"time": datetime.fromtimestamp(start + step * i, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000000000Z"),
+         "mid": {"o": "1.1", "h": "1.2", "l": "1.0", "c": str(1.1 + i / 1e4)}, "volume": 10 + i}
+        for i in range(n)
+    ]
+
+
+class FakeOanda:
+    """
+    Serves a fixed candle list for the requested range and records the requested start times.
+    """
+
+    def __init__(self, candles):
+        self.candles = candles
+        self.starts = []
+
+    def fetch_historical_data(self, instrument, granularity, start_date=None, end_date=None, count=None):
+        start = int(start_date.timestamp())
+        self.starts.append(start)
+        return [candle for candle in self.candles if to_epoch_seconds(candle["time"]) >= start]
+
+
+class FakeMongoStore:
+    """
+    Stand-in for the MongoDBHandler candle methods, keyed like the real unique index.
+    """
+
+    def __init__(self):
+        self.documents = {}
+
+    def latest_candle_timestamp(self, instrument, granularity):
+        keys = [key[2] for key in self.documents if key[:2] == (instrument, granularity)]
+        return max(keys) if keys else None
+
+    def upsert_candles(self, instrument, granularity, candles):
+        before = len(self.documents)
+        for candle in candles:
+            self.documents[(instrument, granularity, to_epoch_seconds(candle["time"]))] = candle
+        return len(self.documents) - before
+
+
+class TestSQLiteCandleUpserts(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = SQLiteDBHandler(os.path.join(self.tmpdir.name, 'instruments.db'))
+        self.db.initialize_db(
+            "CREATE TABLE instruments (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);"
+            "INSERT INTO instruments (id, name) VALUES (1, 'EUR_USD');"
+            + open(SCHEMA_HISTORICAL_DATA).read()
+        )
+
+    def tearDown(self):
+        self.db.close_connection()
+        self.tmpdir.cleanup()
+
+    def test_insert_candles_is_idempotent(self):
+        rows = [(1, 'M1', START + 60 * i, 1.1, 1.2, 1.0, 1.1, 10) for i in range(5)]
+
+        self.assertIsNone(self.db.latest_candle_timestamp(1, 'M1'))
+        self.assertEqual(self.db.insert_candles(rows), 5)
+        self.assertEqual(self.db.insert_candles(rows), 0, "Stored candles should not be inserted again.")
+        self.assertEqual(self.db.insert_candles(rows[3:] + [(1, 'M1', START + 300, 1.1, 1.2, 1.0, 1.1, 10)]), 1)
+        self.assertEqual(self.db.insert_candles([]), 0)
+
+        self.assertEqual(self.db.latest_candle_timestamp(1, 'M1'), START + 300)
+        self.assertIsNone(self.db.latest_candle_timestamp(1, 'H1'))
+
+
+class TestCandleSyncService(TestSQLiteCandleUpserts):
+    def setUp(self):
+        super().setUp()
+        self.oanda = FakeOanda(make_candles(10))
+        self.mongo = FakeMongoStore()
+        self.service = CandleSyncService(oanda_client=self.oanda, mongo_handler=self.mongo, sqlite_db=self.db)
+
+    def test_sync_fetches_only_after_high_water_mark(self):
+        self.assertEqual(self.service.sync("EUR_USD", "M1", default_days=10000), {"mongo": 10, "sqlite": 10})
+        self.assertEqual(self.service.sync("EUR_USD", "M1"), {"mongo": 0, "sqlite": 0})
+        self.assertEqual(self.oanda.starts[-1], START + 9 * 60 + 1)
+
+        self.oanda.candles = make_candles(12)
+        self.assertEqual(self.service.sync("EUR_USD", "M1"), {"mongo": 2, "sqlite": 2})
+        self.assertEqual(self.db.latest_candle_timestamp(1, 'M1'), START + 11 * 60)
+
+    def test_sync_catches_up_the_store_that_is_behind(self):
+        self.db.insert_candles([(1, 'M1', START + 60 * i, 1.1, 1.2, 1.0, 1.1, 10) for i in range(4)])
+        self.mongo.upsert_candles("EUR_USD", "M1", make_candles(8))
+
+        self.assertEqual(self.service.sync("EUR_USD", "M1"), {"mongo": 2, "sqlite": 6})
+        self.assertEqual(self.oanda.starts, [START + 3 * 60 + 1])
+
+    def test_sync_without_sqlite_instrument_syncs_mongo_only(self):
+        self.assertEqual(self.service.sync("GBP_USD", "M1", default_days=10000), {"mongo": 10})
+
+    def test_sync_all_isolates_failures(self):
+        self.mongo.latest_candle_timestamp = MagicMock(side_effect=[None, RuntimeError("down")])
+
+        results = self.service.sync_all(["EUR_USD"], ["M1", "H1"], default_days=10000)
+
+        self.assertEqual(results[("EUR_USD", "M1")], {"mongo": 10, "sqlite": 10})
+        self.assertIsNone(results[("EUR_USD", "H1")])
+
+
+class TestMongoCandleUpserts(unittest.TestCase):
+    def setUp(self):
+        self.handler = MongoDBHandler.__new__(MongoDBHandler)
+        self.handler.db = MagicMock()
+        self.collection = self.handler.db.__getitem__.return_value
+        self.collection.name = "eur_usd_m1_data"
+        self.collection.bulk_write.return_value.upserted_count = 2
+
+    def test_upsert_candles_keys_on_instrument_granularity_timestamp(self):
+        candles = make_candles(3)
+        candles[2]["complete"] = False
+
+        added = self.handler.upsert_candles("eur_usd", "m1", candles)
+
+        self.assertEqual(added, 2)
+        self.handler.db.__getitem__.assert_called_with("eur_usd_m1_data")
+        operations = self.collection.bulk_write.call_args.args[0]
+        self.assertEqual(len(operations), 2, "Incomplete candles should not be stored.")
+        self.assertEqual(operations[1], UpdateOne(
+            {"instrument": "EUR_USD", "granularity": "M1", "timestamp": START + 60},
+            {"$set": {"instrument": "EUR_USD", "granularity": "M1", "timestamp": START + 60,
+                      "time": candles[1]["time"], "mid": candles[1]["mid"], "volume": 11}},
+            upsert=True,
+        ))
+        self.assertEqual(self.collection.bulk_write.call_args.kwargs, {"ordered": False})
+
+    def test_upsert_candles_without_candles_writes_nothing(self):
+        self.assertEqual(self.handler.upsert_candles("EUR_USD", "M1", []), 0)
+        self.collection.bulk_write.assert_not_called()
+
+    def test_latest_candle_timestamp(self):
+        self.collection.find_one.return_value = {"timestamp": START}
+        self.assertEqual(self.handler.latest_candle_timestamp("EUR_USD", "M1"), START)
+
+        self.collection.find_one.return_value = None
+        self.assertIsNone(self.handler.latest_candle_timestamp("EUR_USD", "M1"))
+
+    def test_legacy_candles_are_backfilled_before_the_high_water_mark(self):
+        """
+        Documents stored with only 'time' and 'mid' get their key fields, except the ones already stored again.
+        """
+        self.collection.find_one.side_effect = [None, {"timestamp": START + 60}]
+        self.collection.find.return_value = [
+            {"_id": 1, "time": "2024-01-01 00:00:00"},
+            {"_id": 2, "time": "2024-01-01T00:01:00.000000000Z"},
+            {"_id": 3, "time": "2024-01-01T00:02:00.000000000Z"},
+        ]
+        self.collection.distinct.return_value = [START + 120]
+        self.collection.bulk_write.return_value.modified_count = 2
+
+        self.assertEqual(self.handler.latest_candle_timestamp("eur_usd", "m1"), START + 60)
+
+        operations = self.collection.bulk_write.call_args.args[0]
+        self.assertEqual(operations, [
+            UpdateOne({"_id": 1}, {"$set": {"instrument": "EUR_USD", "granularity": "M1", "timestamp": START}}),
+            UpdateOne({"_id": 2}, {"$set": {"instrument": "EUR_USD", "granularity": "M1", "timestamp": START + 60}}),
+            DeleteOne({"_id": 3}),
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,21 +1,27 @@
+import os
+import tempfile
 import unittest
 import numpy as np
 import pandas as pd
-from backend.trading.indicators.rsi import RSI
-from backend.trading.indicators.ema import EMA
-from backend.trading.indicators.macd import MACD
-from backend.trading.indicators.stoch import StochasticOscillator
-from backend.trading.indicators.sma import SMA
-from backend.trading.indicators.bollinger import BollingerBands
-from backend.trading.indicators.ma_crossover import MACrossover
-from backend.trading.indicators.adx import ADX
-from backend.trading.indicators.aroon import Aroon
-from backend.trading.indicators.cci import CCI
-from backend.trading.indicators.mfi import MFI
-from backend.trading.indicators.obv import OBV
-from backend.trading.indicators.vwap import VWAP
-from backend.trading.indicators.williams_r import WilliamsR
-from backend.trading.indicators.atr import ATR
+from backend.trading.indicators.rsi import RSI, RSIState
+from backend.trading.indicators.ema import EMA, EMAState
+from backend.trading.indicators.macd import MACD, MACDState
+from backend.trading.indicators.stoch import StochasticOscillator, StochasticOscillatorState
+from backend.trading.indicators.sma import SMA, SMAState
+from backend.trading.indicators.bollinger import BollingerBands, BollingerBandsState
+from backend.trading.indicators.ma_crossover import MACrossover, MACrossoverState
+from backend.trading.indicators.adx import ADX, ADXState
+from backend.trading.indicators.aroon import Aroon, AroonState
+from backend.trading.indicators.cci import CCI, CCIState
+from backend.trading.indicators.mfi import MFI, MFIState
+from backend.trading.indicators.obv import OBV, OBVState
+from backend.trading.indicators.vwap import VWAP, VWAPState
+from backend.trading.indicators.williams_r import WilliamsR, WilliamsRState
+from backend.trading.indicators.atr import ATR, ATRState
+from backend.data.repositories._sqlite_db import SQLiteDBHandler
+from backend.trading.indicators._kernels import HighLowExtrema, rolling_extremum
+from backend.trading.indicators._persistence import resolve_instrument_id, write_indicator_results
+from backend.trading.indicators.outputs import INDICATORS, compute_indicator, compute_indicators, output_names
 
 class TestIndicators(unittest.TestCase):
     def setUp(self):
@@ -138,6 +144,215 @@ class TestIndicators(unittest.TestCase):
         self.assertEqual(df_with_ma['fast_ma'].iloc[fast_period-1], sum(self.df['close'][:fast_period]) / fast_period)
         self.assertEqual(df_with_ma['slow_ma'].iloc[slow_period-1], sum(self.df['close'][:slow_period]) / slow_period)
 
+    def test_sma_calculate_many_matches_calculate(self):
+        close = pd.Series(np.random.default_rng(1).normal(100, 5, 500))
+        periods = [2, 5, 14, 50, 200]
+        batch = SMA.calculate_many(close, periods)
+
+        self.assertEqual(batch.shape, (len(close), len(periods)))
+        for j, period in enumerate(periods):
+            expected = SMA.calculate(pd.DataFrame({'close': close}), period=period)['sma']
+            np.testing.assert_allclose(batch[:, j], expected, rtol=1e-10, equal_nan=True)
+
+    def test_ema_calculate_many_matches_calculate(self):
+        close = pd.Series(np.random.default_rng(2).normal(100, 5, 5000))
+        periods = [1, 2, 5, 14, 50, 200]
+        batch = EMA.calculate_many(close, periods)
+
+        for j, period in enumerate(periods):
+            expected = EMA.calculate(pd.DataFrame({'close': close}), period=period)['ema']
+            np.testing.assert_allclose(batch[:, j], expected, rtol=1e-10)
+
+    def test_rsi_calculate_many_matches_calculate(self):
+        close = pd.Series(np.random.default_rng(3).normal(100, 5, 500))
+        periods = [5, 10, 14, 30]
+        batch = RSI.calculate_many(close, periods)
+
+        for j, period in enumerate(periods):
+            expected = RSI.calculate(pd.DataFrame({'close': close}), period=period)['rsi']
+            np.testing.assert_allclose(batch[:, j], expected, rtol=1e-8, equal_nan=True)
+
+    def test_atr_calculate_many_matches_calculate(self):
+        batch = ATR.calculate_many(self.df['high'], self.df['low'], self.df['close'], [3, 5])
+
+        for j, period in enumerate([3, 5]):
+            expected = ATR.calculate(self.df.copy(), period=period)['atr']
+            np.testing.assert_allclose(batch[:, j], expected, rtol=1e-10, equal_nan=True)
+
+    def random_candles(self, n_bars=300, seed=5):
+        rng = np.random.default_rng(seed)
+        close = 100 + np.cumsum(rng.normal(0, 1, n_bars))
+        spread = rng.uniform(0.1, 2, n_bars)
+        return pd.DataFrame({
+            'open': close + rng.normal(0, 0.5, n_bars),
+            'high': close + spread,
+            'low': close - spread,
+            'close': close,
+            'volume': rng.integers(100, 1000, n_bars).astype(float),
+        })
+
+    def assert_stream_matches_batch(self, state, batch_df, columns):
+        # Feed the candles one at a time and compare every output against the batch calculation
+        candles = self.random_candles()
+        streamed = [state.update(candle) for candle in candles.to_dict('records')]
+        expected = batch_df(candles.copy())
+
+        for column in columns:
+            values = [out[column] if isinstance(out, dict) else out for out in streamed]
+            np.testing.assert_allclose(values, expected[column].to_numpy(dtype=float), rtol=1e-7, atol=1e-9,
+                                       equal_nan=True, err_msg=f"{type(state).__name__} differs on {column}")
+
+    def test_streaming_states_match_batch(self):
+        cases = [
+            (SMAState(period=10), lambda df: SMA.calculate(df, period=10), ['sma']),
+            (EMAState(period=10), lambda df: EMA.calculate(df, period=10), ['ema']),
+            (RSIState(period=14), lambda df: RSI.calculate(df, period=14), ['rsi']),
+            (ATRState(period=14), lambda df: ATR.calculate(df, period=14), ['atr']),
+            (MACDState(12, 26, 9), lambda df: MACD.calculate(df, 12, 26, 9), ['macd', 'signal', 'histogram']),
+            (ADXState(period=14), lambda df: ADX.calculate(df, period=14), ['adx', 'plus_di', 'minus_di']),
+            (AroonState(period=25), lambda df: Aroon.calculate(df, period=25), ['aroon_up', 'aroon_down']),
+            (BollingerBandsState(period=20, std=2), lambda df: BollingerBands.calculate(df, period=20, std=2),
+             ['middle_20', 'upper_20', 'lower_20']),
+            (CCIState(period=14), lambda df: CCI.calculate(df, period=14), ['cci']),
+            (MFIState(period=14), lambda df: MFI.calculate(df, period=14), ['mfi']),
+            (VWAPState(), VWAP.calculate, ['vwap']),
+            (StochasticOscillatorState(period=14), lambda df: StochasticOscillator.calculate(df, period=14),
+             ['stoch', 'stoch_signal']),
+            (WilliamsRState(period=14), lambda df: WilliamsR.calculate(df, period=14), ['williams_r']),
+            (MACrossoverState(5, 20), lambda df: MACrossover.calculate(df, 5, 20),
+             ['fast_ma', 'slow_ma', 'crossover', 'crossover_signal']),
+        ]
+        for state, batch_df, columns in cases:
+            with self.subTest(indicator=type(state).__name__):
+                self.assert_stream_matches_batch(state, batch_df, columns)
+
+    def test_rolling_extremum_matches_pandas(self):
+        rng = np.random.default_rng(11)
+        # Rounded values produce ties inside windows; NaNs blank out the windows they fall in
+        values = np.round(rng.normal(0, 1, 1000), 1)
+        values[[10, 500, 501]] = np.nan
+        series = pd.Series(values)
+
+        for period in [1, 2, 7, 25, 64]:
+            highest, high_at = rolling_extremum(values, period, 'max')
+            lowest, low_at = rolling_extremum(values, period, 'min')
+            np.testing.assert_allclose(highest, series.rolling(period).max(), equal_nan=True)
+            np.testing.assert_allclose(lowest, series.rolling(period).min(), equal_nan=True)
+            np.testing.assert_allclose(high_at, series.rolling(period).apply(np.argmax, raw=True), equal_nan=True)
+            np.testing.assert_allclose(low_at, series.rolling(period).apply(np.argmin, raw=True), equal_nan=True)
+
+        self.assertTrue(np.isnan(rolling_extremum(values[:5], 10)[0]).all())
+
+    def test_high_low_extrema_shared_between_indicators(self):
+        candles = self.random_candles()
+        extrema = HighLowExtrema(candles['high'], candles['low'])
+
+        shared = Aroon.calculate(candles.copy(), period=14, extrema=extrema)
+        shared = StochasticOscillator.calculate(shared, period=14, extrema=extrema)
+        shared = WilliamsR.calculate(shared, period=14, extrema=extrema)
+
+        separate = WilliamsR.calculate(StochasticOscillator.calculate(Aroon.calculate(candles.copy(), period=14)))
+        for column in ['aroon_up', 'aroon_down', 'stoch', 'stoch_signal', 'williams_r']:
+            np.testing.assert_allclose(shared[column], separate[column], equal_nan=True)
+        self.assertEqual((list(extrema._highest), list(extrema._lowest)), ([14], [14]))
+
+        with self.assertRaises(ValueError):
+            Aroon.calculate(candles.iloc[:100].copy(), period=14, extrema=extrema)
+
+    def test_cci_mean_deviation_matches_rolling_apply(self):
+        candles = self.random_candles()
+        candles.loc[120, 'high'] = np.nan
+        result = CCI.calculate(candles.copy(), period=20)
+
+        typical_price = (candles['high'] + candles['low'] + candles['close']) / 3
+        expected = typical_price.rolling(20).apply(lambda w: np.mean(np.abs(w - w.mean())), raw=True)
+        np.testing.assert_allclose(result['mean_deviation'], expected, rtol=1e-10, equal_nan=True)
+        self.assertTrue(np.isnan(result['cci'].iloc[125]))
+
+    def test_mfi_flow_split_matches_row_rule(self):
+        candles = self.random_candles()
+        # Repeated bars have an unchanged typical price and so no flow on either side
+        candles.iloc[50] = candles.iloc[49]
+        result = MFI.calculate(candles.copy(), period=14)
+
+        typical_price = (candles['high'] + candles['low'] + candles['close']) / 3
+        flow = typical_price * candles['volume']
+        previous = typical_price.shift(1)
+        positive = [f if tp > prev else 0 for f, tp, prev in zip(flow, typical_price, previous)]
+        negative = [f if tp < prev else 0 for f, tp, prev in zip(flow, typical_price, previous)]
+        np.testing.assert_allclose(result['money_flow_positive'], positive)
+        np.testing.assert_allclose(result['money_flow_negative'], negative)
+        self.assertEqual(result['money_flow_positive'].iloc[50] + result['money_flow_negative'].iloc[50], 0)
+
+        mfr = pd.Series(positive).rolling(14).sum() / pd.Series(negative).rolling(14).sum()
+        np.testing.assert_allclose(result['mfi'], 100 - 100 / (1 + mfr), equal_nan=True)
+
+    def test_aroon_matches_rolling_apply(self):
+        candles = self.random_candles()
+        result = Aroon.calculate(candles.copy(), period=25)
+
+        expected_up = candles['high'].rolling(25).apply(lambda x: (x.argmax() + 1) / 25 * 100, raw=True)
+        expected_down = candles['low'].rolling(25).apply(lambda x: (x.argmin() + 1) / 25 * 100, raw=True)
+        np.testing.assert_allclose(result['aroon_up'], expected_up, equal_nan=True)
+        np.testing.assert_allclose(result['aroon_down'], expected_down, equal_nan=True)
+
+    @staticmethod
+    def reference_obv(close, volume):
+        # Bar-by-bar definition of OBV
+        obv = [0.0]
+        for i in range(1, len(close)):
+            if close[i] > close[i - 1]:
+                obv.append(obv[-1] + volume[i])
+            elif close[i] < close[i - 1]:
+                obv.append(obv[-1] - volume[i])
+            else:
+                obv.append(obv[-1])
+        return obv
+
+    def test_obv_matches_reference(self):
+        candles = self.random_candles(n_bars=2000)
+        # Rounding the closes produces unchanged bars as well as rises and falls
+        candles['close'] = candles['close'].round(0)
+        expected = self.reference_obv(candles['close'].tolist(), candles['volume'].tolist())
+
+        result = OBV.calculate(candles)
+
+        np.testing.assert_allclose(result['obv'], expected)
+        self.assertTrue((candles['close'].diff() == 0).any())
+
+    def test_obv_extend_matches_calculate(self):
+        candles = self.random_candles(n_bars=500)
+        partial = OBV.calculate(candles.iloc[:300].copy())
+        grown = pd.concat([partial, candles.iloc[300:]])
+
+        extended = OBV.extend(grown)
+
+        np.testing.assert_allclose(extended['obv'], OBV.calculate(candles.copy())['obv'])
+        self.assertIs(OBV.extend(extended), extended)
+
+    def test_obv_state_matches_batch(self):
+        self.assert_stream_matches_batch(OBVState(), OBV.calculate, ['obv'])
+
+    def test_obv_state_running_total(self):
+        state = OBVState()
+        values = [state.update(candle) for candle in self.df.to_dict('records')]
+        # Close rises on every bar, so OBV is the running volume after the first candle
+        self.assertEqual(values, list(self.df['volume'].cumsum() - self.df['volume'].iloc[0]))
+
+    def test_streaming_state_seeded_from_history(self):
+        candles = self.random_candles()
+        seeded = RSIState.from_history(candles.iloc[:-1], period=14)
+        latest = seeded.update(candles.iloc[-1].to_dict())
+
+        expected = RSI.calculate(candles.copy(), period=14)['rsi'].iloc[-1]
+        self.assertAlmostEqual(latest, expected, places=7)
+
+    def test_streaming_state_reads_oanda_candles(self):
+        state = SMAState(period=2)
+        state.update({'time': '2024-01-01T00:00:00Z', 'mid': {'o': '1.1', 'h': '1.2', 'l': '1.0', 'c': '1.10'}})
+        value = state.update({'time': '2024-01-01T01:00:00Z', 'mid': {'o': '1.1', 'h': '1.2', 'l': '1.0', 'c': '1.20'}})
+        self.assertAlmostEqual(value, 1.15)
+
     # def test_bop_calculation(self):
     #     df_with_bop = calculate_bop(self.df)
     #     self.assertIn('bop', df_with_bop.columns)
@@ -211,6 +426,144 @@ class TestIndicators(unittest.TestCase):
         # self.assertIn('zlema', df_with_zlema.columns)
         # self.assertEqual(len(df_with_zlema), len(self.df))
         
-        
+
+class TestIndicatorOutputs(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(8)
+        close = 100 + np.cumsum(rng.normal(0, 1, 200))
+        spread = rng.uniform(0.1, 2, 200)
+        self.df = pd.DataFrame({
+            'high': close + spread, 'low': close - spread, 'close': close,
+            'volume': rng.integers(100, 1000, 200).astype(float),
+        })
+
+    def test_compute_indicator_leaves_input_untouched(self):
+        before = self.df.copy()
+        for name in INDICATORS:
+            with self.subTest(indicator=name):
+                outputs = compute_indicator(self.df, name)
+                self.assertEqual(list(outputs.columns), output_names(name))
+                pd.testing.assert_frame_equal(self.df, before)
+
+    def test_outputs_are_namespaced_by_parameters(self):
+        outputs = compute_indicators(self.df, [('sma', {'period': 20}), ('sma', {'period': 50}),
+                                               ('macd', {}), ('bollinger', {'period': 10, 'std': 2.5})])
+
+        self.assertEqual(list(outputs.columns), [
+            'sma_20', 'sma_50', 'macd_12_26_9', 'macd_12_26_9_signal', 'macd_12_26_9_histogram',
+            'bollinger_10_2.5_middle', 'bollinger_10_2.5_upper', 'bollinger_10_2.5_lower',
+        ])
+        np.testing.assert_allclose(outputs['sma_50'], SMA.calculate(self.df.copy(), period=50)['sma'], equal_nan=True)
+        np.testing.assert_allclose(outputs['bollinger_10_2.5_upper'],
+                                   BollingerBands.calculate(self.df.copy(), period=10, std=2.5)['upper_10'], equal_nan=True)
+
+    def test_join_adds_only_the_outputs(self):
+        result = compute_indicators(self.df, [('rsi', {'period': 14}), ('aroon', {}), ('stoch', {})], join=True)
+
+        self.assertIs(result, self.df)
+        self.assertEqual(list(self.df.columns), ['high', 'low', 'close', 'volume', 'rsi_14', 'aroon_25_up',
+                                                 'aroon_25_down', 'stoch_14', 'stoch_14_signal'])
+
+    def test_insufficient_data_gives_nan_outputs(self):
+        outputs = compute_indicator(self.df.iloc[:10], 'sma', period=20)
+        self.assertTrue(outputs['sma_20'].isna().all())
+
+    def test_rejects_unknown_indicator_and_parameters(self):
+        with self.assertRaises(ValueError):
+            compute_indicator(self.df, 'unknown')
+        with self.assertRaises(TypeError):
+            compute_indicator(self.df, 'sma', window=5)
+        with self.assertRaises(KeyError):
+            compute_indicator(self.df[['close']], 'atr')
+
+
+class TestIndicatorPersistence(unittest.TestCase):
+    INDICATOR_SCHEMA = """
+    CREATE TABLE indicators (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, type TEXT NOT NULL);
+    CREATE TABLE indicator_parameters (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        indicator_id INTEGER NOT NULL,
+        parameter_name TEXT NOT NULL,
+        parameter_value REAL,
+        last_update TIMESTAMP NOT NULL,
+        UNIQUE(indicator_id, parameter_name)
+    );
+    CREATE TABLE instrument_indicator_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        instrument_id INTEGER NOT NULL,
+        indicator_id INTEGER NOT NULL,
+        parameter_id INTEGER NOT NULL,
+        parameter_name TEXT,
+        parameter_value REAL NOT NULL,
+        timestamp TEXT NOT NULL
+    );
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.instrument_db = SQLiteDBHandler(os.path.join(self.tmpdir.name, 'instruments.db'))
+        self.instrument_db.initialize_db(
+            "CREATE TABLE instruments (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);"
+            "INSERT INTO instruments (id, name) VALUES (7, 'EUR_USD');"
+        )
+        self.db = SQLiteDBHandler(os.path.join(self.tmpdir.name, 'indicators.db'))
+        self.db.initialize_db(self.INDICATOR_SCHEMA)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def stored_results(self):
+        return self.db.fetch_records_with_query(
+            "SELECT instrument_id, parameter_id, parameter_name, parameter_value "
+            "FROM instrument_indicator_results ORDER BY id"
+        )
+
+    def test_bulk_write_resolves_ids_once(self):
+        self.db.add_indicator("MACD", "trend")
+        prices = pd.DataFrame({'close': np.linspace(1.0, 2.0, 50)})
+        result = MACD.calculate(prices, short_period=3, long_period=6, signal_period=2)
+
+        rows = write_indicator_results(
+            self.db, "MACD", "EUR_USD", result, ['macd', 'signal', 'histogram'],
+            {'short_period': 3, 'long_period': 6, 'signal_period': 2}, instrument_db=self.instrument_db
+        )
+
+        stored = self.stored_results()
+        self.assertEqual(rows, 150)
+        self.assertEqual(len(stored), 150)
+        self.assertEqual({row[0] for row in stored}, {7}, "Results should carry the instrument ID.")
+        self.assertEqual(len(self.db.fetch_records("indicator_parameters")), 3, "Parameters are upserted once.")
+        np.testing.assert_allclose([row[3] for row in stored if row[2] == 'signal'], result['signal'])
+
+    def test_bulk_write_skips_warm_up_bars(self):
+        self.db.add_indicator("SMA", "trend")
+        result = SMA.calculate(pd.DataFrame({'close': np.arange(30, dtype=float)}), period=10)
+
+        rows = write_indicator_results(self.db, "SMA", 7, result, ['sma'], {'period': 10})
+
+        self.assertEqual(rows, 21)
+        np.testing.assert_allclose([row[3] for row in self.stored_results()], result['sma'].dropna())
+
+    def test_bulk_write_needs_known_instrument(self):
+        self.db.add_indicator("SMA", "trend")
+        result = SMA.calculate(pd.DataFrame({'close': np.arange(30, dtype=float)}), period=10)
+
+        rows = write_indicator_results(self.db, "SMA", "XAU_USD", result, ['sma'], {'period': 10},
+                                       instrument_db=self.instrument_db)
+
+        self.assertEqual(rows, 0)
+        self.assertEqual(self.stored_results(), [])
+
+    def test_instrument_ids_are_cached_per_database(self):
+        other_db = SQLiteDBHandler(os.path.join(self.tmpdir.name, 'other_instruments.db'))
+        other_db.initialize_db(
+            "CREATE TABLE instruments (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);"
+            "INSERT INTO instruments (id, name) VALUES (3, 'EUR_USD');"
+        )
+
+        self.assertEqual(resolve_instrument_id("EUR_USD", self.instrument_db), 7)
+        self.assertEqual(resolve_instrument_id("EUR_USD", other_db), 3)
+        self.assertEqual(resolve_instrument_id("EUR_USD", self.instrument_db), 7)
+
 if __name__ == '__main__':
     unittest.main()
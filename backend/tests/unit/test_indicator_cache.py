@@ -0,0 +1,104 @@
+# tests/unit/test_indicator_cache.py
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from backend.trading.indicators import result_cache
+from backend.trading.indicators.outputs import compute_indicator
+from backend.trading.indicators.result_cache import IndicatorCache, data_version
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(4)
+        close = 100 + np.cumsum(rng.normal(0, 1, 300))
+        spread = rng.uniform(0.1, 2, 300)
+        self.df = pd.DataFrame({
+            'high': close + spread, 'low': close - spread, 'close': close,
+            'volume': rng.integers(100, 1000, 300).astype(float),
+        }, index=pd.date_range("2024-01-01", periods=300, freq="min", tz="UTC"))
+        self.cache = IndicatorCache()
+
+    def count_calculations(self):
+        return patch.object(result_cache, 'compute_indicator', side_effect=compute_indicator)
+
+    def test_identical_requests_are_computed_once(self):
+        with self.count_calculations() as computed:
+            first = self.cache.compute_indicator(self.df, 'rsi', 'EUR_USD', 'M1', period=14)
+            second = self.cache.compute_indicator(self.df, 'rsi', 'EUR_USD', 'M1')  # default period 14
+
+        self.assertEqual(computed.call_count, 1)
+        pd.testing.assert_frame_equal(first, second)
+        pd.testing.assert_frame_equal(first, compute_indicator(self.df, 'rsi', period=14))
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_key_separates_instrument_parameters_and_data(self):
+        self.cache.compute_indicator(self.df, 'sma', 'EUR_USD', 'M1', period=20)
+        self.cache.compute_indicator(self.df, 'sma', 'GBP_USD', 'M1', period=20)
+        self.cache.compute_indicator(self.df, 'sma', 'EUR_USD', 'M1', period=30)
+
+        # A new candle changes the data version, so the stored result is not reused
+        grown = pd.concat([self.df, self.df.iloc[[-1]].set_axis([self.df.index[-1] + pd.Timedelta(minutes=1)])])
+        result = self.cache.compute_indicator(grown, 'sma', 'EUR_USD', 'M1', period=20)
+
+        self.assertEqual(self.cache.stats()['misses'], 4)
+        self.assertEqual(len(result), len(grown))
+        self.assertNotEqual(data_version(grown), data_version(self.df))
+        self.assertEqual(data_version(self.df.copy()), data_version(self.df))
+
+    def test_results_are_isolated_from_callers(self):
+        first = self.cache.compute_indicator(self.df, 'sma', period=20)
+        first['sma_20'] = 0.0
+
+        second = self.cache.compute_indicator(self.df, 'sma', period=20)
+        self.assertTrue(np.isnan(second['sma_20'].iloc[0]))
+        self.assertGreater(second['sma_20'].iloc[-1], 0)
+
+    def test_lru_eviction_bounds_memory(self):
+        entry_bytes = len(self.df) * 8
+        cache = IndicatorCache(max_bytes=2 * entry_bytes)
+
+        cache.compute_indicator(self.df, 'sma', period=10)
+        cache.compute_indicator(self.df, 'sma', period=20)
+        cache.compute_indicator(self.df, 'sma', period=10)  # refreshes period 10
+        cache.compute_indicator(self.df, 'sma', period=30)  # evicts period 20
+
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['bytes'], stats['evictions']), (2, 2 * entry_bytes, 1))
+        cache.compute_indicator(self.df, 'sma', period=10)
+        self.assertEqual(cache.stats()['hits'], 2)
+
+    def test_disk_tier_survives_a_new_cache(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            IndicatorCache(cache_dir=tmpdir).compute_indicator(self.df, 'macd', 'EUR_USD', 'M1')
+            self.assertEqual(len([f for f in os.listdir(tmpdir) if f.endswith('.npz')]), 1)
+
+            restarted = IndicatorCache(cache_dir=tmpdir)
+            with self.count_calculations() as computed:
+                result = restarted.compute_indicator(self.df, 'macd', 'EUR_USD', 'M1', short_period=np.int64(12))
+
+            computed.assert_not_called()
+            pd.testing.assert_frame_equal(result, compute_indicator(self.df, 'macd'))
+            self.assertEqual(restarted.stats()['disk_hits'], 1)
+
+            restarted.clear(disk=True)
+            self.assertEqual(os.listdir(tmpdir), [])
+
+    def test_compute_indicators_hashes_once_and_joins(self):
+        with patch.object(result_cache, 'data_version', side_effect=data_version) as hashed:
+            self.cache.compute_indicators(self.df, [('sma', {'period': 20}), ('aroon', {}), ('stoch', {})])
+            joined = self.cache.compute_indicators(self.df, [('sma', {'period': 20})], version='v1', join=True)
+
+        self.assertEqual(hashed.call_count, 1)
+        self.assertIs(joined, self.df)
+        self.assertIn('sma_20', self.df.columns)
+        self.assertEqual(self.cache.stats()['hit_rate'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
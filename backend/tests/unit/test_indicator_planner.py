@@ -0,0 +1,97 @@
+# tests/unit/test_indicator_planner.py
+import unittest
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+
+from backend.trading.indicators import planner
+from backend.trading.indicators.outputs import INDICATORS, compute_indicator
+from backend.trading.indicators.planner import IndicatorPlan, evaluate_indicators
+
+REQUESTS = [(name, {}) for name in INDICATORS] + [
+    ('sma', {'period': 26}), ('ema', {'period': 12}), ('bollinger', {'period': 14, 'std': 1.5}),
+]
+
+
+class TestIndicatorPlan(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(20)
+        close = 100 + np.cumsum(rng.normal(0, 1, 250))
+        spread = rng.uniform(0.1, 2, 250)
+        self.df = pd.DataFrame({
+            'high': close + spread, 'low': close - spread, 'close': close,
+            'volume': rng.integers(0, 5, 250).astype(float),
+        }, index=pd.date_range("2024-01-01", periods=250, freq="h", tz="UTC"))
+
+    def assert_matches_compute_indicator(self, df):
+        outputs = IndicatorPlan(REQUESTS).evaluate(df)
+        for name, parameters in REQUESTS:
+            expected = compute_indicator(df, name, **parameters)
+            pd.testing.assert_frame_equal(outputs[expected.columns], expected, check_exact=True, obj=name)
+
+    def test_every_indicator_has_a_graph(self):
+        self.assertEqual(set(planner.GRAPHS), set(INDICATORS))
+
+    def test_outputs_match_compute_indicator(self):
+        self.assert_matches_compute_indicator(self.df)
+
+        gappy = self.df.copy()
+        gappy.iloc[40, gappy.columns.get_loc('close')] = np.nan
+        self.assert_matches_compute_indicator(gappy)
+
+    def test_short_frames_leave_indicators_needing_more_bars_empty(self):
+        self.assert_matches_compute_indicator(self.df.iloc[:20])
+
+        outputs = evaluate_indicators(self.df.iloc[:5], [('atr', {}), ('vwap', {})])
+        self.assertTrue(outputs['atr_14'].isna().all())
+        self.assertFalse(outputs['vwap'].isna().any())
+
+    def test_shared_intermediates_are_evaluated_once(self):
+        requests = [('atr', {'period': 14}), ('adx', {'period': 14}), ('cci', {}), ('mfi', {}), ('vwap', {}),
+                    ('ema', {'period': 12}), ('macd', {}), ('stoch', {}), ('williams_r', {})]
+        operations = {name: MagicMock(side_effect=function) for name, function in planner.OPERATIONS.items()}
+
+        with patch.dict(planner.OPERATIONS, operations):
+            evaluate_indicators(self.df, requests)
+
+        self.assertEqual(operations['true_range'].call_count, 1)
+        self.assertEqual(operations['typical_price'].call_count, 1)
+        self.assertEqual(operations['money_flow'].call_count, 1)
+        self.assertEqual(operations['ewm'].call_count, 3)  # spans 12 and 26 of close, 9 of the MACD line
+        self.assertEqual(operations['rolling_max'].call_count, 1)
+        self.assertEqual(operations['rolling_min'].call_count, 1)
+
+    def test_explain_lists_nodes_in_evaluation_order(self):
+        plan = IndicatorPlan([('atr', {}), ('adx', {}), ('sma', {'period': 20}), ('bollinger', {})])
+        explanation = plan.explain().splitlines()
+
+        self.assertEqual(explanation[0], f"IndicatorPlan: 4 requests, {len(plan.nodes)} nodes, 9 shared")
+        self.assertEqual(len(explanation), len(plan.nodes) + 1)
+        true_range = next(line for line in explanation if 'true_range(' in line)
+        self.assertIn('true_range(n0, n1, n2)', true_range)
+        self.assertIn('shared x2', true_range)
+        middle = next(line for line in explanation if 'rolling_mean(n2, period=20)' in line)
+        self.assertIn('-> sma_20, bollinger_20_2_middle', middle)
+
+    def test_evaluate_leaves_the_frame_alone_unless_joined(self):
+        columns = list(self.df.columns)
+
+        evaluate_indicators(self.df, [('cci', {}), ('adx', {})])
+        self.assertEqual(list(self.df.columns), columns)
+
+        result = evaluate_indicators(self.df, [('cci', {})], join=True)
+        self.assertIs(result, self.df)
+        self.assertEqual(list(self.df.columns), columns + ['cci_14'])
+
+    def test_invalid_requests(self):
+        with self.assertRaises(ValueError):
+            IndicatorPlan([('unknown', {})])
+        with self.assertRaises(TypeError):
+            IndicatorPlan([('sma', {'window': 5})])
+        with self.assertRaises(KeyError):
+            evaluate_indicators(self.df[['close']], [('sma', {}), ('atr', {})])
+
+
+if __name__ == '__main__':
+    unittest.main()
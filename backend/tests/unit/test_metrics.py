@@ -0,0 +1,84 @@
+# tests/unit/test_metrics.py
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from backend.trading.optimizers import metrics as metrics_module
+from backend.trading.optimizers.metrics import equity_curves, equity_metrics, performance_metrics, signal_metrics
+from backend.trading.optimizers.signal_engine import generate_trades, position_state, trade_statistics
+
+
+class TestEquityMetrics(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(24)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, 500))
+        self.buy = rng.random((500, 40)) < 0.05
+        self.sell = rng.random((500, 40)) < 0.05
+
+    def test_position_state_runs_columns_independently(self):
+        positions = position_state(self.buy, self.sell)
+
+        self.assertEqual(positions.shape, self.buy.shape)
+        for column in range(self.buy.shape[1]):
+            np.testing.assert_array_equal(positions[:, column],
+                                          position_state(self.buy[:, column], self.sell[:, column]))
+
+    def test_equity_curve_follows_positions_bar_by_bar(self):
+        close = np.array([10.0, 11.0, 9.0, 12.0, 12.0])
+        positions = np.array([1, 1, 0, 2, 0])
+
+        np.testing.assert_allclose(equity_curves(close, positions, initial_balance=100),
+                                   [100, 101, 99, 99, 99])
+
+    def test_drawdown_sharpe_and_sortino_of_a_known_curve(self):
+        equity = np.array([100.0, 110.0, 99.0, 88.0, 121.0, 115.0])
+        positions = np.array([1, 1, 1, 1, 1, 0])
+
+        metrics = equity_metrics(equity, positions)
+        returns = np.diff(equity) / equity[:-1]
+
+        self.assertAlmostEqual(metrics['max_drawdown'], 0.2)
+        self.assertEqual(metrics['max_drawdown_duration'], 2)
+        self.assertAlmostEqual(metrics['total_return'], 0.15)
+        self.assertAlmostEqual(metrics['sharpe_ratio'], returns.mean() / returns.std())
+        self.assertAlmostEqual(metrics['sortino_ratio'],
+                               returns.mean() / np.sqrt(np.mean(np.minimum(returns, 0) ** 2)))
+        self.assertAlmostEqual(metrics['calmar_ratio'], 0.15 / 0.2)
+        self.assertAlmostEqual(metrics['exposure'], 5 / 6)
+        self.assertAlmostEqual(metrics['turnover'], 2 / 6)
+        self.assertEqual((metrics['trades'], metrics['win_rate']), (1, 1.0))
+
+        annualized = equity_metrics(equity, positions, periods_per_year=252)
+        self.assertAlmostEqual(annualized['sharpe_ratio'], metrics['sharpe_ratio'] * np.sqrt(252))
+
+    def test_drawdown_stays_finite_when_the_account_is_wiped_out(self):
+        close = np.array([100.0, 150.0, 20.0, 10.0])
+        metrics = performance_metrics(close, np.ones(4), initial_balance=60)
+
+        self.assertAlmostEqual(metrics['max_drawdown'], (110 - -30) / 110)
+        self.assertTrue(all(np.isfinite(value) for value in metrics.values()))
+        with self.assertRaises(ValueError):
+            equity_metrics(np.array([0.0, 1.0]), np.zeros(2))
+
+    def test_many_runs_in_one_call_match_single_runs_and_trade_statistics(self):
+        with patch.object(metrics_module, 'BLOCK_SIZE', 3000):  # six runs per block
+            metrics = signal_metrics(self.close, self.buy, self.sell)
+
+        positions = position_state(self.buy, self.sell)
+        from_curves = equity_metrics(equity_curves(self.close, positions), positions)
+        for name, values in from_curves.items():
+            np.testing.assert_allclose(metrics[name], values, err_msg=name)
+
+        for column in range(self.buy.shape[1]):
+            single = signal_metrics(self.close, self.buy[:, column], self.sell[:, column])
+            for name, value in single.items():
+                self.assertAlmostEqual(metrics[name][column], value, places=12, msg=name)
+
+            _, _, profits = generate_trades(self.close, self.buy[:, column], self.sell[:, column])
+            self.assertEqual(single['trades'], len(profits))
+            self.assertAlmostEqual(single['win_rate'], trade_statistics(profits)['win_rate'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,9 +1,91 @@
 import unittest
 import datetime
+import gzip
+import json
+import threading
+import time
 import pytz
-from backend.trading.brokers.oanda_client import OandaClient
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import parse_qs
+from backend.trading.brokers.oanda_client import OandaClient, candle_windows, jittered_backoff
+from backend.trading.brokers.price_stream import TickBus
 from backend.config.secrets import defs
 
+
+class StubOandaHandler(BaseHTTPRequestHandler):
+    """
+    Serves queued responses per path and records every request it receives.
+    """
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        server = self.server
+        path, _, query = self.path.partition("?")
+        with server.lock:
+            server.requests.append({"method": self.command, "path": self.path, "client": self.client_address,
+                                    "headers": dict(self.headers), "body": body})
+            route = server.routes.get(path, [])
+            if callable(route):
+                status, headers, payload = route({key: values[0] for key, values in parse_qs(query).items()})
+            else:
+                status, headers, payload = route.pop(0) if len(route) > 1 else (route[0] if route else (404, {}, {}))
+
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            data = gzip.compress(data)
+            headers = {**headers, "Content-Encoding": "gzip"}
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+class StubOandaServer:
+    """
+    Local OANDA stand-in running in a background thread.
+    routes maps a path to a list of (status, headers, payload) responses, the last of which repeats,
+    or to a function of the query parameters returning one. bytes payloads are sent as they are.
+    """
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubOandaHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.routes = {}
+        self.httpd.requests = []
+        self.httpd.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v3"
+
+    @property
+    def routes(self):
+        return self.httpd.routes
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def reset(self):
+        with self.httpd.lock:
+            self.httpd.routes.clear()
+            self.httpd.requests.clear()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
 class TestOandaClient(unittest.TestCase):
 
     @classmethod
@@ -143,5 +225,329 @@ class TestOandaClient(unittest.TestCase):
         
         self.assertIn("account", account_info, "Expected 'account' key in response")
 
+
+class TestOandaClientSession(unittest.TestCase):
+    """
+    Exercises the pooled session against a local stub server instead of the OANDA API.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubOandaServer()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+
+    def setUp(self):
+        self.server.reset()
+        self.client = OandaClient(base_url=self.server.base_url, headers={"Authorization": "Bearer test"},
+                                  account_id="101-TEST", timeout=(2, 5), backoff_factor=0)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_connections_are_reused_and_gzipped(self):
+        """
+        Consecutive calls should share one keep-alive connection and accept gzip.
+        """
+        self.server.routes["/v3/accounts/101-TEST/orders"] = [(200, {}, {"orders": [{"id": "1"}]})]
+
+        for _ in range(5):
+            orders = self.client.get_orders()
+            self.assertEqual(orders["orders"], [{"id": "1"}])
+
+        self.assertEqual(len({request["client"] for request in self.server.requests}), 1)
+        self.assertIn("gzip", self.server.requests[0]["headers"]["Accept-Encoding"])
+        self.assertEqual(self.server.requests[0]["headers"]["Authorization"], "Bearer test")
+
+    def test_retries_server_errors(self):
+        """
+        A GET that fails with 503 should be retried until it succeeds.
+        """
+        self.server.routes["/v3/accounts/101-TEST/positions"] = [
+            (503, {}, {}), (502, {}, {}), (200, {}, {"positions": [{"instrument": "EUR_USD"}]}),
+        ]
+
+        positions = self.client.get_open_positions()
+
+        self.assertEqual(positions["positions"], [{"instrument": "EUR_USD"}])
+        self.assertEqual(len(self.server.requests), 3)
+        stats = self.client.latency_stats()["positions"]
+        self.assertEqual((stats["calls"], stats["retries"], stats["errors"]), (1, 2, 0))
+
+    def test_honours_retry_after(self):
+        """
+        A 429 should wait for the server's Retry-After before retrying.
+        """
+        self.server.routes["/v3/accounts/101-TEST/summary"] = [
+            (429, {"Retry-After": "2"}, {}), (200, {}, {"account": {"balance": "100"}}),
+        ]
+
+        with patch("backend.trading.brokers.oanda_client.time.sleep") as sleep:
+            summary = self.client.get_account_summary()
+
+        self.assertEqual(summary["account"]["balance"], "100")
+        sleep.assert_called_once_with(2.0)
+
+    def test_gives_up_after_max_retries(self):
+        """
+        A persistent server error should be reported after max_retries attempts.
+        """
+        self.server.routes["/v3/accounts/101-TEST/openTrades"] = [(500, {}, {})]
+        self.client.max_retries = 2
+
+        self.assertIsNone(self.client.get_open_trades())
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(self.client.latency_stats()["open_trades"]["errors"], 1)
+
+    def test_backoff_stays_capped_after_many_failures(self):
+        """
+        A stream that reconnects forever must keep getting a capped delay instead of overflowing.
+        """
+        for _ in range(20):
+            self.assertLessEqual(jittered_backoff(5000, 0.5, 30), 30)
+
+    def test_orders_are_not_retried_on_server_errors(self):
+        """
+        A POSTed order may have been executed when the server fails, so it must not be sent twice.
+        """
+        self.server.routes["/v3/accounts/101-TEST/orders"] = [(500, {}, {}), (201, {}, {"orderFillTransaction": {}})]
+
+        self.assertIsNone(self.client.place_market_order("EUR_USD", 100))
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(json.loads(self.server.requests[0]["body"])["order"]["units"], "100")
+
+    def test_fetch_historical_data_from_stub(self):
+        """
+        Candles should come back through the session with only the completed ones kept.
+        """
+        candle = {"time": "2024-01-01T00:00:00.000000000Z", "mid": {"o": "1", "h": "1", "l": "1", "c": "1"}, "volume": 5}
+        self.server.routes["/v3/instruments/EUR_USD/candles"] = [
+            (200, {}, {"candles": [{**candle, "complete": True}, {**candle, "complete": False}]}),
+        ]
+
+        candles = self.client.fetch_historical_data("EUR_USD", "h1", count=2)
+
+        self.assertEqual(len(candles), 1)
+        self.assertIn("granularity=H1", self.server.requests[0]["path"])
+        self.assertEqual(self.client.latency_stats()["candles"]["calls"], 1)
+
+
+def stub_candles(parameters):
+    """
+    Stub candles endpoint: one complete S5 candle every 5 seconds from 'from' to 'to', both included.
+    """
+    start = datetime.datetime.strptime(parameters["from"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=pytz.UTC)
+    end = datetime.datetime.strptime(parameters["to"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=pytz.UTC)
+    count = int((end - start).total_seconds() // 5) + 1
+    if count > 5000:
+        return 400, {}, {"errorMessage": "Maximum value for 'count' exceeded"}
+    candles = [
+        {"time": (start + datetime.timedelta(seconds=5 * i)).strftime("%Y-%m-%dT%H:%M:%S.000000000Z"),
+         "mid": {"o": "1.1", "h": "1.1", "l": "1.1", "c": "1.1"}, "volume": 1, "complete": True}
+        for i in range(count)
+    ]
+    return 200, {}, {"candles": candles}
+
+
+class TestOandaClientPaginatedDownload(unittest.TestCase):
+    """
+    Date ranges larger than one response are split into chunks and stitched back together.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubOandaServer()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+
+    def setUp(self):
+        self.server.reset()
+        self.server.routes["/v3/instruments/EUR_USD/candles"] = stub_candles
+        self.client = OandaClient(base_url=self.server.base_url, headers={}, account_id="101-TEST",
+                                  backoff_factor=0, max_retries=1)
+        self.start = datetime.datetime(2024, 1, 1, tzinfo=pytz.UTC)
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_candle_windows(self):
+        """
+        Windows should cover the range back to back and never hold more than the chunk size.
+        """
+        end = self.start + datetime.timedelta(days=365)
+        windows = candle_windows("M1", self.start, end)
+
+        self.assertEqual(windows[0][0], self.start)
+        self.assertEqual(windows[-1][1], end)
+        for (_, previous_end), (next_start, _) in zip(windows, windows[1:]):
+            self.assertEqual(previous_end, next_start)
+        self.assertTrue(all((window_end - window_start).total_seconds() / 60 + 1 <= 5000
+                            for window_start, window_end in windows))
+        with self.assertRaises(ValueError):
+            candle_windows("S1", self.start, end)
+
+    def test_fetch_range_is_complete_and_unique(self):
+        """
+        A range of 17281 S5 candles needs several requests and must come back whole, sorted and de-duplicated.
+        """
+        end = self.start + datetime.timedelta(days=1)
+
+        candles = self.client.fetch_historical_data("EUR_USD", "S5", start_date=self.start, end_date=end)
+
+        times = [candle["time"] for candle in candles]
+        self.assertEqual(len(times), 24 * 720 + 1)
+        self.assertEqual(times, sorted(set(times)))
+        self.assertEqual(times[0], "2024-01-01T00:00:00.000000000Z")
+        self.assertEqual(times[-1], "2024-01-02T00:00:00.000000000Z")
+        self.assertEqual(len(self.server.requests), 4)
+
+    def test_chunks_are_streamed(self):
+        """
+        iter_historical_chunks should yield every chunk separately.
+        """
+        end = self.start + datetime.timedelta(days=1)
+
+        chunks = list(self.client.iter_historical_chunks("EUR_USD", "S5", self.start, end, max_workers=2))
+
+        self.assertEqual(len(chunks), 4)
+        self.assertTrue(all(0 < len(chunk) <= 5000 for chunk in chunks))
+
+    def test_end_date_alone_is_one_request(self):
+        """
+        Without a start date there is no range to split: the candles up to end_date come from one request.
+        """
+        end = self.start + datetime.timedelta(hours=1)
+        self.server.routes["/v3/instruments/EUR_USD/candles"] = [
+            (200, {}, {"candles": [{"time": "2024-01-01T00:00:00.000000000Z", "complete": True,
+                                    "mid": {"o": "1", "h": "1", "l": "1", "c": "1"}, "volume": 1}]}),
+        ]
+
+        candles = self.client.fetch_historical_data("EUR_USD", "S5", end_date=end, count=10)
+
+        self.assertEqual(len(candles), 1)
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertIn("to=2024-01-01T01%3A00%3A00Z", self.server.requests[0]["path"])
+        self.assertIn("count=10", self.server.requests[0]["path"])
+        self.assertNotIn("from=", self.server.requests[0]["path"])
+        with self.assertRaises(ValueError):
+            next(self.client.iter_historical_chunks("EUR_USD", "S5", None, end))
+
+    def test_failed_chunk_fails_the_range(self):
+        """
+        If a chunk cannot be downloaded the range must not come back with a silent gap.
+        """
+        second_window = candle_windows("S5", self.start, self.start + datetime.timedelta(days=1))[1][0]
+
+        def failing_second_window(parameters):
+            if parameters["from"] == second_window.strftime("%Y-%m-%dT%H:%M:%SZ"):
+                return 503, {}, {}
+            return stub_candles(parameters)
+
+        self.server.routes["/v3/instruments/EUR_USD/candles"] = failing_second_window
+
+        candles = self.client.fetch_historical_data("EUR_USD", "S5", start_date=self.start,
+                                                    end_date=self.start + datetime.timedelta(days=1))
+
+        self.assertEqual(candles, [])
+
+
+STREAM_BODY = b"\n".join([
+    b'{"type":"PRICE","time":"2024-01-01T00:00:00.1Z","bids":[{"price":"1.10000","liquidity":1000000}],'
+    b'"asks":[{"price":"1.10010","liquidity":1000000}],"tradeable":true,"instrument":"EUR_USD"}',
+    b'{"type":"HEARTBEAT","time":"2024-01-01T00:00:05.0Z"}',
+    b'{"type":"PRICE","time":"2024-01-01T00:00:06.2Z","bids":[{"price":"150.100","liquidity":1000000}],'
+    b'"asks":[{"price":"150.120","liquidity":1000000}],"tradeable":true,"instrument":"USD_JPY"}',
+]) + b"\n"
+
+
+class TestOandaClientPriceStream(unittest.TestCase):
+    """
+    stream_prices against a stub stream that ends after a few messages.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubOandaServer()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+
+    def setUp(self):
+        self.server.reset()
+        self.client = OandaClient(base_url=self.server.base_url, headers={}, account_id="101-TEST", backoff_factor=0)
+        self.path = "/v3/accounts/101-TEST/pricing/stream"
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_ticks_are_published_and_stream_reconnects(self):
+        """
+        Prices should reach their subscribers, and refused or closed streams should be re-opened.
+        """
+        self.server.routes[self.path] = [(503, {}, {}), (200, {}, STREAM_BODY)]
+        bus = TickBus()
+        eur_usd = []
+        bus.subscribe("EUR_USD", eur_usd.append)
+
+        published = self.client.stream_prices(["EUR_USD", "USD_JPY"], bus=bus, max_reconnects=2)
+
+        self.assertEqual(published, 4)
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertIn("instruments=EUR_USD%2CUSD_JPY", self.server.requests[0]["path"])
+        self.assertEqual(len(eur_usd), 2)
+        self.assertAlmostEqual(eur_usd[0].mid, 1.10005)
+        self.assertEqual(bus.latest["USD_JPY"].ask, 150.12)
+
+    def test_stop_event(self):
+        """
+        Setting the stop event should end the stream after the current line.
+        """
+        self.server.routes[self.path] = [(200, {}, STREAM_BODY)]
+        stop = threading.Event()
+        self.client.tick_bus.subscribe("*", lambda tick: stop.set())
+
+        self.assertEqual(self.client.stream_prices("EUR_USD", stop_event=stop), 1)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_malformed_lines_are_skipped(self):
+        """
+        A truncated or garbled line should be counted and skipped without ending the stream.
+        """
+        body = b'{"type":"PRICE","time":"2024-01-01T00:00:00.1Z","bids":[{"pri\nnot json\n' + STREAM_BODY
+        self.server.routes[self.path] = [(200, {}, body)]
+
+        published = self.client.stream_prices("EUR_USD", max_reconnects=0)
+
+        self.assertEqual(published, 2)
+        self.assertEqual(self.client.malformed_stream_lines, 2)
+
+    def test_stop_event_interrupts_the_backoff(self):
+        """
+        Stopping during the wait before a reconnection should not sleep out the backoff.
+        """
+        self.server.routes[self.path] = [(503, {"Retry-After": "30"}, {})]
+        stop = threading.Event()
+        threading.Timer(0.2, stop.set).start()
+
+        start = time.perf_counter()
+        self.assertEqual(self.client.stream_prices("EUR_USD", stop_event=stop), 0)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_client_errors_end_the_stream(self):
+        """
+        An authorization error will not fix itself, so the stream should not reconnect.
+        """
+        self.server.routes[self.path] = [(401, {}, {"errorMessage": "Insufficient authorization"})]
+
+        self.assertEqual(self.client.stream_prices("EUR_USD"), 0)
+        self.assertEqual(len(self.server.requests), 1)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,13 +1,23 @@
+import os
+import tempfile
+import threading
 import unittest
 import sqlite3
 import pandas as pd
 import numpy as np
+from unittest.mock import MagicMock, patch
 from logs.log_manager import LogManager
+from backend.data.repositories._sqlite_db import SQLiteDBHandler
+from backend.trading.optimizers import optimizer as optimizer_module
+from backend.trading.optimizers import parallel_sweep
 from backend.trading.optimizers.optimizer import Optimizer
 from backend.trading.optimizers.backtester import Backtester
 from backend.trading.indicators.sma import SMA
 from backend.trading.indicators.ema import EMA
 from backend.trading.indicators.rsi import RSI
+from backend.trading.indicators.result_cache import IndicatorCache
+from backend.trading.optimizers.search import EvaluationBudget, RandomSearch, SuccessiveHalving, TPESearch
+from backend.trading.optimizers.walk_forward import Window, walk_forward_windows
 
 # Configure loggers
 logger = LogManager('test_optimizer_logs').get_logger()
@@ -151,5 +161,354 @@ class TestOptimizer(unittest.TestCase):
             print(f"Optimized period found in DB: {optimized_period}")
             self.assertEqual(int(optimized_period), best_parameters['period'], "The optimized period in the DB should match the best parameters found.")
 
+    def test_parallel_sweep_matches_isolated_backtests(self):
+        """
+        Every combination in the parallel sweep should score exactly like its own fresh Backtester run.
+        """
+        self.optimizer.db_handler = MagicMock()
+        self.optimizer.db_handler.get_instrument_id.return_value = 1
+        self.optimizer.db_handler.get_indicator_id.return_value = 2
+        combinations = [{'period': period} for period in (5, 10, 15, 20, 30, 200)]
+
+        results = self.optimizer.optimize_parameters_parallel("EUR_USD", SMA.calculate, combinations, max_workers=2)
+
+        # period=200 needs more bars than the sample has and is left out
+        self.assertEqual(sorted(results['period']), [5, 10, 15, 20, 30])
+        self.assertEqual(list(results['rank']), [1, 2, 3, 4, 5])
+        self.assertTrue(results['total_return'].is_monotonic_decreasing, "Results should be ranked best first.")
+
+        for _, row in results.iterrows():
+            backtester = Backtester()
+            backtester.data = self.sample_data.copy()
+            backtester.apply_indicator(SMA.calculate, period=int(row['period']))
+            backtester.simulate_trades_vectorized("close > sma", "close < sma")
+            expected = backtester.calculate_performance()
+            self.assertAlmostEqual(row['total_return'], expected['total_return'], places=9)
+            self.assertEqual(row['trades'], len(backtester.trades))
+
+        self.assertEqual(self.optimizer.backtester.data.columns.tolist(), ['close'],
+                         "The shared backtester data must not be modified by the sweep.")
+        self.optimizer.db_handler.add_optimized_parameters.assert_called_once_with(
+            1, 2, {'period': int(results.at[0, 'period'])}
+        )
+
+
+class TestWalkForwardOptimization(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(7)
+        prices = 100 + np.cumsum(np.random.normal(0, 1, 400))
+        self.data = pd.DataFrame({'close': prices}, index=pd.date_range(start='2021-01-01', periods=400, freq='D'))
+        self.grid = [{'period': period} for period in (5, 10, 20, 40)]
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = SQLiteDBHandler(os.path.join(self.tmpdir.name, 'optimizer.db'))
+        self.db.initialize_db()
+        self.db.get_instrument_id = MagicMock(return_value=1)
+        self.db.get_indicator_id = MagicMock(return_value=2)
+
+        self.backtester = Backtester()
+        self.backtester.data = self.data.iloc[:350].copy()
+        self.optimizer = Optimizer(self.backtester)
+        self.optimizer.db_handler = self.db
+
+    def tearDown(self):
+        self.db.close_connection()
+        self.tmpdir.cleanup()
+
+    def run_walk_forward(self):
+        run = MagicMock(side_effect=optimizer_module.run_walk_forward)
+        with patch.object(optimizer_module, 'run_walk_forward', run):
+            table = self.optimizer.optimize_walk_forward("EUR_USD", SMA.calculate, self.grid, train_size=100,
+                                                         test_size=50, max_workers=2)
+        return table, run.call_args.args[1]
+
+    @staticmethod
+    def backtest(data, period, start=0):
+        backtester = Backtester()
+        backtester.data = data.copy()
+        backtester.apply_indicator(SMA.calculate, period=period)
+        backtester.data = backtester.data.iloc[start:]
+        backtester.simulate_trades_vectorized("close > sma", "close < sma")
+        return backtester.calculate_performance(), len(backtester.trades)
+
+    def test_windows_roll_forward_and_only_grow_at_the_end(self):
+        self.assertEqual(walk_forward_windows(350, 100, 50), [Window(0, 100, 150), Window(50, 150, 200),
+                                                                Window(100, 200, 250), Window(150, 250, 300),
+                                                                Window(200, 300, 350)])
+        self.assertEqual(walk_forward_windows(399, 100, 50)[:5], walk_forward_windows(350, 100, 50))
+        self.assertEqual(len(walk_forward_windows(400, 100, 50, step=25)), 11)
+        self.assertEqual(walk_forward_windows(120, 100, 50), [])
+
+    def test_each_window_is_scored_out_of_sample_with_its_training_winner(self):
+        table, evaluated = self.run_walk_forward()
+
+        self.assertEqual(len(evaluated), 5)
+        self.assertEqual(list(table['test_start']), [self.data.index[i].isoformat() for i in (100, 150, 200, 250, 300)])
+        for row, window in zip(table.itertuples(), evaluated):
+            train = self.data.iloc[window.train_start:window.train_end]
+            returns = [self.backtest(train, parameters['period'])[0]['total_return'] for parameters in self.grid]
+            self.assertEqual(row.period, self.grid[int(np.argmax(returns))]['period'])
+
+            performance, trades = self.backtest(self.data.iloc[window.train_start:window.test_end], row.period,
+                                                start=window.train_end - window.train_start)
+            self.assertAlmostEqual(row.total_return, performance['total_return'], places=9)
+            self.assertEqual(row.trades, trades)
+
+        stored = self.db.fetch_records_with_query("SELECT COUNT(*) FROM optimized_parameters")
+        self.assertEqual(stored[0][0], 5)
+        rows = self.db.fetch_records_with_query("SELECT profit_loss FROM optimization_results")
+        self.assertEqual({row[0] for row in rows}, {None}, "Per-unit returns are not an account P&L.")
+
+    def test_new_data_only_evaluates_new_windows(self):
+        first, _ = self.run_walk_forward()
+
+        _, evaluated = self.run_walk_forward()
+        self.assertEqual(evaluated, [], "Stored windows should not be evaluated again.")
+
+        self.backtester.data = self.data.copy()
+        table, evaluated = self.run_walk_forward()
+        self.assertEqual(evaluated, [Window(250, 350, 400)])
+        self.assertEqual(len(table), 6)
+        pd.testing.assert_frame_equal(table.iloc[:5], first)
+
+        self.grid = self.grid[:2]
+        _, evaluated = self.run_walk_forward()
+        self.assertEqual(len(evaluated), 6, "A different search should not reuse the stored windows.")
+
+
+class TestSearchStrategies(unittest.TestCase):
+    SPACE = {'x': range(100), 'y': range(0, 300, 2)}
+
+    @staticmethod
+    def objective(parameters, fraction=1.0):
+        # Smooth score peaking at x=37, y=120; short slices of history see a shifted, noisier picture
+        noise = 0 if fraction == 1.0 else 50 * np.sin(parameters['x'] * 7 + parameters['y'])
+        return {'total_return': -(parameters['x'] - 37) ** 2 - (parameters['y'] - 120) ** 2 / 10 + noise}
+
+    def rank_in_space(self, score):
+        return sum(self.objective({'x': x, 'y': y})['total_return'] > score
+                   for x in self.SPACE['x'] for y in self.SPACE['y'])
+
+    def test_budget_charges_each_new_run_once(self):
+        budget = EvaluationBudget(self.objective, max_evaluations=2)
+
+        self.assertEqual(budget.evaluate({'x': 37, 'y': 120}), 0)
+        self.assertEqual(budget.evaluate({'x': 37, 'y': 120}), 0)
+        budget.evaluate({'x': 1, 'y': 0}, fraction=0.5)
+        self.assertEqual((budget.runs, budget.used), (2, 1.5))
+        self.assertFalse(budget.can_afford())
+        with self.assertRaises(RuntimeError):
+            budget.evaluate({'x': 2, 'y': 0})
+
+        failing = EvaluationBudget(MagicMock(side_effect=ValueError("bad")), max_evaluations=1)
+        self.assertEqual(failing.evaluate({'x': 1}), -np.inf)
+        self.assertTrue(failing.results().empty)
+
+    def test_random_search_samples_without_repeats(self):
+        budget = RandomSearch(self.SPACE, seed=0).search(EvaluationBudget(self.objective, max_evaluations=60))
+
+        results = budget.results()
+        self.assertEqual(budget.runs, 60)
+        self.assertEqual(len(results[['x', 'y']].drop_duplicates()), 60)
+        self.assertEqual(list(results['rank']), list(range(1, 61)))
+
+        small = RandomSearch({'x': [1, 2, 3]}, seed=0).search(EvaluationBudget(self.objective, max_evaluations=60))
+        self.assertEqual(small.runs, 3, "The search should stop when the space is used up.")
+
+    def test_successive_halving_promotes_the_best_to_longer_slices(self):
+        objective = MagicMock(side_effect=self.objective)
+        budget = SuccessiveHalving(self.SPACE, eta=3, min_fraction=1 / 9, seed=0).search(
+            EvaluationBudget(objective, max_evaluations=30))
+
+        fractions = [call.args[1] for call in objective.call_args_list]
+        counts = [fractions.count(fraction) for fraction in (1 / 9, 1 / 3, 1.0)]
+        self.assertEqual(len(fractions), sum(counts))
+        self.assertEqual(counts, [counts[0], -(-counts[0] // 3), -(-counts[1] // 3)])
+        self.assertGreater(counts[0], 60, "Short slices should let the budget cover many more candidates.")
+        self.assertLessEqual(budget.used, 30 + 1e-9)
+
+        # The second rung holds the best first-rung candidates
+        first = sorted(budget.trials[:counts[0]], key=lambda trial: trial['total_return'], reverse=True)
+        promoted = {(trial['x'], trial['y']) for trial in budget.trials[counts[0]:counts[0] + counts[1]]}
+        self.assertEqual(promoted, {(trial['x'], trial['y']) for trial in first[:counts[1]]})
+
+    def test_tpe_reaches_the_optimum_region_with_few_runs(self):
+        space_size = len(self.SPACE['x']) * len(self.SPACE['y'])
+        for seed in range(3):
+            budget = TPESearch(self.SPACE, seed=seed).search(EvaluationBudget(self.objective, max_evaluations=60))
+            best = budget.results().at[0, 'total_return']
+            self.assertEqual(budget.runs, 60)
+            self.assertLess(self.rank_in_space(best), space_size * 0.001,
+                            "60 runs should land in the best 0.1% of the 15000 combinations.")
+
+    def test_optimizer_search_stores_the_best_combination(self):
+        np.random.seed(42)
+        backtester = Backtester()
+        backtester.data = pd.DataFrame({'close': np.random.normal(loc=100, scale=5, size=300)})
+        optimizer = Optimizer(backtester)
+        optimizer.db_handler = MagicMock()
+        optimizer.db_handler.get_instrument_id.return_value = 1
+        optimizer.db_handler.get_indicator_id.return_value = 2
+
+        results = optimizer.optimize_search("EUR_USD", SMA.calculate, {'period': range(5, 100)}, strategy='halving',
+                                            max_evaluations=10, seed=3)
+
+        self.assertFalse(results.empty)
+        self.assertTrue(results['total_return'].is_monotonic_decreasing)
+        expected, _ = TestWalkForwardOptimization.backtest(backtester.data, int(results.at[0, 'period']))
+        self.assertAlmostEqual(results.at[0, 'total_return'], expected['total_return'], places=9)
+        optimizer.db_handler.add_optimized_parameters.assert_called_once_with(
+            1, 2, {'period': int(results.at[0, 'period'])})
+        with self.assertRaises(ValueError):
+            optimizer.optimize_search("EUR_USD", SMA.calculate, {'period': range(5, 100)}, strategy='annealing')
+
+
+class TestOptimizerIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(19)
+        self.backtester = Backtester()
+        self.backtester.data = pd.DataFrame({'close': 100 + np.cumsum(np.random.normal(0, 1, 200))})
+        self.backtester.indicator_cache = IndicatorCache()
+        self.optimizer = Optimizer(self.backtester)
+        self.optimizer.db_handler = MagicMock()
+        self.optimizer.store_optimized_parameters = MagicMock()
+
+    def test_repeated_sweep_is_served_from_the_cache(self):
+        grid = [{'period': period} for period in (5, 10, 20, 500)]  # 500 > bars: skipped
+
+        first = self.optimizer.optimize_parameters("EUR_USD", SMA.calculate, grid)
+        after_first = self.backtester.indicator_cache.stats()
+        second = self.optimizer.optimize_parameters("EUR_USD", SMA.calculate, grid)
+        after_second = self.backtester.indicator_cache.stats()
+
+        self.assertEqual((after_first['hits'], after_first['misses']), (0, 4))
+        self.assertEqual((after_second['hits'], after_second['misses']), (4, 4))
+        self.assertEqual(first[1], second[1])
+
+        # Same best result as backtesting each period on freshly computed values
+        expected, _ = TestWalkForwardOptimization.backtest(self.backtester.data[['close']], first[1]['period'])
+        self.assertAlmostEqual(first[0]['total_return'], expected['total_return'], places=9)
+
+class TestCheckpointedOptimization(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(11)
+        prices = 100 + np.cumsum(np.random.normal(0, 1, 300))
+        self.grid = [{'period': period} for period in (5, 10, 15, 20, 30, 40, 60, 500)]  # 500 > bars: no result
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = SQLiteDBHandler(os.path.join(self.tmpdir.name, 'optimizer.db'))
+        self.db.initialize_db()
+        self.db.get_instrument_id = MagicMock(return_value=1)
+        self.db.get_indicator_id = MagicMock(return_value=2)
+
+        self.backtester = Backtester()
+        self.backtester.data = pd.DataFrame({'close': prices})
+        self.optimizer = Optimizer(self.backtester)
+        self.optimizer.db_handler = self.db
+
+    def tearDown(self):
+        self.db.close_connection()
+        self.tmpdir.cleanup()
+
+    def optimize(self, grid, run_id, cancel=None):
+        sweep = MagicMock(side_effect=optimizer_module.run_parallel_sweep)
+        with patch.object(optimizer_module, 'run_parallel_sweep', sweep):
+            results = self.optimizer.optimize_parameters_parallel("EUR_USD", SMA.calculate, grid, max_workers=1,
+                                                                  chunksize=2, run_id=run_id, cancel=cancel)
+        return results, sweep.call_args.args[3]
+
+    def test_every_evaluated_combination_is_checkpointed_in_batches(self):
+        batches = MagicMock(side_effect=self.db.add_optimization_run_results)
+        with patch.object(self.db, 'add_optimization_run_results', batches):
+            results, _ = self.optimize(self.grid, 'run-1')
+
+        self.assertEqual(batches.call_count, 4, "One write per chunk of two combinations.")
+        stored = self.db.get_optimization_run_results('run-1')
+        self.assertEqual([result['parameters'] for result in stored], self.grid)
+        self.assertIsNone(stored[-1]['trades'], "A combination without result is checkpointed as done.")
+        self.assertEqual(len(results), 7)
+        self.assertEqual(results.attrs['run_id'], 'run-1')
+        self.assertEqual(self.db.get_optimization_run('run-1')['status'], 'completed')
+
+        for result in stored[:-1]:
+            expected, trades = TestWalkForwardOptimization.backtest(self.backtester.data, result['parameters']['period'])
+            self.assertAlmostEqual(result['total_return'], expected['total_return'], places=9)
+            self.assertEqual(result['trades'], trades)
+
+    def test_resumed_run_skips_completed_combinations(self):
+        self.optimize(self.grid[:5], 'run-2')
+
+        resumed, evaluated = self.optimize(self.grid, 'run-2')
+        fresh, _ = self.optimize(self.grid, 'run-3')
+
+        self.assertEqual(evaluated, self.grid[5:])
+        pd.testing.assert_frame_equal(resumed, fresh, check_dtype=False)
+        self.assertEqual(len(self.db.get_optimization_run_results('run-2')), len(self.grid))
+
+        with self.assertRaises(ValueError):
+            self.db.get_indicator_id.return_value = 3
+            self.optimize(self.grid, 'run-2')
+
+    def test_cancelled_run_keeps_completed_work(self):
+        cancel = threading.Event()
+        cancel.set()  # Only the chunks already handed to the worker finish
+
+        partial, _ = self.optimize(self.grid, 'run-4', cancel=cancel)
+
+        stored = self.db.get_optimization_run_results('run-4')
+        self.assertLess(len(stored), len(self.grid))
+        self.assertEqual(len(partial), len([result for result in stored if result['trades'] is not None]))
+        self.assertEqual(self.db.get_optimization_run('run-4')['status'], 'cancelled')
+        self.assertEqual(self.db.fetch_records_with_query("SELECT COUNT(*) FROM optimized_parameters")[0][0], 0,
+                         "A cancelled run must not store best parameters.")
+
+        resumed, evaluated = self.optimize(self.grid, 'run-4')
+        self.assertEqual(len(evaluated), len(self.grid) - len(stored))
+        self.assertEqual(len(resumed), 7)
+        self.assertEqual(self.db.get_optimization_run('run-4')['status'], 'completed')
+
+    def test_failed_evaluations_are_retried_on_resume(self):
+        def sweep_failing_on(period):
+            def sweep(data, indicator_func, indicator_column, combinations, on_chunk=None, **kwargs):
+                results = []
+                for start in range(0, len(combinations), 2):
+                    chunk = combinations[start:start + 2]
+                    chunk_results = [
+                        parallel_sweep.FailedEvaluation("MemoryError") if parameters['period'] == period else
+                        parallel_sweep.evaluate_combination({'close': data['close'].to_numpy()}, indicator_func,
+                                                            indicator_column, parameters)
+                        for parameters in chunk
+                    ]
+                    on_chunk(chunk, chunk_results)
+                    results += chunk_results
+                return parallel_sweep.rank_results(results)
+            return MagicMock(side_effect=sweep)
+
+        with patch.object(optimizer_module, 'run_parallel_sweep', sweep_failing_on(15)):
+            first = self.optimizer.optimize_parameters_parallel("EUR_USD", SMA.calculate, self.grid, run_id='run-5')
+        stored = [result['parameters'] for result in self.db.get_optimization_run_results('run-5')]
+        self.assertNotIn({'period': 15}, stored, "A combination that raised must not be checkpointed.")
+        self.assertEqual(len(first), 6)
+
+        retry = sweep_failing_on(None)
+        with patch.object(optimizer_module, 'run_parallel_sweep', retry):
+            resumed = self.optimizer.optimize_parameters_parallel("EUR_USD", SMA.calculate, self.grid, run_id='run-5')
+        self.assertEqual(retry.call_args.args[3], [{'period': 15}])
+        self.assertEqual(len(resumed), 7)
+        rows = self.db.fetch_records_with_query("SELECT profit_loss FROM optimization_results WHERE run_id = 'run-5'")
+        self.assertEqual({row[0] for row in rows}, {None})
+
+    def test_worker_reports_failures_apart_from_missing_results(self):
+        def failing(data, period):
+            raise MemoryError("no room")
+
+        with patch.dict(parallel_sweep._worker_columns, {'close': np.arange(10.0)}):
+            failed = parallel_sweep._evaluate_chunk(failing, 'sma', [{'period': 3}])
+            missing = parallel_sweep._evaluate_chunk(SMA.calculate, 'sma', [{'period': 3}])
+
+        self.assertIsInstance(failed[0], parallel_sweep.FailedEvaluation)
+        self.assertIsNotNone(missing[0])
+        self.assertTrue(parallel_sweep.rank_results(failed).empty)
+
 if __name__ == '__main__':
     unittest.main()
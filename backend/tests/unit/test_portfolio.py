@@ -0,0 +1,116 @@
+# tests/unit/test_portfolio.py
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from backend.trading.indicators.sma import SMA
+from backend.trading.optimizers.backtester import Backtester
+from backend.trading.optimizers.portfolio import PortfolioBacktester, align_prices, quote_to_account
+
+
+def make_frame(close, index):
+    return pd.DataFrame({'close': close, 'volume': np.ones(len(close))}, index=index)
+
+
+class TestAlignPrices(unittest.TestCase):
+    def test_missing_bars_repeat_the_last_price_from_the_common_start(self):
+        index = pd.date_range("2024-01-01", periods=5, freq="h", tz="UTC")
+        frames = {
+            'EUR_USD': make_frame([1.0, 2.0, 3.0, 4.0, 5.0], index),
+            # Starts one bar later and misses the fourth bar
+            'USD_JPY': make_frame([20.0, 30.0, 50.0], index[[1, 2, 4]]),
+        }
+
+        aligned = align_prices(frames)
+
+        self.assertTrue(aligned['close'].index.equals(index[1:]))
+        self.assertEqual(list(aligned['close'].columns), ['EUR_USD', 'USD_JPY'])
+        np.testing.assert_array_equal(aligned['close']['EUR_USD'], [2.0, 3.0, 4.0, 5.0])
+        np.testing.assert_array_equal(aligned['close']['USD_JPY'], [20.0, 30.0, 30.0, 50.0])
+        np.testing.assert_array_equal(aligned['volume']['USD_JPY'], [1.0, 1.0, 0.0, 1.0])
+        self.assertNotIn('open', aligned)
+
+    def test_quote_conversion_uses_direct_inverse_and_cross_rates(self):
+        close = pd.DataFrame({'EUR_USD': [1.1, 1.2], 'USD_JPY': [100.0, 125.0], 'EUR_JPY': [110.0, 150.0]})
+
+        np.testing.assert_allclose(quote_to_account('EUR_USD', close), [1.0, 1.0])
+        np.testing.assert_allclose(quote_to_account('USD_JPY', close), [0.01, 0.008])
+        np.testing.assert_allclose(quote_to_account('EUR_JPY', close), [0.01, 0.008])
+        with self.assertRaises(ValueError):
+            quote_to_account('EUR_GBP', close)
+
+
+class TestPortfolioBacktester(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(25)
+        index = pd.date_range("2024-01-01", periods=400, freq="h", tz="UTC")
+        self.frames = {
+            'EUR_USD': make_frame(1.1 * np.exp(np.cumsum(rng.normal(0, 0.002, 400))), index),
+            'USD_JPY': make_frame(150 * np.exp(np.cumsum(rng.normal(0, 0.002, 400))), index),
+        }
+
+    def run_portfolio(self, **kwargs):
+        portfolio = PortfolioBacktester(loader=object(), **kwargs)
+        portfolio.set_data(self.frames, "H1")
+        portfolio.apply_indicator(SMA.calculate, period=20)
+        portfolio.simulate_trades_vectorized("close > sma", "close < sma")
+        return portfolio, portfolio.calculate_performance()
+
+    def test_each_instrument_trades_like_a_single_pair_backtest(self):
+        portfolio, performance = self.run_portfolio(units=1)
+
+        for instrument, frame in self.frames.items():
+            backtester = Backtester()
+            backtester.data = frame.copy()
+            backtester.apply_indicator(SMA.calculate, period=20)
+            backtester.simulate_trades_vectorized("close > sma", "close < sma")
+
+            held = portfolio.positions[instrument].to_numpy() != 0
+            entries = np.flatnonzero(held & ~np.concatenate([[False], held[:-1]]))
+            self.assertEqual(len(entries), len(backtester.positions))
+            closed = len(backtester.trades)
+            self.assertEqual(performance['instruments'].loc[instrument, 'trades'], closed)
+
+        # EUR_USD is quoted in the account currency: realized P&L per unit is the price difference
+        close = portfolio.data['close']['EUR_USD'].to_numpy()
+        pnl = portfolio.pnl['EUR_USD'].to_numpy()
+        units = portfolio.positions['EUR_USD'].to_numpy()
+        np.testing.assert_allclose(pnl[1:], units[:-1] * np.diff(close))
+
+    def test_yen_pnl_is_converted_to_the_account_currency(self):
+        portfolio, _ = self.run_portfolio()
+
+        close = portfolio.data['close']['USD_JPY'].to_numpy()
+        units = portfolio.positions['USD_JPY'].to_numpy()
+        np.testing.assert_allclose(portfolio.pnl['USD_JPY'].to_numpy()[1:], units[:-1] * np.diff(close) / close[1:])
+        np.testing.assert_allclose(portfolio.equity.to_numpy(),
+                                   10000 + np.cumsum(portfolio.pnl.to_numpy().sum(axis=1)))
+
+    def test_exposure_and_margin_follow_the_open_positions(self):
+        portfolio, performance = self.run_portfolio(units=10000, margin_rate={'EUR_USD': 0.02, 'USD_JPY': 0.04})
+
+        eur_usd = portfolio.notional['EUR_USD'].to_numpy()
+        usd_jpy = portfolio.notional['USD_JPY'].to_numpy()
+        # Long EUR_USD is short USD, long USD_JPY is long USD and short JPY
+        np.testing.assert_allclose(portfolio.exposure['EUR'], eur_usd)
+        np.testing.assert_allclose(portfolio.exposure['USD'], usd_jpy - eur_usd)
+        np.testing.assert_allclose(portfolio.exposure['JPY'], -usd_jpy)
+        np.testing.assert_allclose(usd_jpy[portfolio.positions['USD_JPY'].to_numpy() != 0], 10000)
+        np.testing.assert_allclose(portfolio.margin_used, 0.02 * eur_usd + 0.04 * usd_jpy)
+
+        self.assertAlmostEqual(performance['max_margin_used'], portfolio.margin_used.max())
+        self.assertAlmostEqual(performance['max_gross_exposure'], (eur_usd + usd_jpy).max())
+        self.assertEqual(performance['margin_call_bars'], 0)
+        self.assertEqual(performance['trades'], performance['instruments']['trades'].sum())
+
+    def test_signal_shape_must_match_the_price_matrix(self):
+        portfolio = PortfolioBacktester(loader=object())
+        portfolio.set_data(self.frames, "H1")
+
+        with self.assertRaises(ValueError):
+            portfolio.simulate_trades_vectorized(np.ones((400, 3), dtype=bool), np.zeros((400, 2), dtype=bool))
+
+
+if __name__ == '__main__':
+    unittest.main()
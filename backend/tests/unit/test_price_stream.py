@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from backend.trading.brokers.price_stream import ALL_INSTRUMENTS, Tick, TickBus, parse_price_line, replay_stream
+
+PRICE_LINE = (b'{"type":"PRICE","time":"2024-01-01T00:00:00.123456789Z",'
+              b'"bids":[{"price":"1.10000","liquidity":1000000},{"price":"1.09990","liquidity":5000000}],'
+              b'"asks":[{"price":"1.10020","liquidity":1000000}],"closeoutBid":"1.09990","closeoutAsk":"1.10030",'
+              b'"status":"tradeable","tradeable":true,"instrument":"EUR_USD"}')
+HEARTBEAT_LINE = b'{"type":"HEARTBEAT","time":"2024-01-01T00:00:05.000000000Z"}'
+
+
+class TestParsePriceLine(unittest.TestCase):
+
+    def test_price(self):
+        """
+        A PRICE message should become a Tick with the top of book.
+        """
+        tick = parse_price_line(PRICE_LINE)
+
+        self.assertEqual(tick, Tick("EUR_USD", "2024-01-01T00:00:00.123456789Z", 1.1, 1.1002, True))
+        self.assertAlmostEqual(tick.mid, 1.1001)
+        self.assertAlmostEqual(tick.spread, 0.0002)
+        self.assertEqual(parse_price_line(PRICE_LINE.decode()), tick)
+
+    def test_heartbeats_and_blank_lines_are_skipped(self):
+        self.assertIsNone(parse_price_line(HEARTBEAT_LINE))
+        self.assertIsNone(parse_price_line(HEARTBEAT_LINE.decode()))
+        self.assertIsNone(parse_price_line(b""))
+        self.assertIsNone(parse_price_line(b'{"type":"PRICE","instrument":"EUR_USD","time":"x","bids":[],"asks":[]}'))
+
+
+class TestTickBus(unittest.TestCase):
+
+    def test_routing(self):
+        """
+        Subscribers should receive the ticks of their instrument, wildcard subscribers all of them.
+        """
+        bus = TickBus()
+        eur_usd, everything = [], []
+        bus.subscribe("EUR_USD", eur_usd.append)
+        bus.subscribe(ALL_INSTRUMENTS, everything.append)
+
+        bus.publish(Tick("EUR_USD", "t1", 1.1, 1.2))
+        bus.publish(Tick("USD_JPY", "t2", 150.0, 150.1))
+
+        self.assertEqual([tick.time for tick in eur_usd], ["t1"])
+        self.assertEqual([tick.time for tick in everything], ["t1", "t2"])
+        self.assertEqual(bus.latest["USD_JPY"].time, "t2")
+        self.assertEqual(bus.published, 2)
+
+    def test_unsubscribe_and_failing_subscriber(self):
+        """
+        A failing subscriber must not stop delivery to the others, and unsubscribed callbacks get nothing.
+        """
+        bus = TickBus()
+        received = []
+
+        def broken(tick):
+            raise RuntimeError("boom")
+
+        bus.subscribe("EUR_USD", broken)
+        callback = bus.subscribe("EUR_USD", received.append)
+        bus.publish(Tick("EUR_USD", "t1", 1.1, 1.2))
+        bus.unsubscribe("EUR_USD", callback)
+        bus.publish(Tick("EUR_USD", "t2", 1.1, 1.2))
+
+        self.assertEqual([tick.time for tick in received], ["t1"])
+
+    def test_replay_stream(self):
+        """
+        A recorded stream should replay its prices in order.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "stream.jsonl")
+            with open(path, "wb") as f:
+                f.write(b"\n".join([PRICE_LINE, HEARTBEAT_LINE, PRICE_LINE]) + b"\n")
+            bus = TickBus()
+
+            self.assertEqual(replay_stream(path, bus), 2)
+            self.assertEqual(bus.published, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
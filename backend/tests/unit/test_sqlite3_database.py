@@ -1,6 +1,16 @@
+import os
+import sqlite3
+import tempfile
+import threading
 import unittest
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+from backend.data.repositories._mongo_db import MongoDBHandler
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
 from backend.logs.log_manager import LogManager
+from backend.scripts.maintenance.migrate_historical_data import migrate
+from backend.scripts.data_import.populate_table_data import PopulateTableData
+from backend.scripts.maintenance import migrate_optimization_results
 
 # Configure logging
 log_manager = LogManager('test_sqlite3_database')
@@ -83,5 +93,221 @@ class TestSQLiteDatabase(unittest.TestCase):
 
         logger.info("All assertions for BollingerBands parameters passed.")
 
+class TestSQLitePooledConnections(unittest.TestCase):
+
+    def setUp(self):
+        """Create a pooled handler on a temporary database file (WAL needs a real file)."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = SQLiteDBHandler(os.path.join(self.tmpdir.name, 'pooled.db'), pooled=True,
+                                  pragmas={'cache_size': -2000})
+        self.db.initialize_db("""
+        CREATE TABLE IF NOT EXISTS indicators (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL
+        );
+        """)
+
+    def tearDown(self):
+        self.db.close_all()
+        self.tmpdir.cleanup()
+
+    def test_connection_is_reused_and_pragmas_applied(self):
+        conn = self.db.conn
+        self.db.add_indicator("SMA", "trend")
+        self.db.get_indicator_id("SMA")
+
+        self.assertIs(self.db.conn, conn, "Pooled handler should keep its connection between calls.")
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA cache_size").fetchone()[0], -2000)
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+    def test_each_thread_gets_its_own_connection(self):
+        connections = []
+
+        def worker():
+            self.db.add_indicator("EMA", "trend")
+            connections.append(self.db.conn)
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len({id(conn) for conn in connections}), 3)
+        self.assertNotIn(self.db.conn, connections)
+        self.assertEqual(len(self.db.fetch_records("indicators")), 3)
+
+    def test_transaction_commits_once(self):
+        with self.db.transaction():
+            self.db.add_indicator("RSI", "momentum")
+            self.db.add_indicator("ATR", "volatility")
+            self.assertTrue(self.db.conn.in_transaction, "Calls inside the scope should not commit.")
+
+        self.assertFalse(self.db.conn.in_transaction)
+        self.assertEqual(len(self.db.fetch_records("indicators")), 2)
+
+    def test_transaction_rolls_back_on_error(self):
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.add_indicator("MACD", "trend")
+                raise RuntimeError("abort")
+
+        self.assertEqual(self.db.fetch_records("indicators"), [])
+
+    def test_unpooled_transaction_shares_one_connection(self):
+        db = SQLiteDBHandler(os.path.join(self.tmpdir.name, 'pooled.db'))
+        with db.transaction() as conn:
+            db.add_indicator("OBV", "volume")
+            self.assertIs(db.conn, conn, "Connection should stay open inside the scope.")
+
+        self.assertIsNone(db.conn, "Unpooled handler closes its connection after the scope.")
+        self.assertIsNotNone(self.db.get_indicator_id("OBV"))
+
+class TestHistoricalDataMigration(unittest.TestCase):
+
+    def setUp(self):
+        """Create a database with historical_data in the old rowid / TEXT timestamp layout."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'historical_data.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+        CREATE TABLE historical_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            instrument_id INTEGER NOT NULL,
+            instrument TEXT,
+            granularity TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            open REAL, high REAL, low REAL, close REAL,
+            volume INTEGER
+        );
+        CREATE INDEX idx_historical_instrument_id ON historical_data (instrument_id);
+        INSERT INTO historical_data (instrument_id, granularity, timestamp, close) VALUES
+            (1, 'D', '2024-01-02 00:00:00', 1.10),
+            (1, 'D', '2024-01-01T00:00:00.000000000Z', 1.00),
+            (1, 'D', '2024-01-02T00:00:00.000000000Z', 1.20),
+            (1, 'H1', '2024-01-01 01:00:00', 2.00),
+            (2, 'D', 'not a date', 3.00);
+        """)
+        conn.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_migration_converts_timestamps_and_clusters_rows(self):
+        self.assertEqual(migrate(self.db_path), (3, 2))
+
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("SELECT instrument_id, granularity, timestamp, close FROM historical_data").fetchall()
+        schema = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'historical_data'").fetchone()[0]
+        conn.close()
+
+        self.assertIn("WITHOUT ROWID", schema)
+        # The duplicate 2024-01-02 candle keeps the row inserted last; the unparsable row is dropped
+        self.assertEqual(rows, [
+            (1, 'D', 1704067200, 1.00),
+            (1, 'D', 1704153600, 1.20),
+            (1, 'H1', 1704070800, 2.00),
+        ])
+
+    def test_migration_is_idempotent(self):
+        migrate(self.db_path)
+        self.assertIsNone(migrate(self.db_path))
+
+class TestCandleWritersAreIdempotent(unittest.TestCase):
+
+    def setUp(self):
+        """Create historical_data in the keyed layout and a Mongo batch overlapping the stored candles."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = SQLiteDBHandler(os.path.join(self.tmpdir.name, 'historical_data.db'))
+        schema_path = os.path.join(os.path.dirname(__file__), '../../data/models/schema_historical_data.sql')
+        with open(schema_path) as f:
+            self.db.initialize_db(f.read())
+        self.candles = [
+            {'time': f'2024-01-01T0{hour}:00:00.000000000Z', 'volume': 10,
+             'mid': {'o': '1.1', 'h': '1.2', 'l': '1.0', 'c': f'1.1{hour}'}}
+            for hour in range(4)
+        ]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def stored(self):
+        return self.db.fetch_records_with_query("SELECT granularity, timestamp, close FROM historical_data")
+
+    def test_populate_sqlite_from_mongo_skips_stored_candles(self):
+        mongo = MongoDBHandler.__new__(MongoDBHandler)
+        self.db.get_instrument_id = MagicMock(return_value=1)
+
+        with patch.object(MongoDBHandler, 'read', side_effect=[self.candles[:3], self.candles, self.candles]):
+            mongo.populate_sqlite_from_mongo(self.db, 'EUR_USD', 'H1')
+            mongo.populate_sqlite_from_mongo(self.db, 'EUR_USD', 'H1')
+            mongo.populate_sqlite_from_mongo(self.db, 'EUR_USD', 'H1')
+
+        # The batch of old candles plus one new one adds the new candle; the re-run changes nothing
+        self.assertEqual(len(self.stored()), 4)
+
+    def test_populate_historical_data_to_sqlite_can_be_rerun(self):
+        populator = PopulateTableData.__new__(PopulateTableData)
+        populator.historical_data_db = self.db
+        populator.instruments_db = MagicMock(get_instrument_id=MagicMock(return_value=1))
+        populator.oanda_client = MagicMock(get_open_positions=MagicMock(return_value={'positions': [{'instrument': 'EUR_USD'}]}))
+        # M1 and M5 first get 3 candles, then an overlapping batch with one new candle, then the same batch again
+        batches = [self.candles[:3]] * 2 + [self.candles] * 4
+        populator.mongo_handler = MagicMock(read=MagicMock(side_effect=batches))
+        populator.get_latest_timestamp = MagicMock(return_value=datetime(2024, 1, 1, tzinfo=timezone.utc))
+
+        populator.populate_historical_data_to_sqlite()
+        populator.populate_historical_data_to_sqlite()
+        complete = sorted(self.stored())
+        populator.populate_historical_data_to_sqlite()
+
+        self.assertEqual(len(complete), 8)  # 4 candles for each of M1 and M5
+        self.assertEqual(sorted(self.stored()), complete)
+
+class TestOptimizationResultsMigration(unittest.TestCase):
+
+    def setUp(self):
+        """Create an optimizer database with optimization_results in the layout without run checkpoints."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, 'optimizer.db')
+        conn = sqlite3.connect(self.db_path)
+        conn.executescript("""
+        CREATE TABLE optimization_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            optimization_id INTEGER NOT NULL,
+            instrument_id INTEGER NOT NULL,
+            sharpe_ratio REAL, total_return REAL, max_drawdown REAL, win_rate REAL, profit_loss REAL,
+            total_trades INTEGER,
+            timestamp TEXT NOT NULL
+        );
+        CREATE TABLE walk_forward_windows (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            result_id INTEGER,
+            FOREIGN KEY(result_id) REFERENCES optimization_results(id) ON DELETE CASCADE
+        );
+        INSERT INTO optimization_results (id, optimization_id, instrument_id, total_return, total_trades, timestamp)
+        VALUES (7, 3, 1, 0.25, 4, '2024-01-01T00:00:00');
+        """)
+        conn.close()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_migration_adds_run_columns_and_keeps_rows(self):
+        self.assertEqual(migrate_optimization_results.migrate(self.db_path), 1)
+        self.assertIsNone(migrate_optimization_results.migrate(self.db_path))
+
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("SELECT id, optimization_id, run_id, parameters, total_return FROM optimization_results").fetchall()
+        columns = {row[1]: row[3] for row in conn.execute("PRAGMA table_info(optimization_results)")}
+        references = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'walk_forward_windows'").fetchone()[0]
+        conn.close()
+
+        self.assertEqual(rows, [(7, 3, None, None, 0.25)])
+        self.assertEqual(columns['optimization_id'], 0, "optimization_id is nullable for sweep checkpoints.")
+        self.assertIn("REFERENCES optimization_results(id)", references)
+
 if __name__ == '__main__':
     unittest.main()
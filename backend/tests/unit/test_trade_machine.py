@@ -0,0 +1,108 @@
+# tests/unit/test_trade_machine.py
+import importlib
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from backend.config.settings import variables
+from backend.trading.indicators.rsi import RSI
+
+# Trading settings normally come from the local variables.py
+SETTINGS = {
+    'TRADE_INSTRUMENTS': ['EUR_USD', 'USD_JPY'], 'STATE_MACHINE': False, 'SWITCHES': {'RSI': True, 'MACD': True},
+    'SCENARIOS': {'LONG': 'long', 'SHORT': 'short'}, 'BT_TYPE': None,
+}
+
+
+def make_candles(n, seed):
+    rng = np.random.default_rng(seed)
+    times = pd.date_range("2024-01-01", periods=n, freq="h", tz="UTC")
+    close = 1 + np.cumsum(rng.normal(0, 0.001, n))
+    return [{'time': time.isoformat(), 'complete': True, 'mid': {key: str(price) for key in 'ohlc'}}
+            for time, price in zip(times, close)]
+
+
+class FakeOanda:
+    """
+    Serves the last `count` candles up to `end` of each pair, synchronously or asynchronously.
+    """
+
+    def __init__(self, candles, end):
+        self.candles = candles
+        self.end = dict.fromkeys(candles, end)
+        self.calls = []
+
+    def candles_response(self, instrument, count):
+        self.calls.append((instrument, count))
+        end = self.end[instrument]
+        return {'candles': self.candles[instrument][max(0, end - count):end]}
+
+    def get_historical_data(self, instrument, granularity, count):
+        return self.candles_response(instrument, count)
+
+
+class FakeAsyncOanda(FakeOanda):
+    async def get_historical_data(self, instrument, granularity, count):
+        return self.candles_response(instrument, count)
+
+
+class BlockingApi:
+    def get_historical_data(self, *args):
+        raise AssertionError("run_async must not make blocking requests.")
+
+
+class TestTradeMachineAsyncCycle(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.settings = [patch.object(variables, name, value, create=True) for name, value in SETTINGS.items()]
+        for setting in cls.settings:
+            setting.start()
+        cls.module = importlib.reload(importlib.import_module('backend.trading.managers.trade_machine'))
+
+    @classmethod
+    def tearDownClass(cls):
+        for setting in cls.settings:
+            setting.stop()
+
+    def setUp(self):
+        self.candles = {'EUR_USD': make_candles(1100, seed=1), 'USD_JPY': make_candles(1100, seed=2)}
+        self.trade_machine = self.module.TradeMachine(BlockingApi())
+
+    def assert_rsi_matches_history(self, instrument, start, end):
+        close = pd.DataFrame({'close': [float(c['mid']['c']) for c in self.candles[instrument][start:end]]})
+        expected = RSI.calculate(close)['rsi'].iloc[-1]
+        self.assertAlmostEqual(self.trade_machine.indicator_states[instrument]['RSI'].value, expected, places=9)
+
+    async def test_gap_is_reseeded_through_the_async_client(self):
+        client = FakeAsyncOanda(self.candles, end=1000)
+        await self.trade_machine.run_async(client)
+
+        # EUR_USD keeps up, USD_JPY misses more candles than a refresh request returns
+        client.end = {'EUR_USD': 1003, 'USD_JPY': 1050}
+        client.calls.clear()
+        await self.trade_machine.run_async(client)
+
+        refresh = self.module.TradeMachine.REFRESH_COUNT
+        self.assertEqual(client.calls, [('EUR_USD', refresh), ('USD_JPY', refresh), ('USD_JPY', 1000)])
+        self.assert_rsi_matches_history('EUR_USD', 0, 1003)
+        # Reseeded from the last 1000 candles
+        self.assert_rsi_matches_history('USD_JPY', 50, 1050)
+        self.assertIn(self.trade_machine.states['USD_JPY'], ('green', 'yellow', 'red'))
+
+    def test_sync_cycle_reseeds_with_its_own_client(self):
+        api = FakeOanda(self.candles, end=1000)
+        self.trade_machine.oanda_api = api
+        self.trade_machine.update_indicators('EUR_USD')
+
+        api.end['EUR_USD'] = 1050
+        api.calls.clear()
+        self.trade_machine.update_indicators('EUR_USD')
+
+        self.assertEqual(api.calls, [('EUR_USD', self.module.TradeMachine.REFRESH_COUNT), ('EUR_USD', 1000)])
+        self.assert_rsi_matches_history('EUR_USD', 50, 1050)
+
+
+if __name__ == '__main__':
+    unittest.main()
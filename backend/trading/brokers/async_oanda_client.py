@@ -0,0 +1,397 @@
+import asyncio
+import datetime
+import time
+
+import aiohttp
+import pytz
+from backend.config.secrets import defs
+from backend.logs.log_manager import LogManager
+from backend.trading.brokers.oanda_client import (
+    IDEMPOTENT_METHODS, RETRY_STATUSES, EndpointLatency, build_order, candle_windows, format_candles,
+    jittered_backoff, latest_candles_parameters, retry_after_seconds,
+)
+
+# Initialize the logger
+logger = LogManager('oanda_client_logs').get_logger()
+
+# Errors a request can end with once the retries are used up
+REQUEST_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+async def gather_or_cancel(*aws):
+    """
+    asyncio.gather that cancels the remaining awaitables when one fails, instead of leaving them running
+    on the session with their results lost. The first exception is re-raised as is.
+
+    :return: List of results in the order of aws.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return []
+    try:
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        # Also reached when the caller itself is cancelled
+        for task in tasks:
+            task.cancel()
+    for task in tasks:
+        if task in done and task.exception() is not None:
+            await asyncio.gather(*pending, return_exceptions=True)
+            raise task.exception()
+    return [task.result() for task in tasks]
+
+
+class AsyncOandaClient:
+    """
+    asyncio counterpart of OandaClient for polling many instruments at once.
+
+    One aiohttp session (and its keep-alive connection pool) is shared by every call, and a semaphore caps
+    the requests in flight, so a cycle over N pairs takes about as long as the slowest request rather than
+    the sum of them.
+
+    Usage:
+        async with AsyncOandaClient() as client:
+            candles = await client.fetch_many(["EUR_USD", "GBP_USD"], "H1", count=100)
+    """
+
+    def __init__(self, environment='practice', base_url=None, headers=None, account_id=None, max_concurrency=10,
+                 connect_timeout=5, read_timeout=30, max_retries=3, backoff_factor=0.5, max_backoff=30):
+        """
+        :parameter environment: The trading environment to use ('live' or 'practice').
+        :parameter base_url: API root overriding the environment's URL (e.g. a local stub server).
+        :parameter headers: Request headers overriding defs.SECURE_HEADER.
+        :parameter account_id: Account overriding defs.ACCOUNT_ID.
+        :parameter max_concurrency: Maximum requests in flight (also the connection pool size).
+        :parameter connect_timeout: Seconds allowed to open a connection.
+        :parameter read_timeout: Seconds allowed between reads of a response.
+        :parameter max_retries: Retries on 429/5xx responses and connection errors.
+        :parameter backoff_factor: Base of the exponential backoff between retries, in seconds.
+        :parameter max_backoff: Upper bound of a single wait, including a server's Retry-After.
+        """
+        self.environment = environment
+        self.base_url = base_url or (defs.OANDA_URL_D if environment == 'practice' else defs.OANDA_URL_L)
+        self.headers = headers if headers is not None else defs.SECURE_HEADER
+        self.account_id = account_id or defs.ACCOUNT_ID
+        self.max_concurrency = max_concurrency
+        self.timeout = aiohttp.ClientTimeout(total=None, connect=connect_timeout, sock_read=read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        # Created on first use, inside the running event loop
+        self._session = None
+        self._semaphore = None
+        self._latency = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the shared session and its pooled connections.
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._semaphore = None
+
+    ## ================================================
+    ## ✅ HTTP SESSION
+    ## ================================================
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=30)
+            # aiohttp asks for gzip/deflate and decompresses by default
+            self._session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout, connector=connector)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _request(self, method, endpoint, url, **kwargs):
+        """
+        Send a request through the shared session, retrying 429/5xx responses and connection errors with
+        jittered exponential backoff (a Retry-After header takes precedence). POSTs are only retried on 429.
+
+        :parameter method: HTTP method.
+        :parameter endpoint: Name the latency counters are kept under (e.g. 'candles').
+        :parameter url: Full request URL.
+        :return: The decoded JSON body.
+        :raises aiohttp.ClientResponseError: If the final response has an error status.
+        :raises aiohttp.ClientError, asyncio.TimeoutError: If the request still fails to connect after the retries.
+        """
+        method = method.upper()
+        session = self._get_session()
+        start = time.perf_counter()
+        attempt = 0
+        failed = True
+
+        try:
+            while True:
+                try:
+                    # Hold a slot only while the request is on the wire, not while backing off
+                    async with self._semaphore:
+                        async with session.request(method, url, **kwargs) as response:
+                            if not self._should_retry(method, response.status, attempt):
+                                response.raise_for_status()
+                                payload = await response.json(content_type=None)
+                                failed = False
+                                return payload
+                            logger.warning(f"⚠️ {endpoint}: HTTP {response.status}, "
+                                           f"retrying ({attempt + 1}/{self.max_retries})")
+                            delay = retry_after_seconds(response.headers.get("Retry-After"), self.max_backoff)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    # A POST that timed out may already have been executed
+                    if attempt >= self.max_retries or method not in IDEMPOTENT_METHODS:
+                        raise
+                    logger.warning(f"⚠️ {endpoint}: {e.__class__.__name__}, retrying ({attempt + 1}/{self.max_retries})")
+                    delay = None
+                if delay is None:
+                    delay = jittered_backoff(attempt, self.backoff_factor, self.max_backoff)
+                attempt += 1
+                await asyncio.sleep(delay)
+        finally:
+            self._latency.setdefault(endpoint, EndpointLatency()).record(time.perf_counter() - start, attempt, failed)
+
+    def _should_retry(self, method, status, attempt):
+        if attempt >= self.max_retries or status not in RETRY_STATUSES:
+            return False
+        return status == 429 or method in IDEMPOTENT_METHODS
+
+    def latency_stats(self):
+        """
+        Per-endpoint request counters.
+
+        :return: Dict keyed by endpoint name with calls, retries, errors, avg_ms, max_ms and total_seconds.
+        """
+        return {endpoint: stats.as_dict() for endpoint, stats in self._latency.items()}
+
+    def reset_latency_stats(self):
+        self._latency.clear()
+
+    ## ================================================
+    ## ✅ ACCOUNT FUNCTIONS
+    ## ================================================
+
+    async def get_account_summary(self):
+        """
+        Retrieves account details including balance, margin, and open trades.
+        :return: A dictionary containing account summary.
+        """
+        url = f'{self.base_url}/accounts/{self.account_id}/summary'
+        try:
+            return await self._request('GET', 'account_summary', url)
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Failed to retrieve account summary: {e}")
+            return {}
+
+    async def get_account(self):
+        """
+        Retrieves full account details from OANDA.
+
+        :return: A dictionary containing account details.
+        :raises Exception: If request fails (e.g., invalid account).
+        """
+        url = f'{self.base_url}/accounts/{self.account_id}'
+        try:
+            return await self._request('GET', 'account', url)
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Failed to retrieve account details: {e}")
+            raise Exception(f"Invalid account: {self.account_id}") from e
+
+    async def get_orders(self):
+        """
+        Retrieves a list of all open and pending orders.
+        :return: A dictionary containing open orders.
+        """
+        url = f"{self.base_url}/accounts/{self.account_id}/orders"
+        try:
+            orders = await self._request('GET', 'orders', url)
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Failed to retrieve orders: {e}")
+            return {"orders": []}
+        orders.setdefault("orders", [])
+        return orders
+
+    async def get_account_transactions(self, last_trans_id=None):
+        """
+        Retrieves a list of recent account transactions.
+        :param last_trans_id: If provided, fetches transactions since that ID.
+        :return: A dictionary containing transactions.
+        """
+        url = f"{self.base_url}/accounts/{self.account_id}/transactions"
+        parameters = {"sinceTransactionID": last_trans_id} if last_trans_id else None
+        try:
+            return await self._request('GET', 'transactions', url, params=parameters)
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Failed to retrieve transactions: {e}")
+            return None
+
+    ## ================================================
+    ## ✅ HISTORICAL MARKET DATA FUNCTIONS
+    ## ================================================
+
+    async def get_historical_data(self, instrument, granularity="H1", count=500):
+        """
+        Retrieves the latest candles as OANDA returns them, including the incomplete current candle.
+
+        :return: The response dictionary with a 'candles' list ({'candles': []} on failure).
+        """
+        url = f'{self.base_url}/instruments/{instrument}/candles'
+        try:
+            return await self._request('GET', 'candles', url, params={"granularity": granularity.upper(), "count": count})
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Error fetching {instrument} data: {e}")
+            return {"candles": []}
+
+    async def fetch_historical_data(self, instrument, granularity, start_date=None, end_date=None, count=None):
+        """
+        Retrieves completed candles, like OandaClient.fetch_historical_data. A date range is split into
+        5000-candle requests that run concurrently (within max_concurrency) and are stitched back together.
+
+        :return: A list of candles sorted by time without duplicates ([] on failure).
+        """
+        url = f'{self.base_url}/instruments/{instrument}/candles'
+        granularity = granularity.upper()
+        try:
+            if not start_date:
+                parameters = latest_candles_parameters(granularity, end_date, count)
+                return format_candles(await self._request('GET', 'candles', url, params=parameters))
+
+            end_date = end_date or datetime.datetime.now(pytz.UTC)
+            pages = await gather_or_cancel(*(
+                self._request('GET', 'candles', url, params={
+                    "granularity": granularity,
+                    "from": window_start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "to": window_end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                })
+                for window_start, window_end in candle_windows(granularity, start_date, end_date)
+            ))
+        except (*REQUEST_ERRORS, ValueError) as e:
+            logger.error(f"❌ Error fetching {instrument} data: {e}")
+            return []
+
+        candles_by_time = {candle["time"]: candle for page in pages for candle in format_candles(page)}
+        return [candles_by_time[time_key] for time_key in sorted(candles_by_time)]
+
+    async def fetch_many(self, instruments, granularity="H1", count=500):
+        """
+        Fetch the latest completed candles of several instruments concurrently.
+
+        :return: Dict of instrument -> list of candles.
+        """
+        results = await gather_or_cancel(*(
+            self.fetch_historical_data(instrument, granularity, count=count) for instrument in instruments
+        ))
+        return dict(zip(instruments, results))
+
+    ## ================================================
+    ## ✅ PRICING
+    ## ================================================
+
+    async def get_pricing(self, instruments):
+        """
+        Retrieves current bid/ask prices.
+
+        :param instruments: A list or comma-separated string of instrument names.
+        :return: A dictionary with a 'prices' list.
+        """
+        if not isinstance(instruments, str):
+            instruments = ",".join(instruments)
+        url = f"{self.base_url}/accounts/{self.account_id}/pricing"
+        try:
+            return await self._request('GET', 'pricing', url, params={"instruments": instruments})
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Failed to retrieve prices: {e}")
+            return {"prices": []}
+
+    ## ================================================
+    ## ✅ MARKET ORDER & TRADE MANAGEMENT FUNCTIONS
+    ## ================================================
+
+    async def place_order(self, instrument, units, stop_loss=None, take_profit=None):
+        """
+        Alias for `place_market_order()`.
+        """
+        return await self.place_market_order(instrument, units, stop_loss, take_profit)
+
+    async def place_limit_order(self, instrument, units, price, stop_loss=None, take_profit=None):
+        """
+        Places a limit order (Good 'Til Canceled) for an instrument at a specific price.
+
+        :return: A dictionary with the trade execution response, or None on failure.
+        """
+        url = f"{self.base_url}/accounts/{self.account_id}/orders"
+        order_data = build_order(instrument, units, "LIMIT", "GTC", price, stop_loss, take_profit)
+        try:
+            return await self._request('POST', 'orders', url, json=order_data)
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Failed to place limit order: {e}")
+            return None
+
+    async def place_market_order(self, instrument, units, stop_loss=None, take_profit=None):
+        """
+        Places a market order (Fill-or-Kill) to buy or sell an instrument.
+
+        :return: A dictionary with the trade execution response, or None on failure.
+        """
+        url = f"{self.base_url}/accounts/{self.account_id}/orders"
+        order_data = build_order(instrument, units, "MARKET", "FOK", stop_loss=stop_loss, take_profit=take_profit)
+        try:
+            return await self._request('POST', 'orders', url, json=order_data)
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Failed to place market order: {e}")
+            return None
+
+    async def close_trade(self, trade_id):
+        """
+        Closes an open trade by its ID.
+
+        :return: The response from OANDA, or None on failure.
+        """
+        url = f"{self.base_url}/accounts/{self.account_id}/trades/{trade_id}/close"
+        try:
+            return await self._request('PUT', 'close_trade', url)
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Failed to close trade {trade_id}: {e}")
+            return None
+
+    ## ================================================
+    ## ✅ POSITION & ORDER MONITORING FUNCTIONS
+    ## ================================================
+
+    async def get_positions(self):
+        """
+        Alias for `get_open_positions`.
+        """
+        return await self.get_open_positions()
+
+    async def get_open_positions(self):
+        """
+        Retrieves all open positions.
+
+        :return: A dictionary with a 'positions' list.
+        """
+        url = f"{self.base_url}/accounts/{self.account_id}/positions"
+        try:
+            positions = await self._request('GET', 'positions', url)
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Failed to retrieve open positions: {e}")
+            return {"positions": []}
+        positions.setdefault("positions", [])
+        return positions
+
+    async def get_open_trades(self):
+        """
+        Retrieves all open trades.
+
+        :return: The response dictionary, or None on failure.
+        """
+        url = f"{self.base_url}/accounts/{self.account_id}/openTrades"
+        try:
+            return await self._request('GET', 'open_trades', url)
+        except REQUEST_ERRORS as e:
+            logger.error(f"❌ Failed to retrieve open trades: {e}")
+            return None
@@ -1,23 +1,312 @@
-import requests
 import datetime
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+
 import pytz
+import requests
+from requests.adapters import HTTPAdapter
 from backend.config.secrets import defs
+from backend.data.utils.utils import GRANULARITY_SECONDS
 from backend.logs.log_manager import LogManager
+from backend.trading.brokers.price_stream import TickBus, parse_price_line
 
 # Initialize the logger
 logger = LogManager('oanda_client_logs').get_logger()
 
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Methods that can be repeated safely after a server error. Orders are POSTed and only retried on 429,
+# where OANDA has rejected the request before acting on it.
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# OANDA rejects candle requests for more than 5000 candles
+MAX_CANDLES_PER_REQUEST = 5000
+
+
+def candle_windows(granularity, start_date, end_date, chunk_size=MAX_CANDLES_PER_REQUEST):
+    """
+    Split a date range into consecutive windows holding at most chunk_size candles each.
+
+    :param granularity: OANDA granularity (e.g. 'M1').
+    :param start_date: Start of the range (datetime object, UTC-aware).
+    :param end_date: End of the range (datetime object, UTC-aware).
+    :param chunk_size: Maximum candles per window.
+    :return: List of (window_start, window_end) UTC datetimes.
+    :raises ValueError: If the granularity is unknown.
+    """
+    seconds = GRANULARITY_SECONDS.get(granularity.upper())
+    if seconds is None:
+        raise ValueError(f"Unknown granularity: {granularity}")
+
+    start_date = start_date.astimezone(pytz.UTC).replace(microsecond=0)
+    end_date = end_date.astimezone(pytz.UTC).replace(microsecond=0)
+    # Both ends of a window may hold a candle, so a window spans chunk_size - 1 candle lengths;
+    # the candle on a shared boundary is fetched twice and de-duplicated by the caller
+    step = datetime.timedelta(seconds=seconds * max(1, chunk_size - 1))
+
+    windows = []
+    window_start = start_date
+    while window_start < end_date:
+        window_end = min(window_start + step, end_date)
+        windows.append((window_start, window_end))
+        window_start = window_end
+    return windows
+
+
+def latest_candles_parameters(granularity, end_date=None, count=None):
+    """
+    Parameters of one candles request without a start date: the latest `count` candles, or the `count`
+    candles up to end_date (OANDA returns 500 if count is omitted).
+
+    :param end_date: End of the range (datetime object, UTC-aware), or None for the latest candles.
+    :return: Query parameters dict.
+    """
+    parameters = {"granularity": granularity.upper()}
+    if end_date:
+        parameters["to"] = end_date.astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+    if count:
+        parameters["count"] = count
+    return parameters
+
+
+# 2 ** 32 already exceeds any sensible max_backoff; larger exponents overflow the float multiply
+_MAX_BACKOFF_EXPONENT = 32
+
+
+def jittered_backoff(attempt, backoff_factor, max_backoff):
+    """
+    Seconds to wait before retry number attempt + 1.
+    "Full jitter": a random wait up to the exponential bound spreads out clients that failed together.
+    The exponent is clamped so a stream that retries forever never overflows the float multiply.
+    """
+    return random.uniform(0, min(max_backoff, backoff_factor * 2 ** min(attempt, _MAX_BACKOFF_EXPONENT)))
+
+
+def retry_after_seconds(value, max_backoff):
+    """
+    Seconds to wait according to a Retry-After header value (delta-seconds or HTTP date).
+
+    :return: The wait capped at max_backoff, or None if the header is missing or unreadable.
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        seconds = (retry_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds()
+    return min(max_backoff, max(0.0, seconds))
+
+
+def format_candles(data):
+    """
+    Keep the completed candles of a candles response as dicts with 'time', 'mid' and 'volume'.
+    """
+    if 'candles' not in data:
+        logger.warning(f"⚠️ No candles found in response: {data}")
+        return []
+
+    # Extract 'time' from each candle
+    return [
+        {
+            "time": candle["time"],  # ✅ Ensure 'time' exists
+            "mid": candle["mid"],    # ✅ Keep the OHLC data
+            "volume": candle.get("volume", 0)  # ✅ Handle missing 'volume' field
+        }
+        for candle in data["candles"] if candle["complete"]  # ✅ Only take completed candles
+    ]
+
+
+def build_order(instrument, units, order_type, time_in_force, price=None, stop_loss=None, take_profit=None):
+    """
+    Request body of an order.
+
+    :param order_type: 'MARKET' or 'LIMIT'.
+    :param time_in_force: e.g. 'FOK' (Fill-or-Kill) or 'GTC' (Good 'Til Canceled).
+    :return: The order dictionary to POST.
+    """
+    order = {"instrument": instrument, "units": str(units), "type": order_type, "timeInForce": time_in_force}
+    if price is not None:
+        order["price"] = str(price)
+
+    # Add stop loss and take profit if provided
+    if stop_loss:
+        order["stopLossOnFill"] = {"price": str(stop_loss)}
+    if take_profit:
+        order["takeProfitOnFill"] = {"price": str(take_profit)}
+    return {"order": order}
+
+
+class EndpointLatency:
+    """
+    Request counters for one endpoint: calls, retries, errors and wall-clock latency (including retries).
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds, retries, error):
+        self.calls += 1
+        self.retries += retries
+        self.errors += int(error)
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "errors": self.errors,
+            "avg_ms": self.total_seconds / self.calls * 1000 if self.calls else 0.0,
+            "max_ms": self.max_seconds * 1000,
+            "total_seconds": self.total_seconds,
+        }
+
+
 class OandaClient:
-    def __init__(self, environment='practice'):
+    # (connect, read) timeouts in seconds
+    DEFAULT_TIMEOUT = (5, 30)
+
+    def __init__(self, environment='practice', base_url=None, headers=None, account_id=None,
+                 timeout=DEFAULT_TIMEOUT, max_retries=3, backoff_factor=0.5, max_backoff=30, pool_maxsize=10,
+                 stream_url=None):
         """
         Initializes the OandaClient with the provided environment.
 
+        All requests go through one requests.Session, so connections to the OANDA host are kept alive
+        and reused instead of doing a TCP+TLS handshake per call.
+
         :parameter environment: The trading environment to use ('live' or 'practice').
+        :parameter base_url: API root overriding the environment's URL (e.g. a local stub server).
+        :parameter headers: Request headers overriding defs.SECURE_HEADER.
+        :parameter account_id: Account overriding defs.ACCOUNT_ID.
+        :parameter timeout: Seconds, or a (connect, read) tuple, applied to every request.
+        :parameter max_retries: Retries on 429/5xx responses and connection errors.
+        :parameter backoff_factor: Base of the exponential backoff between retries, in seconds.
+        :parameter max_backoff: Upper bound of a single wait, including a server's Retry-After.
+        :parameter pool_maxsize: Connections kept open per host.
+        :parameter stream_url: Streaming API root. Defaults to the stream host matching base_url.
         """
         self.environment = environment
-        self.base_url = defs.OANDA_URL_D if environment == 'practice' else defs.OANDA_URL_L
-        self.headers = defs.SECURE_HEADER
-        self.account_id = defs.ACCOUNT_ID
+        self.base_url = base_url or (defs.OANDA_URL_D if environment == 'practice' else defs.OANDA_URL_L)
+        # Streaming endpoints live on stream-fx*.oanda.com instead of api-fx*.oanda.com
+        self.stream_url = stream_url or self.base_url.replace("://api-", "://stream-")
+        self.headers = headers if headers is not None else defs.SECURE_HEADER
+        self.account_id = account_id or defs.ACCOUNT_ID
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+        # Retries are handled in _request so Retry-After, jitter and the latency counters are in one place
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._latency = {}
+        self._latency_lock = threading.Lock()
+        # Ticks from stream_prices are published here unless another bus is given
+        self.tick_bus = TickBus()
+        # Stream lines that could not be parsed and were skipped
+        self.malformed_stream_lines = 0
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    ## ================================================
+    ## ✅ HTTP SESSION
+    ## ================================================
+
+    def _request(self, method, endpoint, url, **kwargs):
+        """
+        Send a request through the pooled session, retrying 429/5xx responses and connection errors
+        with jittered exponential backoff. A Retry-After header from the server takes precedence.
+
+        :parameter method: HTTP method.
+        :parameter endpoint: Name the latency counters are kept under (e.g. 'candles').
+        :parameter url: Full request URL.
+        :return: The final response. Its status is not checked; callers use raise_for_status().
+        :raises requests.exceptions.RequestException: If the request still fails to connect after the retries.
+        """
+        method = method.upper()
+        kwargs.setdefault("headers", self.headers)
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        attempt = 0
+        response = None
+
+        try:
+            while True:
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    # A POST that timed out may already have been executed
+                    if attempt >= self.max_retries or method not in IDEMPOTENT_METHODS:
+                        raise
+                    logger.warning(f"⚠️ {endpoint}: {e.__class__.__name__}, retrying ({attempt + 1}/{self.max_retries})")
+                    delay = self._backoff(attempt)
+                else:
+                    if not self._should_retry(method, response, attempt):
+                        return response
+                    logger.warning(f"⚠️ {endpoint}: HTTP {response.status_code}, retrying ({attempt + 1}/{self.max_retries})")
+                    delay = self._retry_after(response)
+                    if delay is None:
+                        delay = self._backoff(attempt)
+                    response.close()
+                attempt += 1
+                time.sleep(delay)
+        finally:
+            failed = response is None or response.status_code >= 400
+            self._record(endpoint, time.perf_counter() - start, attempt, failed)
+
+    def _should_retry(self, method, response, attempt):
+        if attempt >= self.max_retries or response.status_code not in RETRY_STATUSES:
+            return False
+        return response.status_code == 429 or method in IDEMPOTENT_METHODS
+
+    def _backoff(self, attempt):
+        return jittered_backoff(attempt, self.backoff_factor, self.max_backoff)
+
+    def _retry_after(self, response):
+        return retry_after_seconds(response.headers.get("Retry-After"), self.max_backoff)
+
+    def _record(self, endpoint, seconds, retries, error):
+        with self._latency_lock:
+            self._latency.setdefault(endpoint, EndpointLatency()).record(seconds, retries, error)
+
+    def latency_stats(self):
+        """
+        Per-endpoint request counters.
+
+        :return: Dict keyed by endpoint name with calls, retries, errors, avg_ms, max_ms and total_seconds.
+        """
+        with self._latency_lock:
+            return {endpoint: stats.as_dict() for endpoint, stats in self._latency.items()}
+
+    def reset_latency_stats(self):
+        with self._latency_lock:
+            self._latency.clear()
 
     ## ================================================
     ## ✅ ACCOUNT FUNCTIONS
@@ -30,7 +319,7 @@ class OandaClient:
         """
         url = f'{self.base_url}/accounts/{self.account_id}/summary'
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request('GET', 'account_summary', url)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -46,7 +335,7 @@ class OandaClient:
         """
         url = f'{self.base_url}/accounts/{self.account_id}'
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request('GET', 'account', url)
             if response.status_code != 200:
                 raise Exception(f"Invalid account: {self.account_id} - {response.status_code} {response.text}")
             response.raise_for_status()
@@ -66,7 +355,7 @@ class OandaClient:
         """
         url = f"{self.base_url}/accounts/{self.account_id}/orders"
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request('GET', 'orders', url)
             response.raise_for_status()
             orders = response.json()
             
@@ -90,7 +379,7 @@ class OandaClient:
             url += f"?sinceTransactionID={last_trans_id}"
 
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request('GET', 'transactions', url)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -101,89 +390,117 @@ class OandaClient:
     ## ✅ HISTORICAL MARKET DATA FUNCTIONS
     ## ================================================
 
-    import requests
-import datetime
-import pytz
-from backend.config.secrets import defs
-from backend.logs.log_manager import LogManager
-
-# Initialize the logger
-logger = LogManager('oanda_client_logs').get_logger()
-
-class OandaClient:
-    def __init__(self, environment='practice'):
-        """
-        Initializes the OandaClient with the provided environment.
-
-        :parameter environment: The trading environment to use ('live' or 'practice').
-        """
-        self.environment = environment
-        self.base_url = defs.OANDA_URL_D if environment == 'practice' else defs.OANDA_URL_L
-        self.headers = defs.SECURE_HEADER
-        self.account_id = defs.ACCOUNT_ID
-
-    def fetch_historical_data(self, instrument, granularity, start_date=None, end_date=None, count=None):
+    def fetch_historical_data(self, instrument, granularity, start_date=None, end_date=None, count=None,
+                              max_workers=4):
         # sourcery skip: remove-unreachable-code
         """
         Retrieves historical candle data.
 
+        A start_date/end_date range is split into requests of at most MAX_CANDLES_PER_REQUEST candles,
+        which are downloaded concurrently and stitched back together, so long ranges are not truncated.
+
         :param instrument: The instrument to retrieve data for (e.g., 'EUR_USD').
         :param granularity: The granularity of the candle data (e.g., 'M1', 'D', 'H1').
         :param start_date: The starting date for historical data (datetime object, UTC-aware).
-        :param end_date: The end date for historical data (datetime object, UTC-aware).
-        :param count: The number of candles to retrieve (default: None).
-        :return: A list of historical candles.
+        :param end_date: The end date for historical data (datetime object, UTC-aware). Defaults to now
+                         when only start_date is given; without start_date, the candles up to end_date.
+        :param count: The number of candles to retrieve when no start_date is given (default: None).
+        :param max_workers: Concurrent requests used for a date range.
+        :return: A list of historical candles, sorted by time without duplicates.
         """
         logger.info(f"📊 Fetching {instrument} data from OANDA ({granularity})...")
 
-        # Convert dates to UTC format required by OANDA API
-        parameters = {"granularity": granularity.upper()}
+        if not start_date:
+            # Without a start there is no range to split: one request for the latest candles, or those up to end_date
+            try:
+                candles = self._fetch_candle_page(instrument, latest_candles_parameters(granularity, end_date, count))
+            except requests.exceptions.RequestException as e:
+                logger.error(f"❌ Error fetching {instrument} data: {e}")
+                return []
+            logger.info(f"✅ Retrieved {len(candles)} candles for {instrument}")
+            return candles
 
-        if start_date:
-            start_date = start_date.astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
-            parameters["from"] = start_date
+        # Candles are keyed by time so overlapping chunk boundaries do not duplicate them
+        candles_by_time = {}
+        try:
+            for chunk in self.iter_historical_chunks(instrument, granularity, start_date, end_date, max_workers):
+                candles_by_time.update((candle["time"], candle) for candle in chunk)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            # A gap in the middle of the range would go unnoticed downstream, so fail as a whole
+            logger.error(f"❌ Error fetching {instrument} data: {e}")
+            return []
 
-        if end_date:
-            end_date = end_date.astimezone(pytz.UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
-            parameters["to"] = end_date
+        formatted_data = [candles_by_time[time_key] for time_key in sorted(candles_by_time)]
+        logger.info(f"✅ Retrieved {len(formatted_data)} candles for {instrument}")
+        return formatted_data
 
-        # Use count only if start_date and end_date are not provided
-        if not start_date and not end_date and count:
-            parameters["count"] = count
+    def iter_historical_chunks(self, instrument, granularity, start_date, end_date=None, max_workers=4,
+                               chunk_size=MAX_CANDLES_PER_REQUEST):
+        """
+        Download a date range as count-bounded chunks on a bounded thread pool, yielding each chunk's
+        completed candles as soon as it arrives. Chunks arrive in completion order, not time order.
+
+        :param start_date: Start of the range (datetime object, UTC-aware).
+        :param end_date: End of the range (datetime object, UTC-aware). Defaults to now.
+        :param max_workers: Maximum number of requests in flight.
+        :param chunk_size: Maximum candles per request.
+        :return: Generator of candle lists.
+        :raises requests.exceptions.RequestException: If a chunk still fails after the session's retries.
+        :raises ValueError: If start_date is missing.
+        """
+        if start_date is None:
+            raise ValueError("A start_date is required to download a date range.")
+        end_date = end_date or datetime.datetime.now(pytz.UTC)
+        windows = candle_windows(granularity, start_date, end_date, chunk_size)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(windows)))) as executor:
+            futures = [
+                executor.submit(self._fetch_candle_page, instrument, {
+                    "granularity": granularity.upper(),
+                    "from": window_start.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "to": window_end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                })
+                for window_start, window_end in windows
+            ]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                # Stop queued chunks if the caller stops early or a chunk failed
+                for future in futures:
+                    future.cancel()
+
+        logger.info(f"📦 Downloaded {len(windows)} chunk(s) of {instrument} {granularity.upper()} candles.")
+
+    def _fetch_candle_page(self, instrument, parameters):
+        """
+        One candles request.
 
+        :return: The completed candles as dicts with 'time', 'mid' and 'volume'.
+        :raises requests.exceptions.RequestException: If the request fails.
+        """
         url = f'{self.base_url}/instruments/{instrument}/candles'
+        response = self._request('GET', 'candles', url, params=parameters)
+        response.raise_for_status()
+        return format_candles(response.json())
+
+    def get_historical_data(self, instrument, granularity="H1", count=500):
+        """
+        Retrieves the latest candles as OANDA returns them, including the incomplete current candle.
 
+        :param instrument: The instrument to retrieve data for (e.g., 'EUR_USD').
+        :param granularity: The granularity of the candle data (e.g., 'M1', 'D', 'H1').
+        :param count: The number of candles to retrieve.
+        :return: The response dictionary with a 'candles' list ({'candles': []} on failure).
+        """
+        url = f'{self.base_url}/instruments/{instrument}/candles'
         try:
-            response = requests.get(url, headers=self.headers, params=parameters)
+            response = self._request('GET', 'candles', url, params={"granularity": granularity.upper(), "count": count})
             response.raise_for_status()
-            data = response.json()
-            
-            # Debug: Print raw API response
-            print("RAW RESPONSE:", data)  # Debugging
-
-            if 'candles' in data:
-                # Extract 'time' from each candle
-                formatted_data = [
-                    {
-                        "time": candle["time"],  # ✅ Ensure 'time' exists
-                        "mid": candle["mid"],    # ✅ Keep the OHLC data
-                        "volume": candle.get("volume", 0)  # ✅ Handle missing 'volume' field
-                    }
-                    for candle in data["candles"] if candle["complete"]  # ✅ Only take completed candles
-                ]
-                
-                # Debug: Print formatted data
-                print("FORMATTED DATA:", formatted_data[:5])  # Debugging, show first 5 entries
-
-                logger.info(f"✅ Retrieved {len(formatted_data)} candles for {instrument}")
-                return formatted_data
-            else:
-                logger.warning(f"⚠️ No candles found in response: {data}")
-                return []
-
+            return response.json()
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ Error fetching {instrument} data: {e}")
-            return []
+            return {"candles": []}
 
     ## ================================================
     ## ✅ MARKET ORDER & TRADE MANAGEMENT FUNCTIONS
@@ -209,24 +526,11 @@ class OandaClient:
         """
         url = f"{self.base_url}/accounts/{self.account_id}/orders"
 
-        order_data = {
-            "order": {
-                "instrument": instrument,
-                "units": str(units),
-                "price": str(price),
-                "type": "LIMIT",
-                "timeInForce": "GTC"  # Good 'Til Canceled
-            }
-        }
-
-        # Add stop loss and take profit if provided
-        if stop_loss:
-            order_data["order"]["stopLossOnFill"] = {"price": str(stop_loss)}
-        if take_profit:
-            order_data["order"]["takeProfitOnFill"] = {"price": str(take_profit)}
+        # Good 'Til Canceled
+        order_data = build_order(instrument, units, "LIMIT", "GTC", price, stop_loss, take_profit)
 
         try:
-            response = requests.post(url, json=order_data, headers=self.headers)
+            response = self._request('POST', 'orders', url, json=order_data)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -245,23 +549,11 @@ class OandaClient:
         """
         url = f"{self.base_url}/accounts/{self.account_id}/orders"
 
-        order_data = {
-            "order": {
-                "instrument": instrument,
-                "units": str(units),
-                "type": "MARKET",
-                "timeInForce": "FOK"  # Fill-or-Kill
-            }
-        }
-
-        # Add stop loss and take profit if provided
-        if stop_loss:
-            order_data["order"]["stopLossOnFill"] = {"price": str(stop_loss)}
-        if take_profit:
-            order_data["order"]["takeProfitOnFill"] = {"price": str(take_profit)}
+        # Fill-or-Kill
+        order_data = build_order(instrument, units, "MARKET", "FOK", stop_loss=stop_loss, take_profit=take_profit)
 
         try:
-            response = requests.post(url, json=order_data, headers=self.headers)
+            response = self._request('POST', 'orders', url, json=order_data)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -278,7 +570,7 @@ class OandaClient:
         url = f"{self.base_url}/accounts/{self.account_id}/trades/{trade_id}/close"
 
         try:
-            response = requests.put(url, headers=self.headers)
+            response = self._request('PUT', 'close_trade', url)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -304,7 +596,7 @@ class OandaClient:
         """
         url = f"{self.base_url}/accounts/{self.account_id}/positions"
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request('GET', 'positions', url)
             response.raise_for_status()
             positions =  response.json()
         
@@ -325,7 +617,7 @@ class OandaClient:
         """
         url = f"{self.base_url}/accounts/{self.account_id}/openTrades"
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self._request('GET', 'open_trades', url)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -333,25 +625,109 @@ class OandaClient:
             return None
 
     ## ================================================
-    ## ✅ STREAMING PRICES (IF NEEDED)
+    ## ✅ PRICING
     ## ================================================
 
-    def stream_prices(self, instruments):
+    def get_pricing(self, instruments):
         """
-        Streams live prices for the given instruments.
+        Retrieves current bid/ask prices.
 
-        :param instruments: A comma-separated string of instrument names (e.g., "EUR_USD,USD_JPY").
+        :param instruments: A list or comma-separated string of instrument names.
+        :return: A dictionary with a 'prices' list.
         """
-        url = f"{self.base_url}/accounts/{self.account_id}/pricing?instruments={instruments}"
-
+        if not isinstance(instruments, str):
+            instruments = ",".join(instruments)
+        url = f"{self.base_url}/accounts/{self.account_id}/pricing"
         try:
-            response = requests.get(url, headers=self.headers, stream=True)
+            response = self._request('GET', 'pricing', url, params={"instruments": instruments})
             response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"❌ Failed to retrieve prices: {e}")
+            return {"prices": []}
 
-            for line in response.iter_lines():
-                if line:
-                    logger.info(f"📡 Received price update: {line.decode('utf-8')}")
+    ## ================================================
+    ## ✅ STREAMING PRICES
+    ## ================================================
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ Failed to stream prices: {e}")
+    def stream_prices(self, instruments, bus=None, stop_event=None, max_reconnects=None, heartbeat_timeout=10):
+        """
+        Consumes the pricing stream and publishes every price as a Tick on a TickBus until stopped.
+
+        OANDA sends a heartbeat every 5 seconds, so a connection that stays silent for heartbeat_timeout
+        seconds is considered dead. Dropped, silent or closed connections are re-opened with jittered
+        backoff; client errors (bad token, unknown instrument) end the stream. Malformed or truncated lines
+        are logged, counted in malformed_stream_lines and skipped.
+
+        :param instruments: A list or comma-separated string of instrument names (e.g., "EUR_USD,USD_JPY").
+        :param bus: TickBus to publish to (defaults to self.tick_bus).
+        :param stop_event: threading.Event that ends the stream when set (checked on every line and
+                           during the backoff between reconnections).
+        :param max_reconnects: Reconnections allowed before giving up (None = forever).
+        :param heartbeat_timeout: Seconds without any data before reconnecting.
+        :return: Number of ticks published.
+        """
+        bus = bus or self.tick_bus
+        if not isinstance(instruments, str):
+            instruments = ",".join(instruments)
+        url = f"{self.stream_url}/accounts/{self.account_id}/pricing/stream"
+        connect_timeout = self.timeout[0] if isinstance(self.timeout, tuple) else self.timeout
+
+        published = 0
+        reconnects = 0
+        failures = 0
+        while not (stop_event and stop_event.is_set()):
+            delay = None
+            start = time.perf_counter()
+            try:
+                with self.session.get(url, headers=self.headers, params={"instruments": instruments}, stream=True,
+                                      timeout=(connect_timeout, heartbeat_timeout)) as response:
+                    self._record('pricing_stream', time.perf_counter() - start, 0, response.status_code >= 400)
+                    response.raise_for_status()
+                    logger.info(f"📡 Streaming prices for {instruments}")
+
+                    for line in response.iter_lines(chunk_size=None):
+                        # Any line, heartbeats included, proves the connection is healthy
+                        failures = 0
+                        try:
+                            tick = parse_price_line(line)
+                        except (ValueError, KeyError) as e:
+                            self.malformed_stream_lines += 1
+                            logger.warning(f"⚠️ Skipping malformed pricing stream line ({e}): {line[:200]!r}")
+                            tick = None
+                        if tick is not None:
+                            bus.publish(tick)
+                            published += 1
+                        if stop_event and stop_event.is_set():
+                            break
+                    else:
+                        logger.warning("⚠️ Pricing stream closed by the server.")
+
+            except requests.exceptions.HTTPError as e:
+                status = e.response.status_code
+                if status not in RETRY_STATUSES:
+                    logger.error(f"❌ Failed to stream prices: {e}")
+                    break
+                logger.warning(f"⚠️ Pricing stream refused with HTTP {status}.")
+                delay = self._retry_after(e.response)
+            except requests.exceptions.RequestException as e:
+                # Connection refused or reset, or no heartbeat within heartbeat_timeout
+                logger.warning(f"⚠️ Pricing stream interrupted: {e.__class__.__name__}: {e}")
+
+            if stop_event and stop_event.is_set():
+                break
+            if max_reconnects is not None and reconnects >= max_reconnects:
+                logger.error(f"❌ Pricing stream gave up after {reconnects} reconnection(s).")
+                break
+            reconnects += 1
+            delay = delay if delay is not None else self._backoff(failures)
+            if stop_event:
+                # Wake up as soon as the stream is stopped instead of sleeping out the backoff
+                if stop_event.wait(delay):
+                    break
+            else:
+                time.sleep(delay)
+            failures += 1
 
+        logger.info(f"📡 Pricing stream stopped after {published} ticks.")
+        return published
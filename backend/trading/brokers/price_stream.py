@@ -0,0 +1,135 @@
+import json
+import threading
+from typing import NamedTuple
+
+from backend.logs.log_manager import LogManager
+
+# Initialize the logger
+logger = LogManager('price_stream_logs').get_logger()
+
+# Subscribing to this "instrument" receives every tick
+ALL_INSTRUMENTS = "*"
+
+
+class Tick(NamedTuple):
+    """
+    One price update from the OANDA pricing stream.
+    """
+    instrument: str
+    time: str
+    bid: float
+    ask: float
+    tradeable: bool = True
+
+    @property
+    def mid(self):
+        return (self.bid + self.ask) / 2
+
+    @property
+    def spread(self):
+        return self.ask - self.bid
+
+
+def parse_price_line(line):
+    """
+    Parse one line of the pricing stream.
+
+    Heartbeats are recognised from the raw bytes and skipped without decoding them. Only the top of
+    book is kept from a PRICE message.
+
+    :parameter line: Raw line (bytes or str) without the trailing newline.
+    :return: A Tick, or None for heartbeats, blank lines and messages without prices.
+    """
+    if not line:
+        return None
+    if (b'"HEARTBEAT"' if isinstance(line, bytes) else '"HEARTBEAT"') in line:
+        return None
+    message = json.loads(line)
+    if message.get("type") != "PRICE":
+        return None
+    bids = message.get("bids")
+    asks = message.get("asks")
+    if not bids or not asks:
+        return None
+    return Tick(message["instrument"], message["time"], float(bids[0]["price"]), float(asks[0]["price"]),
+                message.get("tradeable", True))
+
+
+class TickBus:
+    """
+    In-process publish/subscribe hub for ticks.
+
+    Subscribers register a callback per instrument (or ALL_INSTRUMENTS) and are called synchronously, on
+    the publishing thread, in subscription order. Subscription lists are replaced rather than mutated,
+    so publishing never takes a lock. A failing subscriber is logged and does not stop the others.
+
+    Usage:
+        bus = TickBus()
+        bus.subscribe("EUR_USD", lambda tick: print(tick.mid))
+        client.stream_prices(["EUR_USD"], bus=bus)
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self.latest = {}
+        self.published = 0
+
+    def subscribe(self, instrument, callback):
+        """
+        :parameter instrument: Instrument name, or ALL_INSTRUMENTS for every tick.
+        :parameter callback: Called with each Tick.
+        :return: The callback, for unsubscribe().
+        """
+        with self._lock:
+            self._subscribers[instrument] = self._subscribers.get(instrument, ()) + (callback,)
+        return callback
+
+    def unsubscribe(self, instrument, callback):
+        with self._lock:
+            remaining = tuple(subscriber for subscriber in self._subscribers.get(instrument, ())
+                              if subscriber is not callback)
+            if remaining:
+                self._subscribers[instrument] = remaining
+            else:
+                self._subscribers.pop(instrument, None)
+
+    def publish(self, tick):
+        """
+        Deliver a tick to the subscribers of its instrument and to the ALL_INSTRUMENTS subscribers.
+        """
+        self.latest[tick.instrument] = tick
+        self.published += 1
+        subscribers = self._subscribers
+        for callback in subscribers.get(tick.instrument, ()) + subscribers.get(ALL_INSTRUMENTS, ()):
+            try:
+                callback(tick)
+            except Exception as e:
+                logger.error(f"❌ Tick subscriber {callback!r} failed on {tick.instrument}: {e}")
+
+
+def consume_lines(lines, bus):
+    """
+    Parse stream lines and publish their ticks.
+
+    :parameter lines: Iterable of raw lines (e.g. response.iter_lines() or an open replay file).
+    :parameter bus: TickBus to publish to.
+    :return: Number of ticks published.
+    """
+    published = 0
+    for line in lines:
+        tick = parse_price_line(line.rstrip(b'\n') if isinstance(line, bytes) else line.rstrip('\n'))
+        if tick is not None:
+            bus.publish(tick)
+            published += 1
+    return published
+
+
+def replay_stream(path, bus):
+    """
+    Publish the ticks of a recorded pricing stream (one JSON message per line).
+
+    :return: Number of ticks published.
+    """
+    with open(path, 'rb') as f:
+        return consume_lines(f, bus)
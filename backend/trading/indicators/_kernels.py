@@ -0,0 +1,322 @@
+# backend/trading/indicators/_kernels.py
+"""
+Array kernels shared by the indicator classes. They work on plain NumPy arrays and evaluate
+many parameter values in one pass, returning arrays of shape (n_bars, n_params).
+"""
+import numpy as np
+import pandas as pd
+
+# Largest growth factor allowed inside one EWM block before the running sum is rescaled
+_EWM_MAX_GROWTH = 1e150
+# Upper bound on rows per EWM block, keeps the (block, n_params) work array cache-sized
+_EWM_MAX_BLOCK = 512
+# Elements per block of windows in rolling_mean_deviation, bounds its temporary (windows, period) array
+_WINDOW_BLOCK_ELEMENTS = 1 << 20
+
+
+def as_array(values):
+    """
+    Return the values of a Series/list/array as a 1-D float64 NumPy array.
+    """
+    if isinstance(values, pd.Series):
+        values = values.to_numpy(dtype=float)
+    return np.asarray(values, dtype=float)
+
+
+def as_periods(periods):
+    """
+    Validate a list of lookback periods and return it as an int array.
+    """
+    periods = np.atleast_1d(np.asarray(periods, dtype=int))
+    if periods.ndim != 1 or len(periods) == 0:
+        raise ValueError("At least one period is required.")
+    if (periods < 1).any():
+        raise ValueError("Periods must be positive integers.")
+    return periods
+
+
+def rolling_sum_many(values, periods):
+    """
+    Rolling sums for several window lengths from one shared cumulative sum.
+    Windows that are incomplete or contain NaN are NaN, like pandas rolling(window).sum().
+
+    :parameter values: 1-D array of input values.
+    :parameter periods: Iterable of window lengths.
+    :return: Array of shape (n_bars, n_params).
+    """
+    return _rolling_many(values, periods, mean=False)
+
+
+def rolling_mean_many(values, periods):
+    """
+    Rolling means for several window lengths, matching pandas rolling(window).mean().
+
+    :parameter values: 1-D array of input values.
+    :parameter periods: Iterable of window lengths.
+    :return: Array of shape (n_bars, n_params).
+    """
+    return _rolling_many(values, periods, mean=True)
+
+
+def _rolling_many(values, periods, mean):
+    x = as_array(values)
+    periods = as_periods(periods)
+    n = len(x)
+    # Column-major so that each period's column is written contiguously
+    out = np.full((n, len(periods)), np.nan, order='F')
+    if n == 0:
+        return out
+
+    missing = np.isnan(x)
+    has_missing = missing.any()
+    # Centre the data before summing to keep the cumulative sum small and the differences accurate
+    offset = x[~missing][0] if not missing.all() else 0.0
+    centred = np.where(missing, 0.0, x - offset) if has_missing else x - offset
+
+    csum = np.concatenate(([0.0], np.cumsum(centred)))
+    cmissing = np.concatenate(([0], np.cumsum(missing))) if has_missing else None
+
+    for j, period in enumerate(periods):
+        if period > n:
+            continue
+        column = out[period - 1:, j]
+        np.subtract(csum[period:], csum[:-period], out=column)
+        if mean:
+            column /= period
+            column += offset
+        else:
+            column += period * offset
+        if has_missing:
+            column[cmissing[period:] - cmissing[:-period] > 0] = np.nan
+
+    return out
+
+
+def ewm_many(values, spans):
+    """
+    Exponentially weighted means (adjust=False) for several spans in one pass over the data,
+    matching pandas ewm(span=span, adjust=False).mean().
+
+    The recursion y[t] = w * y[t-1] + a * x[t] is solved in closed form block by block:
+    inside a block y[s+k] = w**k * (w * y[s-1] + a * cumsum(x[s+i] * w**-i)). The block length is
+    bounded so w**-k never overflows, and every column advances together.
+
+    :parameter values: 1-D array of input values.
+    :parameter spans: Iterable of EWM spans.
+    :return: Array of shape (n_bars, n_params).
+    """
+    x = as_array(values)
+    spans = as_periods(spans)
+    n = len(x)
+
+    if np.isnan(x).any():
+        # The closed form assumes finite input; fall back to pandas for gappy data
+        series = pd.Series(x)
+        return np.column_stack([series.ewm(span=span, adjust=False).mean().to_numpy() for span in spans])
+
+    alpha = 2.0 / (spans + 1.0)
+    decay = 1.0 - alpha
+    out = np.empty((n, len(spans)))
+    if n == 0:
+        return out
+
+    # span == 1 means no smoothing at all
+    trivial = decay == 0
+    out[:, trivial] = x[:, None]
+    if trivial.all():
+        return out
+
+    alpha, decay = alpha[~trivial], decay[~trivial]
+    block = min(_EWM_MAX_BLOCK, max(1, int(np.log(_EWM_MAX_GROWTH) / -np.log(decay.min()))))
+
+    steps = np.arange(block)[:, None]
+    growth = decay ** -steps    # w**-k
+    shrink = decay ** steps     # w**k
+
+    result = out if not trivial.any() else np.empty((n, len(alpha)))
+    result[0] = x[0]
+    work = np.empty((block, len(alpha)))
+    start = 1
+    while start < n:
+        stop = min(start + block, n)
+        chunk = work[:stop - start]
+        np.multiply(x[start:stop, None], growth[:stop - start], out=chunk)
+        np.cumsum(chunk, axis=0, out=chunk)
+        chunk *= alpha
+        chunk += decay * result[start - 1]
+        chunk *= shrink[:stop - start]
+        result[start:stop] = chunk
+        start = stop
+
+    if result is not out:
+        out[:, ~trivial] = result
+    return out
+
+
+def rolling_mean_deviation(values, period):
+    """
+    Rolling mean absolute deviation from each window's own mean, matching
+    rolling(period).apply(lambda w: np.mean(np.abs(w - w.mean()))).
+
+    The deviation has no running-sum form because every window recentres on its own mean, so this is
+    O(n * period) arithmetic over strided window views, processed in blocks to bound memory, with no
+    Python call per window. Windows that are incomplete or contain NaN are NaN.
+
+    :parameter values: 1-D array of input values.
+    :parameter period: Window length.
+    :return: 1-D array of mean deviations.
+    """
+    period = int(as_periods([period])[0])
+    x = as_array(values)
+    out = np.full(len(x), np.nan)
+    if period > len(x):
+        return out
+
+    windows = np.lib.stride_tricks.sliding_window_view(x, period)
+    block = max(1, _WINDOW_BLOCK_ELEMENTS // period)
+    for start in range(0, len(windows), block):
+        chunk = windows[start:start + block]
+        deviation = np.abs(chunk - chunk.mean(axis=1, keepdims=True))
+        out[period - 1 + start:period - 1 + start + len(chunk)] = deviation.mean(axis=1)
+    return out
+
+
+def true_range(high, low, close):
+    """
+    True range as the indicators compute it: max(high-low, |high-prev close|, |low-prev close|),
+    ignoring the missing previous close on the first bar.
+    """
+    high, low, close = as_array(high), as_array(low), as_array(close)
+    previous_close = np.concatenate(([np.nan], close[:-1]))
+    return np.fmax(np.fmax(high - low, np.abs(high - previous_close)), np.abs(low - previous_close))
+
+
+def on_balance_volume(close, volume, previous_close=np.nan, initial=0.0):
+    """
+    On-Balance Volume: the running total of volume signed by the direction of each close-to-close move.
+    Unchanged closes (and comparisons against NaN) add nothing, like the bar-by-bar definition.
+
+    :parameter close: 1-D array of close prices.
+    :parameter volume: 1-D array of volumes.
+    :parameter previous_close: Close before the first bar, to continue an existing series.
+    :parameter initial: OBV before the first bar; the first bar keeps it unless previous_close is given.
+    :return: 1-D array of OBV values.
+    """
+    close, volume = as_array(close), as_array(volume)
+    previous = np.empty_like(close)
+    previous[:1] = previous_close
+    previous[1:] = close[:-1]
+    direction = (close > previous).astype(np.int8) - (close < previous).astype(np.int8)
+    flow = np.where(direction != 0, direction * volume, 0.0)
+    result = np.cumsum(flow)
+    result += initial
+    return result
+
+
+def rolling_extremum(values, period, mode='max'):
+    """
+    Rolling max or min over `period` bars together with its position in the window, in O(n).
+
+    The series is cut into blocks of `period` bars. Every window spans the tail of one block and the
+    head of the next, so its extremum is the better of a running suffix extremum and a running prefix
+    extremum (van Herk / Gil-Werman), each found with one accumulate pass. Ties resolve to the oldest
+    bar, like argmax, and windows that are incomplete or contain NaN are NaN, like pandas rolling.
+
+    :parameter values: 1-D array of input values.
+    :parameter period: Window length.
+    :parameter mode: 'max' or 'min'.
+    :return: Tuple of arrays (extremum, position), position being the offset of the extremum from
+             the start of the window (0 = oldest bar).
+    """
+    if mode not in ('max', 'min'):
+        raise ValueError("mode must be 'max' or 'min'")
+    period = int(as_periods([period])[0])
+    x = as_array(values)
+    n = len(x)
+    extremum = np.full(n, np.nan)
+    position = np.full(n, np.nan)
+    if period > n:
+        return extremum, position
+
+    # A min is the max of the negated series; NaN becomes -inf here and is masked out at the end
+    missing = np.isnan(x)
+    work = np.where(missing, -np.inf, -x if mode == 'min' else x)
+    blocks = -(-n // period)
+    padded = np.full(blocks * period, -np.inf)
+    padded[:n] = work
+    grid = padded.reshape(blocks, period)
+    index = np.arange(blocks * period).reshape(blocks, period)
+
+    # Prefix: running max from each block start; its first occurrence is the last strict new high
+    prefix = np.maximum.accumulate(grid, axis=1)
+    rises = np.ones_like(grid, dtype=bool)
+    rises[:, 1:] = grid[:, 1:] > prefix[:, :-1]
+    prefix_at = np.maximum.accumulate(np.where(rises, index, -1), axis=1)
+
+    # Suffix: running max towards each block start; ties move the occurrence to the older bar
+    suffix = np.maximum.accumulate(grid[:, ::-1], axis=1)[:, ::-1]
+    takes = np.ones_like(grid, dtype=bool)
+    takes[:, :-1] = grid[:, :-1] >= suffix[:, 1:]
+    suffix_at = np.minimum.accumulate(np.where(takes, index, blocks * period)[:, ::-1], axis=1)[:, ::-1]
+
+    prefix, prefix_at = prefix.ravel()[period - 1:n], prefix_at.ravel()[period - 1:n]
+    suffix, suffix_at = suffix.ravel()[:n - period + 1], suffix_at.ravel()[:n - period + 1]
+    older = suffix >= prefix
+    best = np.where(older, suffix, prefix)
+    extremum[period - 1:] = -best if mode == 'min' else best
+    position[period - 1:] = np.where(older, suffix_at, prefix_at) - np.arange(n - period + 1)
+
+    if missing.any():
+        counts = np.concatenate(([0], np.cumsum(missing)))
+        gappy = np.concatenate((np.zeros(period - 1, dtype=bool), counts[period:] - counts[:-period] > 0))
+        extremum[gappy] = np.nan
+        position[gappy] = np.nan
+    return extremum, position
+
+
+class HighLowExtrema:
+    """
+    Rolling highest high and lowest low of one frame, computed once per period and shared by the
+    indicators that need them (Aroon, Stochastic Oscillator, Williams %R).
+
+    Usage:
+        extrema = HighLowExtrema(df['high'], df['low'])
+        Aroon.calculate(df, period=14, extrema=extrema)
+        WilliamsR.calculate(df, period=14, extrema=extrema)  # reuses the same two passes
+    """
+
+    def __init__(self, high, low):
+        self.high = as_array(high)
+        self.low = as_array(low)
+        self._highest = {}
+        self._lowest = {}
+
+    def __len__(self):
+        return len(self.high)
+
+    def highest(self, period):
+        """
+        :return: Tuple (rolling max of high, offset of that max in the window).
+        """
+        if period not in self._highest:
+            self._highest[period] = rolling_extremum(self.high, period, 'max')
+        return self._highest[period]
+
+    def lowest(self, period):
+        """
+        :return: Tuple (rolling min of low, offset of that min in the window).
+        """
+        if period not in self._lowest:
+            self._lowest[period] = rolling_extremum(self.low, period, 'min')
+        return self._lowest[period]
+
+    @classmethod
+    def resolve(cls, df, extrema=None):
+        """
+        Return `extrema` after checking it belongs to a frame of this length, or build one for `df`.
+        """
+        if extrema is None:
+            return cls(df['high'], df['low'])
+        if len(extrema) != len(df):
+            raise ValueError(f"Extrema cover {len(extrema)} bars but the DataFrame has {len(df)}.")
+        return extrema
@@ -0,0 +1,73 @@
+# backend/trading/indicators/_persistence.py
+"""
+Shared writer behind every indicator's insert_results_to_db. Ids are resolved once per call and
+each result column goes to SQLite through one executemany inside one transaction.
+"""
+from datetime import datetime
+from logs.log_manager import LogManager
+from backend.data.repositories._sqlite_db import SQLiteDBHandler
+
+logger = LogManager('indicator_persistence_logs').get_logger()
+
+# (instruments database path, instrument name) -> id, filled on first lookup (instruments are never renumbered)
+_instrument_ids = {}
+_instrument_db = None
+
+
+def resolve_instrument_id(instrument, instrument_db=None):
+    """
+    Look up the ID of an instrument in instruments.db, caching successful lookups per database file.
+
+    :parameter instrument: Instrument name (e.g. 'EUR_USD') or an already resolved integer ID.
+    :parameter instrument_db: Optional SQLiteDBHandler for the instruments database.
+    :return: The instrument ID, or None if the instrument is unknown.
+    """
+    global _instrument_db
+    if isinstance(instrument, int):
+        return instrument
+
+    if instrument_db is None:
+        if _instrument_db is None:
+            _instrument_db = SQLiteDBHandler(db_name="instruments.db")
+        instrument_db = _instrument_db
+
+    key = (instrument_db.db_path, instrument)
+    if key not in _instrument_ids:
+        instrument_id = instrument_db.get_instrument_id(instrument)
+        if instrument_id is None:
+            return None
+        _instrument_ids[key] = instrument_id
+    return _instrument_ids[key]
+
+
+def write_indicator_results(db_handler, indicator_name, instrument, result_df, columns, parameters=None,
+                            instrument_db=None):
+    """
+    Persist indicator result columns in bulk.
+
+    :parameter db_handler: SQLiteDBHandler for the indicators database.
+    :parameter indicator_name: The name of the indicator (e.g., 'SMA').
+    :parameter instrument: Instrument name or ID the results were calculated for.
+    :parameter result_df: DataFrame containing the calculated values.
+    :parameter columns: Result columns to store (e.g. ['macd', 'signal', 'histogram']).
+    :parameter parameters: Indicator parameters to upsert once (e.g. {'period': 14}).
+    :parameter instrument_db: Optional SQLiteDBHandler for the instruments database.
+    :return: Number of result rows written.
+    """
+    indicator_id = db_handler.get_indicator_id(indicator_name)
+    if indicator_id is None:
+        logger.error(f"Indicator {indicator_name} not found; results for {instrument} were not stored.")
+        return 0
+
+    instrument_id = resolve_instrument_id(instrument, instrument_db)
+    if instrument_id is None:
+        logger.error(f"Instrument {instrument} not found; {indicator_name} results were not stored.")
+        return 0
+
+    timestamp = datetime.now().isoformat()
+    with db_handler.transaction():
+        if parameters:
+            db_handler.add_indicator_parameters(indicator_id, parameters)
+        return db_handler.add_indicator_results_bulk(
+            instrument_id, indicator_id, {column: result_df[column] for column in columns}, timestamp
+        )
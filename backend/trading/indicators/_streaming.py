@@ -0,0 +1,208 @@
+# backend/trading/indicators/_streaming.py
+"""
+Building blocks for incremental (streaming) indicators. Each primitive keeps just enough running
+state to take one new value per bar in O(1) amortised time, so a live candle can be folded into an
+indicator without recomputing the whole history.
+"""
+import math
+from collections import deque
+
+NAN = float('nan')
+
+# OANDA candles carry prices under 'mid' with one-letter keys
+_MID_KEYS = {'open': 'o', 'high': 'h', 'low': 'l', 'close': 'c'}
+
+
+def divide(numerator, denominator):
+    """
+    Division with NumPy semantics: x / 0 gives +/-inf and 0 / 0 gives NaN instead of raising.
+    """
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return NAN
+        return math.copysign(math.inf, numerator)
+    return numerator / denominator
+
+
+def candle_field(candle, name):
+    """
+    Read a price/volume field from a candle given as a mapping, a DataFrame row, or an OANDA candle dict.
+    """
+    if name in candle:
+        return float(candle[name])
+    if 'mid' in candle and name in _MID_KEYS:
+        return float(candle['mid'][_MID_KEYS[name]])
+    raise KeyError(f"Candle is missing the '{name}' field.")
+
+
+class RollingWindow:
+    """
+    Fixed-length window with running mean and variance (Welford updates with removal).
+    NaN values occupy a slot but make the statistics undefined until they leave the window,
+    which mirrors pandas rolling(window) with the default min_periods.
+    """
+
+    # Recompute the running moments from scratch this often to stop rounding drift accumulating
+    RESYNC_EVERY = 10_000
+
+    def __init__(self, period):
+        self.period = period
+        self.values = deque()
+        self.missing = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+
+    def push(self, value):
+        self.values.append(value)
+        self._add(value)
+        if len(self.values) > self.period:
+            self._remove(self.values.popleft())
+
+        self.updates += 1
+        if self.updates % self.RESYNC_EVERY == 0:
+            self._resync()
+
+    def _add(self, value):
+        if math.isnan(value):
+            self.missing += 1
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def _remove(self, value):
+        if math.isnan(value):
+            self.missing -= 1
+            return
+        self.count -= 1
+        if self.count == 0:
+            self.mean, self.m2 = 0.0, 0.0
+            return
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self.m2 -= delta * (value - self.mean)
+
+    def _resync(self):
+        valid = [v for v in self.values if not math.isnan(v)]
+        self.count = len(valid)
+        self.mean = math.fsum(valid) / self.count if valid else 0.0
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in valid)
+
+    @property
+    def ready(self):
+        return len(self.values) == self.period and self.missing == 0
+
+    def average(self):
+        return self.mean if self.ready else NAN
+
+    def total(self):
+        return self.mean * self.count if self.ready else NAN
+
+    def std(self):
+        # Sample standard deviation (ddof=1), as pandas rolling().std()
+        if not self.ready or self.count < 2:
+            return NAN
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+
+class ExponentialAverage:
+    """
+    EWM with adjust=False: y[0] = x[0], y[t] = (1 - a) * y[t-1] + a * x[t], with a = 2 / (span + 1).
+    """
+
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.value = None
+
+    def push(self, value):
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+
+class RollingExtremum:
+    """
+    Rolling max or min over the last `period` bars using a monotonic deque.
+    Also reports the offset of the extremum inside the window (first occurrence on ties, like argmax).
+    """
+
+    def __init__(self, period, mode='max'):
+        if mode not in ('max', 'min'):
+            raise ValueError("mode must be 'max' or 'min'")
+        self.period = period
+        self.mode = mode
+        self.candidates = deque()  # (bar index, value), monotonic in value
+        self.index = -1
+        self.recent_missing = deque()
+
+    def push(self, value):
+        self.index += 1
+        if math.isnan(value):
+            self.recent_missing.append(self.index)
+        else:
+            if self.mode == 'max':
+                while self.candidates and self.candidates[-1][1] < value:
+                    self.candidates.pop()
+            else:
+                while self.candidates and self.candidates[-1][1] > value:
+                    self.candidates.pop()
+            self.candidates.append((self.index, value))
+
+        oldest = self.index - self.period + 1
+        while self.candidates and self.candidates[0][0] < oldest:
+            self.candidates.popleft()
+        while self.recent_missing and self.recent_missing[0] < oldest:
+            self.recent_missing.popleft()
+
+    @property
+    def ready(self):
+        return self.index + 1 >= self.period and not self.recent_missing and bool(self.candidates)
+
+    def value(self):
+        return self.candidates[0][1] if self.ready else NAN
+
+    def position(self):
+        """
+        Offset of the extremum from the start of the window (0 = oldest bar).
+        """
+        if not self.ready:
+            return NAN
+        return self.candidates[0][0] - (self.index - self.period + 1)
+
+
+class IndicatorState:
+    """
+    Base class for the per-indicator incremental states. Subclasses implement update(candle),
+    which folds one candle into the state and returns the latest output.
+    """
+
+    def __init__(self):
+        self.value = None
+
+    def update(self, candle):
+        raise NotImplementedError
+
+    def seed(self, df):
+        """
+        Fold every row of a historical DataFrame into the state, oldest first.
+
+        :parameter df: DataFrame of candles with the columns the indicator needs.
+        :return: The output after the last row.
+        """
+        for candle in df.to_dict('records'):
+            self.update(candle)
+        return self.value
+
+    @classmethod
+    def from_history(cls, df, **parameters):
+        """
+        Create a state and seed it from historical candles.
+        """
+        state = cls(**parameters)
+        state.seed(df)
+        return state
@@ -1,9 +1,11 @@
 # backend/trading/indicators/adx.py
+import math
 import pandas as pd
 import numpy as np
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import IndicatorState, RollingWindow, candle_field, divide
 
 # Configure loggers
 logger = LogManager("adx_logs").get_logger()
@@ -18,13 +20,6 @@ class ADX:
         """
         self.db_handler = SQLiteDBHandler(db_name=db_name)
 
-    import pandas as pd
-import numpy as np
-from logs.log_manager import LogManager
-
-logger = LogManager('adx_logs').get_logger()
-
-class ADX:
     @staticmethod
     def calculate(df, period=14):
         """
@@ -69,7 +64,7 @@ class ADX:
         df['adx'] = df['dx'].rolling(window=period).mean()
 
         # Fill NaN values in the 'adx' column
-        df['adx'].fillna(0, inplace=True)
+        df['adx'] = df['adx'].fillna(0)
 
         logger.info(f"ADX calculation for period={period} completed.")
         return df
@@ -83,20 +78,49 @@ class ADX:
         :parameter result_df: DataFrame containing the calculated ADX values.
         :parameter period: Period for which the ADX was calculated.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
-
-        # Insert ADX, plus_di, and minus_di results row by row
-        for _, row in result_df.iterrows():
-            self.db_handler.add_indicator_results(
-                indicator_id, timestamp, "adx", row["adx"]
-            )
-            self.db_handler.add_indicator_results(
-                indicator_id, timestamp, "plus_di", row["plus_di"]
-            )
-            self.db_handler.add_indicator_results(
-                indicator_id, timestamp, "minus_di", row["minus_di"]
-            )
-            self.db_handler.add_indicator_parameters(indicator_id, {"period": period})
-
-        logger.info(f"Inserted ADX results for {instrument} into SQLite.")
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['adx', 'plus_di', 'minus_di'], {'period': period}
+        )
+
+        logger.info(f"Inserted {rows} ADX results for {instrument} into SQLite.")
+
+
+class ADXState(IndicatorState):
+    """
+    Incremental ADX for live candles: rolling sums of true range and directional movement, O(1) per update.
+    """
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.tr = RollingWindow(period)
+        self.plus_dm = RollingWindow(period)
+        self.minus_dm = RollingWindow(period)
+        self.dx = RollingWindow(period)
+        self.previous = None
+
+    def update(self, candle):
+        high, low, close = candle_field(candle, 'high'), candle_field(candle, 'low'), candle_field(candle, 'close')
+
+        true_range = high - low
+        plus_dm = minus_dm = 0.0
+        if self.previous is not None:
+            previous_high, previous_low, previous_close = self.previous
+            true_range = max(true_range, abs(high - previous_close), abs(low - previous_close))
+            up_move, down_move = high - previous_high, previous_low - low
+            plus_dm = up_move if up_move > down_move else 0.0
+            minus_dm = down_move if down_move > up_move else 0.0
+        self.previous = (high, low, close)
+
+        self.tr.push(true_range)
+        self.plus_dm.push(plus_dm)
+        self.minus_dm.push(minus_dm)
+
+        tr_smooth = self.tr.total()
+        plus_di = 100 * divide(self.plus_dm.total(), tr_smooth)
+        minus_di = 100 * divide(self.minus_dm.total(), tr_smooth)
+        self.dx.push(100 * divide(abs(plus_di - minus_di), plus_di + minus_di))
+
+        adx = self.dx.average()
+        self.value = {'adx': 0.0 if math.isnan(adx) else adx, 'plus_di': plus_di, 'minus_di': minus_di}
+        return self.value
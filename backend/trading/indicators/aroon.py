@@ -1,8 +1,9 @@
 # backend/trading/indicators/aroon.py
-import numpy as np
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._kernels import HighLowExtrema
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import IndicatorState, RollingExtremum, candle_field
 
 # Configure loggers
 logger = LogManager('aroon_logs').get_logger()
@@ -21,12 +22,14 @@ class Aroon:
         self.db_handler = SQLiteDBHandler(db_name=db_name)
 
     @staticmethod
-    def calculate(df, period=25):
+    def calculate(df, period=25, extrema=None):
         """
         Calculate the Aroon Up and Aroon Down indicators for a given DataFrame.
 
         :parameter df: DataFrame with 'high' and 'low' prices.
         :parameter period: Lookback period for Aroon calculation.
+        :parameter extrema: Optional HighLowExtrema of df, to share the rolling high/low passes with
+                            other indicators on the same frame.
         :return: DataFrame with the Aroon Up and Aroon Down values.
         """
         # Ensure the necessary columns exist
@@ -38,9 +41,10 @@ class Aroon:
             logger.warning("Insufficient data for Aroon calculation.")
             return df
 
-        # Calculate Aroon Up and Aroon Down
-        df['aroon_up'] = df['high'].rolling(window=period).apply(lambda x: (x.argmax() + 1) / period * 100, raw=True)
-        df['aroon_down'] = df['low'].rolling(window=period).apply(lambda x: (x.argmin() + 1) / period * 100, raw=True)
+        # Calculate Aroon Up and Aroon Down from the positions of the rolling high and low
+        extrema = HighLowExtrema.resolve(df, extrema)
+        df['aroon_up'] = (extrema.highest(period)[1] + 1) / period * 100
+        df['aroon_down'] = (extrema.lowest(period)[1] + 1) / period * 100
 
         logger.info(f"Aroon calculation for period={period} completed.")
         return df
@@ -54,13 +58,30 @@ class Aroon:
         :parameter result_df: DataFrame containing the calculated Aroon values.
         :parameter period: Period for which the Aroon was calculated.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['aroon_up', 'aroon_down'], {'period': period}
+        )
 
-        # Insert Aroon Up and Aroon Down results row by row
-        for _, row in result_df.iterrows():
-            self.db_handler.add_indicator_results(indicator_id, timestamp, 'aroon_up', row['aroon_up'])
-            self.db_handler.add_indicator_results(indicator_id, timestamp, 'aroon_down', row['aroon_down'])
-            self.db_handler.add_indicator_parameters(indicator_id, {'period': period})
+        logger.info(f"Inserted {rows} Aroon results for {instrument} into SQLite.")
 
-        logger.info(f"Inserted Aroon results for {instrument} into SQLite.")
+
+class AroonState(IndicatorState):
+    """
+    Incremental Aroon for live candles: monotonic deques track the position of the rolling high and low.
+    """
+
+    def __init__(self, period=25):
+        super().__init__()
+        self.period = period
+        self.highs = RollingExtremum(period, 'max')
+        self.lows = RollingExtremum(period, 'min')
+
+    def update(self, candle):
+        self.highs.push(candle_field(candle, 'high'))
+        self.lows.push(candle_field(candle, 'low'))
+        self.value = {
+            'aroon_up': (self.highs.position() + 1) / self.period * 100,
+            'aroon_down': (self.lows.position() + 1) / self.period * 100,
+        }
+        return self.value
@@ -2,7 +2,9 @@
 import numpy as np
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._kernels import rolling_mean_many, true_range
+from backend.trading.indicators._streaming import IndicatorState, RollingWindow, candle_field
 
 # Configure loggers
 logger = LogManager('atr_logs').get_logger()
@@ -46,6 +48,21 @@ class ATR:
         logger.info(f"ATR calculation for period={period} completed.")
         return df
 
+    @staticmethod
+    def calculate_many(high, low, close, periods):
+        """
+        Calculate the ATR for many periods at once from one true range series and one cumulative sum.
+
+        :parameter high: Series or array of high prices.
+        :parameter low: Series or array of low prices.
+        :parameter close: Series or array of close prices.
+        :parameter periods: Iterable of lookback periods.
+        :return: NumPy array of shape (n_bars, n_periods), column j holding the ATR for periods[j].
+        """
+        result = rolling_mean_many(true_range(high, low, close), periods)
+        logger.info(f"ATR batch calculation for {result.shape[1]} periods completed.")
+        return result
+
     def insert_results_to_db(self, indicator_name, instrument, result_df, period):
         """
         Insert the ATR results into the SQLite database.
@@ -55,14 +72,31 @@ class ATR:
         :parameter result_df: DataFrame containing the calculated ATR values.
         :parameter period: Period for which the ATR was calculated.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['atr'], {'period': period}
+        )
+
+        logger.info(f"Inserted {rows} ATR results for {instrument} into SQLite.")
+
+
+class ATRState(IndicatorState):
+    """
+    Incremental ATR for live candles: true range from the previous close and a rolling mean, O(1) per update.
+    """
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.window = RollingWindow(period)
+        self.previous_close = None
 
-        parameter_name = 'atr'
-        # Insert ATR results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row['atr']
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
-            self.db_handler.add_indicator_parameters(indicator_id, {'period': period})
+    def update(self, candle):
+        high, low = candle_field(candle, 'high'), candle_field(candle, 'low')
+        true_range = high - low
+        if self.previous_close is not None:
+            true_range = max(true_range, abs(high - self.previous_close), abs(low - self.previous_close))
+        self.previous_close = candle_field(candle, 'close')
 
-        logger.info(f"Inserted ATR results for {instrument} into SQLite.")
+        self.window.push(true_range)
+        self.value = self.window.average()
+        return self.value
@@ -2,7 +2,8 @@
 import pandas as pd
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import IndicatorState, RollingWindow, candle_field
 
 # Configure loggers
 logger = LogManager('bollinger_logs').get_logger()
@@ -60,13 +61,31 @@ class BollingerBands:
         :parameter period: Period for the moving average.
         :parameter std_dev: Standard deviation for the bands.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['upper_band', 'lower_band'], {'period': period, 'std_dev': std}
+        )
 
-        # Insert Bollinger Bands results row by row
-        for _, row in result_df.iterrows():
-            self.db_handler.add_indicator_results(indicator_id, timestamp, 'upper_band', row['upper_band'])
-            self.db_handler.add_indicator_results(indicator_id, timestamp, 'lower_band', row['lower_band'])
-            self.db_handler.add_indicator_parameters(indicator_id, {'period': period, 'std_dev': std})
+        logger.info(f"Inserted {rows} Bollinger Bands results for {instrument} into SQLite.")
 
-        logger.info(f"Inserted Bollinger Bands results for {instrument} into SQLite.")
+
+class BollingerBandsState(IndicatorState):
+    """
+    Incremental Bollinger Bands for live candles: running mean and variance of the window, O(1) per update.
+    """
+
+    def __init__(self, period=20, std=2):
+        super().__init__()
+        self.period = period
+        self.std = std
+        self.window = RollingWindow(period)
+
+    def update(self, candle):
+        self.window.push(candle_field(candle, 'close'))
+        middle, deviation = self.window.average(), self.window.std()
+        self.value = {
+            f'middle_{self.period}': middle,
+            f'upper_{self.period}': middle + deviation * self.std,
+            f'lower_{self.period}': middle - deviation * self.std,
+        }
+        return self.value
@@ -1,8 +1,9 @@
 # backend/trading/indicators/cci.py
-import numpy as np
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._kernels import rolling_mean_deviation
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import NAN, IndicatorState, RollingWindow, candle_field, divide
 
 # Configure loggers
 logger = LogManager('cci_logs').get_logger()
@@ -45,13 +46,8 @@ class CCI:
         # Calculate the rolling mean of the typical price
         df['tp_sma'] = df['typical_price'].rolling(window=period).mean()
 
-        # Manually calculate the mean absolute deviation (MAD)
-        def mean_deviation(series):
-            mean_value = series.mean()
-            return np.mean(np.abs(series - mean_value))
-
-        # Apply the mean deviation function to the rolling window
-        df['mean_deviation'] = df['typical_price'].rolling(window=period).apply(mean_deviation, raw=False)
+        # Mean absolute deviation of each window from its own mean, over strided window views
+        df['mean_deviation'] = rolling_mean_deviation(df['typical_price'], period)
 
         # Calculate the CCI
         df['cci'] = (df['typical_price'] - df['tp_sma']) / (0.015 * df['mean_deviation'])
@@ -68,14 +64,32 @@ class CCI:
         :parameter result_df: DataFrame containing the calculated CCI values.
         :parameter period: Period for which the CCI was calculated.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
-
-        parameter_name = 'cci'
-        # Insert CCI results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row['cci']
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
-            self.db_handler.add_indicator_parameters(indicator_id, {'period': period})
-
-        logger.info(f"Inserted CCI results for {instrument} into SQLite.")
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['cci'], {'period': period}
+        )
+
+        logger.info(f"Inserted {rows} CCI results for {instrument} into SQLite.")
+
+
+class CCIState(IndicatorState):
+    """
+    Incremental CCI for live candles. The running mean is O(1); the mean absolute deviation has to
+    revisit the window, so an update costs O(period).
+    """
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.window = RollingWindow(period)
+
+    def update(self, candle):
+        typical_price = (candle_field(candle, 'high') + candle_field(candle, 'low') + candle_field(candle, 'close')) / 3
+        self.window.push(typical_price)
+
+        if not self.window.ready:
+            self.value = NAN
+        else:
+            mean = sum(self.window.values) / self.window.period
+            mean_deviation = sum(abs(v - mean) for v in self.window.values) / self.window.period
+            self.value = divide(typical_price - mean, 0.015 * mean_deviation)
+        return self.value
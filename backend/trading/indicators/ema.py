@@ -1,6 +1,8 @@
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._kernels import ewm_many
+from backend.trading.indicators._streaming import ExponentialAverage, IndicatorState, candle_field
 
 # Configure loggers
 logger = LogManager('ema_logs').get_logger()
@@ -40,6 +42,19 @@ class EMA:
         logger.info(f"EMA calculation for period={period} completed.")
         return df
 
+    @staticmethod
+    def calculate_many(close, periods):
+        """
+        Calculate the EMA for many periods at once, advancing every period together in one pass.
+
+        :parameter close: Series or array of close prices.
+        :parameter periods: Iterable of lookback periods (e.g. range(5, 201)).
+        :return: NumPy array of shape (n_bars, n_periods), column j holding the EMA for periods[j].
+        """
+        result = ewm_many(close, periods)
+        logger.info(f"EMA batch calculation for {result.shape[1]} periods completed.")
+        return result
+
     def insert_results_to_db(self, indicator_name, instrument, result_df, period):
         """
         Insert the EMA results into the SQLite database.
@@ -49,14 +64,23 @@ class EMA:
         :parameter result_df: DataFrame containing the calculated EMA values.
         :parameter period: Period for which the EMA was calculated.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            [indicator_name.lower()], {'period': period}
+        )
+
+        logger.info(f"Inserted {rows} EMA results for {instrument} into SQLite.")
+
+
+class EMAState(IndicatorState):
+    """
+    Incremental EMA for live candles, O(1) per update.
+    """
 
-        parameter_name = indicator_name.lower()
-        # Insert EMA results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row[parameter_name]
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
-            self.db_handler.add_indicator_parameters(indicator_id, {'period': period})
+    def __init__(self, period=14):
+        super().__init__()
+        self.average = ExponentialAverage(period)
 
-        logger.info(f"Inserted EMA results for {instrument} into SQLite.")
+    def update(self, candle):
+        self.value = self.average.push(candle_field(candle, 'close'))
+        return self.value
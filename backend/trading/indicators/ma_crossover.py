@@ -2,7 +2,8 @@
 import numpy as np
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import IndicatorState, RollingWindow, candle_field
 
 # Configure loggers
 logger = LogManager('ma_logs').get_logger()
@@ -57,14 +58,34 @@ class MACrossover:
         :parameter fast_period: Period for the fast moving average.
         :parameter slow_period: Period for the slow moving average.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['crossover_signal'], {'fast_period': fast_period, 'slow_period': slow_period}
+        )
 
-        parameter_name = 'ma_crossover'
-        # Insert MA Crossover results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row['crossover_signal']
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
-            self.db_handler.add_indicator_parameters(indicator_id, {'fast_period': fast_period, 'slow_period': slow_period})
+        logger.info(f"Inserted {rows} MA Crossover results for {instrument} into SQLite.")
 
-        logger.info(f"Inserted MA Crossover results for {instrument} into SQLite.")
+
+class MACrossoverState(IndicatorState):
+    """
+    Incremental moving average crossover for live candles: two rolling windows, O(1) per update.
+    """
+
+    def __init__(self, fast_period=12, slow_period=26):
+        super().__init__()
+        self.fast = RollingWindow(fast_period)
+        self.slow = RollingWindow(slow_period)
+
+    def update(self, candle):
+        close = candle_field(candle, 'close')
+        self.fast.push(close)
+        self.slow.push(close)
+
+        crossover = self.fast.average() - self.slow.average()
+        self.value = {
+            'fast_ma': self.fast.average(),
+            'slow_ma': self.slow.average(),
+            'crossover': crossover,
+            'crossover_signal': 1 if crossover > 0 else -1,
+        }
+        return self.value
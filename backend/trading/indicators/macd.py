@@ -1,7 +1,8 @@
 # backend/trading/indicators/macd.py
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import ExponentialAverage, IndicatorState, candle_field
         
 logger = LogManager('macd_logs').get_logger()
 
@@ -60,26 +61,32 @@ class MACD:
         :parameter long_period: Long period for MACD calculation.
         :parameter signal_period: Signal period for MACD calculation.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
-
-        # Insert MACD, signal, and histogram results row by row
-        for _, row in result_df.iterrows():
-            macd_value = row['macd']
-            signal_value = row['signal']
-            histogram_value = row['histogram']
-            self.db_handler.add_indicator_results(indicator_id, timestamp, 'macd', macd_value)
-            self.db_handler.add_indicator_results(indicator_id, timestamp, 'signal', signal_value)
-            self.db_handler.add_indicator_results(indicator_id, timestamp, 'histogram', histogram_value)
-
-            # Insert the indicator parameters
-            self.db_handler.add_indicator_parameters(indicator_id, {
-                'short_period': short_period,
-                'long_period': long_period,
-                'signal_period': signal_period
-            })
-
-        self.logger.info(f"Inserted MACD results for {instrument} into SQLite.")
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['macd', 'signal', 'histogram'],
+            {'short_period': short_period, 'long_period': long_period, 'signal_period': signal_period}
+        )
+
+        logger.info(f"Inserted {rows} MACD results for {instrument} into SQLite.")
+
+
+class MACDState(IndicatorState):
+    """
+    Incremental MACD for live candles: three running EMAs, O(1) per update.
+    """
+
+    def __init__(self, short_period=12, long_period=26, signal_period=9):
+        super().__init__()
+        self.short = ExponentialAverage(short_period)
+        self.long = ExponentialAverage(long_period)
+        self.signal = ExponentialAverage(signal_period)
+
+    def update(self, candle):
+        close = candle_field(candle, 'close')
+        macd = self.short.push(close) - self.long.push(close)
+        signal = self.signal.push(macd)
+        self.value = {'macd': macd, 'signal': signal, 'histogram': macd - signal}
+        return self.value
 
 # Example usage:
 # macd_calculator = MACD(db_name="indicators.db")
@@ -1,7 +1,9 @@
 # backend/trading/indicators/mfi.py
+import numpy as np
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import NAN, IndicatorState, RollingWindow, candle_field, divide
 
 # Configure loggers
 logger = LogManager('mfi_logs').get_logger()
@@ -49,8 +51,11 @@ class MFI:
         df['previous_typical_price'] = df['typical_price'].shift(1)
 
         # Positive and negative money flow
-        df['money_flow_positive'] = df.apply(lambda row: row['money_flow'] if row['typical_price'] > row['previous_typical_price'] else 0, axis=1)
-        df['money_flow_negative'] = df.apply(lambda row: row['money_flow'] if row['typical_price'] < row['previous_typical_price'] else 0, axis=1)
+        # (comparisons against the missing first previous price are False, so that bar has no flow)
+        rising = df['typical_price'] > df['previous_typical_price']
+        falling = df['typical_price'] < df['previous_typical_price']
+        df['money_flow_positive'] = np.where(rising, df['money_flow'], 0.0)
+        df['money_flow_negative'] = np.where(falling, df['money_flow'], 0.0)
 
         # Rolling sums of positive and negative money flow
         positive_flow = df['money_flow_positive'].rolling(window=period).sum()
@@ -75,14 +80,37 @@ class MFI:
         :parameter result_df: DataFrame containing the calculated MFI values.
         :parameter period: Period for which the MFI was calculated.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
-
-        parameter_name = 'mfi'
-        # Insert MFI results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row['mfi']
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
-            self.db_handler.add_indicator_parameters(indicator_id, {'period': period})
-
-        logger.info(f"Inserted MFI results for {instrument} into SQLite.")
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['mfi'], {'period': period}
+        )
+
+        logger.info(f"Inserted {rows} MFI results for {instrument} into SQLite.")
+
+
+class MFIState(IndicatorState):
+    """
+    Incremental MFI for live candles: rolling sums of positive and negative money flow, O(1) per update.
+    """
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.positive = RollingWindow(period)
+        self.negative = RollingWindow(period)
+        self.previous_typical_price = None
+
+    def update(self, candle):
+        typical_price = (candle_field(candle, 'high') + candle_field(candle, 'low') + candle_field(candle, 'close')) / 3
+        money_flow = typical_price * candle_field(candle, 'volume')
+        previous = self.previous_typical_price
+        self.previous_typical_price = typical_price
+
+        self.positive.push(money_flow if previous is not None and typical_price > previous else 0.0)
+        self.negative.push(money_flow if previous is not None and typical_price < previous else 0.0)
+
+        if not self.positive.ready:
+            self.value = NAN
+        else:
+            ratio = divide(self.positive.total(), self.negative.total())
+            self.value = 100 - divide(100, 1 + ratio)
+        return self.value
@@ -1,7 +1,10 @@
 # backend/trading/indicators/obv.py
+import numpy as np
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._kernels import on_balance_volume
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import IndicatorState, candle_field
 
 # Configure loggers
 logger = LogManager('obv_logs').get_logger()
@@ -32,21 +35,41 @@ class OBV:
             logger.error("DataFrame must contain 'close' and 'volume' columns.")
             raise KeyError("DataFrame must contain 'close' and 'volume' columns.")
 
-        # Initialize the OBV column
-        df['obv'] = 0
-
-        # Calculate the OBV values based on price changes and volume
-        for i in range(1, len(df)):
-            if df['close'][i] > df['close'][i - 1]:
-                df['obv'][i] = df['obv'][i - 1] + df['volume'][i]
-            elif df['close'][i] < df['close'][i - 1]:
-                df['obv'][i] = df['obv'][i - 1] - df['volume'][i]
-            else:
-                df['obv'][i] = df['obv'][i - 1]
+        # Signed volume summed in one pass; a single column assignment instead of per-row writes
+        df['obv'] = on_balance_volume(df['close'], df['volume'])
 
         logger.info("OBV calculation completed.")
         return df
 
+    @staticmethod
+    def extend(df):
+        """
+        Calculate the OBV of rows appended since the last calculate/extend call, continuing from the
+        last computed value instead of recomputing the whole history.
+
+        :parameter df: DataFrame with 'close' and 'volume' columns whose 'obv' column is filled up to
+                       some row and NaN (or missing) after it.
+        :return: DataFrame with the OBV values.
+        """
+        if 'obv' not in df.columns:
+            return OBV.calculate(df)
+
+        obv = df['obv'].to_numpy(dtype=float)
+        filled = np.flatnonzero(~np.isnan(obv))
+        computed = filled[-1] + 1 if len(filled) else 0
+        if computed == 0:
+            return OBV.calculate(df)
+        if computed == len(obv):
+            return df
+
+        close = df['close'].to_numpy(dtype=float)
+        appended = on_balance_volume(close[computed:], df['volume'].to_numpy(dtype=float)[computed:],
+                                     previous_close=close[computed - 1], initial=obv[computed - 1])
+        df['obv'] = np.concatenate((obv[:computed], appended))
+
+        logger.info(f"OBV extended by {len(appended)} rows.")
+        return df
+
     def insert_results_to_db(self, indicator_name, instrument, result_df):
         """
         Insert the OBV results into the SQLite database.
@@ -55,13 +78,30 @@ class OBV:
         :parameter instrument: The instrument for which the calculation was made (e.g., 'EUR_USD').
         :parameter result_df: DataFrame containing the calculated OBV values.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['obv']
+        )
+
+        logger.info(f"Inserted {rows} OBV results for {instrument} into SQLite.")
+
+
+class OBVState(IndicatorState):
+    """
+    Incremental OBV for live candles: a running total of signed volume, O(1) per update.
+    """
 
-        parameter_name = 'obv'
-        # Insert OBV results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row['obv']
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
+    def __init__(self):
+        super().__init__()
+        self.previous_close = None
 
-        logger.info(f"Inserted OBV results for {instrument} into SQLite.")
+    def update(self, candle):
+        close, volume = candle_field(candle, 'close'), candle_field(candle, 'volume')
+        if self.previous_close is None:
+            self.value = 0.0
+        elif close > self.previous_close:
+            self.value += volume
+        elif close < self.previous_close:
+            self.value -= volume
+        self.previous_close = close
+        return self.value
@@ -0,0 +1,168 @@
+# backend/trading/indicators/outputs.py
+"""
+Non-mutating indicator API. Each indicator's calculate runs on a narrow frame holding only the columns
+it reads, so its helper columns never reach the caller's DataFrame. Only the outputs come back, named
+after the indicator and its parameters ('sma_20', 'rsi_14', 'macd_12_26_9_signal'), so several
+parameter sets of one indicator can sit side by side.
+
+Usage:
+    outputs = compute_indicator(df, 'rsi', period=14)               # standalone DataFrame with 'rsi_14'
+    compute_indicators(df, [('sma', {'period': 20}), ('sma', {'period': 50})], join=True)
+"""
+import inspect
+from typing import NamedTuple
+
+import pandas as pd
+from logs.log_manager import LogManager
+from backend.trading.indicators._kernels import HighLowExtrema
+from backend.trading.indicators.adx import ADX
+from backend.trading.indicators.aroon import Aroon
+from backend.trading.indicators.atr import ATR
+from backend.trading.indicators.bollinger import BollingerBands
+from backend.trading.indicators.cci import CCI
+from backend.trading.indicators.ema import EMA
+from backend.trading.indicators.ma_crossover import MACrossover
+from backend.trading.indicators.macd import MACD
+from backend.trading.indicators.mfi import MFI
+from backend.trading.indicators.obv import OBV
+from backend.trading.indicators.rsi import RSI
+from backend.trading.indicators.sma import SMA
+from backend.trading.indicators.stoch import StochasticOscillator
+from backend.trading.indicators.vwap import VWAP
+from backend.trading.indicators.williams_r import WilliamsR
+
+# Configure loggers
+logger = LogManager('indicator_outputs_logs').get_logger()
+
+
+class IndicatorSpec(NamedTuple):
+    """
+    :parameter calculate: The indicator's calculate function.
+    :parameter inputs: Columns calculate reads.
+    :parameter outputs: Column calculate writes -> suffix of the namespaced name ('' for the main output).
+                        Column names may contain {parameter} placeholders.
+    """
+    calculate: object
+    inputs: tuple
+    outputs: dict
+
+
+HLC = ('high', 'low', 'close')
+HLCV = ('high', 'low', 'close', 'volume')
+
+INDICATORS = {
+    'sma': IndicatorSpec(SMA.calculate, ('close',), {'sma': ''}),
+    'ema': IndicatorSpec(EMA.calculate, ('close',), {'ema': ''}),
+    'rsi': IndicatorSpec(RSI.calculate, ('close',), {'rsi': ''}),
+    'macd': IndicatorSpec(MACD.calculate, ('close',), {'macd': '', 'signal': 'signal', 'histogram': 'histogram'}),
+    'ma_crossover': IndicatorSpec(MACrossover.calculate, ('close',), {
+        'fast_ma': 'fast', 'slow_ma': 'slow', 'crossover': '', 'crossover_signal': 'signal'}),
+    'bollinger': IndicatorSpec(BollingerBands.calculate, ('close',), {
+        'middle_{period}': 'middle', 'upper_{period}': 'upper', 'lower_{period}': 'lower'}),
+    'atr': IndicatorSpec(ATR.calculate, HLC, {'atr': ''}),
+    'adx': IndicatorSpec(ADX.calculate, HLC, {'adx': '', 'plus_di': 'plus_di', 'minus_di': 'minus_di'}),
+    'cci': IndicatorSpec(CCI.calculate, HLC, {'cci': ''}),
+    'stoch': IndicatorSpec(StochasticOscillator.calculate, HLC, {'stoch': '', 'stoch_signal': 'signal'}),
+    'williams_r': IndicatorSpec(WilliamsR.calculate, HLC, {'williams_r': ''}),
+    'aroon': IndicatorSpec(Aroon.calculate, ('high', 'low'), {'aroon_up': 'up', 'aroon_down': 'down'}),
+    'mfi': IndicatorSpec(MFI.calculate, HLCV, {'mfi': ''}),
+    'vwap': IndicatorSpec(VWAP.calculate, HLCV, {'vwap': ''}),
+    'obv': IndicatorSpec(OBV.calculate, ('close', 'volume'), {'obv': ''}),
+}
+
+
+def resolve_parameters(name, parameters):
+    """
+    Look up an indicator and complete its parameters with the calculate defaults, in signature order.
+    """
+    spec = INDICATORS.get(name)
+    if spec is None:
+        raise ValueError(f"Unknown indicator: {name}")
+    signature = inspect.signature(spec.calculate)
+    unknown = set(parameters) - set(signature.parameters)
+    if unknown:
+        raise TypeError(f"{name} does not take the parameters {sorted(unknown)}")
+    resolved = {
+        parameter: parameters.get(parameter, default.default)
+        for parameter, default in signature.parameters.items()
+        if parameter not in ('df', 'extrema')
+    }
+    return spec, resolved
+
+
+def _format(value):
+    return format(value, 'g') if isinstance(value, float) else str(value)
+
+
+def output_names(name, **parameters):
+    """
+    Namespaced output column names of an indicator, e.g. output_names('macd') ->
+    ['macd_12_26_9', 'macd_12_26_9_signal', 'macd_12_26_9_histogram'].
+    """
+    spec, parameters = resolve_parameters(name, parameters)
+    base = '_'.join([name, *(_format(value) for value in parameters.values())])
+    return [f"{base}_{suffix}" if suffix else base for suffix in spec.outputs.values()]
+
+
+def compute_indicator(df, name, join=False, extrema=None, **parameters):
+    """
+    Calculate one indicator without modifying df.
+
+    :parameter df: DataFrame with the input columns of the indicator.
+    :parameter name: Indicator name, a key of INDICATORS (e.g. 'rsi').
+    :parameter join: False returns the outputs as a new DataFrame sharing df's index; True adds them
+                     to df in place and returns df.
+    :parameter extrema: Optional HighLowExtrema of df, shared by aroon/stoch/williams_r.
+    :parameter parameters: Indicator parameters; missing ones take the calculate defaults.
+    :return: DataFrame of the namespaced outputs (or df when join=True). Outputs the indicator could not
+             produce (e.g. too few bars) are all NaN.
+    """
+    spec, resolved = resolve_parameters(name, parameters)
+    missing = [column for column in spec.inputs if column not in df.columns]
+    if missing:
+        logger.error(f"DataFrame is missing the {missing} columns required by {name}.")
+        raise KeyError(f"DataFrame must contain {list(spec.inputs)} columns.")
+
+    # Selecting columns gives a new frame, so calculate's helper columns stay out of df
+    frame = df[list(spec.inputs)]
+    if extrema is not None and 'extrema' in inspect.signature(spec.calculate).parameters:
+        frame = spec.calculate(frame, extrema=extrema, **resolved)
+    else:
+        frame = spec.calculate(frame, **resolved)
+
+    outputs = {}
+    for (column, _), output in zip(spec.outputs.items(), output_names(name, **resolved)):
+        column = column.format(**resolved)
+        outputs[output] = frame[column].to_numpy(dtype=float) if column in frame.columns else float('nan')
+
+    if join:
+        for output, values in outputs.items():
+            df[output] = values
+        return df
+    return pd.DataFrame(outputs, index=df.index)
+
+
+def compute_indicators(df, requests, join=False):
+    """
+    Calculate several indicators without modifying df, sharing the rolling high/low passes between
+    aroon, stoch and williams_r.
+
+    :parameter df: DataFrame of candles.
+    :parameter requests: Iterable of (name, parameters dict) pairs.
+    :parameter join: False returns the outputs as one new DataFrame; True adds them to df in place and
+                     returns df.
+    :return: DataFrame of every namespaced output (or df when join=True).
+    """
+    extrema = None
+    results = []
+    for name, parameters in requests:
+        if name in ('aroon', 'stoch', 'williams_r') and extrema is None:
+            extrema = HighLowExtrema(df['high'], df['low'])
+        results.append(compute_indicator(df, name, extrema=extrema, **(parameters or {})))
+
+    outputs = pd.concat(results, axis=1) if results else pd.DataFrame(index=df.index)
+    if join:
+        for column in outputs.columns:
+            df[column] = outputs[column].to_numpy()
+        return df
+    return outputs
@@ -0,0 +1,408 @@
+# backend/trading/indicators/planner.py
+"""
+Indicator dependency graph. Every indicator is declared as a small graph of operations over the
+candle columns, and the graphs of a requested set are merged into one plan in which identical
+operations (same operation, same inputs, same parameters) are a single node. Evaluating the plan
+therefore derives each shared intermediate once: the true range behind ATR and ADX, the typical
+price behind CCI, MFI and VWAP, the EMAs behind EMA and MACD, the SMA behind SMA and Bollinger, and
+the rolling highs/lows behind Stochastic, Williams %R and Aroon.
+
+Outputs carry the namespaced names of outputs.compute_indicator and the same values.
+
+Usage:
+    plan = IndicatorPlan([('atr', {'period': 14}), ('adx', {'period': 14}), ('cci', {})])
+    print(plan.explain())          # nodes in evaluation order, what they share and provide
+    outputs = plan.evaluate(df)    # DataFrame with 'atr_14', 'adx_14', 'adx_14_plus_di', ...
+"""
+from typing import Callable, NamedTuple
+
+import numpy as np
+import pandas as pd
+from logs.log_manager import LogManager
+from backend.trading.indicators._kernels import (
+    as_array, on_balance_volume, rolling_extremum, rolling_mean_deviation, true_range,
+)
+from backend.trading.indicators.outputs import output_names, resolve_parameters
+
+# Configure loggers
+logger = LogManager('indicator_planner_logs').get_logger()
+
+
+class Node(NamedTuple):
+    """
+    One operation of a plan. Nodes are compared by value, so building the same operation twice
+    yields the same node.
+    """
+    operation: str
+    inputs: tuple
+    parameters: tuple
+
+
+## ================================================
+## ✅ OPERATIONS
+## ================================================
+
+def _rolling(values, period):
+    return pd.Series(values).rolling(window=period)
+
+
+def _previous(values):
+    return np.concatenate(([np.nan], values[:-1]))
+
+
+def _directional_movement(high, low, direction):
+    up_move = high - _previous(high)
+    down_move = _previous(low) - low
+    if direction == 'plus':
+        return np.where(up_move > down_move, up_move, 0)
+    return np.where(down_move > up_move, down_move, 0)
+
+
+def _money_flow_split(typical_price, money_flow, direction):
+    # Comparisons against the missing first previous price are False, so that bar has no flow
+    previous = _previous(typical_price)
+    moved = typical_price > previous if direction == 'positive' else typical_price < previous
+    return np.where(moved, money_flow, 0.0)
+
+
+# Operation name -> function of the input node values and the node parameters. The formulas
+# follow the indicators' calculate methods step by step, so the results are identical.
+OPERATIONS = {
+    # Shared intermediates
+    'true_range': true_range,
+    'typical_price': lambda high, low, close: (high + low + close) / 3,
+    'price_change': lambda close: close - _previous(close),
+    'rolling_mean': lambda values, period: _rolling(values, period).mean().to_numpy(),
+    'rolling_sum': lambda values, period: _rolling(values, period).sum().to_numpy(),
+    'rolling_std': lambda values, period: _rolling(values, period).std().to_numpy(),
+    'rolling_mean_deviation': rolling_mean_deviation,
+    'rolling_max': lambda values, period: rolling_extremum(values, period, 'max'),
+    'rolling_min': lambda values, period: rolling_extremum(values, period, 'min'),
+    'ewm': lambda values, span: pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy(),
+    'money_flow': lambda typical_price, volume: typical_price * volume,
+    # Indicator steps
+    'gains': lambda change: np.where(change > 0, change, 0),
+    'losses': lambda change: -np.where(change < 0, change, 0),
+    'rsi': lambda gain, loss: 100 - (100 / (1 + gain / loss)),
+    'difference': lambda left, right: left - right,
+    'sign': lambda values: np.where(values > 0, 1.0, -1.0),
+    'upper_band': lambda middle, deviation, width: middle + deviation * width,
+    'lower_band': lambda middle, deviation, width: middle - deviation * width,
+    'directional_movement': _directional_movement,
+    'directional_indicator': lambda movement, range_sum: 100 * (movement / range_sum),
+    'directional_index': lambda plus_di, minus_di: 100 * (np.abs(plus_di - minus_di) / (plus_di + minus_di)),
+    'fill_missing': lambda values, value: np.where(np.isnan(values), value, values),
+    'cci': lambda typical_price, mean, deviation: (typical_price - mean) / (0.015 * deviation),
+    'money_flow_split': _money_flow_split,
+    'mfi': lambda positive, negative: 100 - (100 / (1 + positive / negative)),
+    'vwap': lambda money_flow, volume: (pd.Series(money_flow).cumsum() / pd.Series(volume).cumsum()).to_numpy(),
+    'extremum': lambda extremum: extremum[0],
+    'extremum_position': lambda extremum: extremum[1],
+    'stoch': lambda close, highest, lowest: 100 * ((close - lowest) / (highest - lowest)),
+    'williams_r': lambda close, highest, lowest: (highest - close) / (highest - lowest) * -100,
+    'aroon': lambda position, period: (position + 1) / period * 100,
+    'obv': on_balance_volume,
+}
+
+
+## ================================================
+## ✅ INDICATOR GRAPHS
+## ================================================
+
+class IndicatorGraph(NamedTuple):
+    """
+    :parameter build: Function (plan, **parameters) -> dict of output suffix (as in
+                      outputs.INDICATORS, '' for the main output) -> Node.
+    :parameter min_bars: Parameter holding the fewest bars calculate accepts (None: no minimum).
+                         With fewer bars the outputs are NaN, as calculate leaves them unset.
+    """
+    build: Callable
+    min_bars: str = None
+
+
+def _sma(plan, period):
+    return {'': plan.node('rolling_mean', plan.column('close'), period=period)}
+
+
+def _ema(plan, period):
+    return {'': plan.node('ewm', plan.column('close'), span=period)}
+
+
+def _rsi(plan, period):
+    change = plan.node('price_change', plan.column('close'))
+    gain = plan.node('rolling_mean', plan.node('gains', change), period=period)
+    loss = plan.node('rolling_mean', plan.node('losses', change), period=period)
+    return {'': plan.node('rsi', gain, loss)}
+
+
+def _macd(plan, short_period, long_period, signal_period):
+    close = plan.column('close')
+    macd = plan.node('difference', plan.node('ewm', close, span=short_period), plan.node('ewm', close, span=long_period))
+    signal = plan.node('ewm', macd, span=signal_period)
+    return {'': macd, 'signal': signal, 'histogram': plan.node('difference', macd, signal)}
+
+
+def _ma_crossover(plan, fast_period, slow_period):
+    close = plan.column('close')
+    fast = plan.node('rolling_mean', close, period=fast_period)
+    slow = plan.node('rolling_mean', close, period=slow_period)
+    crossover = plan.node('difference', fast, slow)
+    return {'fast': fast, 'slow': slow, '': crossover, 'signal': plan.node('sign', crossover)}
+
+
+def _bollinger(plan, period, std):
+    close = plan.column('close')
+    middle = plan.node('rolling_mean', close, period=period)
+    deviation = plan.node('rolling_std', close, period=period)
+    return {'middle': middle, 'upper': plan.node('upper_band', middle, deviation, width=std),
+            'lower': plan.node('lower_band', middle, deviation, width=std)}
+
+
+def _true_range(plan):
+    return plan.node('true_range', plan.column('high'), plan.column('low'), plan.column('close'))
+
+
+def _typical_price(plan):
+    return plan.node('typical_price', plan.column('high'), plan.column('low'), plan.column('close'))
+
+
+def _atr(plan, period):
+    return {'': plan.node('rolling_mean', _true_range(plan), period=period)}
+
+
+def _adx(plan, period):
+    high, low = plan.column('high'), plan.column('low')
+    range_sum = plan.node('rolling_sum', _true_range(plan), period=period)
+    di = {
+        direction: plan.node('directional_indicator', plan.node(
+            'rolling_sum', plan.node('directional_movement', high, low, direction=direction), period=period
+        ), range_sum)
+        for direction in ('plus', 'minus')
+    }
+    dx = plan.node('directional_index', di['plus'], di['minus'])
+    adx = plan.node('fill_missing', plan.node('rolling_mean', dx, period=period), value=0)
+    return {'': adx, 'plus_di': di['plus'], 'minus_di': di['minus']}
+
+
+def _cci(plan, period):
+    typical_price = _typical_price(plan)
+    return {'': plan.node('cci', typical_price, plan.node('rolling_mean', typical_price, period=period),
+                          plan.node('rolling_mean_deviation', typical_price, period=period))}
+
+
+def _mfi(plan, period):
+    typical_price = _typical_price(plan)
+    money_flow = plan.node('money_flow', typical_price, plan.column('volume'))
+    positive, negative = (
+        plan.node('rolling_sum', plan.node('money_flow_split', typical_price, money_flow, direction=direction),
+                  period=period)
+        for direction in ('positive', 'negative')
+    )
+    return {'': plan.node('mfi', positive, negative)}
+
+
+def _vwap(plan):
+    money_flow = plan.node('money_flow', _typical_price(plan), plan.column('volume'))
+    return {'': plan.node('vwap', money_flow, plan.column('volume'))}
+
+
+def _extrema(plan, period):
+    return (plan.node('rolling_max', plan.column('high'), period=period),
+            plan.node('rolling_min', plan.column('low'), period=period))
+
+
+def _stoch(plan, period):
+    highest, lowest = (plan.node('extremum', extremum) for extremum in _extrema(plan, period))
+    stoch = plan.node('stoch', plan.column('close'), highest, lowest)
+    return {'': stoch, 'signal': plan.node('rolling_mean', stoch, period=3)}
+
+
+def _williams_r(plan, period):
+    highest, lowest = (plan.node('extremum', extremum) for extremum in _extrema(plan, period))
+    return {'': plan.node('williams_r', plan.column('close'), highest, lowest)}
+
+
+def _aroon(plan, period):
+    highest, lowest = (plan.node('extremum_position', extremum) for extremum in _extrema(plan, period))
+    return {'up': plan.node('aroon', highest, period=period), 'down': plan.node('aroon', lowest, period=period)}
+
+
+def _obv(plan):
+    return {'': plan.node('obv', plan.column('close'), plan.column('volume'))}
+
+
+GRAPHS = {
+    'sma': IndicatorGraph(_sma, 'period'),
+    'ema': IndicatorGraph(_ema, 'period'),
+    'rsi': IndicatorGraph(_rsi, 'period'),
+    'macd': IndicatorGraph(_macd, 'long_period'),
+    'ma_crossover': IndicatorGraph(_ma_crossover, 'slow_period'),
+    'bollinger': IndicatorGraph(_bollinger, 'period'),
+    'atr': IndicatorGraph(_atr, 'period'),
+    'adx': IndicatorGraph(_adx, 'period'),
+    'cci': IndicatorGraph(_cci, 'period'),
+    'stoch': IndicatorGraph(_stoch, 'period'),
+    'williams_r': IndicatorGraph(_williams_r, 'period'),
+    'aroon': IndicatorGraph(_aroon, 'period'),
+    'mfi': IndicatorGraph(_mfi, 'period'),
+    'vwap': IndicatorGraph(_vwap),
+    'obv': IndicatorGraph(_obv),
+}
+
+
+## ================================================
+## ✅ PLAN
+## ================================================
+
+class PlannedRequest(NamedTuple):
+    name: str
+    parameters: dict
+    min_bars: int
+    outputs: dict  # namespaced output column -> Node
+
+
+class IndicatorPlan:
+    """
+    Merged dependency graph of a set of indicator requests.
+
+    Nodes are kept in the order they were first built, which is a valid evaluation order because a
+    node's inputs are always built before it.
+    """
+
+    def __init__(self, requests):
+        """
+        :parameter requests: Iterable of (name, parameters dict) pairs, as for outputs.compute_indicators.
+        """
+        self.nodes = {}  # Node -> node number, in evaluation order
+        self.requests = []
+        for name, parameters in requests:
+            spec, resolved = resolve_parameters(name, parameters or {})
+            graph = GRAPHS[name]
+            names = dict(zip(spec.outputs.values(), output_names(name, **resolved)))
+            outputs = {names[suffix]: node for suffix, node in graph.build(self, **resolved).items()}
+            min_bars = resolved[graph.min_bars] if graph.min_bars else 0
+            self.requests.append(PlannedRequest(name, resolved, min_bars, outputs))
+
+    def node(self, operation, *inputs, **parameters):
+        """
+        Return the node of an operation, adding it to the plan unless an identical one exists.
+        """
+        if operation != 'column' and operation not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {operation}")
+        node = Node(operation, inputs, tuple(sorted(parameters.items())))
+        self.nodes.setdefault(node, len(self.nodes))
+        return node
+
+    def column(self, name):
+        """
+        Return the source node reading a candle column.
+        """
+        return self.node('column', name=name)
+
+    def uses(self):
+        """
+        :return: Dict of Node -> number of nodes taking it as an input plus requested outputs it provides.
+        """
+        counts = dict.fromkeys(self.nodes, 0)
+        for node in self.nodes:
+            for source in node.inputs:
+                counts[source] += 1
+        for request in self.requests:
+            for node in request.outputs.values():
+                counts[node] += 1
+        return counts
+
+    def explain(self):
+        """
+        Describe the plan: every node in evaluation order with its inputs, the outputs it provides and,
+        for shared nodes, how many nodes and outputs use it.
+
+        :return: Multi-line string.
+        """
+        uses = self.uses()
+        provides = {}
+        for request in self.requests:
+            for column, node in request.outputs.items():
+                provides.setdefault(node, []).append(column)
+
+        lines = [
+            f"IndicatorPlan: {len(self.requests)} requests, {len(self.nodes)} nodes, "
+            f"{sum(count > 1 for count in uses.values())} shared"
+        ]
+        for node, number in self.nodes.items():
+            arguments = [f"n{self.nodes[source]}" for source in node.inputs]
+            arguments += [f"{parameter}={value}" for parameter, value in node.parameters]
+            line = f"  n{number:<3} {node.operation}({', '.join(arguments)})"
+            notes = []
+            if uses[node] > 1:
+                notes.append(f"shared x{uses[node]}")
+            if node in provides:
+                notes.append(f"-> {', '.join(provides[node])}")
+            lines.append(f"{line:<60} {'  '.join(notes)}".rstrip())
+        return '\n'.join(lines)
+
+    def evaluate(self, df, join=False):
+        """
+        Evaluate the plan on a candle frame without modifying it (unless join=True).
+
+        :parameter df: DataFrame with the columns the requested indicators read.
+        :parameter join: False returns the outputs as a new DataFrame sharing df's index; True adds them
+                         to df in place and returns df.
+        :return: DataFrame of every namespaced output (or df when join=True). Outputs of indicators
+                 given fewer bars than they need are all NaN, like outputs.compute_indicator.
+        """
+        active = [request for request in self.requests if len(df) >= request.min_bars]
+        for request in self.requests:
+            if request not in active:
+                logger.warning(f"Insufficient data for {request.name} {request.parameters}.")
+
+        # Only the nodes the active requests depend on are evaluated
+        needed = set()
+        pending = [node for request in active for node in request.outputs.values()]
+        while pending:
+            node = pending.pop()
+            if node not in needed:
+                needed.add(node)
+                pending.extend(node.inputs)
+
+        missing = sorted({dict(node.parameters)['name'] for node in needed if node.operation == 'column'}
+                         - set(df.columns))
+        if missing:
+            logger.error(f"DataFrame is missing the {missing} columns required by the plan.")
+            raise KeyError(f"DataFrame must contain {missing} columns.")
+
+        values = {}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for node in self.nodes:
+                if node not in needed:
+                    continue
+                parameters = dict(node.parameters)
+                if node.operation == 'column':
+                    values[node] = as_array(df[parameters['name']])
+                else:
+                    values[node] = OPERATIONS[node.operation](*(values[source] for source in node.inputs),
+                                                              **parameters)
+
+        outputs = {}
+        for request in self.requests:
+            for column, node in request.outputs.items():
+                outputs[column] = np.asarray(values[node], dtype=float) if node in values else float('nan')
+        logger.info(f"Evaluated {len(needed)} plan nodes for {len(active)} indicator requests.")
+
+        if join:
+            for column, output in outputs.items():
+                df[column] = output
+            return df
+        return pd.DataFrame(outputs, index=df.index)
+
+
+def evaluate_indicators(df, requests, join=False):
+    """
+    Plan and evaluate a set of indicator requests in one go; see IndicatorPlan.
+
+    :parameter df: DataFrame of candles.
+    :parameter requests: Iterable of (name, parameters dict) pairs.
+    :parameter join: False returns the outputs as one new DataFrame; True adds them to df in place.
+    :return: DataFrame of every namespaced output (or df when join=True).
+    """
+    return IndicatorPlan(requests).evaluate(df, join=join)
@@ -0,0 +1,258 @@
+# backend/trading/indicators/result_cache.py
+"""
+Memoization in front of the indicator calculations. Results are keyed by
+(instrument, granularity, data version, indicator, parameters), where the data version identifies the
+candles the indicator ran on, so a result is reused only for identical data and new candles miss
+automatically. Entries live in a byte-bounded in-memory LRU with an optional on-disk tier below it.
+
+Usage:
+    cache = IndicatorCache(cache_dir='databases/indicator_cache')
+    rsi = cache.compute_indicator(df, 'rsi', instrument='EUR_USD', granularity='M1', period=14)
+    cache.stats()  # {'hits': ..., 'misses': ..., 'hit_rate': ...}
+"""
+import hashlib
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from logs.log_manager import LogManager
+from backend.data.utils.utils import to_python
+from backend.trading.indicators.outputs import compute_indicator, output_names, resolve_parameters
+from backend.trading.indicators.planner import IndicatorPlan
+
+# Configure loggers
+logger = LogManager('indicator_cache_logs').get_logger()
+
+# Columns a candle frame's content version is computed from (those present)
+VERSION_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def data_version(df, columns=VERSION_COLUMNS):
+    """
+    Content hash of a candle frame: its index and the candle columns it has. Any changed, added or removed
+    candle changes the version.
+
+    Hashing reads every value once, so callers that already know a cheaper identity for their data (e.g.
+    the row count and newest timestamp from SQLite) can pass that as the version instead.
+
+    :return: Hex digest string.
+    """
+    columns = [column for column in columns if column in df.columns]
+    row_hashes = pd.util.hash_pandas_object(df[columns], index=True).to_numpy()
+    digest = hashlib.blake2b(row_hashes.tobytes(), digest_size=16)
+    digest.update(','.join(columns).encode())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    LRU cache of indicator outputs (the namespaced columns of outputs.compute_indicator).
+
+    The in-memory tier holds at most max_bytes of result arrays and evicts the least recently used
+    entries beyond that. With a cache_dir, every computed result is also written there as an .npz file
+    and memory misses are looked up on disk before recomputing, so results survive restarts and are
+    shared between processes. Thread-safe.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, cache_dir=None):
+        """
+        :parameter max_bytes: Size bound of the in-memory tier.
+        :parameter cache_dir: Directory of the on-disk tier (None disables it).
+        """
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(name, instrument, granularity, version, parameters):
+        """
+        Cache key of one indicator result; parameters are completed with the calculate defaults so
+        rsi() and rsi(period=14) share an entry.
+        """
+        _, resolved = resolve_parameters(name, parameters)
+        # NumPy scalars become plain numbers so the key (and its on-disk file name) is stable
+        resolved = tuple((parameter, to_python(value)) for parameter, value in resolved.items())
+        return (instrument, granularity, version, name, resolved)
+
+    def compute_indicator(self, df, name, instrument=None, granularity=None, version=None, extrema=None,
+                          **parameters):
+        """
+        Cached outputs.compute_indicator. The result is a new DataFrame on df's index, so modifying it
+        does not affect the cache.
+
+        :parameter df: DataFrame of candles.
+        :parameter name: Indicator name (a key of outputs.INDICATORS).
+        :parameter instrument: Instrument the candles belong to (part of the key).
+        :parameter granularity: Granularity of the candles (part of the key).
+        :parameter version: Identity of the candle data; defaults to data_version(df).
+        :parameter extrema: Optional HighLowExtrema of df, used on a miss.
+        :return: DataFrame of the namespaced outputs.
+        """
+        version = data_version(df) if version is None else version
+        key = self.key(name, instrument, granularity, version, parameters)
+
+        arrays = self.get(key)
+        if arrays is None:
+            outputs = compute_indicator(df, name, extrema=extrema, **parameters)
+            arrays = {column: outputs[column].to_numpy() for column in outputs.columns}
+            self.put(key, arrays)
+        return pd.DataFrame(arrays, index=df.index)
+
+    def compute_indicators(self, df, requests, instrument=None, granularity=None, version=None, join=False):
+        """
+        Cached batch of indicators: the data version is computed once, and the requests that miss are
+        evaluated together as one IndicatorPlan, so they share their intermediates.
+
+        :parameter requests: Iterable of (name, parameters dict) pairs.
+        :parameter join: False returns the outputs as one new DataFrame; True adds them to df in place.
+        :return: DataFrame of every namespaced output (or df when join=True).
+        """
+        version = data_version(df) if version is None else version
+        keyed = {}
+        for name, parameters in requests:
+            parameters = parameters or {}
+            keyed.setdefault(self.key(name, instrument, granularity, version, parameters), (name, parameters))
+
+        results = {key: self.get(key) for key in keyed}
+        missing = [key for key, arrays in results.items() if arrays is None]
+        if missing:
+            outputs = IndicatorPlan([keyed[key] for key in missing]).evaluate(df)
+            for key in missing:
+                name, parameters = keyed[key]
+                arrays = {column: outputs[column].to_numpy() for column in output_names(name, **parameters)}
+                self.put(key, arrays)
+                results[key] = arrays
+
+        columns = {column: values for arrays in results.values() for column, values in arrays.items()}
+        if join:
+            for column, values in columns.items():
+                df[column] = values.copy()
+            return df
+        return pd.DataFrame(columns, index=df.index)
+
+    ## ================================================
+    ## ✅ STORAGE
+    ## ================================================
+
+    def get(self, key):
+        """
+        :return: Dict of output arrays for the key, or None on a miss (counted).
+        """
+        with self._lock:
+            arrays = self._entries.get(key)
+            if arrays is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return arrays
+
+        arrays = self._read_disk(key)
+        with self._lock:
+            if arrays is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, arrays)
+        return arrays
+
+    def put(self, key, arrays):
+        """
+        Store output arrays under a key in memory and, with a cache_dir, on disk.
+        """
+        arrays = {column: np.array(values, dtype=float) for column, values in arrays.items()}
+        for values in arrays.values():
+            values.flags.writeable = False
+        self._remember(key, arrays)
+        self._write_disk(key, arrays)
+
+    def _remember(self, key, arrays):
+        size = sum(values.nbytes for values in arrays.values())
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= sum(values.nbytes for values in previous.values())
+            if size > self.max_bytes:
+                return
+            self._entries[key] = arrays
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.bytes -= sum(values.nbytes for values in evicted.values())
+                self.evictions += 1
+
+    def _disk_path(self, key):
+        digest = hashlib.blake2b(repr(key).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.npz")
+
+    def _read_disk(self, key):
+        if not self.cache_dir:
+            return None
+        try:
+            with np.load(self._disk_path(key)) as stored:
+                return {column: stored[column] for column in stored.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, arrays):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        # Written under a unique name and renamed, so readers never see a partial file
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp.npz"
+        try:
+            np.savez(tmp_path, **arrays)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write indicator cache file {path}: {e}")
+
+    ## ================================================
+    ## ✅ MAINTENANCE
+    ## ================================================
+
+    def stats(self):
+        """
+        :return: Dict with the hit/miss counters, the hit rate and the in-memory size.
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+            }
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info(f"Indicator cache: {stats['hits']} hits, {stats['disk_hits']} disk hits, {stats['misses']} misses "
+                    f"({stats['hit_rate']:.1%}), {stats['entries']} entries, {stats['bytes'] / 1e6:.1f} MB.")
+        return stats
+
+    def clear(self, disk=False):
+        """
+        Drop the in-memory entries (and the on-disk files with disk=True). Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+        if disk and self.cache_dir:
+            for file_name in os.listdir(self.cache_dir):
+                if file_name.endswith('.npz'):
+                    os.remove(os.path.join(self.cache_dir, file_name))
+
+
+# Shared by the components that compute indicators in-process, so identical requests hit one cache
+indicator_cache = IndicatorCache()
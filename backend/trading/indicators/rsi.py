@@ -1,7 +1,9 @@
 import numpy as np
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._kernels import as_array, rolling_sum_many
+from backend.trading.indicators._streaming import NAN, IndicatorState, RollingWindow, candle_field, divide
 
 # Configure loggers
 logger = LogManager('rsi_logs').get_logger()
@@ -51,6 +53,32 @@ class RSI:
         logger.info(f"RSI calculation for period {period} completed.")
         return df
 
+    @staticmethod
+    def calculate_many(close, periods):
+        """
+        Calculate the RSI for many periods at once from shared cumulative sums of gains and losses.
+
+        :parameter close: Series or array of close prices.
+        :parameter periods: Iterable of lookback periods (e.g. range(5, 51)).
+        :return: NumPy array of shape (n_bars, n_periods), column j holding the RSI for periods[j].
+        """
+        close = as_array(close)
+        delta = np.diff(close, prepend=np.nan)
+
+        # Like delta.where(delta > 0, 0): the undefined first change counts as zero
+        gain = rolling_sum_many(np.where(delta > 0, delta, 0.0), periods)
+        loss = rolling_sum_many(np.where(delta < 0, -delta, 0.0), periods)
+
+        # 100 - 100 / (1 + gain / loss) == 100 * gain / (gain + loss), computed in place
+        loss += gain
+        gain *= 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            gain /= loss
+        result = gain
+
+        logger.info(f"RSI batch calculation for {result.shape[1]} periods completed.")
+        return result
+
     def insert_results_to_db(self, indicator_name, instrument, result_df, period):
         """
         Insert the RSI results into the SQLite database.
@@ -60,14 +88,36 @@ class RSI:
         :parameter result_df: DataFrame containing the calculated RSI values.
         :parameter period: Period for which the RSI was calculated.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            [indicator_name.lower()], {'period': period}
+        )
+
+        logger.info(f"Inserted {rows} RSI results for {instrument} into SQLite.")
+
+
+class RSIState(IndicatorState):
+    """
+    Incremental RSI for live candles: rolling windows of gains and losses, O(1) per update.
+    """
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.gains = RollingWindow(period)
+        self.losses = RollingWindow(period)
+        self.previous_close = None
+
+    def update(self, candle):
+        close = candle_field(candle, 'close')
+        # The first candle has no change and counts as zero gain and zero loss, like the batch version
+        delta = 0.0 if self.previous_close is None else close - self.previous_close
+        self.previous_close = close
 
-        parameter_name = indicator_name.lower()
-        # Insert RSI results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row[parameter_name]
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
-            self.db_handler.add_indicator_parameters(indicator_id, {'period': period})
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
 
-        logger.info(f"Inserted RSI results for {instrument} into SQLite.")
+        if not self.gains.ready:
+            self.value = NAN
+        else:
+            self.value = 100 - divide(100, 1 + divide(self.gains.average(), self.losses.average()))
+        return self.value
@@ -1,7 +1,9 @@
 # backend/trading/indicators/sma.py
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._kernels import rolling_mean_many
+from backend.trading.indicators._streaming import IndicatorState, RollingWindow, candle_field
 
 # Configure loggers
 logger = LogManager('sma_logs').get_logger()
@@ -41,6 +43,19 @@ class SMA:
         logger.info(f"SMA calculation for period {period} completed.")
         return df
 
+    @staticmethod
+    def calculate_many(close, periods):
+        """
+        Calculate the SMA for many periods at once from a single cumulative sum.
+
+        :parameter close: Series or array of close prices.
+        :parameter periods: Iterable of lookback periods (e.g. range(5, 201)).
+        :return: NumPy array of shape (n_bars, n_periods), column j holding the SMA for periods[j].
+        """
+        result = rolling_mean_many(close, periods)
+        logger.info(f"SMA batch calculation for {result.shape[1]} periods completed.")
+        return result
+
     def insert_results_to_db(self, indicator_name, instrument, result_df, period):
         """
         Insert the SMA results into the SQLite database.
@@ -50,14 +65,24 @@ class SMA:
         :parameter result_df: DataFrame containing the calculated SMA values.
         :parameter period: Period for which the SMA was calculated.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            [indicator_name.lower()], {'period': period}
+        )
+
+        logger.info(f"Inserted {rows} SMA results for {instrument} into SQLite.")
+
+
+class SMAState(IndicatorState):
+    """
+    Incremental SMA for live candles: a rolling window of closes, O(1) per update.
+    """
 
-        parameter_name = indicator_name.lower()
-        # Insert SMA results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row[parameter_name]
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
-            self.db_handler.add_indicator_parameters(indicator_id, {'period': period})
+    def __init__(self, period=14):
+        super().__init__()
+        self.window = RollingWindow(period)
 
-        logger.info(f"Inserted SMA results for {instrument} into SQLite.")
+    def update(self, candle):
+        self.window.push(candle_field(candle, 'close'))
+        self.value = self.window.average()
+        return self.value
@@ -1,7 +1,9 @@
 # backend/trading/indicators/stoch.py
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._kernels import HighLowExtrema
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import IndicatorState, RollingExtremum, RollingWindow, candle_field, divide
 
 # Configure loggers
 logger = LogManager('stochastic_logs').get_logger()
@@ -16,12 +18,14 @@ class StochasticOscillator:
         self.db_handler = SQLiteDBHandler(db_name=db_name)
 
     @staticmethod
-    def calculate(df, period=14):
+    def calculate(df, period=14, extrema=None):
         """
         Calculate the Stochastic Oscillator for a given DataFrame.
         
         :parameter df: DataFrame with 'high', 'low', and 'close' prices.
         :parameter period: Lookback period for Stochastic Oscillator calculation.
+        :parameter extrema: Optional HighLowExtrema of df, to share the rolling high/low passes with
+                            other indicators on the same frame.
         :return: DataFrame with the Stochastic Oscillator values.
         """
         # Ensure the necessary columns exist
@@ -34,8 +38,9 @@ class StochasticOscillator:
             return df
 
         # Calculate the rolling highest high and lowest low over the period
-        df['highest_high'] = df['high'].rolling(window=period).max()
-        df['lowest_low'] = df['low'].rolling(window=period).min()
+        extrema = HighLowExtrema.resolve(df, extrema)
+        df['highest_high'] = extrema.highest(period)[0]
+        df['lowest_low'] = extrema.lowest(period)[0]
 
         # Calculate the %K (Stochastic Oscillator value)
         df['stoch'] = 100 * ((df['close'] - df['lowest_low']) / (df['highest_high'] - df['lowest_low']))
@@ -55,14 +60,31 @@ class StochasticOscillator:
         :parameter result_df: DataFrame containing the calculated Stochastic Oscillator values.
         :parameter period: Period for which the Stochastic Oscillator was calculated.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['stoch'], {'period': period}
+        )
 
-        parameter_name = 'stoch'
-        # Insert Stochastic Oscillator results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row[parameter_name]
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
-            self.db_handler.add_indicator_parameters(indicator_id, {'period': period})
+        logger.info(f"Inserted {rows} Stochastic Oscillator results for {instrument} into SQLite.")
 
-        logger.info(f"Inserted Stochastic Oscillator results for {instrument} into SQLite.")
+
+class StochasticOscillatorState(IndicatorState):
+    """
+    Incremental Stochastic Oscillator for live candles: monotonic deques for the rolling high/low, O(1) per update.
+    """
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.highs = RollingExtremum(period, 'max')
+        self.lows = RollingExtremum(period, 'min')
+        self.signal = RollingWindow(3)
+
+    def update(self, candle):
+        self.highs.push(candle_field(candle, 'high'))
+        self.lows.push(candle_field(candle, 'low'))
+        highest_high, lowest_low = self.highs.value(), self.lows.value()
+
+        stoch = 100 * divide(candle_field(candle, 'close') - lowest_low, highest_high - lowest_low)
+        self.signal.push(stoch)
+        self.value = {'stoch': stoch, 'stoch_signal': self.signal.average()}
+        return self.value
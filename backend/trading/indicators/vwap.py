@@ -1,7 +1,8 @@
 # backend/trading/indicators/vwap.py
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import IndicatorState, candle_field, divide
 
 # Configure loggers
 logger = LogManager('vwap_logs').get_logger()
@@ -47,13 +48,28 @@ class VWAP:
         :parameter instrument: The instrument for which the calculation was made (e.g., 'EUR_USD').
         :parameter result_df: DataFrame containing the calculated VWAP values.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['vwap']
+        )
 
-        parameter_name = 'vwap'
-        # Insert VWAP results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row['vwap']
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
+        logger.info(f"Inserted {rows} VWAP results for {instrument} into SQLite.")
 
-        logger.info(f"Inserted VWAP results for {instrument} into SQLite.")
+
+class VWAPState(IndicatorState):
+    """
+    Incremental VWAP for live candles: cumulative price-volume and volume, O(1) per update.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.price_volume = 0.0
+        self.volume = 0.0
+
+    def update(self, candle):
+        typical_price = (candle_field(candle, 'high') + candle_field(candle, 'low') + candle_field(candle, 'close')) / 3
+        volume = candle_field(candle, 'volume')
+        self.price_volume += typical_price * volume
+        self.volume += volume
+        self.value = divide(self.price_volume, self.volume)
+        return self.value
@@ -1,7 +1,9 @@
 # backend/trading/indicators/williams_r.py
 from logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
-from datetime import datetime
+from backend.trading.indicators._kernels import HighLowExtrema
+from backend.trading.indicators._persistence import write_indicator_results
+from backend.trading.indicators._streaming import IndicatorState, RollingExtremum, candle_field, divide
 
 # Configure loggers
 logger = LogManager('williams_r_logs').get_logger()
@@ -23,12 +25,14 @@ class WilliamsR:
         :return: DataFrame with Williams %R values.
         """
     @staticmethod
-    def calculate(df, period=14):
+    def calculate(df, period=14, extrema=None):
         """
         Calculate the Williams %R for the given DataFrame.
         
         :parameter df: DataFrame with 'high', 'low', and 'close' prices.
         :parameter period: The lookback period for Williams %R calculation.
+        :parameter extrema: Optional HighLowExtrema of df, to share the rolling high/low passes with
+                            other indicators on the same frame.
         :return: DataFrame with the Williams %R values.
         """
         # Ensure the necessary columns exist
@@ -41,8 +45,9 @@ class WilliamsR:
             return df
 
         # Calculate the Williams %R
-        high_max = df['high'].rolling(window=period).max()
-        low_min = df['low'].rolling(window=period).min()
+        extrema = HighLowExtrema.resolve(df, extrema)
+        high_max = extrema.highest(period)[0]
+        low_min = extrema.lowest(period)[0]
         df['williams_r'] = (high_max - df['close']) / (high_max - low_min) * -100
 
         logger.info("Williams %R calculation completed.")
@@ -57,14 +62,27 @@ class WilliamsR:
         :parameter result_df: DataFrame containing the calculated Williams %R values.
         :parameter period: Period for which the Williams %R was calculated.
         """
-        indicator_id = self.db_handler.get_indicator_id(indicator_name)
-        timestamp = datetime.now().isoformat()
+        rows = write_indicator_results(
+            self.db_handler, indicator_name, instrument, result_df,
+            ['williams_r'], {'period': period}
+        )
 
-        parameter_name = 'williams_r'
-        # Insert Williams %R results row by row
-        for _, row in result_df.iterrows():
-            parameter_value = row[parameter_name]
-            self.db_handler.add_indicator_results(indicator_id, timestamp, parameter_name, parameter_value)
-            self.db_handler.add_indicator_parameters(indicator_id, {'period': period})
+        logger.info(f"Inserted {rows} Williams %R results for {instrument} into SQLite.")
 
-        logger.info(f"Inserted Williams %R results for {instrument} into SQLite.")
+
+class WilliamsRState(IndicatorState):
+    """
+    Incremental Williams %R for live candles: monotonic deques for the rolling high/low, O(1) per update.
+    """
+
+    def __init__(self, period=14):
+        super().__init__()
+        self.highs = RollingExtremum(period, 'max')
+        self.lows = RollingExtremum(period, 'min')
+
+    def update(self, candle):
+        self.highs.push(candle_field(candle, 'high'))
+        self.lows.push(candle_field(candle, 'low'))
+        high_max, low_min = self.highs.value(), self.lows.value()
+        self.value = divide(high_max - candle_field(candle, 'close'), high_max - low_min) * -100
+        return self.value
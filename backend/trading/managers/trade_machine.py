@@ -1,16 +1,22 @@
+import asyncio
 from backend.trading.brokers.oanda_client import OandaClient
 import pandas as pd
-from backend.trading.indicators.macd import MACD
-from backend.trading.indicators.rsi import RSI
+from backend.trading.indicators.macd import MACD, MACDState
+from backend.trading.indicators.rsi import RSI, RSIState
 from backend.api.services.state_machine import StateMachine
 from backend.config.settings.variables import TRADE_INSTRUMENTS, STATE_MACHINE, SWITCHES, SCENARIOS, BT_TYPE
 
 class TradeMachine:
+    # Candles requested per cycle once a pair's indicator states are seeded
+    REFRESH_COUNT = 5
+
     def __init__(self, oanda_api):
         self.oanda_api = oanda_api
         self.state_machine = StateMachine() if STATE_MACHINE else None
         self.backtesting_enabled = BT_TYPE == 'Strategy'
         self.indicator_switches = SWITCHES
+        self.indicator_states = {}
+        self.last_candle_time = {}
         self.initialize_states()
 
     def initialize_states(self):
@@ -24,27 +30,93 @@ class TradeMachine:
         return pd.DataFrame(data['candles'])
 
     def process_data(self, df):
+        if df.empty:
+            return df
         df['time'] = pd.to_datetime(df['time'])
         for col in ['c', 'h', 'l', 'o']:
-            df[col] = df['mid'][col].astype(float)
+            df[col] = df['mid'].map(lambda mid: mid[col]).astype(float)
         df.rename(columns={'c': 'close', 'h': 'high', 'l': 'low', 'o': 'open'}, inplace=True)
         return df
 
-    def analyze_pair(self, instrument):
-        df = self.process_data(self.fetch_data(instrument))
+    def candle_count(self, instrument):
+        """
+        Candles to request for a pair: the full history until its indicator states are seeded.
+        """
+        return self.REFRESH_COUNT if instrument in self.last_candle_time else 1000
+
+    def update_indicators(self, instrument, data=None):
+        """
+        Bring the streaming indicator states of a pair up to date. The first call seeds them from
+        the full history; later calls only fetch the latest candles and fold in the ones not seen yet.
+        If the latest candles no longer reach back to the last candle folded in (e.g. after an outage
+        or a restart gap), the states are reseeded from a fresh full-history request.
+
+        :parameter data: Candles response already fetched for this pair, or None to fetch it.
+        :return: The pair's indicator states, or None if none are seeded yet.
+        """
+        if data is None:
+            data = self.oanda_api.get_historical_data(instrument, "H1", self.candle_count(instrument))
+        if self.fold_candles(instrument, data):
+            self.fold_candles(instrument, self.oanda_api.get_historical_data(instrument, "H1",
+                                                                              self.candle_count(instrument)))
+        return self.indicator_states.get(instrument)
+
+    def fold_candles(self, instrument, data):
+        """
+        Fold a candles response into the indicator states of a pair, seeding them if needed.
+        Nothing is fetched here, so the sync and async cycles can both request the candles their own way.
+
+        :parameter data: Candles response for this pair.
+        :return: True if candles since the last one folded in are missing. The pair is then unseeded, and
+                 the caller should fetch candle_count(instrument) candles and fold them in again.
+        """
+        # A failed request comes back without candles: keep the states as they are until the next cycle
+        if not data.get('candles'):
+            print(f"{instrument}: no candles received, indicators not updated.")
+            return False
+
+        candles = self.process_data(pd.DataFrame(data['candles']))
+        # Only completed candles are folded in, so the forming candle is never counted twice
+        if 'complete' in candles.columns:
+            candles = candles[candles['complete'].astype(bool)]
+
+        last_time = self.last_candle_time.get(instrument)
+        if last_time is None:
+            states = {}
+            if self.indicator_switches["RSI"]:
+                states["RSI"] = RSIState()
+            if self.indicator_switches["MACD"]:
+                states["MACD"] = MACDState()
+            self.indicator_states[instrument] = states
+        elif candles.empty or candles['time'].iloc[0] <= last_time:
+            candles = candles[candles['time'] > last_time]
+        else:
+            print(f"{instrument}: candles since {last_time} are missing, reseeding indicators.")
+            del self.last_candle_time[instrument]
+            return True
+
+        for state in self.indicator_states[instrument].values():
+            state.seed(candles)
+        if not candles.empty:
+            self.last_candle_time[instrument] = candles['time'].iloc[-1]
+        return False
+
+    def analyze_pair(self, instrument, data=None):
+        self.apply_indicators(instrument, self.update_indicators(instrument, data))
+
+    def apply_indicators(self, instrument, states):
+        """
+        Update the state of a pair from its indicator states.
+        """
+        if states is None:
+            return
         scenario = SCENARIOS['LONG'] if self.states[instrument] == 'green' else SCENARIOS['SHORT']
 
-        if self.indicator_switches["RSI"]:
-            rsi_calculator = RSI()
-            rsi_df = rsi_calculator.calculate(df)
-        if self.indicator_switches["MACD"]:
-            macd_calculator = MACD()
-            macd_df = macd_calculator.calculate(df)
-        
         # Example logic for updating states based on indicators
-        if rsi_df['rsi'].iloc[-1] < 30:
+        rsi = states["RSI"].value
+        if rsi < 30:
             self.update_state(instrument, 'green')
-        elif 30 <= rsi_df['rsi'].iloc[-1] <= 70:
+        elif 30 <= rsi <= 70:
             self.update_state(instrument, 'yellow')
         else:
             self.update_state(instrument, 'red')
@@ -58,10 +130,40 @@ class TradeMachine:
         if self.backtesting_enabled:
             self.run_backtest()
 
+    async def run_async(self, client):
+        """
+        Run one cycle with the candles of every pair requested concurrently, so the cycle waits for the
+        slowest request instead of the sum of them. Pairs that need reseeding get their full history in a
+        second concurrent round. The analysis itself is unchanged.
+
+        :parameter client: An AsyncOandaClient.
+        """
+        self.initialize_states()
+        pairs = list(self.states)
+        responses = await asyncio.gather(*(
+            client.get_historical_data(pair, "H1", self.candle_count(pair)) for pair in pairs
+        ))
+        # Pairs with a gap in their candles are reseeded through the async client too, never the blocking one
+        reseed = [pair for pair, data in zip(pairs, responses) if self.fold_candles(pair, data)]
+        histories = await asyncio.gather(*(
+            client.get_historical_data(pair, "H1", self.candle_count(pair)) for pair in reseed
+        ))
+        for pair, data in zip(reseed, histories):
+            self.fold_candles(pair, data)
+
+        for pair in pairs:
+            self.apply_indicators(pair, self.indicator_states.get(pair))
+            print(f"{pair} state: {self.states[pair]}")
+
+        if self.backtesting_enabled:
+            self.run_backtest()
+
     def run_backtest(self):
         print("Running backtest...")
         for pair in self.states:
             df = self.process_data(self.fetch_data(pair))
+            if df.empty:
+                continue
             # Example: Use indicator classes for backtesting
             if self.indicator_switches["RSI"]:
                 rsi_calculator = RSI()
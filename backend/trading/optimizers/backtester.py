@@ -3,10 +3,14 @@ from datetime import datetime
 import numpy as np
 import pandas as pd
 
+from backend.data.repositories._candle_cache import CandleCache
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
 from backend.data.repositories._mongo_db import MongoDBHandler
+from backend.data.utils.utils import candle_rows, from_epoch_seconds
 from backend.logs.log_manager import LogManager
+from backend.trading.indicators.result_cache import data_version, indicator_cache
 from backend.trading.indicators.sma import SMA
+from backend.trading.optimizers.signal_engine import generate_trades, resolve_signal, trade_statistics
 
 # Initialize the LogManager
 logger = LogManager('backtester_logs').get_logger()
@@ -17,24 +21,47 @@ class Backtester:
         self.positions = []
         self.trades = []
         self.results = []
-        self.data = None
+        self._data = None
+        # Cheap cache version of the candles load_data loaded, cleared when data is replaced
+        self._loaded_version = None
+        self.instrument = None
+        self.granularity = None
         
         # Initialize MongoDB and SQLite handlers
         self.mongo_handler = MongoDBHandler(db_name="forex_data")
         self.db_handler = SQLiteDBHandler(db_name="instruments.db") 
+        self.candle_cache = CandleCache()
+        self.indicator_cache = indicator_cache
         
     def load_data(self, instrument, granularity="D", source="mongo"):
         """
-        Load historical data from the specified source (MongoDB/SQLite).
+        Load historical data from the specified source (MongoDB/SQLite/local candle cache).
         """
+        self.instrument, self.granularity = instrument, granularity
         if source == "mongo":
             # MongoDB logic here (example)
             self.data = self.load_from_mongo(instrument, granularity)
         elif source == "sqlite":
             # SQLite logic here (example)
             self.data = self.load_from_sqlite(instrument, granularity)
+        elif source == "cache":
+            self.data = self.load_from_cache(instrument, granularity)
         else:
             raise ValueError(f"Unsupported data source: {source}")
+        # New candles change the row count or the newest timestamp, so this identifies them without hashing
+        if self.data is not None and len(self.data):
+            self._loaded_version = f"{len(self.data)}:{self.data.index[-1]}"
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        # Candles set from outside load_data are content-hashed again by data_version
+        if value is not self._data:
+            self._loaded_version = None
+        self._data = value
 
     def load_from_mongo(self, instrument, granularity):
         """
@@ -78,45 +105,31 @@ class Backtester:
 
     def transfer_mongo_to_sqlite(self, instrument, granularity):
         """
-        Fetch historical data from MongoDB and store it in SQLite.
+        Copy the MongoDB candles newer than the latest one in SQLite into SQLite.
+
+        :return: Number of candles added.
         """
         try:
-            collection_name = f"{instrument.lower()}_{granularity.lower()}_data"
-            mongo_data = self.mongo_handler.read({}, collection_name=collection_name)
-
-            if not mongo_data:
-                logger.error(f"❌ No data found in MongoDB for {instrument} - {granularity}.")
-                return
-
             instrument_id = self.db_handler.get_instrument_id(instrument)
             if not instrument_id:
                 logger.error(f"❌ Instrument {instrument} not found in SQLite. Ensure it's added first.")
-                return
-
-            records = []
-            records.extend(
-                (
-                    instrument_id,
-                    granularity,
-                    record['time'],
-                    float(record['mid'].get('o', 0)),
-                    float(record['mid'].get('h', 0)),
-                    float(record['mid'].get('l', 0)),
-                    float(record['mid'].get('c', 0)),
-                    float(record.get('volume', 0)),
-                )
-                for record in mongo_data
-            )
-            query = """
-                INSERT INTO historical_data (instrument_id, granularity, timestamp, open, high, low, close, volume)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """
-            self.db_handler.execute_many(query, records)
+                return 0
+
+            latest = self.db_handler.latest_candle_timestamp(instrument_id, granularity)
+            mongo_data = self.mongo_handler.read_candles_after(instrument, granularity, latest)
+
+            if not mongo_data:
+                logger.info(f"No new data in MongoDB for {instrument} - {granularity}.")
+                return 0
 
-            logger.info(f"✅ Successfully transferred {len(records)} records for {instrument} - {granularity} to SQLite.")
+            added = self.db_handler.insert_candles(candle_rows(instrument_id, granularity, mongo_data))
+
+            logger.info(f"✅ Transferred {added} new records for {instrument} - {granularity} to SQLite.")
+            return added
 
         except Exception as e:
             logger.error(f"❌ Error transferring data from MongoDB to SQLite: {e}")
+            return 0
 
     def load_from_sqlite(self, instrument, granularity, retry=False):
         """
@@ -149,11 +162,48 @@ class Backtester:
 
         # Convert to DataFrame
         self.data = pd.DataFrame(result, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        self.data['timestamp'] = pd.to_datetime(self.data['timestamp'])
+        self.data['timestamp'] = from_epoch_seconds(self.data['timestamp'])
         self.data.set_index('timestamp', inplace=True)
 
         return self.data
 
+    def load_from_cache(self, instrument, granularity, max_age=None):
+        """
+        Load historical data from the memory-mapped candle cache. The cache is refreshed from SQLite
+        (and through it from MongoDB) only when SQLite holds newer candles, the cache is missing,
+        or it is older than max_age seconds.
+        """
+        instrument = instrument.upper().replace("/", "_")
+        instrument_id = self.db_handler.get_instrument_id(instrument)
+        latest = None
+        if instrument_id is not None:
+            result = self.db_handler.fetch_records_with_query(
+                "SELECT MAX(timestamp) FROM historical_data WHERE instrument_id = ? AND granularity = ?",
+                (instrument_id, granularity),
+            )
+            latest = result[0][0] if result else None
+
+        if self.candle_cache.is_stale(instrument, granularity, latest, max_age):
+            meta = self.candle_cache.metadata(instrument, granularity)
+            if meta is not None and meta['last_timestamp'] is not None and instrument_id is not None:
+                # Only pull the candles the cache is missing
+                rows = self.db_handler.fetch_records_with_query(
+                    """
+                    SELECT timestamp, open, high, low, close, volume FROM historical_data
+                    WHERE instrument_id = ? AND granularity = ? AND timestamp > ?
+                    ORDER BY timestamp ASC
+                    """,
+                    (instrument_id, granularity, meta['last_timestamp']),
+                )
+                new_rows = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                self.candle_cache.append(instrument, granularity, new_rows)
+            else:
+                self.candle_cache.write(instrument, granularity, self.load_from_sqlite(instrument, granularity))
+            logger.info(f"Candle cache refreshed for {instrument} - {granularity}.")
+
+        self.data = self.candle_cache.load(instrument, granularity)
+        return self.data
+
     def apply_indicator(self, indicator_func, *args, **kwargs):
         """
         Apply a given indicator function to the historical data.
@@ -163,6 +213,32 @@ class Backtester:
         else:
             raise ValueError("Historical data is not loaded. Load data before applying indicators.")
 
+    def data_version(self):
+        """
+        Identity of the loaded candles for the indicator cache. Candles loaded with load_data are identified
+        cheaply by the row count and newest timestamp taken at load time, until data is replaced; any other
+        data is content-hashed. Edit loaded candles by assigning a new frame, not in place.
+        """
+        if self.data is None:
+            raise ValueError("Historical data is not loaded.")
+        return self._loaded_version or data_version(self.data)
+
+    def add_indicators(self, requests):
+        """
+        Join the namespaced outputs of several indicators (e.g. 'sma_20', 'rsi_14') onto the data.
+        Unlike apply_indicator, the indicators' helper columns are not added, and results already
+        computed for identical candles are taken from the indicator cache.
+
+        :parameter requests: Iterable of (name, parameters dict) pairs, e.g. [('sma', {'period': 20})].
+        """
+        if self.data is None:
+            raise ValueError("Historical data is not loaded. Load data before applying indicators.")
+        loaded_version = self._loaded_version
+        self.data = self.indicator_cache.compute_indicators(self.data, requests, self.instrument, self.granularity,
+                                                            version=self.data_version(), join=True)
+        # Only indicator columns were joined: the candles are still the loaded ones
+        self._loaded_version = loaded_version
+
     def simulate_trades(self, buy_signal, sell_signal):
         """
         Execute buy/sell logic based on signals and simulate trades.
@@ -194,6 +270,30 @@ class Backtester:
                 
         logger.info(f"Final Balance: {self.balance:.2f}")
 
+    def simulate_trades_vectorized(self, buy_signal, sell_signal):
+        """
+        Vectorized counterpart of simulate_trades. Produces the same trades, positions and balance,
+        but works out entries and exits with array operations instead of walking every row.
+
+        :parameter buy_signal: Boolean array/Series, or an expression over the data columns (e.g. "close > sma").
+        :parameter sell_signal: Boolean array/Series, or an expression over the data columns.
+        """
+        if self.data is None:
+            raise ValueError("Data is not available for trading. Please load data first.")
+
+        buy = resolve_signal(self.data, buy_signal)
+        sell = resolve_signal(self.data, sell_signal)
+        close = self.data['close'].to_numpy(dtype=float)
+
+        entry_idx, exit_idx, profits = generate_trades(close, buy, sell)
+
+        self.positions.extend(zip(self.data.index[entry_idx], close[entry_idx].tolist()))
+        self.trades.extend(profits.tolist())
+        self.balance += float(profits.sum())
+
+        logger.info(f"Vectorized simulation: {len(entry_idx)} entries, {len(exit_idx)} exits.")
+        logger.info(f"Final Balance: {self.balance:.2f}")
+
     def calculate_performance(self):
         """
         Calculate performance metrics: total return, win rate, Sharpe ratio, drawdown.
@@ -201,31 +301,14 @@ class Backtester:
         if not self.trades:
             return {"total_return": 0, "win_rate": 0, "sharpe_ratio": 0, "max_drawdown": 0}
 
-        total_return = sum(self.trades)
-        win_rate = len([t for t in self.trades if t > 0]) / len(self.trades) if self.trades else 0
-
-        # Sharpe Ratio Calculation
-        returns_series = np.array(self.trades)
-        sharpe_ratio = np.mean(returns_series) / np.std(returns_series) if np.std(returns_series) != 0 else 0
-
-        # Max Drawdown Calculation
-        cumulative_returns = np.cumsum(returns_series)
-        peak = np.maximum.accumulate(cumulative_returns)
-        drawdowns = (peak - cumulative_returns) / peak
-        max_drawdown = np.max(drawdowns) if len(drawdowns) > 0 else 0
-
-        logger.info(f"Total Return: {total_return:.2f}")
-        logger.info(f"Win Rate: {win_rate:.2%}")
-        logger.info(f"Sharpe Ratio: {sharpe_ratio:.2f}")
-        logger.info(f"Max Drawdown: {max_drawdown:.2%}")
-
-        return {
-            "total_return": total_return,
-            "win_rate": win_rate,
-            "sharpe_ratio": sharpe_ratio,
-            "max_drawdown": max_drawdown,
-            "trades": self.trades,
-        }
+        statistics = trade_statistics(self.trades)
+
+        logger.info(f"Total Return: {statistics['total_return']:.2f}")
+        logger.info(f"Win Rate: {statistics['win_rate']:.2%}")
+        logger.info(f"Sharpe Ratio: {statistics['sharpe_ratio']:.2f}")
+        logger.info(f"Max Drawdown: {statistics['max_drawdown']:.2%}")
+
+        return {**statistics, "trades": self.trades}
 
     def get_trade_results(self):
         """
@@ -0,0 +1,212 @@
+"""
+Performance metrics over bar-by-bar equity curves. Where trade_statistics only sees the closed trades,
+these metrics follow the account through every bar, so open positions, time under water and time in
+the market count as well.
+
+Every function takes one run as 1-D arrays (one entry per bar) or many runs at once as 2-D arrays with
+one column per run (e.g. per parameter set of a sweep); metrics are computed along the bars for a whole
+block of runs in the same array operations.
+
+Usage:
+    positions = position_state(close[:, None] > sma, close[:, None] < sma)  # sma: one column per period
+    metrics = performance_metrics(close, positions, periods_per_year=252)
+    pd.DataFrame(metrics)  # one row per period
+"""
+import numpy as np
+
+from backend.logs.log_manager import LogManager
+from backend.trading.optimizers.signal_engine import position_state
+
+# Initialize the LogManager
+logger = LogManager('metrics_logs').get_logger()
+
+# Runs are scored in blocks of about this many bar values, so the temporaries of a block stay small
+BLOCK_SIZE = 2 ** 18
+
+
+def _runs(values):
+    """
+    One contiguous row per run: the bars of every run are scanned along memory, which keeps the
+    cumulative passes fast for any number of runs.
+    """
+    return np.ascontiguousarray(np.atleast_2d(np.transpose(np.asarray(values, dtype=float))))
+
+
+def _blocks(values, n_runs):
+    """
+    Split (n_bars, n_runs) values into run-major blocks; 1-D values are shared by every block.
+    """
+    values = np.asarray(values)
+    step = max(1, BLOCK_SIZE // len(values))
+    for start in range(0, n_runs, step):
+        yield _runs(values[:, start:start + step] if np.ndim(values) == 2 else values)
+
+
+def equity_curves(close, positions, initial_balance=10000):
+    """
+    Account equity after every bar. positions[t] is the position held after bar t (as returned by
+    position_state, in units of the instrument), so it earns the price change from bar t to bar t + 1.
+
+    :parameter close: Array of close prices, shape (n_bars,) or (n_bars, n_runs).
+    :parameter positions: Array of positions, shape (n_bars,) or (n_bars, n_runs).
+    :parameter initial_balance: Equity before the first bar.
+    :return: Float array shaped like positions.
+    """
+    if len(close) != len(positions):
+        raise ValueError(f"Close length {len(close)} does not match positions length {len(positions)}.")
+    equity = _equity_rows(_runs(close), _runs(positions), initial_balance)
+    return equity[0] if np.ndim(positions) == 1 and np.ndim(close) == 1 else equity.T
+
+
+def _equity_rows(close, positions, initial_balance):
+    equity = np.zeros(np.broadcast_shapes(close.shape, positions.shape))
+    np.multiply(positions[:, :-1], np.diff(close, axis=-1), out=equity[:, 1:])
+    equity[:, 0] = initial_balance
+    return np.cumsum(equity, axis=-1, out=equity)
+
+
+def _trade_counts(equity, held):
+    """
+    Closed trades and winning trades per run. A trade is a run of bars with a non-zero position; its
+    profit is the equity change from its entry bar to its exit bar. Open trades are not counted.
+    """
+    n_runs, n_bars = held.shape
+    previous = np.zeros_like(held)
+    previous[:, 1:] = held[:, :-1]
+
+    # Entries and exits in run order; every run's k-th exit closes its k-th entry
+    entries = np.flatnonzero(held > previous)
+    exits = np.flatnonzero(held < previous)
+    last_entry = np.cumsum(np.bincount(entries // n_bars, minlength=n_runs)) - 1
+    closed = np.ones(len(entries), dtype=bool)
+    closed[last_entry[held[:, -1]]] = False
+    entries = entries[closed]
+
+    flat_equity = equity.ravel()
+    profits = flat_equity[exits] - flat_equity[entries]
+    exit_runs = exits // n_bars
+    return np.bincount(exit_runs, minlength=n_runs), np.bincount(exit_runs[profits > 0], minlength=n_runs)
+
+
+def _metric_rows(equity, positions, periods_per_year):
+    """
+    Metrics of run-major equity and position rows; see equity_metrics.
+    """
+    if np.any(equity[:, 0] <= 0):
+        raise ValueError("Equity curves must start positive.")
+    n_runs, n_bars = equity.shape
+    zeros = np.zeros(n_runs)
+
+    # Per-bar returns; once an account is wiped out, later bars count as flat
+    previous = equity[:, :-1]
+    returns = np.diff(equity, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        np.divide(returns, previous, out=returns)
+    if np.any(previous <= 0):
+        returns[previous <= 0] = 0
+    n_returns = max(returns.shape[1], 1)
+    mean = returns.sum(axis=-1) / n_returns
+    variance = np.maximum(np.einsum('ij,ij->i', returns, returns) / n_returns - mean ** 2, 0)
+    np.minimum(returns, 0, out=returns)
+    downside = np.sqrt(np.einsum('ij,ij->i', returns, returns) / n_returns)
+    std = np.sqrt(variance)
+    scale = np.sqrt(periods_per_year) if periods_per_year else 1.0
+    sharpe = np.divide(mean, std, out=zeros.copy(), where=std > 0) * scale
+    sortino = np.divide(mean, downside, out=zeros.copy(), where=downside > 0) * scale
+
+    # The running peak starts at the (positive) first bar, so it never is zero or negative
+    peak = np.maximum.accumulate(equity, axis=-1)
+    bars = np.arange(n_bars, dtype=np.int32 if n_bars < 2 ** 31 else np.int64)
+    last_peak = np.maximum.accumulate(np.where(equity >= peak, bars, 0), axis=-1)
+    max_drawdown_duration = (bars - last_peak).max(axis=-1)
+    drawdown = peak - equity
+    max_drawdown = np.divide(drawdown, peak, out=drawdown).max(axis=-1)
+
+    growth = equity[:, -1] / equity[:, 0]
+    total_return = growth - 1
+    if periods_per_year and n_bars > 1:
+        with np.errstate(invalid='ignore'):
+            annual_return = np.where(growth > 0, growth ** (periods_per_year / (n_bars - 1)) - 1, -1.0)
+    else:
+        annual_return = total_return
+    calmar = np.divide(annual_return, max_drawdown, out=zeros.copy(), where=max_drawdown > 0)
+
+    held = positions != 0
+    turnover = (np.abs(positions[:, 0]) + np.abs(np.diff(positions, axis=-1)).sum(axis=-1)) / n_bars
+    trades, wins = _trade_counts(equity, held)
+
+    return {
+        'total_return': total_return,
+        'profit': equity[:, -1] - equity[:, 0],
+        'sharpe_ratio': sharpe,
+        'sortino_ratio': sortino,
+        'calmar_ratio': calmar,
+        'max_drawdown': max_drawdown,
+        'max_drawdown_duration': max_drawdown_duration,
+        'exposure': np.count_nonzero(held, axis=-1) / n_bars,
+        'turnover': turnover,
+        'win_rate': np.divide(wins, trades, out=zeros.copy(), where=trades > 0),
+        'trades': trades,
+    }
+
+
+def _collect(parts, single):
+    if single:
+        return {name: values[0].item() for name, values in parts[0].items()}
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def equity_metrics(equity, positions, periods_per_year=None):
+    """
+    Performance metrics of equity curves.
+
+    :parameter equity: Equity after every bar (see equity_curves), shape (n_bars,) or (n_bars, n_runs).
+                       The first bar must be positive, so every drawdown is measured against a positive peak.
+    :parameter positions: Positions the equity was earned with, shaped like equity.
+    :parameter periods_per_year: Bars per year (e.g. 252 for daily candles) to annualize Sharpe, Sortino
+                                 and the Calmar return; per-bar values if omitted.
+    :return: Dict of metric -> float for 1-D input, or array with one value per run for 2-D input:
+             total_return (fraction of the initial equity), profit, sharpe_ratio, sortino_ratio,
+             calmar_ratio, max_drawdown (fraction of the peak), max_drawdown_duration (bars below the
+             previous peak), exposure (share of bars with a position), turnover (average absolute
+             position change per bar), win_rate and trades (closed trades).
+    """
+    if np.shape(equity) != np.shape(positions) or len(equity) == 0:
+        raise ValueError(f"Equity {np.shape(equity)} and positions {np.shape(positions)} must be non-empty "
+                         f"and of the same shape.")
+    n_runs = np.shape(equity)[1] if np.ndim(equity) == 2 else 1
+    parts = [_metric_rows(equity_rows, position_rows, periods_per_year)
+             for equity_rows, position_rows in zip(_blocks(equity, n_runs), _blocks(positions, n_runs))]
+    return _collect(parts, np.ndim(equity) == 1)
+
+
+def performance_metrics(close, positions, initial_balance=10000, periods_per_year=None):
+    """
+    Build the equity curves of positions held on close prices and compute their metrics, a block of
+    runs at a time.
+
+    :parameter close: Array of close prices, shape (n_bars,) or (n_bars, n_runs).
+    :parameter positions: Array of positions, shape (n_bars,) or (n_bars, n_runs).
+    :return: See equity_metrics.
+    """
+    if len(close) != len(positions) or len(positions) == 0:
+        raise ValueError(f"Close length {len(close)} does not match positions length {len(positions)}.")
+    n_runs = max(np.shape(values)[1] if np.ndim(values) == 2 else 1 for values in (close, positions))
+    parts = []
+    for close_rows, position_rows in zip(_blocks(close, n_runs), _blocks(positions, n_runs)):
+        equity = _equity_rows(close_rows, position_rows, initial_balance)
+        parts.append(_metric_rows(equity, np.broadcast_to(position_rows, equity.shape), periods_per_year))
+    return _collect(parts, np.ndim(close) == 1 and np.ndim(positions) == 1)
+
+
+def signal_metrics(close, buy, sell, initial_balance=10000, periods_per_year=None):
+    """
+    Metrics of the long/flat runs defined by buy and sell signals, with the rules of
+    Backtester.simulate_trades (see position_state).
+
+    :parameter buy: Boolean array of buy signals, shape (n_bars,) or (n_bars, n_runs).
+    :parameter sell: Boolean array of sell signals, shaped like buy.
+    :return: See equity_metrics.
+    """
+    return performance_metrics(close, position_state(np.asarray(buy), np.asarray(sell)), initial_balance,
+                               periods_per_year)
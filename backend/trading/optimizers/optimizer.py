@@ -1,7 +1,15 @@
+import uuid
 from datetime import datetime
+import pandas as pd
 from backend.logs.log_manager import LogManager
 from backend.data.repositories._sqlite_db import SQLiteDBHandler
+from backend.data.utils.utils import to_python
 from backend.trading.optimizers.backtester import Backtester
+from backend.trading.optimizers.parallel_sweep import FailedEvaluation, rank_results, run_parallel_sweep
+from backend.trading.optimizers.search import SEARCH_STRATEGIES, EvaluationBudget, backtest_objective
+from backend.trading.optimizers.walk_forward import (
+    run_walk_forward, walk_forward_key, walk_forward_table, walk_forward_windows, window_labels,
+)
 from backend.trading.indicators.sma import SMA
 from backend.trading.indicators.ema import EMA
 from backend.trading.indicators.rsi import RSI  # Assuming you have this implemented
@@ -18,21 +26,31 @@ class Optimizer:
         self.db_handler = SQLiteDBHandler(db_name="optimizer.db")
         logger.info("Optimizer initialized.")
 
+    @staticmethod
+    def get_indicator_column(indicator_func):
+        """
+        Return the column an indicator function writes ('sma', 'ema', 'rsi'), or None if it is not supported.
+        """
+        if indicator_func == SMA.calculate:
+            return 'sma'
+        elif indicator_func == EMA.calculate:
+            return 'ema'
+        elif indicator_func == RSI.calculate:
+            return 'rsi'
+        return None
+
     def optimize_parameters(self, instrument, indicator_func, param_combinations):
         """
         Run backtests with different parameter combinations for a given indicator and store the best-performing one.
+        Indicator values come from the backtester's indicator cache, so repeated sweeps over the same candles
+        reuse them.
         """
         best_result = None
         best_parameters = None
 
         # Get the correct column name based on the indicator function
-        if indicator_func == SMA.calculate:
-            indicator_name = 'sma'
-        elif indicator_func == EMA.calculate:
-            indicator_name = 'ema'
-        elif indicator_func == RSI.calculate:
-            indicator_name = 'rsi'
-        else:
+        indicator_name = self.get_indicator_column(indicator_func)
+        if indicator_name is None:
             logger.error("Unknown indicator function.")
             return {}, {}
         
@@ -44,19 +62,24 @@ class Optimizer:
             logger.error("Missing instrument or indicator ID, cannot continue optimization.")
             return {}, {}
 
+        # Computed once per sweep: the candles do not change between combinations
+        version = self.backtester.data_version()
+        cache = self.backtester.indicator_cache
+
         for parameters in param_combinations:
             try:
                 logger.info(f"Testing parameters: {parameters}")
 
-                # Apply the indicator with the current parameter set
-                self.backtester.apply_indicator(indicator_func, **parameters)
+                # The indicator for the current parameter set, from the cache or computed and cached
+                values = cache.compute_indicator(self.backtester.data, indicator_name, self.backtester.instrument,
+                                                 self.backtester.granularity, version=version, **parameters).iloc[:, 0]
+                if values.isna().all():
+                    logger.error(f"No {indicator_name} values for {parameters} (not enough data). Skipping...")
+                    continue
 
                 # Since we're using a fixed column name (e.g., 'sma', 'ema', 'rsi'), reference that directly
                 indicator_column = indicator_name  # No need to add a period-specific suffix
-
-                if indicator_column not in self.backtester.data.columns:
-                    logger.error(f"Column {indicator_column} not found in data. Skipping...")
-                    continue
+                self.backtester.data[indicator_column] = values.to_numpy()
 
                 # Define buy/sell signals based on the calculated indicator
                 def buy_signal(row):
@@ -86,6 +109,222 @@ class Optimizer:
             logger.error("No valid result was found during optimization.")
             return {}, {}
 
+    def optimize_parameters_parallel(self, instrument, indicator_func, param_combinations, max_workers=None,
+                                     chunksize=None, rank_by="total_return", run_id=None, cancel=None):
+        """
+        Parallel version of optimize_parameters. Combinations are spread over a process pool; the
+        workers map the backtester's candles read-only and each combination is backtested in isolation,
+        so nothing is shared between runs. The best combination is stored like in optimize_parameters.
+
+        The sweep is checkpointed: every completed chunk of combinations is written to
+        optimization_results under the run id, in one transaction per chunk. Calling again with the same
+        run_id (e.g. after the process died, was preempted or was cancelled) only evaluates the
+        combinations that are not stored yet, and ranks them together with the stored ones. Combinations
+        whose evaluation raised are not stored, so they are retried as well.
+
+        :parameter instrument: The instrument the data belongs to (e.g. 'EUR_USD').
+        :parameter indicator_func: SMA.calculate, EMA.calculate or RSI.calculate.
+        :parameter param_combinations: List of parameter dicts.
+        :parameter max_workers: Number of worker processes (defaults to the CPU count).
+        :parameter chunksize: Combinations sent to a worker at a time, and checkpointed together.
+        :parameter rank_by: Metric used to rank the combinations, highest first.
+        :parameter run_id: Id of the run to start or resume (a new id is generated if omitted; it is
+                           available as results.attrs['run_id']).
+        :parameter cancel: threading.Event; setting it stops the sweep after the running chunks, keeping
+                           their results. A cancelled run stores no best parameters.
+        :return: DataFrame with one row per combination (parameters, metrics, trade count), ranked best first.
+        """
+        if self.backtester.data is None:
+            raise ValueError("Historical data is not loaded. Load data before optimizing.")
+
+        indicator_name = self.get_indicator_column(indicator_func)
+        if indicator_name is None:
+            logger.error("Unknown indicator function.")
+            return pd.DataFrame()
+
+        param_combinations = list(param_combinations)
+        total = len(param_combinations)
+        parameter_names = list(param_combinations[0]) if param_combinations else []
+        instrument_id = self.db_handler.get_instrument_id(instrument)
+        indicator_id = self.db_handler.get_indicator_id(indicator_name)
+        checkpointed = bool(instrument_id and indicator_id)
+        run_id = run_id or uuid.uuid4().hex
+
+        stored, on_chunk = [], None
+        if checkpointed:
+            if not self.db_handler.save_optimization_run(run_id, instrument_id, indicator_id, total, 'running'):
+                raise ValueError(f"Cannot start optimization run {run_id}: it belongs to another instrument or "
+                                 f"indicator, or the optimizer database is unavailable.")
+
+            requested = {self.db_handler.parameters_key(parameters) for parameters in param_combinations}
+            stored = [result for result in self.db_handler.get_optimization_run_results(run_id)
+                      if self.db_handler.parameters_key(result['parameters']) in requested]
+            done = {self.db_handler.parameters_key(result['parameters']) for result in stored}
+            param_combinations = [parameters for parameters in param_combinations
+                                  if self.db_handler.parameters_key(parameters) not in done]
+            logger.info(f"Optimization run {run_id}: {len(done)} combinations already evaluated, "
+                        f"{len(param_combinations)} to go.")
+
+            def on_chunk(chunk, chunk_results):
+                # Evaluations that raised are left out, so a resumed run retries them
+                kept = [i for i, result in enumerate(chunk_results) if not isinstance(result, FailedEvaluation)]
+                if kept:
+                    self.db_handler.add_optimization_run_results(run_id, instrument_id, [chunk[i] for i in kept],
+                                                                 [chunk_results[i] for i in kept])
+        else:
+            logger.warning("Missing instrument or indicator ID, the sweep is not checkpointed.")
+
+        try:
+            results = run_parallel_sweep(self.backtester.data, indicator_func, indicator_name, param_combinations,
+                                         max_workers=max_workers, chunksize=chunksize, rank_by=rank_by,
+                                         on_chunk=on_chunk, cancel=cancel)
+        except BaseException:
+            if checkpointed:
+                self.db_handler.save_optimization_run(run_id, instrument_id, indicator_id,
+                                                      total, 'interrupted')
+            raise
+
+        cancelled = cancel is not None and cancel.is_set()
+        if stored:
+            previous = [{**result['parameters'], **{key: value for key, value in result.items() if key != 'parameters'}}
+                        for result in stored if result['trades'] is not None]
+            new = results.drop(columns='rank').to_dict('records') if not results.empty else []
+            results = rank_results(previous + new, rank_by)
+        results.attrs['run_id'] = run_id
+        if checkpointed:
+            self.db_handler.save_optimization_run(run_id, instrument_id, indicator_id, total,
+                                                  'cancelled' if cancelled else 'completed')
+
+        if cancelled:
+            logger.warning(f"Optimization run {run_id} was cancelled, resume it with the same run_id.")
+            return results
+        if results.empty:
+            logger.error("No valid result was found during optimization.")
+            return results
+
+        # Back to plain Python values so they can be bound as SQLite parameters
+        best_parameters = {key: to_python(results.at[0, key]) for key in parameter_names}
+        logger.info(f"Best result: {results.iloc[0].to_dict()}")
+
+        if checkpointed:
+            self.store_optimized_parameters(instrument_id, indicator_id, best_parameters)
+        else:
+            logger.warning("Missing instrument or indicator ID, best parameters were not stored.")
+
+        return results
+
+    def optimize_search(self, instrument, indicator_func, search_space, strategy="tpe", max_evaluations=50,
+                        rank_by="total_return", seed=None):
+        """
+        Budgeted version of optimize_parameters: a search strategy picks which combinations of the search
+        space to backtest, spending at most max_evaluations full-history backtests. The best combination
+        is stored like in optimize_parameters.
+
+        :parameter instrument: The instrument the data belongs to (e.g. 'EUR_USD').
+        :parameter indicator_func: SMA.calculate, EMA.calculate or RSI.calculate.
+        :parameter search_space: Dict of parameter name -> candidate values (e.g. {'period': range(5, 500)}).
+        :parameter strategy: 'random', 'halving', 'tpe' or 'grid', or a strategy instance with a search(budget) method.
+        :parameter max_evaluations: Budget in full-history backtests (a run on part of the history costs its share).
+        :parameter rank_by: Metric used to rank the combinations, highest first.
+        :parameter seed: Random seed of the strategy, for reproducible searches.
+        :return: DataFrame of the full-history trials, ranked best first.
+        """
+        if self.backtester.data is None:
+            raise ValueError("Historical data is not loaded. Load data before optimizing.")
+
+        indicator_name = self.get_indicator_column(indicator_func)
+        if indicator_name is None:
+            logger.error("Unknown indicator function.")
+            return pd.DataFrame()
+
+        if isinstance(strategy, str):
+            if strategy not in SEARCH_STRATEGIES:
+                raise ValueError(f"Unknown search strategy '{strategy}', expected one of {sorted(SEARCH_STRATEGIES)}.")
+            strategy = SEARCH_STRATEGIES[strategy](search_space) if strategy == 'grid' \
+                else SEARCH_STRATEGIES[strategy](search_space, seed=seed)
+
+        budget = EvaluationBudget(backtest_objective(self.backtester.data, indicator_func, indicator_name),
+                                  max_evaluations, rank_by=rank_by)
+        strategy.search(budget)
+        results = budget.results()
+        logger.info(f"{type(strategy).__name__} spent {budget.used:.1f} of {max_evaluations} backtests "
+                    f"in {budget.runs} runs.")
+        if results.empty:
+            logger.error("No valid result was found during optimization.")
+            return results
+
+        best_parameters = {key: to_python(results.at[0, key]) for key in search_space}
+        logger.info(f"Best result: {results.iloc[0].to_dict()}")
+
+        instrument_id = self.db_handler.get_instrument_id(instrument)
+        indicator_id = self.db_handler.get_indicator_id(indicator_name)
+        if instrument_id and indicator_id:
+            self.store_optimized_parameters(instrument_id, indicator_id, best_parameters)
+        else:
+            logger.warning("Missing instrument or indicator ID, best parameters were not stored.")
+
+        return results
+
+    def optimize_walk_forward(self, instrument, indicator_func, param_combinations, train_size, test_size, step=None,
+                              max_workers=None, rank_by="total_return"):
+        """
+        Walk-forward optimization: split the loaded data into rolling train/test windows, pick the best
+        combination of each training window and score it out-of-sample on the test window that follows.
+        Windows are optimized in parallel, and each window's winner and out-of-sample performance are
+        stored (optimized_parameters, optimization_results, walk_forward_windows).
+
+        Windows are identified by the bars they cover and the search settings, so a later call on data
+        with new bars appended only evaluates the windows that did not exist before.
+
+        :parameter instrument: The instrument the data belongs to (e.g. 'EUR_USD').
+        :parameter indicator_func: SMA.calculate, EMA.calculate or RSI.calculate.
+        :parameter param_combinations: List of parameter dicts searched in every training window.
+        :parameter train_size: Bars in each training window.
+        :parameter test_size: Bars in each out-of-sample window.
+        :parameter step: Bars between window starts (defaults to test_size).
+        :parameter max_workers: Number of worker processes (defaults to the CPU count).
+        :parameter rank_by: Metric used to rank the combinations of a training window, highest first.
+        :return: DataFrame with one row per window (bar labels, winning parameters, out-of-sample metrics).
+        """
+        data = self.backtester.data
+        if data is None:
+            raise ValueError("Historical data is not loaded. Load data before optimizing.")
+
+        indicator_name = self.get_indicator_column(indicator_func)
+        if indicator_name is None:
+            logger.error("Unknown indicator function.")
+            return pd.DataFrame()
+
+        instrument_id = self.db_handler.get_instrument_id(instrument)
+        indicator_id = self.db_handler.get_indicator_id(indicator_name)
+        if not instrument_id or not indicator_id:
+            logger.error("Missing instrument or indicator ID, cannot continue optimization.")
+            return pd.DataFrame()
+
+        search_key = walk_forward_key(indicator_name, param_combinations, train_size, test_size, step, rank_by)
+        windows = walk_forward_windows(len(data), train_size, test_size, step)
+        labels = [window_labels(data.index, window) for window in windows]
+        stored = {(window['train_start'], window['test_end'])
+                  for window in self.db_handler.get_walk_forward_windows(instrument_id, indicator_id, search_key)}
+        pending = [(window, label) for window, label in zip(windows, labels)
+                   if (label['train_start'], label['test_end']) not in stored]
+        logger.info(f"Walk-forward: {len(windows)} windows, {len(windows) - len(pending)} already evaluated.")
+
+        results = run_walk_forward(data, [window for window, _ in pending], indicator_func, indicator_name,
+                                   param_combinations, max_workers=max_workers, rank_by=rank_by)
+        for (_, label), result in zip(pending, results):
+            if result is None:
+                logger.warning(f"No valid result for walk-forward window {label}.")
+                continue
+            self.db_handler.add_walk_forward_window(instrument_id, indicator_id, search_key, label,
+                                                    result['parameters'], result['test'])
+
+        current = {(label['train_start'], label['test_end']) for label in labels}
+        return walk_forward_table([
+            window for window in self.db_handler.get_walk_forward_windows(instrument_id, indicator_id, search_key)
+            if (window['train_start'], window['test_end']) in current
+        ])
+
     def save_optimized_parameters(self, instrument_id, indicator_id, parameters):
         """
         Save optimized parameters to the SQLite database.
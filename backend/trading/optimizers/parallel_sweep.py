@@ -0,0 +1,190 @@
+import os
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from backend.logs.log_manager import LogManager
+from backend.trading.optimizers.signal_engine import generate_trades, trade_statistics
+
+# Initialize the LogManager
+logger = LogManager('parallel_sweep_logs').get_logger()
+
+# Candle columns mapped by the current worker process, set once by _init_worker
+_worker_columns = {}
+
+
+class SharedCandles:
+    """
+    Read-only candle columns shared with worker processes through memory-mapped .npy files.
+    Every worker maps the same files, so the operating system keeps one copy of the pages
+    no matter how many processes read them.
+
+    Usage:
+        with SharedCandles(data) as candles:
+            executor = ProcessPoolExecutor(initializer=_init_worker, initargs=(candles.spec,))
+    """
+
+    def __init__(self, data, columns=None):
+        """
+        :parameter data: DataFrame of candles.
+        :parameter columns: Columns to share (defaults to every numeric column).
+        """
+        columns = columns or [column for column in data.columns if pd.api.types.is_numeric_dtype(data[column])]
+        # /dev/shm keeps the files in RAM where available
+        self.tmpdir = tempfile.TemporaryDirectory(dir='/dev/shm' if os.path.isdir('/dev/shm') else None)
+        for column in columns:
+            np.save(os.path.join(self.tmpdir.name, f"{column}.npy"), data[column].to_numpy(dtype=float))
+        self.spec = (self.tmpdir.name, tuple(columns))
+
+    def close(self):
+        self.tmpdir.cleanup()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_candles(spec):
+    """
+    Map the shared candle columns into the calling process.
+
+    :parameter spec: SharedCandles.spec.
+    :return: Dict of read-only arrays keyed by column name.
+    """
+    directory, columns = spec
+    return {column: np.load(os.path.join(directory, f"{column}.npy"), mmap_mode='r') for column in columns}
+
+
+def _init_worker(spec):
+    _worker_columns.clear()
+    _worker_columns.update(attach_candles(spec))
+
+
+class FailedEvaluation:
+    """
+    Marks a combination whose evaluation raised, as opposed to one that produced no result (None).
+    A failure may be transient (e.g. MemoryError), so it is not checkpointed and a resumed run retries it.
+    """
+
+    def __init__(self, error):
+        self.error = error
+
+    def __repr__(self):
+        return f"FailedEvaluation({self.error!r})"
+
+
+def evaluate_combination(columns, indicator_func, indicator_column, parameters, start=0):
+    """
+    Backtest one parameter combination on its own DataFrame view of the candles, using the same
+    rules as Optimizer.optimize_parameters: long while close > indicator, flat while close < indicator.
+
+    :parameter start: First bar that may trade; the bars before it only warm the indicator up.
+    :return: Dict of the parameters, the performance metrics and the number of trades, or None if the
+             indicator did not produce its column (e.g. not enough data).
+    """
+    # A fresh frame per combination: indicators add columns to it without touching the shared arrays
+    data = pd.DataFrame(columns, copy=False)
+    data = indicator_func(data, **parameters)
+    if indicator_column not in data.columns:
+        return None
+
+    close = data['close'].to_numpy(dtype=float)[start:]
+    indicator = data[indicator_column].to_numpy(dtype=float)[start:]
+    # NaN comparisons are False, as in the row loop
+    _, _, profits = generate_trades(close, close > indicator, close < indicator)
+
+    return {**parameters, **trade_statistics(profits), "trades": len(profits)}
+
+
+def _evaluate_chunk(indicator_func, indicator_column, chunk):
+    results = []
+    for parameters in chunk:
+        try:
+            results.append(evaluate_combination(_worker_columns, indicator_func, indicator_column, parameters))
+        except Exception as e:
+            logger.error(f"Error evaluating parameters {parameters}: {e}")
+            results.append(FailedEvaluation(f"{e.__class__.__name__}: {e}"))
+    return results
+
+
+def rank_results(results, rank_by="total_return"):
+    """
+    Turn a list of evaluation dicts into a table sorted best first, with a 1-based 'rank' column.
+    """
+    table = pd.DataFrame([result for result in results if isinstance(result, dict)])
+    if table.empty:
+        return table
+    table = table.sort_values(rank_by, ascending=False, kind='stable').reset_index(drop=True)
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table
+
+
+def run_parallel_sweep(data, indicator_func, indicator_column, param_combinations, max_workers=None,
+                       chunksize=None, rank_by="total_return", on_chunk=None, cancel=None):
+    """
+    Evaluate parameter combinations in a process pool that shares the candle data read-only.
+
+    Chunks are handed to on_chunk as soon as they complete, so a caller can checkpoint them while the
+    sweep runs. Setting `cancel` stops the sweep early: chunks that have not started are dropped, the
+    ones already running finish and are handed over as usual.
+
+    :parameter data: DataFrame of candles with at least a 'close' column.
+    :parameter indicator_func: Picklable indicator function, e.g. SMA.calculate.
+    :parameter indicator_column: Column the indicator writes (e.g. 'sma').
+    :parameter param_combinations: List of parameter dicts.
+    :parameter max_workers: Number of worker processes (defaults to the CPU count).
+    :parameter chunksize: Combinations sent to a worker at a time (defaults to ~4 chunks per worker).
+    :parameter rank_by: Metric to sort the results by, best (highest) first.
+    :parameter on_chunk: Called with (chunk, results) for every completed chunk, in submission order among
+                         the chunks completing together, where results holds the evaluation dict, None (no
+                         result) or a FailedEvaluation (the evaluation raised) of each parameter dict of the chunk.
+    :parameter cancel: threading.Event that cancels the remaining chunks once set.
+    :return: Ranked DataFrame with one row per evaluated combination.
+    """
+    param_combinations = list(param_combinations)
+    max_workers = max_workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(param_combinations) // (max_workers * 4))
+    chunks = [param_combinations[i:i + chunksize] for i in range(0, len(param_combinations), chunksize)]
+
+    completed = {}
+    with SharedCandles(data) as candles:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(candles.spec,)) as executor:
+            futures = {executor.submit(_evaluate_chunk, indicator_func, indicator_column, chunk): i
+                       for i, chunk in enumerate(chunks)}
+            pending = set(futures)
+            try:
+                while pending:
+                    if cancel is not None and cancel.is_set():
+                        # Running chunks cannot be cancelled and stay pending until they finish
+                        for future in pending:
+                            future.cancel()
+                    # Wake up regularly to notice a cancellation between completions
+                    done, pending = wait(pending, timeout=None if cancel is None else 0.5,
+                                         return_when=FIRST_COMPLETED)
+                    # Chunks finishing together are handed over in submission order
+                    for future in sorted(done, key=futures.get):
+                        if future.cancelled():
+                            continue
+                        i = futures[future]
+                        completed[i] = future.result()
+                        if on_chunk is not None:
+                            on_chunk(chunks[i], completed[i])
+            except BaseException:
+                # Interrupted (e.g. KeyboardInterrupt): drop the queue instead of working through it
+                for future in futures:
+                    future.cancel()
+                raise
+
+    # Submission order, so that ties rank the same however the chunks completed
+    results = [result for i in sorted(completed) for result in completed[i]]
+    evaluated = sum(len(chunks[i]) for i in completed)
+    if evaluated < len(param_combinations):
+        logger.info(f"Parallel sweep cancelled after {evaluated} of {len(param_combinations)} combinations.")
+    else:
+        logger.info(f"Parallel sweep evaluated {len(param_combinations)} combinations on {max_workers} workers.")
+    return rank_results(results, rank_by)
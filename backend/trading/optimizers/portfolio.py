@@ -0,0 +1,313 @@
+"""
+Portfolio backtests over several instruments at once. The candles of every instrument are aligned on
+one timestamp index as 2-D matrices (one column per instrument), signals are evaluated on the whole
+matrix, and the positions of all pairs share one account: P&L, notional exposure and margin are
+converted to the account currency and tracked bar by bar.
+
+Usage:
+    portfolio = PortfolioBacktester()
+    portfolio.load_data(MAJORS, granularity="H1", source="cache")
+    portfolio.apply_indicator(SMA.calculate, period=50)
+    portfolio.simulate_trades_vectorized("close > sma", "close < sma")
+    portfolio.calculate_performance()
+"""
+import numpy as np
+import pandas as pd
+
+from backend.logs.log_manager import LogManager
+from backend.trading.optimizers.backtester import Backtester
+from backend.trading.optimizers.metrics import equity_metrics
+from backend.trading.optimizers.signal_engine import position_state
+
+# Initialize the LogManager
+logger = LogManager('portfolio_logs').get_logger()
+
+MAJORS = ["EUR_USD", "GBP_USD", "USD_JPY", "AUD_USD", "USD_CHF", "USD_CAD", "NZD_USD"]
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def align_prices(frames, fields=FIELDS):
+    """
+    Align the candles of several instruments on the union of their timestamps. A bar missing for one
+    instrument repeats its last price (and has no volume); bars before every instrument has started
+    are dropped, so no price is ever taken from the future.
+
+    :parameter frames: Dict of instrument -> DataFrame of candles indexed by timestamp (sorted, unique).
+    :parameter fields: Candle columns to align; columns missing from any frame are skipped.
+    :return: Dict of field -> DataFrame with one column per instrument, all on the same index.
+    """
+    if not frames:
+        raise ValueError("No instruments to align.")
+    indexes = [frame.index for frame in frames.values()]
+    keys = [np.asarray(index.values) for index in indexes]
+    if keys[0].dtype.kind in 'mM':
+        # Timestamps sort much faster as integers
+        keys = [key.view(np.int64) for key in keys]
+    start = max(key[0] for key in keys)
+    if all(np.array_equal(keys[0], key) for key in keys[1:]):
+        index, union = indexes[0], keys[0]
+        positions = [np.arange(len(union))] * len(keys)
+    else:
+        # Sorted union of the timestamps. A stable sort of the concatenated (already sorted) indexes is
+        # a merge of sorted runs, and keeps the first frame's copy of a timestamp first.
+        stacked = np.concatenate(keys)
+        order = np.argsort(stacked, kind='stable')
+        ordered = stacked[order]
+        new = np.empty(len(ordered), dtype=bool)
+        new[0] = True
+        np.not_equal(ordered[1:], ordered[:-1], out=new[1:])
+        union = ordered[new]
+        inverse = np.empty(len(stacked), dtype=np.int64)
+        inverse[order] = np.cumsum(new) - 1
+        # The index labels (time zone included) come from the frames
+        index = indexes[0].append(indexes[1:])[order[new]]
+        positions = np.split(inverse, np.cumsum([len(key) for key in keys[:-1]]))
+    offset = np.searchsorted(union, start)
+    index = index[offset:]
+
+    # For every common bar, the row of each instrument's candle at that bar (-1 if it has none) and
+    # the last row at or before it
+    n_bars = len(index)
+    rows, last_rows = [], []
+    for key, position in zip(keys, positions):
+        present = np.full(n_bars, -1, dtype=np.int64)
+        later = key >= start
+        present[position[later] - offset] = np.flatnonzero(later)
+        rows.append(present)
+        last_rows.append(np.maximum.accumulate(present))
+
+    matrices = {}
+    for field in fields:
+        if not all(field in frame.columns for frame in frames.values()):
+            continue
+        columns = []
+        for frame, present, last in zip(frames.values(), rows, last_rows):
+            source = frame[field].to_numpy(dtype=float)
+            if field == 'volume':
+                columns.append(np.where(present >= 0, source[present], 0.0))
+            else:
+                columns.append(source[last])
+        matrices[field] = pd.DataFrame(np.column_stack(columns), index=index, columns=list(frames))
+    if 'close' not in matrices:
+        raise ValueError("Every instrument needs a 'close' column.")
+    return matrices
+
+
+def quote_to_account(instrument, close, account_currency="USD"):
+    """
+    Rate converting amounts in the quote currency of an instrument into the account currency, bar by bar.
+
+    :parameter instrument: Instrument name, e.g. 'EUR_GBP'.
+    :parameter close: DataFrame of close prices with one column per instrument.
+    :return: Float array with one rate per bar.
+    :raises ValueError: If no instrument of the portfolio converts the quote currency.
+    """
+    base, quote = instrument.split('_')
+    if quote == account_currency:
+        return np.ones(len(close))
+    if base == account_currency:
+        return 1 / close[instrument].to_numpy(dtype=float)
+    if f"{quote}_{account_currency}" in close.columns:
+        return close[f"{quote}_{account_currency}"].to_numpy(dtype=float)
+    if f"{account_currency}_{quote}" in close.columns:
+        return 1 / close[f"{account_currency}_{quote}"].to_numpy(dtype=float)
+    raise ValueError(f"Cannot convert {quote} to {account_currency}: add {quote}_{account_currency} or "
+                     f"{account_currency}_{quote} to the portfolio.")
+
+
+class PortfolioBacktester:
+    def __init__(self, initial_balance=10000, units=10000, margin_rate=0.02, account_currency="USD", loader=None):
+        """
+        :parameter initial_balance: Account balance, in the account currency.
+        :parameter units: Units traded per position, for every instrument or as a dict per instrument.
+        :parameter margin_rate: Margin required per unit of notional, for every instrument or as a dict
+                                per instrument (0.02 = 50:1 leverage).
+        :parameter account_currency: Currency P&L, exposure and margin are reported in.
+        :parameter loader: Backtester used to load candles (created on first use).
+        """
+        self.initial_balance = initial_balance
+        self.units = units
+        self.margin_rate = margin_rate
+        self.account_currency = account_currency
+        self.loader = loader
+        self.instruments = []
+        self.granularity = None
+        self.data = {}
+        self.indicators = {}
+        self.positions = None
+        self.equity = None
+        self.pnl = None
+        self.notional = None
+        self.exposure = None
+        self.margin_used = None
+
+    def _per_instrument(self, value):
+        return np.array([value[instrument] if isinstance(value, dict) else value for instrument in self.instruments],
+                        dtype=float)
+
+    def load_data(self, instruments=MAJORS, granularity="D", source="cache"):
+        """
+        Load the candles of every instrument (see Backtester.load_data) and align them.
+        """
+        if self.loader is None:
+            self.loader = Backtester()
+        frames = {}
+        for instrument in instruments:
+            self.loader.load_data(instrument, granularity=granularity, source=source)
+            frames[instrument] = self.loader.data
+        self.set_data(frames, granularity)
+
+    def set_data(self, frames, granularity=None):
+        """
+        Use candles that are already loaded.
+
+        :parameter frames: Dict of instrument -> DataFrame of candles indexed by timestamp.
+        """
+        self.data = align_prices(frames)
+        self.instruments = list(frames)
+        self.granularity = granularity
+        self.indicators = {}
+        logger.info(f"Portfolio aligned {len(self.instruments)} instruments on {len(self.data['close'])} bars.")
+
+    def apply_indicator(self, indicator_func, *args, **kwargs):
+        """
+        Apply an indicator function to every instrument. Each column the indicator adds (e.g. 'sma')
+        becomes a matrix with one column per instrument, usable in signal expressions.
+        """
+        if not self.data:
+            raise ValueError("Historical data is not loaded. Load data before applying indicators.")
+        index = self.data['close'].index
+        fields = list(self.data)
+        matrices = [matrix.to_numpy() for matrix in self.data.values()]
+        outputs = {}
+        for column, instrument in enumerate(self.instruments):
+            frame = pd.DataFrame(np.column_stack([matrix[:, column] for matrix in matrices]), index=index,
+                                 columns=fields)
+            # Indicators may add their columns to the frame they are given, so compare with the fields
+            result = indicator_func(frame, *args, **kwargs)
+            for name in result.columns.difference(fields):
+                outputs.setdefault(name, []).append(result[name].to_numpy(dtype=float))
+        for name, columns in outputs.items():
+            self.indicators[name] = pd.DataFrame(np.column_stack(columns), index=index, columns=self.instruments)
+
+    def resolve_signal(self, signal):
+        """
+        Turn a signal definition into a boolean (bars, instruments) array.
+
+        :parameter signal: Boolean DataFrame/array shaped like the price matrix, or an expression over the
+                           candle fields and indicators (e.g. "close > sma"), evaluated for all instruments at once.
+        """
+        close = self.data['close']
+        if isinstance(signal, str):
+            # Plain arrays: every matrix already shares the index, so there is nothing to align
+            matrices = {name: matrix.to_numpy() for name, matrix in {**self.data, **self.indicators}.items()}
+            signal = pd.eval(signal, local_dict=matrices)
+        if isinstance(signal, pd.DataFrame):
+            signal = signal.reindex(index=close.index, columns=close.columns).to_numpy()
+
+        signal = np.asarray(signal)
+        if signal.shape != close.shape:
+            raise ValueError(f"Signal shape {signal.shape} does not match the price matrix {close.shape}.")
+        # NaN comparisons are False, as in Backtester.simulate_trades
+        if signal.dtype != bool:
+            signal = np.nan_to_num(signal.astype(float), nan=0.0) != 0
+        return signal
+
+    def simulate_trades_vectorized(self, buy_signal, sell_signal):
+        """
+        Trade every instrument with the rules of Backtester.simulate_trades (long on buy, flat on sell),
+        all instruments in the same array operations, in one shared account.
+
+        Sets positions (units held after each bar), pnl and notional (per instrument), equity, exposure
+        (net notional per currency) and margin_used, all in the account currency.
+        """
+        if not self.data:
+            raise ValueError("Data is not available for trading. Please load data first.")
+
+        close = self.data['close']
+        prices = close.to_numpy(dtype=float)
+        held = position_state(self.resolve_signal(buy_signal), self.resolve_signal(sell_signal))
+        units = held * self._per_instrument(self.units)
+        rates = np.column_stack([quote_to_account(instrument, close, self.account_currency)
+                                 for instrument in self.instruments])
+
+        # A position held after bar t earns the move to bar t + 1, converted at the rate of bar t + 1
+        pnl = np.zeros_like(prices)
+        pnl[1:] = units[:-1] * np.diff(prices, axis=0) * rates[1:]
+        equity = self.initial_balance + np.cumsum(pnl.sum(axis=1))
+
+        # Notional of every position in the account currency: units of the base currency at the current price
+        notional = units * prices * rates
+        currencies = sorted({currency for instrument in self.instruments for currency in instrument.split('_')})
+        incidence = np.zeros((len(self.instruments), len(currencies)))
+        for row, instrument in enumerate(self.instruments):
+            base, quote = instrument.split('_')
+            incidence[row, currencies.index(base)] = 1    # long the base currency
+            incidence[row, currencies.index(quote)] = -1  # short the quote currency
+
+        self.positions = pd.DataFrame(units, index=close.index, columns=self.instruments)
+        self.pnl = pd.DataFrame(pnl, index=close.index, columns=self.instruments)
+        self.notional = pd.DataFrame(notional, index=close.index, columns=self.instruments)
+        self.equity = pd.Series(equity, index=close.index, name='equity')
+        self.exposure = pd.DataFrame(notional @ incidence, index=close.index, columns=currencies)
+        self.margin_used = pd.Series(np.abs(notional) @ self._per_instrument(self.margin_rate), index=close.index,
+                                     name='margin_used')
+
+        logger.info(f"Portfolio simulation: {len(self.instruments)} instruments, {len(close)} bars, "
+                    f"final equity {equity[-1]:.2f}.")
+
+    def calculate_performance(self, periods_per_year=None):
+        """
+        Performance of the account and of each instrument.
+
+        :parameter periods_per_year: Bars per year, to annualize the ratios (see equity_metrics).
+        :return: Dict with the account metrics of equity_metrics (without the trade statistics), 'trades'
+                 (closed trades over all instruments), the margin figures 'max_margin_used',
+                 'min_margin_level' (equity / margin used) and 'margin_call_bars' (equity below the margin
+                 used), 'max_gross_exposure', and 'instruments': a DataFrame of the equity_metrics of
+                 every instrument traded on its own.
+        """
+        if self.equity is None:
+            raise ValueError("No simulation to evaluate. Run simulate_trades_vectorized first.")
+
+        equity = self.equity.to_numpy()
+        units = self.positions.to_numpy()
+        open_positions = np.count_nonzero(units, axis=1)
+        performance = equity_metrics(equity, open_positions, periods_per_year)
+        del performance['trades'], performance['win_rate']
+
+        instrument_equity = self.initial_balance + np.cumsum(self.pnl.to_numpy(), axis=0)
+        instruments = pd.DataFrame(equity_metrics(instrument_equity, units, periods_per_year),
+                                   index=self.instruments)
+
+        margin = self.margin_used.to_numpy()
+        with np.errstate(divide='ignore'):
+            margin_level = np.where(margin > 0, equity / margin, np.inf)
+        gross = np.abs(self.notional.to_numpy()).sum(axis=1)
+
+        performance.update({
+            'trades': int(instruments['trades'].sum()),
+            'max_margin_used': float(margin.max()),
+            'min_margin_level': float(margin_level.min()),
+            'margin_call_bars': int(np.count_nonzero(equity < margin)),
+            'max_gross_exposure': float(gross.max()),
+            'instruments': instruments,
+        })
+
+        logger.info(f"Portfolio return: {performance['total_return']:.2%}, max drawdown: "
+                    f"{performance['max_drawdown']:.2%}, peak margin used: {performance['max_margin_used']:.2f}")
+        return performance
+
+    def run(self, instruments, granularity, buy_signal, sell_signal, indicators=(), source="cache"):
+        """
+        Load, apply indicators, simulate and evaluate in one call.
+
+        :parameter indicators: Iterable of (indicator_func, parameters dict) pairs.
+        :return: See calculate_performance.
+        """
+        self.load_data(instruments, granularity, source)
+        for indicator_func, parameters in indicators:
+            self.apply_indicator(indicator_func, **parameters)
+        self.simulate_trades_vectorized(buy_signal, sell_signal)
+        return self.calculate_performance()
@@ -0,0 +1,349 @@
+"""
+Search strategies for the optimizer. Instead of backtesting every parameter combination, a strategy
+decides which combinations to backtest (and on how much history) within a shared EvaluationBudget:
+
+    RandomSearch       samples combinations uniformly without repeats.
+    SuccessiveHalving  scores many combinations on a short recent slice of history, keeps the best
+                       1/eta of them for a slice eta times longer, and so on up to the full history.
+    TPESearch          Tree-structured Parzen Estimator: after some random trials, samples where the
+                       best-scoring combinations so far are dense and the rest are sparse.
+    GridSearch         every combination, i.e. what optimize_parameters does.
+
+Usage:
+    budget = EvaluationBudget(backtest_objective(data, SMA.calculate, 'sma'), max_evaluations=50)
+    TPESearch({'period': range(5, 500)}, seed=1).search(budget)
+    budget.results()  # full-history trials, best first
+"""
+import itertools
+import math
+
+import numpy as np
+import pandas as pd
+
+from backend.data.utils.utils import to_python
+from backend.logs.log_manager import LogManager
+from backend.trading.optimizers.parallel_sweep import evaluate_combination, rank_results
+
+# Initialize the LogManager
+logger = LogManager('search_logs').get_logger()
+
+
+def backtest_objective(data, indicator_func, indicator_column):
+    """
+    Objective backtesting one combination with the rules of Optimizer.optimize_parameters.
+
+    :parameter data: DataFrame of candles with at least a 'close' column.
+    :return: Function (parameters, fraction) -> metrics dict (or None), run on the most recent
+             `fraction` of the bars.
+    """
+    columns = {column: data[column].to_numpy(dtype=float) for column in data.columns
+               if pd.api.types.is_numeric_dtype(data[column])}
+    n_bars = len(data)
+
+    def objective(parameters, fraction=1.0):
+        start = n_bars - max(1, int(round(n_bars * fraction)))
+        window = {column: values[start:] for column, values in columns.items()}
+        return evaluate_combination(window, indicator_func, indicator_column, parameters)
+
+    return objective
+
+
+class SearchSpace:
+    """
+    Discrete search space: each parameter takes one of a sequence of values. Points are tuples of
+    value indices, one per parameter.
+    """
+
+    def __init__(self, space):
+        """
+        :parameter space: Dict of parameter name -> sequence of candidate values (e.g. range(5, 200)).
+        """
+        self.names = list(space)
+        self.values = [list(values) for values in space.values()]
+        if not self.names or not all(self.values):
+            raise ValueError("Every parameter needs at least one candidate value.")
+        self.sizes = np.array([len(values) for values in self.values])
+
+    def __len__(self):
+        return math.prod(len(values) for values in self.values)
+
+    def parameters(self, point):
+        """
+        :return: Parameter dict of a point.
+        """
+        return {name: to_python(values[i]) for name, values, i in zip(self.names, self.values, point)}
+
+    def points(self):
+        """
+        Every point, in grid order.
+        """
+        return itertools.product(*(range(size) for size in self.sizes))
+
+    def sample(self, rng, exclude=(), tries=1000):
+        """
+        Draw a uniformly random point not in `exclude`.
+
+        :return: Point, or None if none was found (the space is used up or nearly so).
+        """
+        if len(exclude) >= len(self):
+            return None
+        for _ in range(tries):
+            point = tuple(int(i) for i in rng.integers(0, self.sizes))
+            if point not in exclude:
+                return point
+        remaining = (point for point in self.points() if point not in exclude)
+        return next(remaining, None)
+
+
+class EvaluationBudget:
+    """
+    Evaluation budget shared by the search strategies. Costs are counted in full-history backtests:
+    a run on a fraction of the history costs that fraction. Each (parameters, fraction) pair is
+    backtested once; asking again returns the recorded score for free.
+    """
+
+    def __init__(self, objective, max_evaluations, rank_by="total_return"):
+        """
+        :parameter objective: Function (parameters, fraction) -> metrics dict or None
+                              (e.g. backtest_objective(...)).
+        :parameter max_evaluations: Budget in full-history backtests.
+        :parameter rank_by: Metric maximized by the search.
+        """
+        self.objective = objective
+        self.max_evaluations = max_evaluations
+        self.rank_by = rank_by
+        self.used = 0.0
+        self.runs = 0
+        self.trials = []
+        self._scores = {}
+
+    @staticmethod
+    def _key(parameters, fraction):
+        return tuple(sorted(parameters.items())), round(fraction, 9)
+
+    @property
+    def remaining(self):
+        return self.max_evaluations - self.used
+
+    def can_afford(self, fraction=1.0):
+        return self.used + fraction <= self.max_evaluations + 1e-9
+
+    def evaluated(self, parameters, fraction=1.0):
+        return self._key(parameters, fraction) in self._scores
+
+    def evaluate(self, parameters, fraction=1.0):
+        """
+        Backtest one combination on the most recent `fraction` of the history and charge the budget.
+
+        :return: Score (the rank_by metric; -inf when the combination produced no result).
+        :raises RuntimeError: If the budget cannot afford the run.
+        """
+        key = self._key(parameters, fraction)
+        if key in self._scores:
+            return self._scores[key]
+        if not self.can_afford(fraction):
+            raise RuntimeError(f"Evaluation budget of {self.max_evaluations} backtests exhausted.")
+
+        self.used += fraction
+        self.runs += 1
+        try:
+            metrics = self.objective(parameters, fraction)
+        except Exception as e:
+            logger.error(f"Error evaluating parameters {parameters}: {e}")
+            metrics = None
+
+        score = float(metrics[self.rank_by]) if metrics is not None else -math.inf
+        score = -math.inf if math.isnan(score) else score
+        self._scores[key] = score
+        if metrics is not None:
+            self.trials.append({**parameters, **metrics, 'fraction': fraction})
+        return score
+
+    def results(self):
+        """
+        :return: Ranked DataFrame of the full-history trials, best first (see rank_results).
+        """
+        full = [{key: value for key, value in trial.items() if key != 'fraction'}
+                for trial in self.trials if trial['fraction'] == 1.0]
+        return rank_results(full, self.rank_by)
+
+
+## ================================================
+## ✅ STRATEGIES
+## ================================================
+
+class GridSearch:
+    """
+    Every combination of the space in grid order, as far as the budget goes.
+    """
+
+    def __init__(self, space):
+        self.space = SearchSpace(space)
+
+    def search(self, budget):
+        for point in self.space.points():
+            if not budget.can_afford():
+                break
+            budget.evaluate(self.space.parameters(point))
+        return budget
+
+
+class RandomSearch:
+    """
+    Uniformly random combinations without repeats until the budget or the space runs out.
+    """
+
+    def __init__(self, space, seed=None):
+        self.space = SearchSpace(space)
+        self.rng = np.random.default_rng(seed)
+
+    def search(self, budget):
+        seen = set()
+        while budget.can_afford():
+            point = self.space.sample(self.rng, seen)
+            if point is None:
+                break
+            seen.add(point)
+            budget.evaluate(self.space.parameters(point))
+        return budget
+
+
+class SuccessiveHalving:
+    """
+    Successive halving over growing slices of history. Rung r scores its candidates on the most recent
+    min_fraction * eta**r of the bars and promotes the best 1/eta to the next rung; the last rung uses
+    the full history. Every rung costs about the same, so the budget buys roughly
+    max_evaluations / (rungs * min_fraction) starting candidates.
+    """
+
+    def __init__(self, space, eta=3, min_fraction=1 / 9, seed=None):
+        """
+        :parameter eta: Factor by which the candidates shrink and the slices grow between rungs.
+        :parameter min_fraction: Share of the history used by the first rung.
+        """
+        if eta < 2 or not 0 < min_fraction <= 1:
+            raise ValueError("eta must be at least 2 and min_fraction in (0, 1].")
+        self.space = SearchSpace(space)
+        self.eta = eta
+        self.rng = np.random.default_rng(seed)
+        rungs = int(math.floor(math.log(1 / min_fraction, eta) + 1e-9)) + 1
+        self.fractions = [min(1.0, min_fraction * eta ** rung) for rung in range(rungs - 1)] + [1.0]
+
+    def plan(self, max_evaluations):
+        """
+        :return: Number of candidates per rung that fits in the budget.
+        """
+        def sizes(n_candidates):
+            counts = [n_candidates]
+            for _ in self.fractions[1:]:
+                counts.append(math.ceil(counts[-1] / self.eta))
+            return counts
+
+        per_candidate = sum(fraction / self.eta ** rung for rung, fraction in enumerate(self.fractions))
+        n_candidates = min(len(self.space), int(max_evaluations / per_candidate) + self.eta)
+        while n_candidates > 1 and sum(size * fraction for size, fraction in
+                                       zip(sizes(n_candidates), self.fractions)) > max_evaluations + 1e-9:
+            n_candidates -= 1
+        return sizes(max(1, n_candidates))
+
+    def search(self, budget):
+        sizes = self.plan(budget.remaining)
+        candidates, seen = [], set()
+        while len(candidates) < sizes[0]:
+            point = self.space.sample(self.rng, seen)
+            if point is None:
+                break
+            seen.add(point)
+            candidates.append(self.space.parameters(point))
+
+        for size, fraction in zip(sizes, self.fractions):
+            candidates = candidates[:size]
+            scored = []
+            for parameters in candidates:
+                if not budget.can_afford(fraction):
+                    break
+                scored.append((budget.evaluate(parameters, fraction), parameters))
+            # Stable sort: ties keep their sampling order
+            scored.sort(key=lambda item: item[0], reverse=True)
+            candidates = [parameters for _, parameters in scored]
+            logger.info(f"Successive halving: {len(scored)} candidates on {fraction:.0%} of the history.")
+        return budget
+
+
+class TPESearch:
+    """
+    Tree-structured Parzen Estimator over the discrete space. After n_startup random trials, the
+    full-history trials are split into the best `gamma` share and the rest, each parameter gets a
+    Parzen (kernel density) estimate over its value indices for both groups, and the next combination
+    is the candidate, among n_candidates drawn from the good density, with the highest good/bad ratio.
+    """
+
+    def __init__(self, space, n_startup=10, gamma=0.25, n_candidates=24, seed=None):
+        self.space = SearchSpace(space)
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.rng = np.random.default_rng(seed)
+
+    def _density(self, observed, size):
+        """
+        Parzen estimate over the indices 0..size-1: a Gaussian kernel per observation, renormalized
+        on the index grid, mixed with a uniform prior of one observation's weight.
+
+        :return: Array of probabilities over the indices.
+        """
+        grid = np.arange(size)
+        prior = np.full(size, 1 / size)
+        if len(observed) == 0:
+            return prior
+        bandwidth = max(1.0, size / (1 + len(observed)))
+        kernels = np.exp(-0.5 * ((grid[None, :] - np.asarray(observed)[:, None]) / bandwidth) ** 2)
+        kernels /= kernels.sum(axis=1, keepdims=True)
+        return (kernels.sum(axis=0) + prior) / (len(observed) + 1)
+
+    def suggest(self, points, scores, exclude):
+        """
+        :return: Next point to evaluate, or None if every candidate drawn was already evaluated.
+        """
+        order = np.argsort(scores)[::-1]
+        n_good = max(1, int(math.ceil(self.gamma * len(points))))
+        good, bad = points[order[:n_good]], points[order[n_good:]]
+
+        ratio = np.zeros(self.n_candidates)
+        candidates = np.empty((self.n_candidates, len(self.space.sizes)), dtype=int)
+        for dimension, size in enumerate(self.space.sizes):
+            good_density = self._density(good[:, dimension], size)
+            bad_density = self._density(bad[:, dimension], size)
+            candidates[:, dimension] = self.rng.choice(size, size=self.n_candidates, p=good_density)
+            ratio += np.log(good_density[candidates[:, dimension]]) - np.log(bad_density[candidates[:, dimension]])
+
+        for i in np.argsort(ratio)[::-1]:
+            point = tuple(int(index) for index in candidates[i])
+            if point not in exclude:
+                return point
+        return None
+
+    def search(self, budget):
+        seen, points, scores = set(), [], []
+        while budget.can_afford():
+            point = None
+            if len(points) >= self.n_startup:
+                point = self.suggest(np.array(points), np.array(scores), seen)
+            if point is None:
+                point = self.space.sample(self.rng, seen)
+            if point is None:
+                break
+            seen.add(point)
+            score = budget.evaluate(self.space.parameters(point))
+            points.append(point)
+            # Failed combinations rank last without distorting the densities with -inf
+            scores.append(score if math.isfinite(score) else -1e300)
+        return budget
+
+
+SEARCH_STRATEGIES = {
+    'grid': GridSearch,
+    'random': RandomSearch,
+    'halving': SuccessiveHalving,
+    'tpe': TPESearch,
+}
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from backend.logs.log_manager import LogManager
+
+# Initialize the LogManager
+logger = LogManager('signal_engine_logs').get_logger()
+
+
+def resolve_signal(data, signal):
+    """
+    Turn a signal definition into a boolean NumPy array aligned with the data.
+
+    :parameter data: DataFrame the signal refers to.
+    :parameter signal: Boolean array/Series, or a string expression over the columns (e.g. "close > sma").
+    :return: Boolean NumPy array with one entry per row of data.
+    """
+    if isinstance(signal, str):
+        signal = data.eval(signal)
+
+    if isinstance(signal, pd.Series):
+        signal = signal.to_numpy()
+
+    signal = np.asarray(signal)
+    if signal.shape != (len(data),):
+        raise ValueError(f"Signal length {signal.shape} does not match data length {len(data)}.")
+
+    # NaN comparisons are False in the row loop as well, so missing values never trigger a fill
+    if signal.dtype != bool:
+        signal = np.nan_to_num(signal.astype(float), nan=0.0) != 0
+
+    return signal
+
+
+def position_state(buy, sell):
+    """
+    Compute the long/flat state after every bar, matching the rules of Backtester.simulate_trades:
+    a flat book opens on a buy signal and a long book closes on a sell signal.
+
+    Bars with only one signal reset the state (buy -> long, sell -> flat). Bars with both
+    signals always flip it, so the state is the last reset value XOR the parity of the flips since.
+
+    :parameter buy: Boolean array of buy signals, one row per bar; a 2-D array holds one run per column.
+    :parameter sell: Boolean array of sell signals, shaped like buy.
+    :return: Boolean array shaped like buy, True where a position is held after the bar.
+    """
+    n = len(buy)
+    if n == 0:
+        return np.zeros(np.shape(buy), dtype=bool)
+
+    # One contiguous row per run, so every scan below runs along memory
+    buy, sell = np.ascontiguousarray(np.transpose(buy)), np.ascontiguousarray(np.transpose(sell))
+    flips = buy & sell
+    resets = buy ^ sell
+    parity = np.logical_xor.accumulate(flips, axis=-1)
+
+    # Tag each reset with its bar, its value and the flip parity at that bar, then carry the most
+    # recent tag forward: bar * 4 + value * 2 + parity, or -1 before the first reset
+    dtype = np.int32 if n < 2 ** 29 else np.int64
+    tags = np.arange(n, dtype=dtype) * 4 + buy * dtype(2) + parity
+    last_reset = np.maximum.accumulate(np.where(resets, tags, dtype(-1)), axis=-1)
+
+    # value XOR parity at the reset XOR parity now; before any reset both tag bits are 1 and cancel out
+    state = ((last_reset >> 1) ^ last_reset) & 1
+    return np.transpose(state.astype(bool) ^ parity)
+
+
+def generate_trades(close, buy, sell):
+    """
+    Work out entries, exits and per-trade profit from signal arrays.
+
+    :parameter close: Array of close prices.
+    :parameter buy: Boolean array of buy signals.
+    :parameter sell: Boolean array of sell signals.
+    :return: Tuple (entry_idx, exit_idx, profits). entry_idx may hold one more element than
+             exit_idx when the last position is still open.
+    """
+    close = np.asarray(close, dtype=float)
+    state = position_state(buy, sell)
+    previous = np.concatenate(([False], state[:-1]))
+
+    entry_idx = np.flatnonzero(state & ~previous)
+    exit_idx = np.flatnonzero(~state & previous)
+    profits = close[exit_idx] - close[entry_idx[:len(exit_idx)]]
+
+    return entry_idx, exit_idx, profits
+
+
+def trade_statistics(profits):
+    """
+    Performance metrics for a list of per-trade profits, as reported by Backtester.calculate_performance.
+
+    :parameter profits: Sequence of per-trade profits.
+    :return: Dict with total_return, win_rate, sharpe_ratio and max_drawdown.
+    """
+    returns_series = np.asarray(profits, dtype=float)
+    if len(returns_series) == 0:
+        return {"total_return": 0, "win_rate": 0, "sharpe_ratio": 0, "max_drawdown": 0}
+
+    total_return = float(returns_series.sum())
+    win_rate = np.count_nonzero(returns_series > 0) / len(returns_series)
+
+    # Sharpe Ratio Calculation
+    std = np.std(returns_series)
+    sharpe_ratio = np.mean(returns_series) / std if std != 0 else 0
+
+    # Max Drawdown Calculation
+    cumulative_returns = np.cumsum(returns_series)
+    peak = np.maximum.accumulate(cumulative_returns)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = (peak - cumulative_returns) / peak
+    max_drawdown = np.max(drawdowns)
+
+    return {
+        "total_return": total_return,
+        "win_rate": win_rate,
+        "sharpe_ratio": sharpe_ratio,
+        "max_drawdown": max_drawdown,
+    }
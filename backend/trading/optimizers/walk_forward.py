@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import pandas as pd
+
+from backend.data.utils.utils import to_python
+from backend.logs.log_manager import LogManager
+from backend.trading.optimizers.parallel_sweep import SharedCandles, attach_candles, evaluate_combination, rank_results
+
+# Initialize the LogManager
+logger = LogManager('walk_forward_logs').get_logger()
+
+# Candle columns mapped by the current worker process, set once by _init_worker
+_worker_columns = {}
+
+
+class Window(NamedTuple):
+    """
+    Bar positions of one walk-forward window: train on [train_start, train_end), test on [train_end, test_end).
+    """
+    train_start: int
+    train_end: int
+    test_end: int
+
+
+def walk_forward_windows(n_bars, train_size, test_size, step=None):
+    """
+    Rolling train/test windows over n_bars bars, anchored at the first bar. Each test window directly
+    follows its training window, and only windows whose test window is complete are returned, so
+    appending bars adds new windows at the end and leaves the existing ones unchanged.
+
+    :parameter n_bars: Number of bars in the data.
+    :parameter train_size: Bars in each training window.
+    :parameter test_size: Bars in each out-of-sample window.
+    :parameter step: Bars between window starts (defaults to test_size: back-to-back test windows).
+    :return: List of Window.
+    """
+    step = step or test_size
+    if min(train_size, test_size, step) < 1:
+        raise ValueError("Window sizes and step must be positive.")
+    return [Window(start, start + train_size, start + train_size + test_size)
+            for start in range(0, n_bars - train_size - test_size + 1, step)]
+
+
+def window_labels(index, window):
+    """
+    Identify a window by the bars it covers rather than their positions, so it keeps its identity when
+    data is appended.
+
+    :return: Dict with the train_start, train_end, test_start and test_end bar labels (inclusive).
+    """
+    def label(position):
+        value = index[position]
+        return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+    return {
+        'train_start': label(window.train_start),
+        'train_end': label(window.train_end - 1),
+        'test_start': label(window.train_end),
+        'test_end': label(window.test_end - 1),
+    }
+
+
+def walk_forward_key(indicator_column, param_combinations, train_size, test_size, step, rank_by):
+    """
+    Identity of a walk-forward search. Windows stored under another key (a different grid, window
+    size or ranking metric) are not reused.
+    """
+    search = {
+        'indicator': indicator_column, 'grid': list(param_combinations), 'train_size': train_size,
+        'test_size': test_size, 'step': step or test_size, 'rank_by': rank_by,
+    }
+    return hashlib.blake2b(json.dumps(search, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+def evaluate_window(columns, window, indicator_func, indicator_column, param_combinations, rank_by="total_return"):
+    """
+    Optimize one window: backtest every combination on the training bars, then run the winner on the
+    test bars. The winner's indicator is computed from the start of the training window so it is warmed
+    up, but only test bars can trade.
+
+    :parameter columns: Dict of candle column arrays covering at least the window.
+    :return: Dict with the window, the winning 'parameters', its 'train' metrics and its out-of-sample
+             'test' metrics, or None if no combination produced a result.
+    """
+    train = {column: values[window.train_start:window.train_end] for column, values in columns.items()}
+    results = []
+    for parameters in param_combinations:
+        try:
+            results.append(evaluate_combination(train, indicator_func, indicator_column, parameters))
+        except Exception as e:
+            logger.error(f"Error evaluating parameters {parameters}: {e}")
+
+    table = rank_results(results, rank_by)
+    if table.empty:
+        return None
+    # Read cell by cell: a row Series would upcast integer parameters to float
+    parameters = {key: to_python(table.at[0, key]) for key in param_combinations[0]}
+
+    span = {column: values[window.train_start:window.test_end] for column, values in columns.items()}
+    test = evaluate_combination(span, indicator_func, indicator_column, parameters,
+                                start=window.train_end - window.train_start)
+    if test is None:
+        return None
+    metrics = ('total_return', 'win_rate', 'sharpe_ratio', 'max_drawdown', 'trades')
+    return {
+        'window': window,
+        'parameters': parameters,
+        'train': {metric: to_python(table.at[0, metric]) for metric in metrics},
+        'test': {metric: to_python(test[metric]) for metric in metrics},
+    }
+
+
+def _init_worker(spec):
+    _worker_columns.clear()
+    _worker_columns.update(attach_candles(spec))
+
+
+def _evaluate_window(window, indicator_func, indicator_column, param_combinations, rank_by):
+    return evaluate_window(_worker_columns, window, indicator_func, indicator_column, param_combinations, rank_by)
+
+
+def run_walk_forward(data, windows, indicator_func, indicator_column, param_combinations, max_workers=None,
+                     rank_by="total_return"):
+    """
+    Evaluate walk-forward windows in a process pool, one window per task. The workers map the candle
+    columns read-only, as in run_parallel_sweep.
+
+    :parameter data: DataFrame of candles with at least a 'close' column.
+    :parameter windows: Windows to evaluate (see walk_forward_windows).
+    :parameter indicator_func: Picklable indicator function, e.g. SMA.calculate.
+    :parameter indicator_column: Column the indicator writes (e.g. 'sma').
+    :parameter param_combinations: List of parameter dicts searched in every training window.
+    :parameter max_workers: Number of worker processes (defaults to the CPU count, at most one per window).
+    :parameter rank_by: Metric the training windows are ranked by, highest first.
+    :return: List with the evaluate_window result (or None) of each window, in order.
+    """
+    windows, param_combinations = list(windows), list(param_combinations)
+    if not windows:
+        return []
+    max_workers = min(max_workers or os.cpu_count() or 1, len(windows))
+
+    with SharedCandles(data) as candles:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(candles.spec,)) as executor:
+            futures = [executor.submit(_evaluate_window, window, indicator_func, indicator_column,
+                                       param_combinations, rank_by) for window in windows]
+            results = []
+            for window, future in zip(windows, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    logger.error(f"Error evaluating walk-forward window {window}: {e}")
+                    results.append(None)
+
+    logger.info(f"Walk-forward evaluated {len(windows)} windows x {len(param_combinations)} combinations "
+                f"on {max_workers} workers.")
+    return results
+
+
+def walk_forward_table(windows):
+    """
+    Flatten stored walk-forward windows (SQLiteDBHandler.get_walk_forward_windows) into one row per
+    window: the bar labels, the winning parameters and the out-of-sample metrics.
+    """
+    labels = ('train_start', 'train_end', 'test_start', 'test_end')
+    return pd.DataFrame([
+        {label: window[label] for label in labels} | window['parameters']
+        | {key: value for key, value in window.items() if key not in labels and key != 'parameters'}
+        for window in windows
+    ])